@@ -0,0 +1,104 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""Benchmark mesh collision query time against geometric error of simplified meshes."""
+
+# Standard Library
+import argparse
+import time
+
+# Third Party
+import numpy as np
+import torch
+import trimesh
+
+# CuRobo
+from curobo.geom.mesh_decimation import MeshDecimationConfig
+from curobo.geom.sdf.world import CollisionQueryBuffer, WorldCollisionConfig
+from curobo.geom.sdf.world_mesh import WorldMeshCollision
+from curobo.geom.types import Mesh, WorldConfig
+from curobo.types.base import TensorDeviceType
+
+
+def create_scan_mesh(n_subdivisions: int, seed: int = 0) -> Mesh:
+    """Create a dense mesh of a bumpy sphere, similar to a scanned object."""
+    sphere = trimesh.creation.icosphere(subdivisions=n_subdivisions, radius=0.3)
+    rng = np.random.default_rng(seed)
+    vertices = sphere.vertices * (1.0 + 0.01 * rng.standard_normal((len(sphere.vertices), 1)))
+    return Mesh("scan", pose=[0.5, 0, 0.4, 1, 0, 0, 0], vertices=vertices, faces=sphere.faces)
+
+
+def time_query(
+    world: WorldConfig, query_sphere: torch.Tensor, tensor_args: TensorDeviceType, n_iters: int
+) -> float:
+    """Return mean time of a collision query in milliseconds."""
+    checker = WorldMeshCollision(WorldCollisionConfig(tensor_args=tensor_args, world_model=world))
+    query_buffer = CollisionQueryBuffer.initialize_from_shape(
+        query_sphere.shape, tensor_args, checker.collision_types
+    )
+    weight = tensor_args.to_device([1.0])
+    activation_distance = tensor_args.to_device([0.05])
+    checker.get_sphere_distance(query_sphere, query_buffer, weight, activation_distance)
+    torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(n_iters):
+        checker.get_sphere_distance(query_sphere, query_buffer, weight, activation_distance)
+    torch.cuda.synchronize()
+    return (time.perf_counter() - start) * 1000.0 / n_iters
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        nargs="+",
+        default=[0.005, 0.01, 0.02, 0.04],
+        help="decimation tolerance in meters",
+    )
+    parser.add_argument("--subdivisions", type=int, default=7, help="subdivisions of scan mesh")
+    parser.add_argument("--batch_size", type=int, default=32, help="number of trajectories")
+    parser.add_argument("--horizon", type=int, default=32, help="timesteps per trajectory")
+    parser.add_argument("--n_spheres", type=int, default=60, help="spheres per timestep")
+    parser.add_argument("--n_iters", type=int, default=20, help="queries to average over")
+    args = parser.parse_args()
+
+    tensor_args = TensorDeviceType()
+    query_sphere = torch.rand(
+        (args.batch_size, args.horizon, args.n_spheres, 4), **(tensor_args.as_torch_dict())
+    )
+    query_sphere[..., :3] = (query_sphere[..., :3] - 0.5) * 1.0 + tensor_args.to_device(
+        [0.5, 0.0, 0.4]
+    )
+    query_sphere[..., 3] = query_sphere[..., 3] * 0.05 + 0.02
+
+    mesh = create_scan_mesh(args.subdivisions)
+    base_time = time_query(WorldConfig(mesh=[mesh]), query_sphere, tensor_args, args.n_iters)
+    print("| tolerance (m) | faces | max error (m) | query (ms) | speedup |")
+    print("|---|---|---|---|---|")
+    print("| - | " + str(len(mesh.faces)) + " | 0.0 | {:.3f} | 1.0x |".format(base_time))
+    for tolerance in args.tolerance:
+        simple_mesh, stats = mesh.get_decimated_mesh(MeshDecimationConfig(tolerance=tolerance))
+        query_time = time_query(
+            WorldConfig(mesh=[simple_mesh]), query_sphere, tensor_args, args.n_iters
+        )
+        print(
+            "| "
+            + str(tolerance)
+            + " | "
+            + str(stats.output_faces)
+            + " | "
+            + "{:.4f}".format(stats.max_error)
+            + " | "
+            + "{:.3f}".format(query_time)
+            + " | "
+            + "{:.1f}x".format(base_time / query_time)
+            + " |"
+        )
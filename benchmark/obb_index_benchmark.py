@@ -0,0 +1,134 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""Benchmark sphere-cuboid collision queries with and without a grid index over cuboids."""
+
+# Standard Library
+import argparse
+import math
+import time
+
+# Third Party
+import torch
+
+# CuRobo
+from curobo.geom.sdf.world import (
+    CollisionQueryBuffer,
+    WorldCollisionConfig,
+    WorldPrimitiveCollision,
+)
+from curobo.geom.types import Cuboid, WorldConfig
+from curobo.types.base import TensorDeviceType
+
+
+def create_warehouse_world(n_obbs: int, density: float = 4.0, seed: int = 0) -> WorldConfig:
+    """Scatter cuboids on a floor, keeping the number of cuboids per square meter constant."""
+    generator = torch.Generator().manual_seed(seed)
+    side = math.sqrt(n_obbs / density)
+    position = torch.rand((n_obbs, 3), generator=generator)
+    position[:, :2] = (position[:, :2] - 0.5) * side
+    position[:, 2] = position[:, 2] * 2.0
+    yaw = torch.rand(n_obbs, generator=generator) * math.pi
+    dims = torch.rand((n_obbs, 3), generator=generator) * 0.4 + 0.1
+    cuboids = [
+        Cuboid(
+            name="cuboid_" + str(i),
+            pose=position[i].tolist() + [math.cos(yaw[i] / 2), 0, 0, math.sin(yaw[i] / 2)],
+            dims=dims[i].tolist(),
+        )
+        for i in range(n_obbs)
+    ]
+    return WorldConfig(cuboid=cuboids)
+
+
+def time_query(
+    checker: WorldPrimitiveCollision,
+    query_sphere: torch.Tensor,
+    tensor_args: TensorDeviceType,
+    swept: bool,
+    n_iters: int,
+) -> float:
+    """Return mean time of a collision query in milliseconds."""
+    query_buffer = CollisionQueryBuffer.initialize_from_shape(
+        query_sphere.shape, tensor_args, checker.collision_types
+    )
+    weight = tensor_args.to_device([1.0])
+    activation_distance = tensor_args.to_device([0.05])
+    speed_dt = tensor_args.to_device([0.02])
+
+    def query():
+        if swept:
+            return checker.get_swept_sphere_distance(
+                query_sphere, query_buffer, weight, activation_distance, speed_dt, 4
+            )
+        return checker.get_sphere_distance(query_sphere, query_buffer, weight, activation_distance)
+
+    query()
+    if tensor_args.device.type == "cuda":
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(n_iters):
+        query()
+    if tensor_args.device.type == "cuda":
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) * 1000.0 / n_iters
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--n_obbs",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000, 10000],
+        help="number of cuboids in the world",
+    )
+    parser.add_argument("--batch_size", type=int, default=32, help="number of trajectories")
+    parser.add_argument("--horizon", type=int, default=32, help="timesteps per trajectory")
+    parser.add_argument("--n_spheres", type=int, default=60, help="spheres per timestep")
+    parser.add_argument("--cell_size", type=float, default=0.25, help="grid cell size in meters")
+    parser.add_argument("--n_iters", type=int, default=10, help="queries to average over")
+    parser.add_argument("--swept", action="store_true", help="benchmark swept sphere queries")
+    parser.add_argument("--cpu", action="store_true", help="run on cpu with pytorch backend")
+    args = parser.parse_args()
+
+    device = torch.device("cpu") if args.cpu or not torch.cuda.is_available() else None
+    tensor_args = TensorDeviceType() if device is None else TensorDeviceType(device=device)
+
+    # spheres of a robot reaching within a 1.5m cube around the origin:
+    query_sphere = torch.rand(
+        (args.batch_size, args.horizon, args.n_spheres, 4), **(tensor_args.as_torch_dict())
+    )
+    query_sphere[..., :3] = (query_sphere[..., :3] - 0.5) * 1.5
+    query_sphere[..., 2] += 0.75
+    query_sphere[..., 3] = query_sphere[..., 3] * 0.05 + 0.02
+
+    print("| cuboids | no index (ms) | grid index (ms) | speedup |")
+    print("|---|---|---|---|")
+    for n_obbs in args.n_obbs:
+        world = create_warehouse_world(n_obbs)
+        times = []
+        for obb_index in [None, {"cell_size": args.cell_size}]:
+            config = WorldCollisionConfig(
+                tensor_args=tensor_args, world_model=world, obb_index=obb_index
+            )
+            checker = WorldPrimitiveCollision(config)
+            times.append(time_query(checker, query_sphere, tensor_args, args.swept, args.n_iters))
+        print(
+            "| "
+            + str(n_obbs)
+            + " | "
+            + "{:.2f}".format(times[0])
+            + " | "
+            + "{:.2f}".format(times[1])
+            + " | "
+            + "{:.1f}x".format(times[0] / times[1])
+            + " |"
+        )
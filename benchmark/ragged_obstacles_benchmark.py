@@ -0,0 +1,144 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""Benchmark memory and query time of padded and ragged cuboid storage in batched worlds."""
+
+# Standard Library
+import argparse
+import time
+from typing import List
+
+# Third Party
+import torch
+
+# CuRobo
+from curobo.geom.sdf.world import (
+    CollisionQueryBuffer,
+    WorldCollisionConfig,
+    WorldPrimitiveCollision,
+)
+from curobo.geom.types import Cuboid, WorldConfig
+from curobo.types.base import TensorDeviceType
+
+
+def create_batch_world(
+    n_envs: int, max_obbs: int, mean_obbs: int, seed: int = 0
+) -> List[WorldConfig]:
+    """Create environments with a skewed number of cuboids, the first with max_obbs cuboids."""
+    generator = torch.Generator().manual_seed(seed)
+    # exponential distribution of cuboids per environment:
+    n_obbs = -mean_obbs * torch.log(1.0 - torch.rand(n_envs, generator=generator))
+    n_obbs = torch.clamp(n_obbs.round().long(), 1, max_obbs)
+    n_obbs[0] = max_obbs
+    world_list = []
+    for n in n_obbs.tolist():
+        position = (torch.rand((n, 3), generator=generator) - 0.5) * 2.0
+        dims = torch.rand((n, 3), generator=generator) * 0.2 + 0.05
+        cuboids = [
+            Cuboid("cuboid_" + str(i), position[i].tolist() + [1, 0, 0, 0], dims[i].tolist())
+            for i in range(n)
+        ]
+        world_list.append(WorldConfig(cuboid=cuboids))
+    return world_list
+
+
+def get_cache_bytes(checker: WorldPrimitiveCollision) -> int:
+    """Return memory of cuboid cache tensors in bytes."""
+    return sum(t.numel() * t.element_size() for t in checker._cube_tensor_list)
+
+
+def time_query(
+    checker: WorldPrimitiveCollision,
+    query_sphere: torch.Tensor,
+    env_query_idx: torch.Tensor,
+    tensor_args: TensorDeviceType,
+    n_iters: int,
+) -> float:
+    """Return mean time of a collision query in milliseconds."""
+    query_buffer = CollisionQueryBuffer.initialize_from_shape(
+        query_sphere.shape, tensor_args, checker.collision_types
+    )
+    weight = tensor_args.to_device([1.0])
+    activation_distance = tensor_args.to_device([0.05])
+
+    def query():
+        return checker.get_sphere_distance(
+            query_sphere, query_buffer, weight, activation_distance, env_query_idx
+        )
+
+    query()
+    if tensor_args.device.type == "cuda":
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(n_iters):
+        query()
+    if tensor_args.device.type == "cuda":
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) * 1000.0 / n_iters
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--max_obbs",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000],
+        help="number of cuboids in the largest environment",
+    )
+    parser.add_argument("--n_envs", type=int, default=64, help="number of environments")
+    parser.add_argument("--mean_obbs", type=int, default=5, help="mean cuboids per environment")
+    parser.add_argument("--horizon", type=int, default=32, help="timesteps per trajectory")
+    parser.add_argument("--n_spheres", type=int, default=60, help="spheres per timestep")
+    parser.add_argument("--n_iters", type=int, default=10, help="queries to average over")
+    parser.add_argument("--cpu", action="store_true", help="run on cpu with pytorch backend")
+    args = parser.parse_args()
+
+    device = torch.device("cpu") if args.cpu or not torch.cuda.is_available() else None
+    tensor_args = TensorDeviceType() if device is None else TensorDeviceType(device=device)
+
+    # one trajectory per environment:
+    query_sphere = torch.rand(
+        (args.n_envs, args.horizon, args.n_spheres, 4), **(tensor_args.as_torch_dict())
+    )
+    query_sphere[..., :3] = (query_sphere[..., :3] - 0.5) * 2.0
+    query_sphere[..., 3] = query_sphere[..., 3] * 0.05 + 0.02
+    env_query_idx = torch.arange(args.n_envs, device=tensor_args.device, dtype=torch.int32)
+
+    print("| max cuboids | padded (KB) | ragged (KB) | padded (ms) | ragged (ms) | speedup |")
+    print("|---|---|---|---|---|---|")
+    for max_obbs in args.max_obbs:
+        world_list = create_batch_world(args.n_envs, max_obbs, args.mean_obbs)
+        memory = []
+        times = []
+        for ragged in [False, True]:
+            config = WorldCollisionConfig(
+                tensor_args=tensor_args, world_model=world_list, ragged_obstacles=ragged
+            )
+            checker = WorldPrimitiveCollision(config)
+            memory.append(get_cache_bytes(checker) / 1024.0)
+            times.append(
+                time_query(checker, query_sphere, env_query_idx, tensor_args, args.n_iters)
+            )
+        print(
+            "| "
+            + str(max_obbs)
+            + " | "
+            + "{:.1f}".format(memory[0])
+            + " | "
+            + "{:.1f}".format(memory[1])
+            + " | "
+            + "{:.2f}".format(times[0])
+            + " | "
+            + "{:.2f}".format(times[1])
+            + " | "
+            + "{:.1f}x".format(times[0] / times[1])
+            + " |"
+        )
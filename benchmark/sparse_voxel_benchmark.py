@@ -0,0 +1,189 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""Benchmark memory and query time of sparse block voxel grids against dense voxel grids."""
+
+# Standard Library
+import argparse
+import math
+import time
+
+# Third Party
+import torch
+
+# CuRobo
+from curobo.geom.sdf.world import (
+    CollisionCheckerType,
+    CollisionQueryBuffer,
+    WorldCollision,
+    WorldCollisionConfig,
+)
+from curobo.geom.sdf.world_sparse_voxel import WorldSparseVoxelCollision
+from curobo.geom.types import VoxelGrid, WorldConfig
+from curobo.types.base import TensorDeviceType
+
+
+def create_warehouse_grid(
+    side: float, voxel_size: float, n_boxes: int, tensor_args: TensorDeviceType, seed: int = 0
+) -> VoxelGrid:
+    """Create a voxel grid with signed distance to boxes scattered on a floor."""
+    generator = torch.Generator().manual_seed(seed)
+    grid = VoxelGrid(
+        "warehouse",
+        pose=[0, 0, 1.0, 1, 0, 0, 0],
+        dims=[side, side, 2.0],
+        voxel_size=voxel_size,
+        tensor_args=tensor_args,
+    )
+    xyz = grid.create_xyzr_tensor(transform_to_origin=True, tensor_args=tensor_args)[:, :3]
+    center = (torch.rand((n_boxes, 3), generator=generator) - 0.5) * side
+    center[:, 2] = torch.rand(n_boxes, generator=generator) + 0.25
+    half = (torch.rand((n_boxes, 3), generator=generator) * 0.4 + 0.1).to(tensor_args.device)
+    center = center.to(tensor_args.device)
+    esdf = torch.full_like(xyz[:, 0], -100.0)
+    for i in range(n_boxes):
+        q = torch.abs(xyz - center[i]) - half[i]
+        box_esdf = -(
+            torch.linalg.norm(torch.clamp(q, min=0.0), dim=-1)
+            + torch.clamp(torch.amax(q, dim=-1), max=0.0)
+        )
+        esdf = torch.maximum(esdf, box_esdf)
+    grid.feature_tensor = esdf
+    return grid
+
+
+def time_query(
+    checker: WorldCollision,
+    query_sphere: torch.Tensor,
+    tensor_args: TensorDeviceType,
+    swept: bool,
+    n_iters: int,
+) -> float:
+    """Return mean time of a collision query in milliseconds."""
+    query_buffer = CollisionQueryBuffer.initialize_from_shape(
+        query_sphere.shape, tensor_args, checker.collision_types
+    )
+    weight = tensor_args.to_device([1.0])
+    activation_distance = tensor_args.to_device([0.05])
+    speed_dt = tensor_args.to_device([0.02])
+
+    def query():
+        if swept:
+            return checker.get_swept_sphere_distance(
+                query_sphere, query_buffer, weight, activation_distance, speed_dt, 4
+            )
+        return checker.get_sphere_distance(query_sphere, query_buffer, weight, activation_distance)
+
+    query()
+    if tensor_args.device.type == "cuda":
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(n_iters):
+        query()
+    if tensor_args.device.type == "cuda":
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) * 1000.0 / n_iters
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--side",
+        type=float,
+        nargs="+",
+        default=[4.0, 8.0, 16.0],
+        help="length of the square floor of the world in meters",
+    )
+    parser.add_argument("--voxel_size", type=float, default=0.05, help="voxel size in meters")
+    parser.add_argument("--box_density", type=float, default=0.5, help="boxes per square meter")
+    parser.add_argument("--block_size", type=int, default=8, help="voxels per block edge")
+    parser.add_argument("--far_distance", type=float, default=0.3, help="truncation in meters")
+    parser.add_argument("--batch_size", type=int, default=32, help="number of trajectories")
+    parser.add_argument("--horizon", type=int, default=32, help="timesteps per trajectory")
+    parser.add_argument("--n_spheres", type=int, default=60, help="spheres per timestep")
+    parser.add_argument("--n_iters", type=int, default=10, help="queries to average over")
+    parser.add_argument("--swept", action="store_true", help="benchmark swept sphere queries")
+    parser.add_argument("--cpu", action="store_true", help="run on cpu")
+    args = parser.parse_args()
+
+    device = torch.device("cpu") if args.cpu or not torch.cuda.is_available() else None
+    tensor_args = TensorDeviceType() if device is None else TensorDeviceType(device=device)
+
+    # spheres of a robot reaching within a 1.5m cube around the origin:
+    query_sphere = torch.rand(
+        (args.batch_size, args.horizon, args.n_spheres, 4), **(tensor_args.as_torch_dict())
+    )
+    query_sphere[..., :3] = (query_sphere[..., :3] - 0.5) * 1.5
+    query_sphere[..., 2] += 0.75
+    query_sphere[..., 3] = query_sphere[..., 3] * 0.05 + 0.02
+
+    # dense grids are queried with CUDA kernels when available, otherwise with all blocks stored:
+    dense_name = "dense" if tensor_args.device.type == "cuda" else "all blocks"
+    print(
+        "| side (m) | voxels | dense (MB) | sparse (MB) | "
+        + dense_name
+        + " (ms) | sparse (ms) | speedup |"
+    )
+    print("|---|---|---|---|---|---|---|")
+    for side in args.side:
+        n_boxes = max(1, int(args.box_density * side * side))
+        grid = create_warehouse_grid(side, args.voxel_size, n_boxes, tensor_args)
+        world = WorldConfig(voxel=[grid])
+        n_voxels = math.prod(grid.get_grid_shape()[0])
+        dense_bytes = n_voxels * grid.feature_tensor.element_size()
+
+        sparse_config = {"block_size": args.block_size, "far_distance": args.far_distance}
+        sparse = WorldSparseVoxelCollision(
+            WorldCollisionConfig(
+                tensor_args=tensor_args,
+                world_model=world,
+                checker_type=CollisionCheckerType.SPARSE_VOXEL,
+                sparse_voxel=sparse_config,
+            )
+        )
+        if tensor_args.device.type == "cuda":
+            # CuRobo
+            from curobo.geom.sdf.world_voxel import WorldVoxelCollision
+
+            dense = WorldVoxelCollision(
+                WorldCollisionConfig(
+                    tensor_args=tensor_args,
+                    world_model=world,
+                    checker_type=CollisionCheckerType.VOXEL,
+                )
+            )
+        else:
+            dense = WorldSparseVoxelCollision(
+                WorldCollisionConfig(
+                    tensor_args=tensor_args,
+                    world_model=world,
+                    checker_type=CollisionCheckerType.SPARSE_VOXEL,
+                    sparse_voxel={"block_size": args.block_size, "far_distance": 1000.0},
+                )
+            )
+        dense_time = time_query(dense, query_sphere, tensor_args, args.swept, args.n_iters)
+        sparse_time = time_query(sparse, query_sphere, tensor_args, args.swept, args.n_iters)
+        print(
+            "| "
+            + str(side)
+            + " | "
+            + str(n_voxels)
+            + " | "
+            + "{:.1f}".format(dense_bytes / 1e6)
+            + " | "
+            + "{:.1f}".format(sparse.voxel_memory_bytes / 1e6)
+            + " | "
+            + "{:.2f}".format(dense_time)
+            + " | "
+            + "{:.2f}".format(sparse_time)
+            + " | "
+            + "{:.1f}x".format(dense_time / sparse_time)
+            + " |"
+        )
@@ -0,0 +1,58 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""Example finding self collision ignore pairs of a robot by sampling joint configurations."""
+
+# Standard Library
+import argparse
+
+# Third Party
+import yaml
+
+# CuRobo
+from curobo.types.base import TensorDeviceType
+from curobo.util_file import get_robot_configs_path, join_path, load_yaml
+from curobo.wrap.model.robot_world import RobotWorld, RobotWorldConfig
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--robot", type=str, default="franka.yml", help="robot configuration to load"
+    )
+    parser.add_argument(
+        "--n_samples", type=int, default=100000, help="number of joint configurations to sample"
+    )
+    parser.add_argument(
+        "--batch_size", type=int, default=10000, help="joint configurations to evaluate at once"
+    )
+    parser.add_argument(
+        "--never_collision_distance",
+        type=float,
+        default=0.01,
+        help="link pairs closer than this distance are not marked as never colliding",
+    )
+    args = parser.parse_args()
+
+    tensor_args = TensorDeviceType()
+    robot_cfg = load_yaml(join_path(get_robot_configs_path(), args.robot))["robot_cfg"]
+    config = RobotWorldConfig.load_from_config(robot_cfg, None, tensor_args=tensor_args)
+    robot_world = RobotWorld(config)
+
+    result = robot_world.get_self_collision_ignore(
+        n_samples=args.n_samples,
+        batch_size=args.batch_size,
+        never_collision_distance=args.never_collision_distance,
+    )
+    n_pairs = len(result.collision_fraction)
+    print("Link pairs: " + str(n_pairs))
+    print("Always colliding: " + str(len(result.always_colliding)))
+    print("Never colliding: " + str(len(result.never_colliding)))
+    print("Skipped links: " + str(result.skipped_links))
+    print(yaml.dump({"self_collision_ignore": result.self_collision_ignore}, sort_keys=False))
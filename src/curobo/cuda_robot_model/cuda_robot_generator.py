@@ -29,7 +29,7 @@ import torch
 import torch.autograd.profiler as profiler
 
 # CuRobo
-from curobo.cuda_robot_model.kinematics_parser import LinkParams
+from curobo.cuda_robot_model.kinematics_parser import KinematicsParser, LinkParams
 from curobo.cuda_robot_model.types import (
     CSpaceConfig,
     JointLimits,
@@ -55,6 +55,12 @@ except ImportError:
         + "or pip install usd-core, NOTE: Do not install this if using with Isaac Sim."
     )
 
+#: Number of sphere pair checks per thread supported by the self collision kernel.
+SELF_COLLISION_CHECKS_PER_THREAD = [2, 4, 8, 32, 64, 128, 512]
+
+#: Maximum number of threads in a block of the self collision kernel.
+SELF_COLLISION_MAX_THREADS = 1024
+
 
 @dataclass
 class CudaRobotGeneratorConfig:
@@ -313,23 +319,7 @@ class CudaRobotGenerator(CudaRobotGeneratorConfig):
 
         # other_links = list(set(self.link_names + self.collision_link_names))
 
-        # load kinematics parser based on file type:
-        # NOTE: Also add option to load from data buffers.
-        if self.use_usd_kinematics:
-            self._kinematics_parser = UsdKinematicsParser(
-                self.usd_path,
-                flip_joints=self.usd_flip_joints,
-                flip_joint_limits=self.usd_flip_joint_limits,
-                extra_links=self.extra_links,
-                usd_robot_root=self.usd_robot_root,
-            )
-        else:
-            self._kinematics_parser = UrdfKinematicsParser(
-                self.urdf_path,
-                mesh_root=self.asset_root_path,
-                extra_links=self.extra_links,
-                load_meshes=self.load_meshes,
-            )
+        self._kinematics_parser = CudaRobotGenerator.load_kinematics_parser(self)
 
         if self.lock_joints is None:
             self._build_kinematics(self.base_link, self.ee_link, other_links, self.link_names)
@@ -374,8 +364,36 @@ class CudaRobotGenerator(CudaRobotGeneratorConfig):
             lock_jointstate=self.lock_jointstate,
             mimic_joints=self._mimic_joint_data,
         )
-        if self.asset_root_path is not None and self.asset_root_path != "":
-            self._kinematics_parser.add_absolute_path_to_link_meshes(self.asset_root_path)
+
+    @staticmethod
+    def load_kinematics_parser(config: CudaRobotGeneratorConfig) -> KinematicsParser:
+        """Load kinematics parser based on file type of the robot description.
+
+        Args:
+            config: Generator configuration containing paths to robot description files.
+
+        Returns:
+            KinematicsParser: Parser with absolute paths added to link meshes.
+        """
+        # NOTE: Also add option to load from data buffers.
+        if config.use_usd_kinematics:
+            kinematics_parser = UsdKinematicsParser(
+                config.usd_path,
+                flip_joints=config.usd_flip_joints,
+                flip_joint_limits=config.usd_flip_joint_limits,
+                extra_links=config.extra_links,
+                usd_robot_root=config.usd_robot_root,
+            )
+        else:
+            kinematics_parser = UrdfKinematicsParser(
+                config.urdf_path,
+                mesh_root=config.asset_root_path,
+                extra_links=config.extra_links,
+                load_meshes=config.load_meshes,
+            )
+        if config.asset_root_path is not None and config.asset_root_path != "":
+            kinematics_parser.add_absolute_path_to_link_meshes(config.asset_root_path)
+        return kinematics_parser
 
     def add_link(self, link_params: LinkParams):
         """Add an extra link to the robot kinematics tree.
@@ -785,50 +803,40 @@ class CudaRobotGenerator(CudaRobotGeneratorConfig):
         )
 
         # build self collision distance tensor:
-        self_collision_distance = (
-            torch.zeros(
-                (self.total_spheres, self.total_spheres),
-                dtype=cpu_tensor_args.dtype,
-                device=cpu_tensor_args.device,
-            )
-            - torch.inf
-        )
-        self.self_collision_offset = torch.zeros(
-            (self.total_spheres), dtype=cpu_tensor_args.dtype, device=cpu_tensor_args.device
-        )
         with profiler.record_function("robot_generator/self_collision_distance"):
-            # iterate through each link:
-            for j_idx, j in enumerate(collision_link_names):
-                ignore_links = []
+            n_links = len(collision_link_names)
+            # mask of link pairs to check for self collision, ignore pairs are symmetric:
+            link_pair_mask = ~torch.eye(n_links, dtype=torch.bool, device=cpu_tensor_args.device)
+            link_local_idx = {name: i for i, name in enumerate(collision_link_names)}
+            for j in collision_link_names:
                 if j in self.self_collision_ignore.keys():
-                    ignore_links = self.self_collision_ignore[j]
-                link1_idx = self._name_to_idx_map[j]
-                link1_spheres_idx = torch.nonzero(self._link_sphere_idx_map == link1_idx)
-
-                rad1 = self._link_spheres_tensor[link1_spheres_idx, 3]
+                    for i_name in self.self_collision_ignore[j]:
+                        if i_name in link_local_idx:
+                            link_pair_mask[link_local_idx[j], link_local_idx[i_name]] = False
+                            link_pair_mask[link_local_idx[i_name], link_local_idx[j]] = False
                 if j not in self_collision_buffer.keys():
                     self_collision_buffer[j] = 0.0
-                c1 = self_collision_buffer[j]
-                self.self_collision_offset[link1_spheres_idx] = c1
-                for _, i_name in enumerate(collision_link_names):
-                    if i_name == j or i_name in ignore_links:
-                        continue
-                    if i_name not in collision_link_names:
-                        log_error("Self Collision Link name not found in collision_link_names")
-                    # find index of this link name:
-                    if i_name not in self_collision_buffer.keys():
-                        self_collision_buffer[i_name] = 0.0
-                    c2 = self_collision_buffer[i_name]
-                    link2_idx = self._name_to_idx_map[i_name]
-                    # update collision distance between spheres from these two links:
-                    link2_spheres_idx = torch.nonzero(self._link_sphere_idx_map == link2_idx)
-                    rad2 = self._link_spheres_tensor[link2_spheres_idx, 3]
-
-                    for k1 in range(len(rad1)):
-                        sp1 = link1_spheres_idx[k1]
-                        for k2 in range(len(rad2)):
-                            sp2 = link2_spheres_idx[k2]
-                            self_collision_distance[sp1, sp2] = rad1[k1] + rad2[k2] + c1 + c2
+
+            # map every sphere to the index of its link in collision_link_names:
+            global_to_local = torch.full(
+                (len(self._name_to_idx_map),), -1, dtype=torch.long, device=cpu_tensor_args.device
+            )
+            for j in collision_link_names:
+                global_to_local[self._name_to_idx_map[j]] = link_local_idx[j]
+            sphere_link_idx = global_to_local[self._link_sphere_idx_map.to(dtype=torch.long)]
+
+            link_offset = torch.as_tensor(
+                [self_collision_buffer[j] for j in collision_link_names],
+                dtype=cpu_tensor_args.dtype,
+                device=cpu_tensor_args.device,
+            )
+            self.self_collision_offset = link_offset[sphere_link_idx]
+            rad = self._link_spheres_tensor[:, 3]
+            self_collision_distance = (rad.unsqueeze(1) + rad.unsqueeze(0)) + (
+                self.self_collision_offset.unsqueeze(1) + self.self_collision_offset.unsqueeze(0)
+            )
+            sphere_pair_mask = link_pair_mask[sphere_link_idx][:, sphere_link_idx]
+            self_collision_distance[~sphere_pair_mask] = -torch.inf
 
         self_collision_distance = self_collision_distance.to(device=self.tensor_args.device)
         with profiler.record_function("robot_generator/self_collision_min"):
@@ -853,8 +861,9 @@ class CudaRobotGenerator(CudaRobotGeneratorConfig):
         if not valid_data:
             use_experimental_kernel = False
             log_warn(
-                "Self Collision checks are greater than 32 * 512, using slower kernel."
-                + " Number of spheres: "
+                "Self Collision checks are greater than "
+                + str(SELF_COLLISION_MAX_THREADS * SELF_COLLISION_CHECKS_PER_THREAD[-1])
+                + ", using slower kernel. Number of spheres: "
                 + str(self_collision_distance.shape[0])
             )
         if use_experimental_kernel:
@@ -874,6 +883,7 @@ class CudaRobotGenerator(CudaRobotGeneratorConfig):
             collision_matrix=self_coll_matrix,
             experimental_kernel=use_experimental_kernel,
             checks_per_thread=checks_per_thread,
+            sphere_link_idx=sphere_link_idx.to(device=self.tensor_args.device),
         )
 
     @profiler.record_function("robot_generator/create_self_collision_thread_data")
@@ -893,67 +903,45 @@ class CudaRobotGenerator(CudaRobotGeneratorConfig):
 
         """
         coll_cpu = collision_threshold.cpu()
-        max_checks_per_thread = 512
-        thread_loc = torch.zeros((2 * 32 * max_checks_per_thread), dtype=torch.int16) - 1
         n_spheres = coll_cpu.shape[0]
-        sl_idx = 0
-        skip_count = 0
-        all_val = 0
-        valid_data = True
-        for i in range(n_spheres):
-            if not valid_data:
-                break
-            if torch.max(coll_cpu[i]) == -torch.inf:
-                log_info("skip" + str(i))
-            for j in range(i + 1, n_spheres):
-                if sl_idx > thread_loc.shape[0] - 1:
-                    valid_data = False
-                    log_warn(
-                        "Self Collision checks are greater than "
-                        + str(32 * max_checks_per_thread)
-                        + ", using slower kernel"
-                    )
-                    break
-                if coll_cpu[i, j] != -torch.inf:
-                    thread_loc[sl_idx] = i
-                    sl_idx += 1
-                    thread_loc[sl_idx] = j
-                    sl_idx += 1
-                else:
-                    skip_count += 1
-                all_val += 1
+
+        # sphere pairs from upper triangle in row major order, skipping pairs with -inf distance:
+        pair_idx = torch.triu_indices(n_spheres, n_spheres, offset=1)
+        valid_pairs = coll_cpu[pair_idx[0], pair_idx[1]] != -torch.inf
+        pair_idx = pair_idx[:, valid_pairs]
+        n_pairs = pair_idx.shape[1]
+        all_val = max(1, n_spheres * (n_spheres - 1) // 2)
+        skip_count = all_val - n_pairs
         log_info("Self Collision threads, skipped %: " + str(100 * float(skip_count) / all_val))
-        log_info("Self Collision count: " + str(sl_idx / (2)))
-        log_info("Self Collision per thread: " + str(sl_idx / (2 * 1024)))
-
-        max_checks_per_thread = 512
-        val = sl_idx / (2 * 1024)
-        if val < 1:
-            max_checks_per_thread = 1
-        elif val < 2:
-            max_checks_per_thread = 2
-        elif val < 4:
-            max_checks_per_thread = 4
-        elif val < 8:
-            max_checks_per_thread = 8
-        elif val < 32:
-            max_checks_per_thread = 32
-        elif val < 64:
-            max_checks_per_thread = 64
-        elif val < 128:
-            max_checks_per_thread = 128
-        elif val < 512:
-            max_checks_per_thread = 512
-        else:
-            log_error(
-                "Self Collision not supported as checks are greater than 32 * 512, \
-                      reduce number of spheres used to approximate the robot."
+        log_info("Self Collision count: " + str(n_pairs))
+        log_info("Self Collision per thread: " + str(n_pairs / 1024))
+
+        # pick smallest tile of checks per thread that fits all pairs within one block:
+        valid_data = False
+        max_checks_per_thread = SELF_COLLISION_CHECKS_PER_THREAD[-1]
+        for checks in SELF_COLLISION_CHECKS_PER_THREAD:
+            if checks * SELF_COLLISION_MAX_THREADS >= n_pairs:
+                max_checks_per_thread = checks
+                valid_data = True
+                break
+        if not valid_data:
+            log_warn(
+                "Self Collision checks are greater than "
+                + str(SELF_COLLISION_MAX_THREADS * SELF_COLLISION_CHECKS_PER_THREAD[-1])
+                + ", using slower kernel"
             )
-
-        if max_checks_per_thread < 2:
-            max_checks_per_thread = 2
         log_info("Self Collision using: " + str(max_checks_per_thread))
 
+        # Tiled layout: thread t reads pairs [t * checks, (t + 1) * checks). The kernel launches
+        # at least 32 threads and at least one thread per sphere, so the buffer is padded with -1
+        # to cover the tiles of all launched threads.
+        n_threads = max(
+            32, n_spheres, (n_pairs + max_checks_per_thread - 1) // max_checks_per_thread
+        )
+        thread_loc = torch.full((2 * n_threads * max_checks_per_thread,), -1, dtype=torch.int16)
+        thread_loc[: 2 * n_pairs] = pair_idx.t().reshape(-1).to(dtype=torch.int16)
+        sl_idx = 2 * n_pairs
+
         return (
             thread_loc.to(device=collision_threshold.device),
             sl_idx,
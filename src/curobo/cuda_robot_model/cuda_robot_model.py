@@ -20,7 +20,7 @@ from __future__ import annotations
 
 # Standard Library
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 # Third Party
 import torch
@@ -31,21 +31,35 @@ from curobo.cuda_robot_model.cuda_robot_generator import (
     CudaRobotGenerator,
     CudaRobotGeneratorConfig,
 )
+from curobo.cuda_robot_model.kinematics_memo import KinematicsMemo, KinematicsMemoConfig
 from curobo.cuda_robot_model.kinematics_parser import KinematicsParser
+from curobo.cuda_robot_model.robot_model_cache import (
+    RobotModelCacheData,
+    get_robot_model_cache_key,
+    get_robot_model_cache_path,
+    load_robot_model_cache,
+    save_robot_model_cache,
+)
 from curobo.cuda_robot_model.types import (
     CSpaceConfig,
     JointLimits,
+    KinematicsSubtreeConfig,
     KinematicsTensorConfig,
     SelfCollisionKinematicsConfig,
 )
 from curobo.cuda_robot_model.util import load_robot_yaml
-from curobo.curobolib.kinematics import get_cuda_kinematics
+from curobo.curobolib.kinematics import (
+    get_cuda_kinematics,
+    get_link_jacobians,
+    torch_forward_cumul_transforms,
+)
 from curobo.geom.sphere_fit import SphereFitType
 from curobo.geom.types import Mesh, Obstacle, Sphere
 from curobo.types.base import TensorDeviceType
 from curobo.types.file_path import ContentPath
 from curobo.types.math import Pose
 from curobo.types.state import JointState
+from curobo.util.buffer_pool import BufferPool
 from curobo.util.logger import log_error, log_info, log_warn
 from curobo.util_file import is_file_xrdf
 
@@ -82,8 +96,9 @@ class CudaRobotModelConfig:
     #: USD is an experimental feature and might not work for all robots.
     kinematics_parser: Optional[KinematicsParser] = None
 
-    #: Output jacobian during forward kinematics. This is not implemented. The forward kinematics
-    #: function does use Jacobian during backward pass. What's not supported is
+    #: Compute jacobian of the end-effector in every forward kinematics call, filling
+    #: :attr:`CudaKinematicsState.lin_jacobian` and :attr:`CudaKinematicsState.ang_jacobian`.
+    #: Use :meth:`CudaRobotModel.get_link_jacobians` for jacobians of other links.
     compute_jacobian: bool = False
 
     #: Store transformation matrix of every link during forward kinematics call in global memory.
@@ -244,8 +259,35 @@ class CudaRobotModelConfig:
         Returns:
             CudaRobotModelConfig: robot model configuration.
         """
+        # load generated kinematics from cache if enabled with CUROBO_ROBOT_MODEL_CACHE_DIR:
+        cache_key = None
+        if get_robot_model_cache_path() is not None:
+            # key is computed before generation as generator modifies config in place.
+            cache_key = get_robot_model_cache_key(config)
+            cache_data = load_robot_model_cache(cache_key, config.tensor_args)
+            if cache_data is not None:
+                return CudaRobotModelConfig(
+                    tensor_args=config.tensor_args,
+                    link_names=cache_data.link_names,
+                    kinematics_config=cache_data.kinematics_config,
+                    self_collision_config=cache_data.self_collision_config,
+                    kinematics_parser=None,
+                    use_global_cumul=config.use_global_cumul,
+                    compute_jacobian=config.compute_jacobian,
+                    generator_config=config,
+                )
+
         # create a config generator and load all values
         generator = CudaRobotGenerator(config)
+        if cache_key is not None:
+            save_robot_model_cache(
+                cache_key,
+                RobotModelCacheData(
+                    link_names=generator.link_names,
+                    kinematics_config=generator.kinematics_config,
+                    self_collision_config=generator.self_collision_config,
+                ),
+            )
         return CudaRobotModelConfig(
             tensor_args=generator.tensor_args,
             link_names=generator.link_names,
@@ -280,10 +322,12 @@ class CudaRobotModelState:
     #: by :attr:`CudaRobotModel.ee_link`.
     ee_quaternion: torch.Tensor
 
-    #: Linear Jacobian. Currently not supported.
+    #: Linear Jacobian of the end-effector [b, 3, dof]. Only computed when requested, see
+    #: :meth:`CudaRobotModel.get_link_jacobians`.
     lin_jacobian: Optional[torch.Tensor] = None
 
-    #: Angular Jacobian. Currently not supported.
+    #: Angular Jacobian of the end-effector [b, 3, dof]. Only computed when requested, see
+    #: :meth:`CudaRobotModel.get_link_jacobians`.
     ang_jacobian: Optional[torch.Tensor] = None
 
     #: Position of links specified by link_names  (:attr:`CudaRobotModel.link_names`).
@@ -347,6 +391,11 @@ class CudaRobotModel(CudaRobotModelConfig):
         """
         super().__init__(**vars(config))
         self._batch_size = 0
+        self._subtree_cache = {}
+        self._kinematics_memo = None
+        #: Pool of output buffers, bucketed by batch size to avoid reallocation when batch size
+        #: changes.
+        self.buffer_pool = BufferPool()
         self.update_batch_size(1, reset_buffers=True)
 
     def update_batch_size(
@@ -361,55 +410,40 @@ class CudaRobotModel(CudaRobotModelConfig):
         """
         if batch_size == 0:
             log_error("batch size is zero")
-        if force_update and self._batch_size == batch_size and self.compute_jacobian:
-            log_error("Outputting jacobian is not supported")
-            self.lin_jac = self.lin_jac.detach()  # .requires_grad_(True)
-            self.ang_jac = self.ang_jac.detach()  # .requires_grad_(True)
-        elif self._batch_size != batch_size or reset_buffers:
+        if self._batch_size != batch_size or reset_buffers:
+            if reset_buffers:
+                self.buffer_pool.clear()
             self._batch_size = batch_size
-            self._link_pos_seq = torch.zeros(
-                (self._batch_size, len(self.link_names), 3),
-                device=self.tensor_args.device,
-                dtype=self.tensor_args.dtype,
+            device = self.tensor_args.device
+            dtype = self.tensor_args.dtype
+            self._link_pos_seq = self.buffer_pool.get(
+                "link_pos", batch_size, (len(self.link_names), 3), dtype, device
             )
-            self._link_quat_seq = torch.zeros(
-                (self._batch_size, len(self.link_names), 4),
-                device=self.tensor_args.device,
-                dtype=self.tensor_args.dtype,
+            self._link_quat_seq = self.buffer_pool.get(
+                "link_quat", batch_size, (len(self.link_names), 4), dtype, device
             )
-
-            self._batch_robot_spheres = torch.zeros(
-                (self._batch_size, self.kinematics_config.total_spheres, 4),
-                device=self.tensor_args.device,
-                dtype=self.tensor_args.collision_geometry_dtype,
+            self._batch_robot_spheres = self.buffer_pool.get(
+                "robot_spheres",
+                batch_size,
+                (self.kinematics_config.total_spheres, 4),
+                self.tensor_args.collision_geometry_dtype,
+                device,
             )
-            self._grad_out_q = torch.zeros(
-                (self._batch_size, self.get_dof()),
-                device=self.tensor_args.device,
-                dtype=self.tensor_args.dtype,
+            self._grad_out_q = self.buffer_pool.get(
+                "grad_out_q", batch_size, (self.get_dof(),), dtype, device
             )
-            self._global_cumul_mat = torch.zeros(
-                (self._batch_size, self.kinematics_config.link_map.shape[0], 4, 4),
-                device=self.tensor_args.device,
-                dtype=self.tensor_args.dtype,
+            self._global_cumul_mat = self.buffer_pool.get(
+                "global_cumul_mat",
+                batch_size,
+                (self.kinematics_config.link_map.shape[0], 4, 4),
+                dtype,
+                device,
             )
-            if self.compute_jacobian:
-                log_error("Outputting jacobian is not supported")
-                self.lin_jac = torch.zeros(
-                    [batch_size, 3, self.kinematics_config.n_dofs],
-                    device=self.tensor_args.device,
-                    dtype=self.tensor_args.dtype,
-                )
-                self.ang_jac = torch.zeros(
-                    [batch_size, 3, self.kinematics_config.n_dofs],
-                    device=self.tensor_args.device,
-                    dtype=self.tensor_args.dtype,
-                )
 
     @profiler.record_function("cuda_robot_model/forward_kinematics")
     def forward(
         self, q, link_name=None, calculate_jacobian=False
-    ) -> Tuple[Tensor, Tensor, None, None, Tensor, Tensor, Tensor]:
+    ) -> Tuple[Tensor, Tensor, Optional[Tensor], Optional[Tensor], Tensor, Tensor, Tensor]:
         """Compute forward kinematics of the robot.
 
         Use :func:`~get_state` to get a structured output.
@@ -417,12 +451,14 @@ class CudaRobotModel(CudaRobotModelConfig):
         Args:
             q: Joint configuration of the robot. Shape should be [batch_size, dof].
             link_name: Name of link to return pose of. If None, returns end-effector pose.
-            calculate_jacobian: Calculate jacobian of the robot. Not supported.
+            calculate_jacobian: Calculate jacobian of the link given by link_name. Always
+                calculated when :attr:`CudaRobotModelConfig.compute_jacobian` is True.
 
         Returns:
-            Tuple[Tensor, Tensor, None, None, Tensor, Tensor, Tensor]: End-effector position,
-            end-effector quaternion (wxyz), linear jacobian(None), angular jacobian(None),
-            link positions, link quaternion (wxyz), link spheres.
+            Tuple[Tensor, Tensor, Optional[Tensor], Optional[Tensor], Tensor, Tensor, Tensor]:
+            End-effector position, end-effector quaternion (wxyz), linear jacobian [b, 3, dof],
+            angular jacobian [b, 3, dof], link positions, link quaternion (wxyz), link spheres.
+            Jacobians are None when they are not calculated.
         """
         if len(q.shape) > 2:
             log_error("q shape should be [batch_size, dof]")
@@ -446,8 +482,11 @@ class CudaRobotModel(CudaRobotModelConfig):
         lin_jac = ang_jac = None
 
         # compute jacobians?
-        if calculate_jacobian:
-            log_error("Outputting jacobian is not supported")
+        if calculate_jacobian or self.compute_jacobian:
+            jac_link_name = self.kinematics_config.ee_link if link_name is None else link_name
+            link_jac = self._get_link_jacobians_from_forward(q, [jac_link_name])
+            lin_jac = link_jac[:, 0, :3]
+            ang_jac = link_jac[:, 0, 3:]
         return (
             ee_pos,
             ee_quat,
@@ -466,17 +505,20 @@ class CudaRobotModel(CudaRobotModelConfig):
         Args:
             q: Joint configuration of the robot. Shape should be [batch_size, dof].
             link_name: Name of link to return pose of. If None, returns end-effector pose.
-            calculate_jacobian: Calculate jacobian of the robot. Not supported.
+            calculate_jacobian: Calculate jacobian of the link given by link_name.
 
         Returns:
             CudaRobotModelState: Kinematic state of the robot.
         """
+        calculate_jacobian = calculate_jacobian or self.compute_jacobian
+        if self._kinematics_memo is not None and not calculate_jacobian and not q.requires_grad:
+            return self._get_state_from_memo(q, link_name)
         out = self.forward(q, link_name, calculate_jacobian)
         state = CudaRobotModelState(
             out[0],
             out[1],
-            None,
-            None,
+            out[2],
+            out[3],
             out[4],
             out[5],
             out[6],
@@ -484,6 +526,93 @@ class CudaRobotModel(CudaRobotModelConfig):
         )
         return state
 
+    def enable_kinematics_memo(
+        self, config: KinematicsMemoConfig = KinematicsMemoConfig()
+    ) -> KinematicsMemo:
+        """Memoize forward kinematics in :meth:`get_state` keyed by quantized joint positions.
+
+        Results of configurations seen before are returned without recomputation. Memoization is
+        skipped when q requires gradients or a jacobian is requested. See
+        :mod:`curobo.cuda_robot_model.kinematics_memo` for details.
+
+        Args:
+            config: Quantization resolution and maximum number of entries.
+
+        Returns:
+            KinematicsMemo: Memo instance, which tracks hit and miss counts.
+        """
+        self._kinematics_memo = KinematicsMemo(
+            config,
+            len(self.link_names),
+            self.kinematics_config.total_spheres,
+            self.tensor_args,
+        )
+        return self._kinematics_memo
+
+    def disable_kinematics_memo(self):
+        """Disable memoization of forward kinematics and free stored entries."""
+        self._kinematics_memo = None
+
+    @property
+    def kinematics_memo(self) -> Optional[KinematicsMemo]:
+        """Memo of forward kinematics, None when disabled."""
+        return self._kinematics_memo
+
+    def _get_state_from_memo(
+        self, q: torch.Tensor, link_name: Optional[str] = None
+    ) -> CudaRobotModelState:
+        if len(q.shape) > 2:
+            log_error("q shape should be [batch_size, dof]")
+        if len(q.shape) == 1:
+            q = q.unsqueeze(0)
+        memo = self._kinematics_memo
+        memo.check_kinematics(self.kinematics_config)
+        keys = memo.get_keys(q)
+        hit_idx, hit_slots, miss_idx = memo.lookup(keys)
+        batch_size = q.shape[0]
+        link_pos = torch.empty(
+            (batch_size, len(self.link_names), 3),
+            device=self.tensor_args.device,
+            dtype=self.tensor_args.dtype,
+        )
+        link_quat = torch.empty(
+            (batch_size, len(self.link_names), 4),
+            device=self.tensor_args.device,
+            dtype=self.tensor_args.dtype,
+        )
+        link_spheres = torch.empty(
+            (batch_size, self.kinematics_config.total_spheres, 4),
+            device=self.tensor_args.device,
+            dtype=self.tensor_args.collision_geometry_dtype,
+        )
+        if len(hit_idx) > 0:
+            hit_rows = torch.as_tensor(hit_idx, device=self.tensor_args.device, dtype=torch.long)
+            hit_pos, hit_quat, hit_spheres = memo.get(hit_slots)
+            link_pos[hit_rows] = hit_pos
+            link_quat[hit_rows] = hit_quat
+            link_spheres[hit_rows] = hit_spheres
+        if len(miss_idx) > 0:
+            miss_rows = torch.as_tensor(miss_idx, device=self.tensor_args.device, dtype=torch.long)
+            out = self.forward(q[miss_rows])
+            link_pos[miss_rows] = out[4]
+            link_quat[miss_rows] = out[5]
+            link_spheres[miss_rows] = out[6]
+            memo.insert([keys[i] for i in miss_idx], out[4], out[5], out[6])
+
+        link_idx = 0 if len(self.link_names) == 1 else self.kinematics_config.ee_idx
+        if link_name is not None:
+            link_idx = self.link_names.index(link_name)
+        return CudaRobotModelState(
+            link_pos[:, link_idx],
+            link_quat[:, link_idx],
+            None,
+            None,
+            link_pos,
+            link_quat,
+            link_spheres,
+            self.link_names,
+        )
+
     def compute_kinematics(
         self, js: JointState, link_name: Optional[str] = None, calculate_jacobian: bool = False
     ) -> CudaRobotModelState:
@@ -492,7 +621,7 @@ class CudaRobotModel(CudaRobotModelConfig):
         Args:
             js: Joint state of robot.
             link_name: Name of link to return pose of. If None, returns end-effector pose.
-            calculate_jacobian: Calculate jacobian of the robot. Not supported.
+            calculate_jacobian: Calculate jacobian of the link given by link_name.
 
 
         Returns:
@@ -513,7 +642,7 @@ class CudaRobotModel(CudaRobotModelConfig):
         Args:
             js: Joint state of robot.
             link_name: Name of link to return pose of. If None, returns end-effector pose.
-            calculate_jacobian: Calculate jacobian of the robot. Not supported.
+            calculate_jacobian: Calculate jacobian of the link given by link_name.
 
 
         Returns:
@@ -538,7 +667,7 @@ class CudaRobotModel(CudaRobotModelConfig):
             joint_position: Joint position of robot. Assumed to only contain active joints in the
                 order specified in :attr:`CudaRobotModel.joint_names`.
             link_name: Name of link to return pose of. If None, returns end-effector pose.
-            calculate_jacobian: Calculate jacobian of the robot. Not supported.
+            calculate_jacobian: Calculate jacobian of the link given by link_name.
 
 
         Returns:
@@ -554,7 +683,9 @@ class CudaRobotModel(CudaRobotModelConfig):
         Returns:
             List[Mesh]: List of all link meshes.
         """
-        m_list = [self.get_link_mesh(l) for l in self.kinematics_config.mesh_link_names]
+        m_list = [
+            self.get_link_mesh(link_name) for link_name in self.kinematics_config.mesh_link_names
+        ]
 
         return m_list
 
@@ -621,37 +752,203 @@ class CudaRobotModel(CudaRobotModelConfig):
     def get_link_poses(self, q: torch.Tensor, link_names: List[str]) -> Pose:
         """Get Pose of links at given joint configuration q using forward kinematics.
 
-        Note that only the links specified in :class:`~CudaRobotModelConfig.link_names` are returned.
+        Only the requested links and their ancestors are computed, see :meth:`forward_subtree`.
 
         Args:
             q: Joint configuration of the robot, shape should be [batch_size, dof].
-            link_names: Names of links to get pose of. This should be a subset of
-                :class:`~CudaRobotModelConfig.link_names`.
+            link_names: Names of links to get pose of. Any link in the kinematic tree can be
+                requested.
 
         Returns:
             Pose: Poses of links at given joint configuration.
         """
-        state = self.get_state(q)
-        position = torch.zeros(
-            (q.shape[0], len(link_names), 3),
-            device=self.tensor_args.device,
-            dtype=self.tensor_args.dtype,
+        position, quaternion, _ = self.forward_subtree(q, link_names)
+        return Pose(position=position.clone(), quaternion=quaternion.clone())
+
+    def get_subtree_config(
+        self, link_names: List[str], include_spheres: bool = False
+    ) -> KinematicsSubtreeConfig:
+        """Get kinematics tensors pruned to the ancestor chain of given links.
+
+        The pruned tensors are cached per set of link names and are rebuilt when the joints of the
+        kinematics representation change, e.g., when switching locked joints.
+
+        Args:
+            link_names: Names of links to compute pose of.
+            include_spheres: Also compute position of spheres attached to links in the pruned
+                chain.
+
+        Returns:
+            KinematicsSubtreeConfig: Pruned kinematics tensors.
+        """
+        key = (tuple(link_names), include_spheres)
+        if (
+            key not in self._subtree_cache
+            or self._subtree_cache[key]["joint_names"] != self.kinematics_config.joint_names
+        ):
+            self._subtree_cache[key] = {
+                "config": self.kinematics_config.get_subtree_config(link_names, include_spheres),
+                "joint_names": list(self.kinematics_config.joint_names),
+                "batch_size": 0,
+            }
+        return self._subtree_cache[key]["config"]
+
+    @profiler.record_function("cuda_robot_model/forward_kinematics_subtree")
+    def forward_subtree(
+        self, q: torch.Tensor, link_names: List[str], include_spheres: bool = False
+    ) -> Tuple[torch.Tensor, torch.Tensor, Optional[torch.Tensor]]:
+        """Compute forward kinematics of only the given links and their ancestors.
+
+        This is faster than :meth:`forward` when a few links of a robot with many links are
+        required, e.g., pose of one end-effector of a bimanual robot. Any link in the kinematic
+        tree can be requested. Outputs are differentiable with respect to q.
+
+        Args:
+            q: Joint configuration of the robot. Shape should be [batch_size, dof].
+            link_names: Names of links to compute pose of.
+            include_spheres: Also compute position of spheres attached to links in the pruned
+                chain. Use :attr:`KinematicsSubtreeConfig.sphere_idx` from
+                :meth:`get_subtree_config` to find index of these spheres in robot spheres.
+
+        Returns:
+            Tuple[torch.Tensor, torch.Tensor, Optional[torch.Tensor]]: Link positions
+            [batch_size, n_links, 3], link quaternions (wxyz) [batch_size, n_links, 4], and link
+            spheres [batch_size, n_subtree_spheres, 4] when include_spheres is True, otherwise
+            None.
+        """
+        if len(q.shape) > 2:
+            log_error("q shape should be [batch_size, dof]")
+        if len(q.shape) == 1:
+            q = q.unsqueeze(0)
+        subtree_config = self.get_subtree_config(link_names, include_spheres)
+        buffers = self._subtree_cache[(tuple(link_names), include_spheres)]
+        batch_size = q.shape[0]
+        if buffers["batch_size"] != batch_size:
+            n_links = subtree_config.link_idx.shape[0]
+            buffers["link_pos"] = torch.zeros(
+                (batch_size, len(link_names), 3),
+                device=self.tensor_args.device,
+                dtype=self.tensor_args.dtype,
+            )
+            buffers["link_quat"] = torch.zeros(
+                (batch_size, len(link_names), 4),
+                device=self.tensor_args.device,
+                dtype=self.tensor_args.dtype,
+            )
+            buffers["robot_spheres"] = torch.zeros(
+                (batch_size, subtree_config.sphere_idx.shape[0], 4),
+                device=self.tensor_args.device,
+                dtype=self.tensor_args.collision_geometry_dtype,
+            )
+            buffers["grad_out_q"] = torch.zeros(
+                (batch_size, self.get_dof()),
+                device=self.tensor_args.device,
+                dtype=self.tensor_args.dtype,
+            )
+            buffers["global_cumul_mat"] = torch.zeros(
+                (batch_size, n_links, 4, 4),
+                device=self.tensor_args.device,
+                dtype=self.tensor_args.dtype,
+            )
+            buffers["batch_size"] = batch_size
+
+        link_pos, link_quat, robot_spheres = get_cuda_kinematics(
+            buffers["link_pos"],
+            buffers["link_quat"],
+            buffers["robot_spheres"],
+            buffers["global_cumul_mat"],
+            q,
+            self.kinematics_config.fixed_transforms[subtree_config.link_idx].contiguous(),
+            self.kinematics_config.link_spheres[subtree_config.sphere_idx].contiguous(),
+            subtree_config.link_map,
+            subtree_config.joint_map,
+            subtree_config.joint_map_type,
+            subtree_config.store_link_map,
+            subtree_config.link_sphere_idx_map,
+            subtree_config.link_chain_map,
+            subtree_config.joint_offset_map,
+            buffers["grad_out_q"],
+            self.use_global_cumul,
         )
-        quaternion = torch.zeros(
-            (q.shape[0], len(link_names), 4),
+        if not include_spheres:
+            robot_spheres = None
+        return link_pos, link_quat, robot_spheres
+
+    def get_link_jacobians(
+        self, q: torch.Tensor, link_names: Optional[List[str]] = None
+    ) -> torch.Tensor:
+        """Compute geometric jacobian of links at given joint configuration q.
+
+        Jacobians of all links are computed in one batched pass from the cumulative transforms
+        of forward kinematics. Any link in the kinematic tree can be requested, not only links in
+        :attr:`CudaRobotModelConfig.link_names`. The returned jacobians are not differentiable.
+
+        Args:
+            q: Joint configuration of the robot, shape should be [batch_size, dof].
+            link_names: Names of links to compute jacobian for. Defaults to
+                :attr:`CudaRobotModelConfig.link_names`.
+
+        Returns:
+            torch.Tensor: Jacobian of links [batch_size, n_links, 6, dof], with rows containing
+            linear velocity followed by angular velocity of the link origin in the base frame.
+        """
+        if link_names is None:
+            link_names = self.link_names
+        if len(q.shape) == 1:
+            q = q.unsqueeze(0)
+        q = q.detach()
+        self.update_batch_size(q.shape[0])
+        self._cuda_forward(q)
+        return self._get_link_jacobians_from_forward(q, link_names)
+
+    def _get_link_jacobians_from_forward(
+        self, q: torch.Tensor, link_names: List[str]
+    ) -> torch.Tensor:
+        """Compute jacobian of links, assumes forward kinematics was already computed for q.
+
+        Args:
+            q: Joint configuration of the robot, shape should be [batch_size, dof].
+            link_names: Names of links to compute jacobian for.
+
+        Returns:
+            torch.Tensor: Jacobian of links [batch_size, n_links, 6, dof].
+        """
+        for link_name in link_names:
+            if link_name not in self.kinematics_config.link_name_to_idx_map:
+                log_error(link_name + " not found in kinematic tree")
+        link_idx = torch.as_tensor(
+            [self.kinematics_config.link_name_to_idx_map[link_name] for link_name in link_names],
             device=self.tensor_args.device,
-            dtype=self.tensor_args.dtype,
+            dtype=torch.long,
+        )
+        if self.use_global_cumul:
+            cumul_mat = self._global_cumul_mat
+        else:
+            cumul_mat = torch_forward_cumul_transforms(
+                q.detach(),
+                self.kinematics_config.fixed_transforms,
+                self.kinematics_config.link_map,
+                self.kinematics_config.joint_map,
+                self.kinematics_config.joint_map_type,
+                self.kinematics_config.joint_offset_map,
+            )
+        return get_link_jacobians(
+            cumul_mat.detach(),
+            link_idx,
+            self.kinematics_config.joint_map,
+            self.kinematics_config.joint_map_type,
+            self.kinematics_config.link_chain_map,
+            self.kinematics_config.joint_offset_map,
+            self.get_dof(),
         )
-
-        for li, l in enumerate(link_names):
-            i = self.link_names.index(l)
-            position[:, li, :] = state.links_position[:, i, :]
-            quaternion[:, li, :] = state.links_quaternion[:, i, :]
-        return Pose(position=position, quaternion=quaternion)
 
     def _cuda_forward(self, q: torch.Tensor) -> Tuple[Tensor, Tensor, Tensor]:
         """Compute forward kinematics on GPU. Use :func:`~get_state` or :func:`~forward` instead.
 
+        A pure PyTorch implementation is used when the CUDA kinematics extension is not available
+        or when the robot model is loaded on cpu, see
+        :class:`~curobo.curobolib.kinematics.KinematicsFusedTorchFunction`.
+
         Args:
             q: Joint configuration of the robot, shape should be [batch_size, dof].
 
@@ -687,9 +984,23 @@ class CudaRobotModel(CudaRobotModelConfig):
         """Get self collision configuration parameters of the robot."""
         return self.self_collision_config
 
+    def get_kinematics_parser(self) -> KinematicsParser:
+        """Get parser of robot description file.
+
+        The parser is loaded from :attr:`generator_config` when the robot model was loaded from
+        cache (see :mod:`~curobo.cuda_robot_model.robot_model_cache`).
+        """
+        if self.kinematics_parser is None:
+            if self.generator_config is None:
+                log_error("kinematics parser requires generator_config to load")
+            self.kinematics_parser = CudaRobotGenerator.load_kinematics_parser(
+                self.generator_config
+            )
+        return self.kinematics_parser
+
     def get_link_mesh(self, link_name: str) -> Mesh:
         """Get mesh of a link of the robot."""
-        mesh = self.kinematics_parser.get_link_mesh(link_name)
+        mesh = self.get_kinematics_parser().get_link_mesh(link_name)
         return mesh
 
     def get_link_transform(self, link_name: str) -> Pose:
@@ -800,6 +1111,7 @@ class CudaRobotModel(CudaRobotModelConfig):
         """
 
         self.kinematics_config.copy_(new_kin_config)
+        self._subtree_cache = {}
 
     def attach_external_objects_to_robot(
         self,
@@ -0,0 +1,223 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""
+Memoization of forward kinematics keyed by quantized joint positions.
+
+Validation and visualization pipelines often compute forward kinematics of the same joint
+configurations repeatedly (e.g., re-checking a trajectory after a small change to the world). This
+module stores link poses and sphere positions of previously seen configurations in preallocated
+device tensors, evicting the least recently used entries when full. Joint positions are rounded to
+:attr:`KinematicsMemoConfig.resolution` to form the key, so configurations in the same bin share the
+result computed for the first configuration seen in that bin.
+
+Enable with :meth:`~curobo.cuda_robot_model.cuda_robot_model.CudaRobotModel.enable_kinematics_memo`.
+The memo is only used when gradients and jacobians are not requested. Entries are dropped
+automatically when kinematics tensors of the robot are modified in place (e.g., when attaching an
+object or switching locked joints).
+"""
+
+from __future__ import annotations
+
+# Standard Library
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Tuple
+
+# Third Party
+import torch
+
+# CuRobo
+from curobo.cuda_robot_model.types import KinematicsTensorConfig
+from curobo.types.base import TensorDeviceType
+from curobo.util.logger import log_error
+
+
+@dataclass
+class KinematicsMemoConfig:
+    """Parameters of forward kinematics memoization."""
+
+    #: Quantization step for joint positions, in radians for revolute joints and meters for
+    #: prismatic joints. Configurations within the same step share a cached result.
+    resolution: float = 1e-4
+
+    #: Maximum number of configurations to store. Least recently used entries are evicted.
+    max_entries: int = 10000
+
+    def __post_init__(self):
+        if self.resolution <= 0.0:
+            log_error("resolution should be positive, got " + str(self.resolution))
+        if self.max_entries <= 0:
+            log_error("max_entries should be positive, got " + str(self.max_entries))
+
+
+class KinematicsMemo:
+    """LRU cache of link poses and spheres keyed by quantized joint positions."""
+
+    def __init__(
+        self,
+        config: KinematicsMemoConfig,
+        n_links: int,
+        n_spheres: int,
+        tensor_args: TensorDeviceType = TensorDeviceType(),
+    ):
+        """Initialize memo with preallocated storage.
+
+        Args:
+            config: Memoization parameters.
+            n_links: Number of links whose pose is stored per configuration.
+            n_spheres: Number of robot spheres stored per configuration.
+            tensor_args: Device and precision of stored tensors.
+        """
+        self.config = config
+        self.tensor_args = tensor_args
+        self._link_pos = torch.zeros(
+            (config.max_entries, n_links, 3), **(tensor_args.as_torch_dict())
+        )
+        self._link_quat = torch.zeros(
+            (config.max_entries, n_links, 4), **(tensor_args.as_torch_dict())
+        )
+        self._link_spheres = torch.zeros(
+            (config.max_entries, n_spheres, 4),
+            device=tensor_args.device,
+            dtype=tensor_args.collision_geometry_dtype,
+        )
+        self._slots: OrderedDict[bytes, int] = OrderedDict()
+        self._kinematics_version = None
+        #: Number of configurations returned from the memo.
+        self.hits = 0
+        #: Number of configurations that required computing forward kinematics.
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of queried configurations returned from the memo."""
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return self.hits / total
+
+    def clear(self):
+        """Remove all entries. Counters are not reset."""
+        self._slots.clear()
+
+    def reset_counters(self):
+        """Reset hit and miss counters."""
+        self.hits = 0
+        self.misses = 0
+
+    def check_kinematics(self, kinematics_config: KinematicsTensorConfig):
+        """Clear entries if kinematics tensors were modified since the last call.
+
+        In-place modifications of a tensor increment its version counter, so comparing versions
+        detects updates like attaching objects or copying a new kinematics configuration without
+        reading tensor data.
+
+        Args:
+            kinematics_config: Kinematics tensors used to compute stored entries.
+        """
+        tensors = [
+            kinematics_config.fixed_transforms,
+            kinematics_config.link_map,
+            kinematics_config.joint_map,
+            kinematics_config.joint_map_type,
+            kinematics_config.joint_offset_map,
+            kinematics_config.store_link_map,
+            kinematics_config.link_sphere_idx_map,
+            kinematics_config.link_spheres,
+        ]
+        version = tuple((id(t), t._version) for t in tensors if t is not None)
+        if version != self._kinematics_version:
+            self.clear()
+            self._kinematics_version = version
+
+    def get_keys(self, q: torch.Tensor) -> List[bytes]:
+        """Quantize joint positions and compute a key per configuration.
+
+        Args:
+            q: Joint positions [batch_size, dof].
+
+        Returns:
+            List[bytes]: Key for every configuration.
+        """
+        q_quantized = torch.round(q.detach() / self.config.resolution).to(torch.int64).cpu()
+        return [row.tobytes() for row in q_quantized.numpy()]
+
+    def lookup(self, keys: List[bytes]) -> Tuple[List[int], List[int], List[int]]:
+        """Find stored entries of configurations and mark them as recently used.
+
+        Args:
+            keys: Keys from :meth:`get_keys`.
+
+        Returns:
+            Tuple[List[int], List[int], List[int]]: Batch indices that hit, storage slots of the
+            hits, and batch indices that missed.
+        """
+        hit_idx = []
+        hit_slots = []
+        miss_idx = []
+        for i, k in enumerate(keys):
+            slot = self._slots.get(k)
+            if slot is None:
+                miss_idx.append(i)
+            else:
+                self._slots.move_to_end(k)
+                hit_idx.append(i)
+                hit_slots.append(slot)
+        self.hits += len(hit_idx)
+        self.misses += len(miss_idx)
+        return hit_idx, hit_slots, miss_idx
+
+    def get(self, slots: List[int]) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """Read stored link positions, link quaternions, and spheres of storage slots."""
+        slot_idx = torch.as_tensor(slots, device=self.tensor_args.device, dtype=torch.long)
+        return self._link_pos[slot_idx], self._link_quat[slot_idx], self._link_spheres[slot_idx]
+
+    def insert(
+        self,
+        keys: List[bytes],
+        link_pos: torch.Tensor,
+        link_quat: torch.Tensor,
+        link_spheres: torch.Tensor,
+    ):
+        """Store forward kinematics of configurations, evicting least recently used entries.
+
+        Args:
+            keys: Keys of configurations from :meth:`get_keys`.
+            link_pos: Link positions [len(keys), n_links, 3].
+            link_quat: Link quaternions [len(keys), n_links, 4].
+            link_spheres: Robot spheres [len(keys), n_spheres, 4].
+        """
+        rows = []
+        slots = []
+        inserted = {}
+        for i, k in enumerate(keys):
+            if k in inserted or k in self._slots:
+                continue
+            if len(inserted) == self.config.max_entries:
+                break
+            if len(self._slots) < self.config.max_entries:
+                slot = len(self._slots)
+            else:
+                _, slot = self._slots.popitem(last=False)
+            self._slots[k] = slot
+            inserted[k] = slot
+            rows.append(i)
+            slots.append(slot)
+        if len(rows) == 0:
+            return
+        row_idx = torch.as_tensor(rows, device=self.tensor_args.device, dtype=torch.long)
+        slot_idx = torch.as_tensor(slots, device=self.tensor_args.device, dtype=torch.long)
+        self._link_pos[slot_idx] = link_pos[row_idx]
+        self._link_quat[slot_idx] = link_quat[row_idx]
+        self._link_spheres[slot_idx] = link_spheres[row_idx]
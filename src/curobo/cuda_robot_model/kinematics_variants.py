@@ -0,0 +1,178 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""
+Registry of prebuilt kinematics variants of a robot, keyed by the set of locked joints.
+
+Locked joints are merged into fixed transforms when generating kinematics tensors with
+:class:`~curobo.cuda_robot_model.cuda_robot_generator.CudaRobotGenerator`, so changing which
+joints are locked requires parsing the robot again. This registry stores the generated
+:class:`~curobo.cuda_robot_model.types.KinematicsTensorConfig` of every locked-joint set that was
+used, so switching back to a set only copies tensors into the kinematics used by the solvers.
+
+The copy is done in place as solvers and CUDA graphs hold references to the kinematics tensors.
+All variants of a registry should hence have the same tensor shapes, i.e., the same number of
+locked joints.
+"""
+
+from __future__ import annotations
+
+# Standard Library
+import copy
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# CuRobo
+from curobo.cuda_robot_model.cuda_robot_model import CudaRobotModel
+from curobo.cuda_robot_model.types import KinematicsTensorConfig
+from curobo.util.logger import log_error
+
+
+@dataclass
+class KinematicsVariant:
+    """Kinematics tensors generated for a set of locked joints."""
+
+    #: Joint names and values the joints were locked at.
+    lock_joints: Dict[str, float]
+
+    #: Kinematics tensors generated with :attr:`lock_joints`.
+    kinematics_config: KinematicsTensorConfig
+
+
+class KinematicsVariantRegistry:
+    """Stores kinematics variants of a robot keyed by the set of locked joints."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._variants: Dict[Tuple[str, ...], KinematicsVariant] = {}
+        self._active_key: Optional[Tuple[str, ...]] = None
+
+    @staticmethod
+    def get_key(lock_joints: Dict[str, float]) -> Tuple[str, ...]:
+        """Get key of a locked-joint set. The key does not depend on values of locked joints."""
+        return tuple(sorted(lock_joints.keys()))
+
+    @property
+    def active_key(self) -> Optional[Tuple[str, ...]]:
+        """Key of variant that was last activated with :meth:`activate`."""
+        return self._active_key
+
+    @property
+    def keys(self) -> List[Tuple[str, ...]]:
+        """Keys of all registered variants."""
+        return list(self._variants.keys())
+
+    def __len__(self) -> int:
+        return len(self._variants)
+
+    def __contains__(self, lock_joints: Dict[str, float]) -> bool:
+        return self.get_key(lock_joints) in self._variants
+
+    def get(
+        self, lock_joints: Dict[str, float], match_values: bool = True
+    ) -> Optional[KinematicsVariant]:
+        """Get variant for a set of locked joints.
+
+        Args:
+            lock_joints: Joint names and values to lock.
+            match_values: Only return the variant if it was generated with the same values of
+                locked joints, up to float32 precision. Values are merged into fixed transforms of
+                the variant.
+
+        Returns:
+            Optional[KinematicsVariant]: Variant if registered, None otherwise.
+        """
+        variant = self._variants.get(self.get_key(lock_joints))
+        if variant is None:
+            return None
+        if match_values and any(
+            abs(float(variant.lock_joints[k]) - float(v)) > 1e-6 for k, v in lock_joints.items()
+        ):
+            return None
+        return variant
+
+    def add(
+        self, lock_joints: Dict[str, float], kinematics_config: KinematicsTensorConfig
+    ) -> KinematicsVariant:
+        """Register kinematics tensors generated for a set of locked joints.
+
+        An existing variant with the same set of locked joints is replaced.
+
+        Args:
+            lock_joints: Joint names and values the kinematics tensors were generated with.
+            kinematics_config: Generated kinematics tensors.
+
+        Returns:
+            KinematicsVariant: Registered variant.
+        """
+        if len(self._variants) > 0:
+            reference = next(iter(self._variants.values())).kinematics_config
+            self._check_compatible(reference, kinematics_config)
+        variant = KinematicsVariant(
+            lock_joints=dict(lock_joints), kinematics_config=kinematics_config
+        )
+        self._variants[self.get_key(lock_joints)] = variant
+        return variant
+
+    def add_active(self, kinematics: CudaRobotModel) -> KinematicsVariant:
+        """Register a copy of the kinematics tensors a robot model currently uses.
+
+        The variant is keyed by the locked joints of ``kinematics`` and marked as active, so the
+        original locked-joint set can be activated again after switching to another variant.
+
+        Args:
+            kinematics: Robot model to copy kinematics tensors from.
+
+        Returns:
+            KinematicsVariant: Registered variant.
+        """
+        lock_joints = {}
+        lock_jointstate = kinematics.lock_jointstate
+        if lock_jointstate is not None:
+            position = lock_jointstate.position.view(-1).tolist()
+            lock_joints = dict(zip(lock_jointstate.joint_names, position))
+        variant = self.add(lock_joints, copy.deepcopy(kinematics.kinematics_config))
+        self._active_key = self.get_key(lock_joints)
+        return variant
+
+    def activate(self, lock_joints: Dict[str, float], kinematics: CudaRobotModel):
+        """Copy kinematics tensors of a registered variant into a robot model.
+
+        Tensors are copied in place, so all rollout instances sharing the kinematics tensors of
+        ``kinematics`` are updated and no solver buffers are reallocated.
+
+        Args:
+            lock_joints: Joint names of a registered variant. Values are ignored.
+            kinematics: Robot model to update.
+        """
+        key = self.get_key(lock_joints)
+        if key not in self._variants:
+            log_error("Kinematics variant with lock joints " + str(list(key)) + " not registered")
+        variant = self._variants[key]
+        self._check_compatible(kinematics.kinematics_config, variant.kinematics_config)
+        kinematics.update_kinematics_config(variant.kinematics_config)
+        self._active_key = key
+
+    @staticmethod
+    def _check_compatible(current: KinematicsTensorConfig, new: KinematicsTensorConfig):
+        if current.n_dof != new.n_dof:
+            log_error(
+                "Kinematics variant has "
+                + str(new.n_dof)
+                + " dof, current kinematics has "
+                + str(current.n_dof)
+                + " dof. Locked joint sets should have the same number of joints."
+            )
+        if current.fixed_transforms.shape != new.fixed_transforms.shape or (
+            current.link_spheres is not None
+            and new.link_spheres is not None
+            and current.link_spheres.shape != new.link_spheres.shape
+        ):
+            log_error("Kinematics variant has different number of links or spheres")
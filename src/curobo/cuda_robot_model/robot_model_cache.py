@@ -0,0 +1,212 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""
+On-disk cache of robot kinematics generated by
+:class:`~curobo.cuda_robot_model.cuda_robot_generator.CudaRobotGenerator`.
+
+Parsing a URDF and building kinematics tensors takes seconds for large robots. This module stores
+the generated :class:`~curobo.cuda_robot_model.types.KinematicsTensorConfig` and
+:class:`~curobo.cuda_robot_model.types.SelfCollisionKinematicsConfig` on disk, keyed by a hash of
+the robot description file and all parameters of
+:class:`~curobo.cuda_robot_model.cuda_robot_generator.CudaRobotGeneratorConfig` (collision
+spheres, lock_joints, extra_links, cspace, ...). Any change to the inputs results in a new key, so
+stale entries are never loaded.
+
+The cache is disabled by default. Set the environment variable ``CUROBO_ROBOT_MODEL_CACHE_DIR`` to
+a writable directory to enable it.
+"""
+
+from __future__ import annotations
+
+# Standard Library
+import enum
+import hashlib
+import json
+import os
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Any, List, Optional
+
+# Third Party
+import numpy as np
+import torch
+from packaging import version
+
+# CuRobo
+from curobo.cuda_robot_model.cuda_robot_generator import CudaRobotGeneratorConfig
+from curobo.cuda_robot_model.types import KinematicsTensorConfig, SelfCollisionKinematicsConfig
+from curobo.types.base import TensorDeviceType
+from curobo.util.logger import log_info, log_warn
+
+#: Version of the cache format. Increment when the layout of cached data changes.
+ROBOT_MODEL_CACHE_VERSION = 2
+
+
+@dataclass
+class RobotModelCacheData:
+    """Generated robot kinematics stored in the cache."""
+
+    #: Names of links to compute poses for.
+    link_names: List[str]
+
+    #: Kinematics tensors of the robot.
+    kinematics_config: KinematicsTensorConfig
+
+    #: Self collision tensors of the robot.
+    self_collision_config: Optional[SelfCollisionKinematicsConfig]
+
+
+def get_robot_model_cache_path() -> Optional[str]:
+    """Get directory of the robot model cache from ``CUROBO_ROBOT_MODEL_CACHE_DIR``.
+
+    Returns:
+        Optional[str]: Path to cache directory. None if cache is disabled.
+    """
+    cache_dir = os.environ.get("CUROBO_ROBOT_MODEL_CACHE_DIR")
+    if cache_dir is None or cache_dir == "":
+        return None
+    return cache_dir
+
+
+def _to_hashable(value: Any) -> Any:
+    """Convert a value to a json serializable representation with a deterministic order."""
+    if isinstance(value, TensorDeviceType):
+        return {"device": str(value.device), "dtype": str(value.dtype)}
+    if isinstance(value, torch.Tensor):
+        return {"dtype": str(value.dtype), "data": value.detach().cpu().tolist()}
+    if isinstance(value, np.ndarray):
+        return {"dtype": str(value.dtype), "data": value.tolist()}
+    if isinstance(value, enum.Enum):
+        return value.name
+    if is_dataclass(value):
+        return {
+            "__class__": type(value).__name__,
+            **{f.name: _to_hashable(getattr(value, f.name)) for f in fields(value)},
+        }
+    if isinstance(value, dict):
+        return {str(k): _to_hashable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_hashable(v) for v in value]
+    if isinstance(value, (np.floating, np.integer, np.bool_)):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def _read_file_bytes(file_path: Optional[str]) -> bytes:
+    """Read contents of file. Returns the path when the file does not exist."""
+    if file_path is None:
+        return b""
+    if not os.path.isfile(file_path):
+        return file_path.encode()
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
+def get_robot_model_cache_key(config: CudaRobotGeneratorConfig) -> str:
+    """Compute cache key for a robot generator configuration.
+
+    The key is a hash of the contents of the urdf (or usd) file and all parameters in the
+    configuration. This should be computed before creating the generator as the generator
+    modifies some parameters (e.g., cspace) in place.
+
+    Args:
+        config: Robot generator configuration.
+
+    Returns:
+        str: Hex digest of the configuration.
+    """
+    # CuRobo
+    from curobo import __version__
+
+    hasher = hashlib.sha256()
+    hasher.update(str(ROBOT_MODEL_CACHE_VERSION).encode())
+    hasher.update(str(__version__).encode())
+    hasher.update(_read_file_bytes(config.urdf_path))
+    if config.use_usd_kinematics:
+        hasher.update(_read_file_bytes(config.usd_path))
+    config_data = json.dumps(_to_hashable(config), sort_keys=True)
+    hasher.update(config_data.encode())
+    return hasher.hexdigest()
+
+
+def _get_cache_file(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, "robot_model_" + key + ".pt")
+
+
+def load_robot_model_cache(
+    key: str, tensor_args: TensorDeviceType, cache_dir: Optional[str] = None
+) -> Optional[RobotModelCacheData]:
+    """Load generated robot kinematics from cache.
+
+    Args:
+        key: Cache key from :func:`get_robot_model_cache_key`.
+        tensor_args: Device to load tensors to.
+        cache_dir: Directory of cache. Defaults to :func:`get_robot_model_cache_path`.
+
+    Returns:
+        Optional[RobotModelCacheData]: Cached data, None if not found or cache is disabled.
+    """
+    if cache_dir is None:
+        cache_dir = get_robot_model_cache_path()
+    if cache_dir is None:
+        return None
+    cache_file = _get_cache_file(cache_dir, key)
+    if not os.path.isfile(cache_file):
+        return None
+    try:
+        if version.parse(torch.__version__) >= version.parse("1.13"):
+            data = torch.load(cache_file, map_location=tensor_args.device, weights_only=False)
+        else:
+            data = torch.load(cache_file, map_location=tensor_args.device)
+    except Exception as e:
+        log_warn("Failed to load robot model cache " + cache_file + ": " + str(e))
+        return None
+    if not isinstance(data, RobotModelCacheData):
+        log_warn("Invalid robot model cache " + cache_file)
+        return None
+    log_info("Loaded robot model from cache " + cache_file)
+    return data
+
+
+def save_robot_model_cache(
+    key: str, data: RobotModelCacheData, cache_dir: Optional[str] = None
+) -> Optional[str]:
+    """Save generated robot kinematics to cache.
+
+    The file is written to a temporary path and then renamed, so concurrent processes loading the
+    cache never read a partially written file.
+
+    Args:
+        key: Cache key from :func:`get_robot_model_cache_key`.
+        data: Generated robot kinematics.
+        cache_dir: Directory of cache. Defaults to :func:`get_robot_model_cache_path`.
+
+    Returns:
+        Optional[str]: Path of written cache file, None if cache is disabled or write failed.
+    """
+    if cache_dir is None:
+        cache_dir = get_robot_model_cache_path()
+    if cache_dir is None:
+        return None
+    cache_file = _get_cache_file(cache_dir, key)
+    tmp_file = cache_file + "." + str(os.getpid()) + ".tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        torch.save(data, tmp_file)
+        os.replace(tmp_file, cache_file)
+    except Exception as e:
+        log_warn("Failed to write robot model cache " + cache_file + ": " + str(e))
+        if os.path.isfile(tmp_file):
+            os.remove(tmp_file)
+        return None
+    log_info("Saved robot model to cache " + cache_file)
+    return cache_file
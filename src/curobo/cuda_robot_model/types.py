@@ -682,6 +682,102 @@ class KinematicsTensorConfig:
         curr_spheres = self.get_reference_link_spheres(link_name)
         self.update_link_spheres(link_name, curr_spheres)
 
+    def get_subtree_config(
+        self, link_names: List[str], include_spheres: bool = False
+    ) -> KinematicsSubtreeConfig:
+        """Get kinematics tensors pruned to the ancestor chain of given links.
+
+        Forward kinematics with the pruned tensors only computes transforms of the given links and
+        their ancestors, which is faster when only a few links of a large robot are required.
+
+        Args:
+            link_names: Names of links to compute pose of. Any link in the kinematic tree can be
+                used.
+            include_spheres: Also compute position of spheres attached to links in the pruned
+                chain.
+
+        Returns:
+            KinematicsSubtreeConfig: Pruned kinematics tensors.
+        """
+        for link_name in link_names:
+            if link_name not in self.link_name_to_idx_map:
+                log_error(link_name + " not found in kinematic tree")
+        device = self.link_map.device
+        store_idx = torch.as_tensor(
+            [self.link_name_to_idx_map[link_name] for link_name in link_names],
+            device=device,
+            dtype=torch.long,
+        )
+        # every row of link_chain_map marks the ancestors of the link, including itself:
+        link_mask = torch.any(self.link_chain_map[store_idx] != 0, dim=0)
+        link_idx = torch.nonzero(link_mask).view(-1)
+        n_links = self.link_map.shape[0]
+        new_idx = torch.full((n_links,), -1, device=device, dtype=torch.long)
+        new_idx[link_idx] = torch.arange(link_idx.shape[0], device=device)
+        if include_spheres:
+            sphere_idx = torch.nonzero(link_mask[self.link_sphere_idx_map.to(torch.long)]).view(-1)
+        else:
+            sphere_idx = torch.zeros((0,), device=device, dtype=torch.long)
+
+        return KinematicsSubtreeConfig(
+            link_names=link_names,
+            link_idx=link_idx,
+            link_map=new_idx[self.link_map[link_idx].to(dtype=torch.long)].to(
+                dtype=self.link_map.dtype
+            ),
+            joint_map=self.joint_map[link_idx].contiguous(),
+            joint_map_type=self.joint_map_type[link_idx].contiguous(),
+            joint_offset_map=self.joint_offset_map.view(n_links, -1)[link_idx].reshape(-1),
+            store_link_map=new_idx[store_idx].to(dtype=self.store_link_map.dtype),
+            link_chain_map=self.link_chain_map[link_idx][:, link_idx].contiguous(),
+            link_sphere_idx_map=new_idx[
+                self.link_sphere_idx_map[sphere_idx].to(dtype=torch.long)
+            ].to(dtype=self.link_sphere_idx_map.dtype),
+            sphere_idx=sphere_idx,
+        )
+
+
+@dataclass
+class KinematicsSubtreeConfig:
+    """Kinematics tensors pruned to the ancestor chain of a subset of links.
+
+    Create with :meth:`KinematicsTensorConfig.get_subtree_config`. Fixed transforms and spheres
+    are read from the full :class:`KinematicsTensorConfig` with :attr:`link_idx` and
+    :attr:`sphere_idx` during forward kinematics, as these can change at runtime (e.g., when
+    attaching objects).
+    """
+
+    #: Names of links to compute pose [n_store_links].
+    link_names: List[str]
+
+    #: Index of links in the pruned chain, sorted in ascending order [n_subtree_links].
+    link_idx: torch.Tensor
+
+    #: Index of parent link in pruned chain given link index [n_subtree_links].
+    link_map: torch.Tensor
+
+    #: Joint index given link index [n_subtree_links].
+    joint_map: torch.Tensor
+
+    #: Type of joint given link index [n_subtree_links].
+    joint_map_type: torch.Tensor
+
+    #: Joint offset for mimic joints and negative axis joints [n_subtree_links * 2].
+    joint_offset_map: torch.Tensor
+
+    #: Index of link in pruned chain to write out pose [n_store_links].
+    store_link_map: torch.Tensor
+
+    #: Ancestors of each link in pruned chain [n_subtree_links, n_subtree_links].
+    link_chain_map: torch.Tensor
+
+    #: Index of link in pruned chain for every sphere [n_subtree_spheres].
+    link_sphere_idx_map: torch.Tensor
+
+    #: Index of spheres of links in the pruned chain in
+    #: :attr:`KinematicsTensorConfig.link_spheres` [n_subtree_spheres].
+    sphere_idx: torch.Tensor
+
 
 @dataclass
 class SelfCollisionKinematicsConfig:
@@ -713,3 +809,30 @@ class SelfCollisionKinematicsConfig:
     #: be performed within 1024 threads as shared memory is used. So,
     # checks_per_thread * n_spheres <= 1024.
     checks_per_thread: int = 32
+
+    #: Index of link in collision link names for every sphere. This is used to compute bounding
+    #: spheres of links for the broad phase of self collision checks.
+    sphere_link_idx: Optional[torch.Tensor] = None
+
+    def get_pair_report(self) -> Dict[str, Union[int, float]]:
+        """Get number of sphere pairs checked for self collision and sparsity of checks.
+
+        Returns:
+            Dict[str, Union[int, float]]: Dictionary with number of spheres ("n_spheres"), number
+                of sphere pairs checked ("n_pairs"), number of all sphere pairs ("n_all_pairs"),
+                fraction of sphere pairs that are skipped ("sparsity"), checks per thread
+                ("checks_per_thread"), and number of threads with checks ("n_threads").
+        """
+        n_spheres = self.offset.shape[0] if self.offset is not None else 0
+        n_pairs = self.thread_max // 2 if self.thread_max is not None else 0
+        n_all_pairs = n_spheres * (n_spheres - 1) // 2
+        sparsity = 1.0 - float(n_pairs) / n_all_pairs if n_all_pairs > 0 else 0.0
+        n_threads = (n_pairs + self.checks_per_thread - 1) // self.checks_per_thread
+        return {
+            "n_spheres": n_spheres,
+            "n_pairs": n_pairs,
+            "n_all_pairs": n_all_pairs,
+            "sparsity": sparsity,
+            "checks_per_thread": self.checks_per_thread,
+            "n_threads": n_threads,
+        }
@@ -12,5 +12,6 @@
 cuRoboLib module contains CUDA implementations (kernels) of robotics algorithms, wrapped in
 C++, and compiled with PyTorch for use in Python.
 
-All implementations are in ``.cu`` files in ``cpp`` sub-directory.
+All implementations are in ``.cu`` files in ``cpp`` sub-directory. Kinematics and self collision
+also have pure PyTorch implementations that are used when the CUDA extension is not available.
 """
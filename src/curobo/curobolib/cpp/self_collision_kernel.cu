@@ -362,14 +362,15 @@ namespace Curobo
       dist_t  max_d[NBPB] = {{ 0.0, 0, 0}};
       int16_t indices[ndpt * 2];
 
-      for (uint8_t i = 0; i < ndpt * 2; i++)
+      // int counters: uint8_t cannot reach ndpt * 2 for tiles of 128 or more checks per thread.
+      for (int i = 0; i < ndpt * 2; i++)
       {
         indices[i] = locations_[(threadIdx.x) * 2 * ndpt + i];
       }
 
 #pragma unroll
 
-      for (uint8_t k = 0; k < ndpt; k++)
+      for (int k = 0; k < ndpt; k++)
       {
         // We are iterating through ndpt pair of spheres across batch
         // if we increase ndpt, then we can compute for more spheres?
@@ -8,11 +8,15 @@
 # without an express license agreement from NVIDIA CORPORATION or
 # its affiliates is strictly prohibited.
 #
+# Standard Library
+import math
+from typing import Callable, List, Optional, Tuple
+
 # Third Party
 import torch
 
 # CuRobo
-from curobo.util.logger import log_warn
+from curobo.util.logger import log_info, log_warn
 from curobo.util.torch_utils import get_torch_jit_decorator
 
 try:
@@ -20,24 +24,36 @@ try:
     from curobo.curobolib import geom_cu
 
 except ImportError:
-    log_warn("geom_cu binary not found, jit compiling...")
-    # Third Party
-    from torch.utils.cpp_extension import load
+    geom_cu = None
+    if torch.cuda.is_available():
+        log_warn("geom_cu binary not found, jit compiling...")
+        try:
+            # Third Party
+            from torch.utils.cpp_extension import load
 
-    # CuRobo
-    from curobo.util_file import add_cpp_path
+            # CuRobo
+            from curobo.util_file import add_cpp_path
 
-    geom_cu = load(
-        name="geom_cu",
-        sources=add_cpp_path(
-            [
-                "geom_cuda.cpp",
-                "sphere_obb_kernel.cu",
-                "pose_distance_kernel.cu",
-                "self_collision_kernel.cu",
-            ]
-        ),
-    )
+            geom_cu = load(
+                name="geom_cu",
+                sources=add_cpp_path(
+                    [
+                        "geom_cuda.cpp",
+                        "sphere_obb_kernel.cu",
+                        "pose_distance_kernel.cu",
+                        "self_collision_kernel.cu",
+                    ]
+                ),
+            )
+        except Exception as e:
+            log_warn("geom_cu failed to compile: " + str(e))
+    else:
+        log_info("CUDA not available, geom_cu is not loaded")
+
+
+def is_geom_cu_available() -> bool:
+    """Check if the CUDA geometry extension was loaded."""
+    return geom_cu is not None
 
 
 def get_self_collision_distance(
@@ -55,7 +71,21 @@ def get_self_collision_distance(
     compute_grad,
     checks_per_thread=32,
     experimental_kernel=True,
+    broad_phase_data: Optional[Tuple[torch.Tensor, torch.Tensor, torch.Tensor, float]] = None,
 ):
+    if broad_phase_data is not None or geom_cu is None or not robot_spheres.is_cuda:
+        return get_self_collision_distance_torch(
+            out_distance,
+            out_vec,
+            sparse_index,
+            robot_spheres,
+            collision_offset,
+            weight,
+            thread_locations,
+            thread_size,
+            compute_grad,
+            broad_phase_data,
+        )
     r = geom_cu.self_collision_distance(
         out_distance,
         out_vec,
@@ -78,6 +108,199 @@ def get_self_collision_distance(
     return out_distance, out_vec
 
 
+def get_self_collision_link_pairs(
+    thread_locations: torch.Tensor, thread_size: int, sphere_link_idx: torch.Tensor
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Find pairs of links that have sphere pairs checked for self collision.
+
+    Args:
+        thread_locations: Sphere pairs checked for self collision, stored as [i0, j0, i1, j1, ...].
+        thread_size: Number of valid values in thread_locations (2 * number of sphere pairs).
+        sphere_link_idx: Index of link for each sphere [n_spheres].
+
+    Returns:
+        Tuple[torch.Tensor, torch.Tensor]: Unique link pairs [n_link_pairs, 2] and index of link
+            pair for every sphere pair [n_pairs].
+    """
+    pairs = thread_locations[:thread_size].view(-1, 2).to(dtype=torch.long)
+    sphere_link_pairs = sphere_link_idx.to(dtype=torch.long)[pairs]
+    link_pairs, pair_link_pair_idx = torch.unique(sphere_link_pairs, dim=0, return_inverse=True)
+    return link_pairs, pair_link_pair_idx.view(-1)
+
+
+def get_self_collision_broad_phase_pairs(
+    robot_spheres: torch.Tensor,
+    collision_offset: torch.Tensor,
+    sphere_link_idx: torch.Tensor,
+    link_pairs: torch.Tensor,
+    pair_link_pair_idx: torch.Tensor,
+    activation_distance: float = 0.0,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Find sphere pairs of links whose bounding spheres are within activation distance.
+
+    A bounding sphere is computed per link from the current position of its collision spheres,
+    centered at the mean of spheres with positive radius. As a sphere pair of two links can only
+    be in collision when bounding spheres of the links overlap, skipping pairs of far links gives
+    the same self collision distance as checking all pairs.
+
+    Args:
+        robot_spheres: Position and radius of spheres [batch, n_spheres, 4].
+        collision_offset: Radius offset for each sphere [n_spheres].
+        sphere_link_idx: Index of link for each sphere [n_spheres].
+        link_pairs: Link pairs from :func:`get_self_collision_link_pairs` [n_link_pairs, 2].
+        pair_link_pair_idx: Link pair index of each sphere pair [n_pairs].
+        activation_distance: Distance added to link bounding spheres.
+
+    Returns:
+        Tuple[torch.Tensor, torch.Tensor]: Batch index and sphere pair index of sphere pairs to
+            check.
+    """
+    b, n, _ = robot_spheres.shape
+    sphere_link_idx = sphere_link_idx.to(dtype=torch.long)
+    n_links = int(torch.max(link_pairs).item()) + 1 if link_pairs.shape[0] > 0 else 0
+    n_links = max(n_links, int(torch.max(sphere_link_idx).item()) + 1)
+    position = robot_spheres[..., :3]
+    radius = robot_spheres[..., 3] + collision_offset
+    valid = (radius > 0.0).to(dtype=robot_spheres.dtype).unsqueeze(-1)
+    center = torch.zeros(
+        (b, n_links, 3), device=robot_spheres.device, dtype=robot_spheres.dtype
+    ).index_add_(1, sphere_link_idx, position * valid)
+    count = torch.zeros(
+        (b, n_links, 1), device=robot_spheres.device, dtype=robot_spheres.dtype
+    ).index_add_(1, sphere_link_idx, valid)
+    center = center / torch.clamp(count, min=1.0)
+
+    # bounding radius has to include all spheres of the link:
+    sphere_bound = torch.linalg.norm(position - center[:, sphere_link_idx], dim=-1) + radius
+    bound_radius = torch.full(
+        (b, n_links), -torch.inf, device=robot_spheres.device, dtype=robot_spheres.dtype
+    ).scatter_reduce_(1, sphere_link_idx.view(1, -1).expand(b, -1), sphere_bound, reduce="amax")
+
+    link_distance = torch.linalg.norm(
+        center[:, link_pairs[:, 0]] - center[:, link_pairs[:, 1]], dim=-1
+    )
+    link_active = link_distance <= (
+        bound_radius[:, link_pairs[:, 0]] + bound_radius[:, link_pairs[:, 1]] + activation_distance
+    )
+    batch_idx, pair_idx = torch.nonzero(link_active[:, pair_link_pair_idx], as_tuple=True)
+    return batch_idx, pair_idx
+
+
+def _torch_sphere_pair_penetration(
+    sph1: torch.Tensor, sph2: torch.Tensor, offset1: torch.Tensor, offset2: torch.Tensor
+) -> torch.Tensor:
+    """Compute penetration between sphere pairs, with the order of operations of the kernel."""
+    d_vec = sph1[..., :3] - sph2[..., :3]
+    d = torch.sqrt(
+        d_vec[..., 0] * d_vec[..., 0]
+        + d_vec[..., 1] * d_vec[..., 1]
+        + d_vec[..., 2] * d_vec[..., 2]
+    )
+    return ((sph1[..., 3] + offset1) + (sph2[..., 3] + offset2)) - d
+
+
+def get_self_collision_distance_torch(
+    out_distance: torch.Tensor,
+    out_vec: torch.Tensor,
+    sparse_index: torch.Tensor,
+    robot_spheres: torch.Tensor,
+    collision_offset: torch.Tensor,
+    weight: torch.Tensor,
+    thread_locations: torch.Tensor,
+    thread_size: int,
+    compute_grad: bool,
+    broad_phase_data: Optional[Tuple[torch.Tensor, torch.Tensor, torch.Tensor, float]] = None,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Compute self collision distance in PyTorch, matching output of the CUDA kernel.
+
+    Computes the maximum penetration between sphere pairs in thread_locations for every batch
+    element, scaled by weight. When compute_grad is True, out_vec is filled with the normalized
+    direction between the pair of spheres with maximum penetration.
+
+    Args:
+        out_distance: Output buffer for distance [batch].
+        out_vec: Output buffer for gradient [batch, n_spheres, 4].
+        sparse_index: Buffer to track spheres with non-zero gradient [batch, n_spheres].
+        robot_spheres: Position and radius of spheres [batch, n_spheres, 4].
+        collision_offset: Radius offset for each sphere [n_spheres].
+        weight: Weight of cost [1].
+        thread_locations: Sphere pairs checked for self collision, stored as [i0, j0, i1, j1, ...].
+        thread_size: Number of valid values in thread_locations (2 * number of sphere pairs).
+        compute_grad: Compute gradient.
+        broad_phase_data: Sphere link index, link pairs, link pair index of each sphere pair from
+            :func:`get_self_collision_link_pairs`, and activation distance. When given, only
+            sphere pairs of links with overlapping bounding spheres are checked.
+
+    Returns:
+        Tuple[torch.Tensor, torch.Tensor]: Distance and gradient buffers.
+    """
+    n_spheres = robot_spheres.shape[-2]
+    spheres = robot_spheres.detach().view(-1, n_spheres, 4)
+    b = spheres.shape[0]
+    out_distance_flat = out_distance.view(-1)
+    out_vec_flat = out_vec.view(-1, n_spheres, 4)
+    sparse_index_flat = sparse_index.view(-1, n_spheres)
+    pairs = thread_locations[:thread_size].view(-1, 2).to(dtype=torch.long)
+
+    if broad_phase_data is not None:
+        sphere_link_idx, link_pairs, pair_link_pair_idx, activation_distance = broad_phase_data
+        batch_idx, pair_idx = get_self_collision_broad_phase_pairs(
+            spheres,
+            collision_offset,
+            sphere_link_idx,
+            link_pairs,
+            pair_link_pair_idx,
+            activation_distance,
+        )
+        i = pairs[pair_idx, 0]
+        j = pairs[pair_idx, 1]
+        penetration = _torch_sphere_pair_penetration(
+            spheres[batch_idx, i], spheres[batch_idx, j], collision_offset[i], collision_offset[j]
+        )
+
+        # maximum penetration per batch, ties pick the first sphere pair as in the kernel:
+        max_penetration = torch.zeros((b,), device=spheres.device, dtype=spheres.dtype)
+        max_penetration.scatter_reduce_(0, batch_idx, penetration, reduce="amax")
+        is_max = (penetration == max_penetration[batch_idx]) & (penetration > 0.0)
+        max_pair = torch.full((b,), pairs.shape[0], device=spheres.device, dtype=torch.long)
+        max_pair.scatter_reduce_(0, batch_idx[is_max], pair_idx[is_max], reduce="amin")
+    else:
+        i = pairs[:, 0]
+        j = pairs[:, 1]
+        penetration = _torch_sphere_pair_penetration(
+            spheres[:, i], spheres[:, j], collision_offset[i], collision_offset[j]
+        )
+        if pairs.shape[0] > 0:
+            # argmax returns the first sphere pair on ties as in the kernel:
+            max_pair = torch.argmax(penetration, dim=-1)
+            max_penetration = torch.clamp(
+                torch.gather(penetration, 1, max_pair.unsqueeze(1)).squeeze(1), min=0.0
+            )
+        else:
+            max_pair = torch.zeros((b,), device=spheres.device, dtype=torch.long)
+            max_penetration = torch.zeros((b,), device=spheres.device, dtype=spheres.dtype)
+
+    out_distance_flat[:] = weight[0] * max_penetration
+
+    if compute_grad:
+        out_vec_flat[sparse_index_flat != 0] = 0.0
+        sparse_index_flat[:] = 0
+        collision_batch = torch.nonzero(max_penetration > 0.0, as_tuple=True)[0]
+        max_i = pairs[max_pair[collision_batch], 0]
+        max_j = pairs[max_pair[collision_batch], 1]
+        g_vec = spheres[collision_batch, max_i, :3] - spheres[collision_batch, max_j, :3]
+        g_vec = g_vec * torch.rsqrt(
+            g_vec[:, 0:1] * g_vec[:, 0:1]
+            + g_vec[:, 1:2] * g_vec[:, 1:2]
+            + g_vec[:, 2:3] * g_vec[:, 2:3]
+        )
+        out_vec_flat[collision_batch, max_i, :3] = weight[0] * -1 * g_vec
+        out_vec_flat[collision_batch, max_j, :3] = weight[0] * g_vec
+        sparse_index_flat[collision_batch, max_i] = 1
+        sparse_index_flat[collision_batch, max_j] = 1
+    return out_distance, out_vec
+
+
 class SelfCollisionDistance(torch.autograd.Function):
     @staticmethod
     def forward(
@@ -94,6 +317,7 @@ class SelfCollisionDistance(torch.autograd.Function):
         checks_per_thread: int,
         experimental_kernel: bool,
         return_loss: bool = False,
+        broad_phase_data: Optional[Tuple[torch.Tensor, torch.Tensor, torch.Tensor, float]] = None,
     ):
         # get batch size
         b, h, n_spheres, _ = robot_spheres.shape
@@ -112,6 +336,7 @@ class SelfCollisionDistance(torch.autograd.Function):
             robot_spheres.requires_grad,
             checks_per_thread,
             experimental_kernel,
+            broad_phase_data,
         )
         ctx.return_loss = return_loss
         ctx.save_for_backward(out_vec)
@@ -125,7 +350,21 @@ class SelfCollisionDistance(torch.autograd.Function):
             if ctx.return_loss:
                 g_vec = g_vec * grad_out_distance.view(*g_vec.shape[:2], 1, 1)
             sphere_grad = g_vec
-        return None, None, None, sphere_grad, None, None, None, None, None, None, None, None
+        return (
+            None,
+            None,
+            None,
+            sphere_grad,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+        )
 
 
 class SelfCollisionDistanceLoss(SelfCollisionDistance):
@@ -135,7 +374,7 @@ class SelfCollisionDistanceLoss(SelfCollisionDistance):
         if ctx.needs_input_grad[3]:
             (g_vec,) = ctx.saved_tensors
             sphere_grad = g_vec * grad_out_distance.unsqueeze(1)
-        return None, None, None, sphere_grad, None, None, None, None, None, None, None
+        return None, None, None, sphere_grad, None, None, None, None, None, None, None, None, None
 
 
 def get_pose_distance(
@@ -561,137 +800,1607 @@ class PoseError(torch.autograd.Function):
         )
 
 
-class SdfSphereOBB(torch.autograd.Function):
-    @staticmethod
-    def forward(
-        ctx,
-        query_sphere,
+#: Distance used by the CUDA kernels when searching for the closest point on an obstacle outside
+#: of the activation region during swept sphere collision checking.
+SWEPT_SPHERE_MAX_DISTANCE = 1000.0
+
+#: Signed distance read by voxel queries outside of voxel grids, matching the CUDA kernels.
+VOXEL_UNOBSERVED_DISTANCE = -1000.0
+
+#: Number of sphere and obstacle pairs checked together by PyTorch primitive collision functions.
+#: Obstacles are checked in chunks so memory does not grow with the number of obstacles.
+TORCH_PRIMITIVE_CHUNK_SIZE = 1 << 21
+
+#: Offset added to block coordinates of sparse voxel grids, so they can be packed in 16 bits.
+SPARSE_VOXEL_BLOCK_OFFSET = 1 << 15
+
+
+def _torch_quaternion_to_matrix(quat: torch.Tensor) -> torch.Tensor:
+    """Rotation matrix of quaternions [..., 4] (wxyz), expanded as in the CUDA kernels."""
+    w, x, y, z = quat[..., 0], quat[..., 1], quat[..., 2], quat[..., 3]
+    ww, xx, yy, zz = w * w, x * x, y * y, z * z
+    rot = torch.stack(
+        [
+            ww + xx - yy - zz,
+            2 * (x * y - w * z),
+            2 * (x * z + w * y),
+            2 * (x * y + w * z),
+            ww - xx + yy - zz,
+            2 * (y * z - w * x),
+            2 * (x * z - w * y),
+            2 * (y * z + w * x),
+            ww - xx - yy + zz,
+        ],
+        dim=-1,
+    )
+    return rot.view(quat.shape[:-1] + (3, 3))
+
+
+def _torch_obb_closest_point(
+    bounds: torch.Tensor, position: torch.Tensor, radius: torch.Tensor
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+    """Compute closest point between spheres and an axis aligned box centered at origin.
+
+    Follows ``check_sphere_aabb`` in sphere_obb_kernel.cu.
+
+    Args:
+        bounds: Half extents of box [..., 3].
+        position: Center of spheres in box frame [..., 3].
+        radius: Radius of spheres [...].
+
+    Returns:
+        Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]: Unit vector pointing out of
+        the box [..., 3], signed distance of sphere center (positive inside) [...], signed distance
+        of sphere (positive when penetrating) [...], and mask of spheres within ``radius`` of box
+        bounds which is used to skip computation in the kernel [...].
+    """
+    abs_position = torch.abs(position)
+    excess = torch.amax(abs_position - bounds, dim=-1)
+    near = excess < radius
+    inside = excess < 0.0
+    val = bounds - abs_position
+
+    # outside: clamp to box bounds.
+    pt_outside = torch.where(val < 0.0, torch.copysign(bounds, position), position)
+
+    # inside: project to nearest face.
+    val = torch.abs(val)
+    y_axis = (val[..., 1] <= val[..., 0]) & (val[..., 1] <= val[..., 2])
+    x_axis = ~y_axis & (val[..., 0] <= val[..., 1]) & (val[..., 0] <= val[..., 2])
+    z_axis = ~(y_axis | x_axis)
+    face_axis = torch.stack([x_axis, y_axis, z_axis], dim=-1)
+    face = torch.where(position > 0.0, bounds, -bounds)
+    pt_inside = torch.where(face_axis, face, position)
+
+    pt = torch.where(inside.unsqueeze(-1), pt_inside, pt_outside)
+    delta = pt - position
+    distance = torch.linalg.norm(delta, dim=-1)
+    delta = torch.where((distance == 0.0).unsqueeze(-1), -pt, delta)
+    distance = torch.where(inside, distance, -distance)
+    delta = torch.where(inside.unsqueeze(-1), -delta, delta)
+    delta = delta / torch.clamp(torch.linalg.norm(delta, dim=-1, keepdim=True), min=1e-12)
+    sphere_distance = distance + radius
+    return delta, distance, sphere_distance, near
+
+
+def _torch_scale_eta_metric(
+    delta: torch.Tensor, sphere_distance: torch.Tensor, eta: torch.Tensor
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Smooth collision cost and gradient of penetrating spheres, see ``scale_eta_metric``."""
+    quadratic = sphere_distance <= eta
+    cost = torch.where(
+        quadratic, (0.5 / eta) * sphere_distance * sphere_distance, sphere_distance - 0.5 * eta
+    )
+    scale = torch.where(quadratic, sphere_distance / eta, torch.ones_like(sphere_distance))
+    valid = sphere_distance > 0.0
+    cost = torch.where(valid, cost, torch.zeros_like(cost))
+    grad = torch.where(valid.unsqueeze(-1), scale.unsqueeze(-1) * delta, torch.zeros_like(delta))
+    return cost, grad
+
+
+def _torch_get_env_primitives(
+    obs_params: torch.Tensor,
+    obs_pose: torch.Tensor,
+    obs_enable: torch.Tensor,
+    n_env_obs: torch.Tensor,
+    env_query_idx: torch.Tensor,
+    batch_size: int,
+    use_batch_env: bool,
+    find_active: bool = True,
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor, List[int]]:
+    """Gather primitive obstacles of the environment of every batch index.
+
+    Obstacles are indexed as in the CUDA kernels, where obstacle ``i`` of environment ``e`` is
+    read from ``e * max_nobs + i`` of the flattened obstacle tensors and the number of obstacles
+    from ``n_env_obs[e]``. This also reads ragged obstacle tensors, see
+    :mod:`curobo.geom.sdf.ragged_obstacles`.
+
+    Args:
+        find_active: Return only indices of obstacles that are enabled in at least one queried
+            environment. This synchronizes with the device. When False, max_nobs obstacles are
+            read from every environment and all indices are returned.
+
+    Returns:
+        Tuple: Parameters [batch, n_obs, n_params], rotation [batch, n_obs, 3, 3], translation
+        [batch, n_obs, 3], enable mask [batch, n_obs], and indices of obstacles to check.
+    """
+    device = obs_pose.device
+    if use_batch_env:
+        env_idx = env_query_idx.view(-1)[:batch_size].to(dtype=torch.long)
+    else:
+        env_idx = torch.zeros(batch_size, dtype=torch.long, device=device)
+    max_nobs = obs_pose.shape[1]
+    n_env = n_env_obs.view(-1).to(dtype=torch.long)[env_idx]
+    n_obs = max_nobs
+    if find_active:
+        n_obs = int(torch.max(n_env).item()) if batch_size > 0 else 0
+    obs_idx = torch.arange(n_obs, device=device).unsqueeze(0)
+    flat_idx = env_idx.unsqueeze(1) * max_nobs + obs_idx
+    n_flat = obs_pose.shape[0] * max_nobs
+    in_env = (obs_idx < n_env.unsqueeze(1)) & (flat_idx < n_flat)
+    flat_idx = torch.where(in_env, flat_idx, 0)
+    enable = (obs_enable.reshape(n_flat)[flat_idx] != 0) & in_env
+    pose = obs_pose.reshape(n_flat, -1)[flat_idx].to(dtype=torch.float32)
+    params = obs_params.reshape(n_flat, -1)[flat_idx].to(dtype=torch.float32)
+    rot = _torch_quaternion_to_matrix(pose[..., 3:7])
+    if find_active:
+        active_obs = torch.nonzero(torch.any(enable, dim=0)).view(-1).tolist()
+    else:
+        active_obs = list(range(n_obs))
+    return params, rot, pose[..., :3], enable, active_obs
+
+
+def _torch_get_env_obbs(
+    box_dims: torch.Tensor,
+    box_pose: torch.Tensor,
+    box_enable: torch.Tensor,
+    n_env_obb: torch.Tensor,
+    env_query_idx: torch.Tensor,
+    batch_size: int,
+    use_batch_env: bool,
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor, List[int]]:
+    """Gather obstacles of the environment of every batch index.
+
+    Returns:
+        Tuple: Half extents [batch, n_obbs, 3], rotation [batch, n_obbs, 3, 3], translation
+        [batch, n_obbs, 3], enable mask [batch, n_obbs], and indices of obstacles that are enabled
+        in at least one queried environment.
+    """
+    dims, rot, trans, enable, active_obbs = _torch_get_env_primitives(
+        box_dims, box_pose, box_enable, n_env_obb, env_query_idx, batch_size, use_batch_env
+    )
+    return dims[..., :3] / 2, rot, trans, enable, active_obbs
+
+
+def _torch_write_sphere_distance(
+    out_buffer: torch.Tensor,
+    grad_out_buffer: torch.Tensor,
+    sparsity_idx: torch.Tensor,
+    valid_sphere: torch.Tensor,
+    cost: torch.Tensor,
+    grad: torch.Tensor,
+    weight: torch.Tensor,
+    transform_back: bool,
+):
+    """Write cost and gradient to buffers with the sparsity logic of the CUDA kernels.
+
+    Buffers of spheres that are not in collision are only written when their sparsity index is
+    set, so that zeros are not rewritten every call.
+    """
+    shape = valid_sphere.shape
+    out_distance = out_buffer.view(shape)
+    out_grad = grad_out_buffer.view(shape + (4,))
+    sparsity = sparsity_idx.view(shape)
+    was_active = sparsity != 0
+    hit = valid_sphere & (cost != 0.0)
+    clear = ~hit & was_active
+    clear_invalid = ~valid_sphere & was_active
+
+    new_distance = torch.where(
+        hit, weight * cost, torch.where(~valid_sphere | clear, 0.0, out_distance.float())
+    )
+    new_grad = out_grad.float()
+    if transform_back:
+        new_grad_xyz = torch.where(
+            hit.unsqueeze(-1),
+            weight * grad,
+            torch.where(clear.unsqueeze(-1), 0.0, new_grad[..., :3]),
+        )
+    else:
+        new_grad_xyz = torch.where(clear_invalid.unsqueeze(-1), 0.0, new_grad[..., :3])
+    new_grad_w = torch.where(clear_invalid, 0.0, new_grad[..., 3])
+    new_sparsity = torch.where(hit, 1, torch.where(clear, 0, sparsity))
+
+    out_distance.copy_(new_distance)
+    out_grad[..., :3].copy_(new_grad_xyz)
+    out_grad[..., 3].copy_(new_grad_w)
+    sparsity.copy_(new_sparsity)
+
+
+def _torch_get_obstacle_chunks(
+    active_obs: List[int], n_queries: int, device: torch.device
+) -> List[torch.Tensor]:
+    """Split indices of obstacles into chunks of at most TORCH_PRIMITIVE_CHUNK_SIZE pairs.
+
+    Args:
+        active_obs: Indices of obstacles to check.
+        n_queries: Number of query spheres checked against every obstacle.
+        device: Device of returned indices.
+
+    Returns:
+        List[torch.Tensor]: Indices of obstacles in every chunk.
+    """
+    chunk_size = max(1, TORCH_PRIMITIVE_CHUNK_SIZE // max(n_queries, 1))
+    return [
+        torch.as_tensor(active_obs[i : i + chunk_size], dtype=torch.long, device=device)
+        for i in range(0, len(active_obs), chunk_size)
+    ]
+
+
+def _torch_sphere_primitive_clpt(
+    spheres: torch.Tensor,
+    obs_params: torch.Tensor,
+    rot: torch.Tensor,
+    trans: torch.Tensor,
+    enable: torch.Tensor,
+    active_obs: List[int],
+    closest_point: Callable,
+    out_buffer: torch.Tensor,
+    grad_out_buffer: torch.Tensor,
+    sparsity_idx: torch.Tensor,
+    weight: torch.Tensor,
+    activation_distance: torch.Tensor,
+    max_distance: torch.Tensor,
+    transform_back: bool,
+    compute_distance: bool,
+    compute_esdf: bool,
+) -> List[torch.Tensor]:
+    """Compute collision between spheres and primitive obstacles of one type.
+
+    Args:
+        spheres: Query spheres [batch, n_spheres, 4].
+        obs_params: Parameters of obstacles [batch, n_obs, n_params], from
+            :func:`_torch_get_env_primitives`.
+        rot: Rotation of world in obstacle frame [batch, n_obs, 3, 3].
+        trans: Translation of world in obstacle frame [batch, n_obs, 3].
+        enable: Enable mask of obstacles [batch, n_obs].
+        active_obs: Indices of obstacles to check.
+        closest_point: Function with the signature of :func:`_torch_obb_closest_point`, taking
+            parameters of an obstacle instead of half extents.
+
+    Returns:
+        List[torch.Tensor]: Distance, gradient, and sparsity buffers.
+    """
+    radius = spheres[..., 3]
+    valid_sphere = radius >= 0.0
+    weight = weight.view(()).float()
+    chunks = _torch_get_obstacle_chunks(active_obs, spheres.shape[0] * spheres.shape[1], rot.device)
+
+    if not compute_distance:
+        # binary collision:
+        radius = (radius + activation_distance.view(()).float()).unsqueeze(1)
+        collision = torch.zeros_like(valid_sphere)
+        for idx in chunks:
+            position = torch.einsum("bkij,bnj->bkni", rot[:, idx], spheres[..., :3])
+            position = position + trans[:, idx].unsqueeze(2)
+            _, _, sphere_distance, near = closest_point(
+                obs_params[:, idx].unsqueeze(2), position, radius
+            )
+            obs_collision = near & (sphere_distance > 0.0) & enable[:, idx].unsqueeze(2)
+            collision |= torch.any(obs_collision, dim=1)
+        out_distance = torch.where(valid_sphere & collision, weight, 0.0)
+        out_buffer.view(valid_sphere.shape).copy_(out_distance)
+        return [out_buffer, grad_out_buffer, sparsity_idx]
+
+    eta = max_distance.view(()).float() if compute_esdf else activation_distance.view(()).float()
+    radius = radius + eta
+    if compute_esdf:
+        cost = torch.zeros_like(radius) - eta
+    else:
+        cost = torch.zeros_like(radius)
+    grad = torch.zeros_like(spheres[..., :3])
+    for idx in chunks:
+        rot_k = rot[:, idx]
+        position = torch.einsum("bkij,bnj->bkni", rot_k, spheres[..., :3])
+        position = position + trans[:, idx].unsqueeze(2)
+        delta, _, sphere_distance, near = closest_point(
+            obs_params[:, idx].unsqueeze(2), position, radius.unsqueeze(1)
+        )
+        collision = near & (sphere_distance > 0.0) & enable[:, idx].unsqueeze(2)
+        if compute_esdf:
+            # deepest penetration across obstacles, keeping the first obstacle on ties:
+            obs_distance = torch.where(collision, sphere_distance, -torch.inf)
+            max_distance_k, max_idx = torch.max(obs_distance, dim=1)
+            update = max_distance_k > cost
+            cost = torch.where(update, max_distance_k, cost)
+            if transform_back:
+                max_delta = torch.gather(
+                    delta, 1, max_idx.view(max_idx.shape[0], 1, -1, 1).expand(-1, -1, -1, 3)
+                ).squeeze(1)
+                max_rot = torch.gather(
+                    rot_k, 1, max_idx.view(max_idx.shape[0], -1, 1, 1).expand(-1, -1, 3, 3)
+                )
+                world_delta = torch.einsum("bnji,bnj->bni", max_rot, max_delta)
+                grad = torch.where(update.unsqueeze(-1), world_delta, grad)
+        else:
+            obs_cost, obs_grad = _torch_scale_eta_metric(delta, sphere_distance, eta)
+            update = collision & (obs_cost > 0.0)
+            cost = cost + torch.sum(torch.where(update, obs_cost, 0.0), dim=1)
+            if transform_back:
+                world_grad = torch.einsum("bkji,bknj->bkni", rot_k, obs_grad)
+                grad = grad + torch.sum(torch.where(update.unsqueeze(-1), world_grad, 0.0), dim=1)
+
+    if compute_esdf:
+        out_distance = out_buffer.view(valid_sphere.shape)
+        out_grad = grad_out_buffer.view(valid_sphere.shape + (4,))
+        sparsity = sparsity_idx.view(valid_sphere.shape)
+        clear_invalid = (~valid_sphere & (sparsity != 0)).unsqueeze(-1)
+        out_distance.copy_(torch.where(valid_sphere, cost - radius, 0.0))
+        if transform_back:
+            out_grad[..., :3].copy_(
+                torch.where(valid_sphere.unsqueeze(-1), grad, out_grad[..., :3].float())
+            )
+        out_grad.copy_(torch.where(clear_invalid, 0.0, out_grad.float()))
+        sparsity.copy_(torch.where(clear_invalid.squeeze(-1), 0, sparsity))
+    else:
+        _torch_write_sphere_distance(
+            out_buffer,
+            grad_out_buffer,
+            sparsity_idx,
+            valid_sphere,
+            cost,
+            grad,
+            weight,
+            transform_back,
+        )
+    return [out_buffer, grad_out_buffer, sparsity_idx]
+
+
+def sphere_obb_clpt_torch(
+    query_sphere: torch.Tensor,
+    out_buffer: torch.Tensor,
+    grad_out_buffer: torch.Tensor,
+    sparsity_idx: torch.Tensor,
+    weight: torch.Tensor,
+    activation_distance: torch.Tensor,
+    max_distance: torch.Tensor,
+    box_accel: torch.Tensor,
+    box_dims: torch.Tensor,
+    box_pose: torch.Tensor,
+    box_enable: torch.Tensor,
+    n_env_obb: torch.Tensor,
+    env_query_idx: torch.Tensor,
+    max_nobs: int,
+    batch_size: int,
+    horizon: int,
+    n_spheres: int,
+    transform_back: bool,
+    compute_distance: bool,
+    use_batch_env: bool,
+    sum_collisions: bool = True,
+    compute_esdf: bool = False,
+) -> List[torch.Tensor]:
+    """Compute collision between spheres and cuboids in PyTorch, matching the CUDA kernel.
+
+    Takes the same arguments as ``geom_cu.closest_point``. Computation is vectorized across
+    spheres and chunks of obstacles. Costs of all obstacles are summed, as in the CUDA kernel,
+    so sum_collisions is not used.
+
+    Returns:
+        List[torch.Tensor]: Distance, gradient, and sparsity buffers.
+    """
+    spheres = query_sphere.detach().view(batch_size, horizon * n_spheres, 4).float()
+    bounds, rot, trans, enable, active_obbs = _torch_get_env_obbs(
+        box_dims, box_pose, box_enable, n_env_obb, env_query_idx, batch_size, use_batch_env
+    )
+    return _torch_sphere_primitive_clpt(
+        spheres,
+        bounds,
+        rot,
+        trans,
+        enable,
+        active_obbs,
+        _torch_obb_closest_point,
         out_buffer,
         grad_out_buffer,
         sparsity_idx,
         weight,
         activation_distance,
         max_distance,
-        box_accel,
-        box_dims,
-        box_pose,
-        box_enable,
-        n_env_obb,
-        env_query_idx,
-        max_nobs,
-        batch_size,
-        horizon,
-        n_spheres,
         transform_back,
         compute_distance,
-        use_batch_env,
-        return_loss: bool = False,
-        sum_collisions: bool = True,
-        compute_esdf: bool = False,
-    ):
-        r = geom_cu.closest_point(
-            query_sphere,
-            out_buffer,
-            grad_out_buffer,
-            sparsity_idx,
-            weight,
-            activation_distance,
-            max_distance,
-            box_accel,
-            box_dims,
-            box_pose,
-            box_enable,
-            n_env_obb,
-            env_query_idx,
-            max_nobs,
-            batch_size,
-            horizon,
-            n_spheres,
-            transform_back,
-            compute_distance,
-            use_batch_env,
-            sum_collisions,
-            compute_esdf,
+        compute_esdf,
+    )
+
+
+def _torch_obb_swept_closest_point(
+    bounds: torch.Tensor, position: torch.Tensor, radius: torch.Tensor
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+    """Closest point of :func:`_torch_obb_closest_point`, with the distance of spheres far from
+    the box clamped to the largest jump of swept sphere collision checking."""
+    delta, distance, sphere_distance, near = _torch_obb_closest_point(bounds, position, radius)
+    excess = torch.amax(torch.abs(position) - bounds, dim=-1)
+    distance = torch.where(excess < SWEPT_SPHERE_MAX_DISTANCE, distance, 1000.0)
+    return delta, distance, sphere_distance, near
+
+
+def _torch_swept_sphere_jump(
+    obs_params: torch.Tensor,
+    sphere_1: torch.Tensor,
+    sphere_other: torch.Tensor,
+    radius: torch.Tensor,
+    length: torch.Tensor,
+    jump_distance: torch.Tensor,
+    active: torch.Tensor,
+    eta: torch.Tensor,
+    sweep_steps: int,
+    cost: torch.Tensor,
+    grad: torch.Tensor,
+    closest_point: Callable,
+    early_exit: bool = True,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Sweep from a sphere towards its neighbor in time, jumping by distance to the obstacle.
+
+    Follows ``check_jump_distance`` in sphere_obb_kernel.cu. When early_exit is True, sweeping
+    stops once no sphere is active, which synchronizes with the device.
+    """
+    for _ in range(sweep_steps):
+        active = active & (jump_distance < length / 2)
+        if early_exit and not torch.any(active):
+            break
+        k0 = (1 - jump_distance / length).unsqueeze(-1)
+        position = k0 * sphere_1 + (1 - k0) * sphere_other
+        delta, distance, sphere_distance, near = closest_point(obs_params, position, radius)
+        collision = active & near & (sphere_distance > 0.0)
+        step_cost, step_grad = _torch_scale_eta_metric(delta, sphere_distance, eta)
+        cost = cost + torch.where(collision, step_cost, 0.0)
+        grad = grad + torch.where(collision.unsqueeze(-1), step_grad, 0.0)
+        jump_distance = torch.where(
+            active, jump_distance + torch.maximum(torch.abs(distance), radius), jump_distance
         )
-        # r[1][r[1]!=r[1]] = 0.0
-        ctx.compute_esdf = compute_esdf
-        ctx.return_loss = return_loss
-        ctx.save_for_backward(r[1])
-        return r[0]
+    return cost, grad
 
-    @staticmethod
-    def backward(ctx, grad_output):
-        grad_pt = None
-        if ctx.needs_input_grad[0]:
-            # if ctx.compute_esdf:
-            #    raise NotImplementedError("Gradients not implemented for compute_esdf=True")
-            (r,) = ctx.saved_tensors
-            if ctx.return_loss:
-                r = r * grad_output.unsqueeze(-1)
-            grad_pt = r
-        return (
-            grad_pt,
-            None,
-            None,
-            None,
-            None,
-            None,
-            None,
-            None,
-            None,
-            None,
-            None,
-            None,
-            None,
-            None,
-            None,
-            None,
-            None,
-            None,
-            None,
-            None,
-            None,
-            None,
-            None,
+
+def _torch_scale_speed_metric(
+    sphere_0: torch.Tensor,
+    sphere_1: torch.Tensor,
+    sphere_2: torch.Tensor,
+    dt: torch.Tensor,
+    transform_back: bool,
+    cost: torch.Tensor,
+    grad: torch.Tensor,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Scale cost by speed of spheres, see ``scale_speed_metric`` in sphere_obb_kernel.cu."""
+    velocity = (0.5 / dt) * (sphere_2 - sphere_0)
+    speed = torch.linalg.norm(velocity, dim=-1)
+    moving = speed >= 0.001
+    safe_speed = torch.where(moving, speed, 1.0).unsqueeze(-1)
+    if transform_back:
+        acceleration = (sphere_0 + sphere_2 - 2 * sphere_1) * (1 / (dt * dt))
+        direction = velocity / safe_speed
+        curvature = acceleration / (safe_speed * safe_speed)
+        orth_grad = grad - direction * torch.sum(direction * grad, dim=-1, keepdim=True)
+        orth_curvature = curvature - direction * torch.sum(
+            direction * curvature, dim=-1, keepdim=True
         )
+        new_grad = safe_speed * (orth_grad - cost.unsqueeze(-1) * orth_curvature)
+        grad = torch.where(moving.unsqueeze(-1), new_grad, grad)
+    cost = torch.where(moving, speed * cost, cost)
+    return cost, grad
 
 
-class SdfSweptSphereOBB(torch.autograd.Function):
-    @staticmethod
-    def forward(
-        ctx,
-        query_sphere,
+def _torch_swept_sphere_primitive_clpt(
+    spheres: torch.Tensor,
+    obs_params: torch.Tensor,
+    rot: torch.Tensor,
+    trans: torch.Tensor,
+    enable: torch.Tensor,
+    active_obs: List[int],
+    closest_point: Callable,
+    out_buffer: torch.Tensor,
+    grad_out_buffer: torch.Tensor,
+    sparsity_idx: torch.Tensor,
+    weight: torch.Tensor,
+    activation_distance: torch.Tensor,
+    speed_dt: torch.Tensor,
+    sweep_steps: int,
+    enable_speed_metric: bool,
+    transform_back: bool,
+    compute_distance: bool,
+    early_exit: bool = True,
+) -> List[torch.Tensor]:
+    """Compute collision between swept spheres and primitive obstacles of one type.
+
+    Args:
+        spheres: Query spheres [batch, horizon, n_spheres, 4].
+        obs_params: Parameters of obstacles [batch, n_obs, n_params], from
+            :func:`_torch_get_env_primitives`.
+        rot: Rotation of world in obstacle frame [batch, n_obs, 3, 3].
+        trans: Translation of world in obstacle frame [batch, n_obs, 3].
+        enable: Enable mask of obstacles [batch, n_obs].
+        active_obs: Indices of obstacles to check.
+        closest_point: Function with the signature of :func:`_torch_obb_closest_point`, taking
+            parameters of an obstacle instead of half extents. Returned distance is used to jump
+            along segments and should not overestimate the distance to the obstacle.
+        early_exit: Stop sweeping once no sphere is active, see :func:`_torch_swept_sphere_jump`.
+
+    Returns:
+        List[torch.Tensor]: Distance, gradient, and sparsity buffers.
+    """
+    batch_size, horizon = spheres.shape[:2]
+    eta = activation_distance.view(()).float()
+    weight = weight.view(()).float()
+    valid_sphere = spheres[..., 3] >= 0.0
+    radius = spheres[..., 3] + eta
+    sphere_1 = spheres[..., :3]
+    sphere_0 = torch.cat([sphere_1[:, :1], sphere_1[:, :-1]], dim=1)
+    sphere_2 = torch.cat([sphere_1[:, 1:], sphere_1[:, -1:]], dim=1)
+    time_idx = torch.arange(horizon, device=spheres.device).view(1, 1, -1, 1)
+    chunks = _torch_get_obstacle_chunks(active_obs, radius.numel(), spheres.device)
+    radius = radius.unsqueeze(1)
+    sphere_1 = sphere_1.unsqueeze(1)
+    sphere_0 = sphere_0.unsqueeze(1)
+    sphere_2 = sphere_2.unsqueeze(1)
+
+    if not compute_distance:
+        collision = torch.zeros_like(valid_sphere)
+        n_steps = 2 * sweep_steps + 1
+        for idx in chunks:
+            rot_k = rot[:, idx].view(batch_size, -1, 1, 1, 3, 3)
+            trans_k = trans[:, idx].view(batch_size, -1, 1, 1, 3)
+            params_k = obs_params[:, idx].view(batch_size, len(idx), 1, 1, -1)
+            enable_k = enable[:, idx].view(batch_size, -1, 1, 1)
+            loc_1 = (rot_k @ sphere_1.unsqueeze(-1)).squeeze(-1) + trans_k
+            loc_0 = (rot_k @ sphere_0.unsqueeze(-1)).squeeze(-1) + trans_k
+            loc_2 = (rot_k @ sphere_2.unsqueeze(-1)).squeeze(-1) + trans_k
+            _, _, sphere_distance, near = closest_point(params_k, loc_1, radius)
+            obs_collision = enable_k & near & (sphere_distance > 0.0)
+            for j in range(sweep_steps):
+                k0 = (j + 1) / n_steps
+                for loc_other, valid_time in [
+                    (loc_0, time_idx > 0),
+                    (loc_2, time_idx < horizon - 1),
+                ]:
+                    position = k0 * loc_1 + (1 - k0) * loc_other
+                    _, _, sphere_distance, near = closest_point(params_k, position, radius)
+                    obs_collision |= enable_k & valid_time & near & (sphere_distance > 0.0)
+            collision |= torch.any(obs_collision, dim=1)
+        out_distance = torch.where(valid_sphere & collision, weight, 0.0)
+        out_buffer.view(valid_sphere.shape).copy_(out_distance)
+        return [out_buffer, grad_out_buffer, sparsity_idx]
+
+    distance_0 = torch.clamp(torch.linalg.norm(sphere_0 - sphere_1, dim=-1) - 2 * radius, min=0.0)
+    distance_2 = torch.clamp(torch.linalg.norm(sphere_2 - sphere_1, dim=-1) - 2 * radius, min=0.0)
+    sweep_back = (time_idx > 0) & (distance_0 > 0.0)
+    sweep_fwd = (time_idx < horizon - 1) & (distance_2 > 0.0)
+    length_0 = distance_0 + 2 * radius
+    length_2 = distance_2 + 2 * radius
+
+    cost = torch.zeros_like(valid_sphere, dtype=radius.dtype)
+    grad = torch.zeros_like(spheres[..., :3])
+    for idx in chunks:
+        rot_k = rot[:, idx].view(batch_size, -1, 1, 1, 3, 3)
+        trans_k = trans[:, idx].view(batch_size, -1, 1, 1, 3)
+        params_k = obs_params[:, idx].view(batch_size, len(idx), 1, 1, -1)
+        enable_k = enable[:, idx].view(batch_size, -1, 1, 1)
+        loc_1 = (rot_k @ sphere_1.unsqueeze(-1)).squeeze(-1) + trans_k
+        loc_0 = (rot_k @ sphere_0.unsqueeze(-1)).squeeze(-1) + trans_k
+        loc_2 = (rot_k @ sphere_2.unsqueeze(-1)).squeeze(-1) + trans_k
+
+        delta, distance, sphere_distance, near = closest_point(params_k, loc_1, radius)
+        collision = near & (sphere_distance > 0.0)
+        obs_cost, obs_grad = _torch_scale_eta_metric(delta, sphere_distance, eta)
+        obs_cost = torch.where(collision, obs_cost, 0.0)
+        obs_grad = torch.where(collision.unsqueeze(-1), obs_grad, 0.0)
+
+        jump_distance = torch.maximum(torch.abs(distance) - radius, radius)
+
+        active = enable_k & sweep_back & (jump_distance < distance_0 / 2)
+        obs_cost, obs_grad = _torch_swept_sphere_jump(
+            params_k,
+            loc_1,
+            loc_0,
+            radius,
+            length_0,
+            jump_distance,
+            active,
+            eta,
+            sweep_steps,
+            obs_cost,
+            obs_grad,
+            closest_point,
+            early_exit,
+        )
+        active = enable_k & sweep_fwd & (jump_distance < length_2 / 2)
+        obs_cost, obs_grad = _torch_swept_sphere_jump(
+            params_k,
+            loc_1,
+            loc_2,
+            radius,
+            length_2,
+            jump_distance,
+            active,
+            eta,
+            sweep_steps,
+            obs_cost,
+            obs_grad,
+            closest_point,
+            early_exit,
+        )
+        update = enable_k & (obs_cost > 0.0)
+        cost = cost + torch.sum(torch.where(update, obs_cost, 0.0), dim=1)
+        if transform_back:
+            world_grad = (rot_k.transpose(-1, -2) @ obs_grad.unsqueeze(-1)).squeeze(-1)
+            grad = grad + torch.sum(torch.where(update.unsqueeze(-1), world_grad, 0.0), dim=1)
+
+    sphere_0 = sphere_0.squeeze(1)
+    sphere_1 = sphere_1.squeeze(1)
+    sphere_2 = sphere_2.squeeze(1)
+    sweep_back = sweep_back.squeeze(1)
+    sweep_fwd = sweep_fwd.squeeze(1)
+    if enable_speed_metric:
+        scale = sweep_back & sweep_fwd & (cost != 0.0)
+        speed_cost, speed_grad = _torch_scale_speed_metric(
+            sphere_0, sphere_1, sphere_2, speed_dt.view(()).float(), transform_back, cost, grad
+        )
+        cost = torch.where(scale, speed_cost, cost)
+        grad = torch.where(scale.unsqueeze(-1), speed_grad, grad)
+    _torch_write_sphere_distance(
+        out_buffer,
+        grad_out_buffer,
+        sparsity_idx,
+        valid_sphere,
+        cost,
+        grad,
+        weight,
+        transform_back,
+    )
+    return [out_buffer, grad_out_buffer, sparsity_idx]
+
+
+def swept_sphere_obb_clpt_torch(
+    query_sphere: torch.Tensor,
+    out_buffer: torch.Tensor,
+    grad_out_buffer: torch.Tensor,
+    sparsity_idx: torch.Tensor,
+    weight: torch.Tensor,
+    activation_distance: torch.Tensor,
+    speed_dt: torch.Tensor,
+    box_accel: torch.Tensor,
+    box_dims: torch.Tensor,
+    box_pose: torch.Tensor,
+    box_enable: torch.Tensor,
+    n_env_obb: torch.Tensor,
+    env_query_idx: torch.Tensor,
+    max_nobs: int,
+    batch_size: int,
+    horizon: int,
+    n_spheres: int,
+    sweep_steps: int,
+    enable_speed_metric: bool,
+    transform_back: bool,
+    compute_distance: bool,
+    use_batch_env: bool,
+    sum_collisions: bool = True,
+) -> List[torch.Tensor]:
+    """Compute collision between swept spheres and cuboids in PyTorch, matching the CUDA kernel.
+
+    Takes the same arguments as ``geom_cu.swept_closest_point``. Spheres are swept towards the
+    previous and next timestep by jumping along the segment by the distance to the obstacle, for
+    at most sweep_steps jumps in each direction. Costs of all obstacles are summed, as in the CUDA
+    kernel, so sum_collisions is not used.
+
+    Returns:
+        List[torch.Tensor]: Distance, gradient, and sparsity buffers.
+    """
+    spheres = query_sphere.detach().view(batch_size, horizon, n_spheres, 4).float()
+    bounds, rot, trans, enable, active_obbs = _torch_get_env_obbs(
+        box_dims, box_pose, box_enable, n_env_obb, env_query_idx, batch_size, use_batch_env
+    )
+    return _torch_swept_sphere_primitive_clpt(
+        spheres,
+        bounds,
+        rot,
+        trans,
+        enable,
+        active_obbs,
+        _torch_obb_swept_closest_point,
         out_buffer,
         grad_out_buffer,
         sparsity_idx,
         weight,
         activation_distance,
         speed_dt,
-        box_accel,
-        box_dims,
-        box_pose,
-        box_enable,
-        n_env_obb,
-        env_query_idx,
-        max_nobs,
-        batch_size,
-        horizon,
-        n_spheres,
         sweep_steps,
         enable_speed_metric,
         transform_back,
         compute_distance,
-        use_batch_env,
-        return_loss: bool = False,
-        sum_collisions: bool = True,
-    ):
-        r = geom_cu.swept_closest_point(
-            query_sphere,
-            out_buffer,
-            grad_out_buffer,
-            sparsity_idx,
-            weight,
-            activation_distance,
+    )
+
+
+def _torch_capsule_closest_point(
+    capsule_params: torch.Tensor, position: torch.Tensor, radius: torch.Tensor
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+    """Compute closest point between spheres and a capsule in the capsule frame.
+
+    A sphere obstacle is a capsule with base equal to tip.
+
+    Args:
+        capsule_params: Base [..., :3], tip [..., 3:6], and radius [..., 6] of capsule.
+        position: Center of spheres in capsule frame [..., 3].
+        radius: Radius of spheres [...].
+
+    Returns:
+        Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]: Unit vector along which
+        penetration increases [..., 3], signed distance of sphere center (positive inside)
+        [...], signed distance of sphere (positive when penetrating) [...], and mask of
+        penetrating spheres [...]. The unit vector is zero for spheres centered on the segment
+        of the capsule.
+    """
+    base = capsule_params[..., :3]
+    axis = capsule_params[..., 3:6] - base
+    length_sq = torch.clamp(torch.sum(axis * axis, dim=-1), min=1e-12)
+    t = torch.clamp(torch.sum((position - base) * axis, dim=-1) / length_sq, 0.0, 1.0)
+    delta = base + t.unsqueeze(-1) * axis - position
+    center_distance = torch.linalg.norm(delta, dim=-1)
+    delta = delta / torch.clamp(center_distance, min=1e-12).unsqueeze(-1)
+    distance = capsule_params[..., 6] - center_distance
+    sphere_distance = distance + radius
+    return delta, distance, sphere_distance, sphere_distance > 0.0
+
+
+def sphere_capsule_clpt_torch(
+    query_sphere: torch.Tensor,
+    out_buffer: torch.Tensor,
+    grad_out_buffer: torch.Tensor,
+    sparsity_idx: torch.Tensor,
+    weight: torch.Tensor,
+    activation_distance: torch.Tensor,
+    max_distance: torch.Tensor,
+    capsule_params: torch.Tensor,
+    capsule_pose: torch.Tensor,
+    capsule_enable: torch.Tensor,
+    n_env_capsule: torch.Tensor,
+    env_query_idx: torch.Tensor,
+    batch_size: int,
+    horizon: int,
+    n_spheres: int,
+    transform_back: bool,
+    compute_distance: bool,
+    use_batch_env: bool,
+    compute_esdf: bool = False,
+) -> List[torch.Tensor]:
+    """Compute collision between spheres and capsules in PyTorch.
+
+    Cost and gradient follow :func:`sphere_obb_clpt_torch`, with the closed form distance to
+    the segment of every capsule. All cached capsules are checked, with disabled capsules masked
+    out, so that queries do not synchronize with the device.
+
+    Args:
+        capsule_params: Base, tip, and radius of capsules [n_envs, n_capsules, 8].
+        capsule_pose: Pose of world in capsule frame [n_envs, n_capsules, 8].
+        capsule_enable: Enable flag of capsules [n_envs, n_capsules].
+        n_env_capsule: Number of capsules in every environment [n_envs].
+
+    Returns:
+        List[torch.Tensor]: Distance, gradient, and sparsity buffers.
+    """
+    spheres = query_sphere.detach().view(batch_size, horizon * n_spheres, 4).float()
+    params, rot, trans, enable, active_capsules = _torch_get_env_primitives(
+        capsule_params,
+        capsule_pose,
+        capsule_enable,
+        n_env_capsule,
+        env_query_idx,
+        batch_size,
+        use_batch_env,
+        find_active=False,
+    )
+    return _torch_sphere_primitive_clpt(
+        spheres,
+        params,
+        rot,
+        trans,
+        enable,
+        active_capsules,
+        _torch_capsule_closest_point,
+        out_buffer,
+        grad_out_buffer,
+        sparsity_idx,
+        weight,
+        activation_distance,
+        max_distance,
+        transform_back,
+        compute_distance,
+        compute_esdf,
+    )
+
+
+def swept_sphere_capsule_clpt_torch(
+    query_sphere: torch.Tensor,
+    out_buffer: torch.Tensor,
+    grad_out_buffer: torch.Tensor,
+    sparsity_idx: torch.Tensor,
+    weight: torch.Tensor,
+    activation_distance: torch.Tensor,
+    speed_dt: torch.Tensor,
+    capsule_params: torch.Tensor,
+    capsule_pose: torch.Tensor,
+    capsule_enable: torch.Tensor,
+    n_env_capsule: torch.Tensor,
+    env_query_idx: torch.Tensor,
+    batch_size: int,
+    horizon: int,
+    n_spheres: int,
+    sweep_steps: int,
+    enable_speed_metric: bool,
+    transform_back: bool,
+    compute_distance: bool,
+    use_batch_env: bool,
+) -> List[torch.Tensor]:
+    """Compute collision between swept spheres and capsules in PyTorch.
+
+    Spheres are swept as in :func:`swept_sphere_obb_clpt_torch`. Distance to a capsule is exact,
+    so jumps along the segment never skip over a capsule. Like :func:`sphere_capsule_clpt_torch`,
+    this does not synchronize with the device.
+
+    Returns:
+        List[torch.Tensor]: Distance, gradient, and sparsity buffers.
+    """
+    spheres = query_sphere.detach().view(batch_size, horizon, n_spheres, 4).float()
+    params, rot, trans, enable, active_capsules = _torch_get_env_primitives(
+        capsule_params,
+        capsule_pose,
+        capsule_enable,
+        n_env_capsule,
+        env_query_idx,
+        batch_size,
+        use_batch_env,
+        find_active=False,
+    )
+    return _torch_swept_sphere_primitive_clpt(
+        spheres,
+        params,
+        rot,
+        trans,
+        enable,
+        active_capsules,
+        _torch_capsule_closest_point,
+        out_buffer,
+        grad_out_buffer,
+        sparsity_idx,
+        weight,
+        activation_distance,
+        speed_dt,
+        sweep_steps,
+        enable_speed_metric,
+        transform_back,
+        compute_distance,
+        early_exit=False,
+    )
+
+
+def _torch_sparse_voxel_block_keys(
+    block_xyz: torch.Tensor, layer_slot: torch.Tensor
+) -> torch.Tensor:
+    """Pack block coordinates [..., 3] and layer slots [...] into int64 hash keys.
+
+    Block coordinates are stored in 16 bits each, layer slots in the remaining high bits. Blocks
+    outside the 16 bit range get keys that are never stored, so they read as unallocated.
+    """
+    offset_xyz = block_xyz + SPARSE_VOXEL_BLOCK_OFFSET
+    in_range = torch.all((offset_xyz >= 0) & (offset_xyz < 2 * SPARSE_VOXEL_BLOCK_OFFSET), dim=-1)
+    offset_xyz = torch.clamp(offset_xyz, 0, 2 * SPARSE_VOXEL_BLOCK_OFFSET - 1)
+    keys = (
+        (layer_slot << 48)
+        | (offset_xyz[..., 0] << 32)
+        | (offset_xyz[..., 1] << 16)
+        | offset_xyz[..., 2]
+    )
+    return torch.where(in_range, keys, -1)
+
+
+def _torch_trilinear_interpolate(
+    values: torch.Tensor, frac: torch.Tensor, corners: torch.Tensor, voxel_size: torch.Tensor
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Trilinearly interpolate values at the eight corners of voxel cells.
+
+    Args:
+        values: Values at corners [..., 8], ordered as corners.
+        frac: Position of points in their cell in [0, 1) [..., 3].
+        corners: Offsets of corners from the lowest corner of a cell [8, 3].
+        voxel_size: Edge length of cells, broadcastable to [...].
+
+    Returns:
+        Tuple[torch.Tensor, torch.Tensor]: Interpolated value [...] and its gradient [..., 3].
+    """
+    w = torch.stack([1.0 - frac, frac], dim=-1)  # [..., 3, 2]
+    wx = w[..., 0, corners[:, 0]]
+    wy = w[..., 1, corners[:, 1]]
+    wz = w[..., 2, corners[:, 2]]
+    sign = corners.to(dtype=values.dtype) * 2.0 - 1.0
+    value = torch.sum(values * wx * wy * wz, dim=-1)
+    grad = (
+        torch.stack(
+            [
+                torch.sum(values * sign[:, 0] * wy * wz, dim=-1),
+                torch.sum(values * wx * sign[:, 1] * wz, dim=-1),
+                torch.sum(values * wx * wy * sign[:, 2], dim=-1),
+            ],
+            dim=-1,
+        )
+        / voxel_size
+    )
+    return value, grad
+
+
+def _torch_voxel_corners(device: torch.device) -> torch.Tensor:
+    """Offsets of the eight corners of a voxel cell [8, 3]."""
+    return torch.tensor(
+        [[i, j, k] for i in range(2) for j in range(2) for k in range(2)],
+        device=device,
+        dtype=torch.long,
+    )
+
+
+def voxel_esdf_torch(
+    points: torch.Tensor,
+    grid_features: torch.Tensor,
+    grid_params: torch.Tensor,
+    grid_pose: torch.Tensor,
+    grid_enable: torch.Tensor,
+    env_idx: torch.Tensor,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Interpolate signed distance of points from dense voxel grids.
+
+    Uses the voxel layout of ``geom_cu.closest_point_voxel``, with signed distance trilinearly
+    interpolated between the eight nearest voxel centers instead of read from the nearest voxel.
+    Voxel centers are the points of :meth:`~curobo.geom.types.VoxelGrid.create_xyzr_tensor`.
+
+    Args:
+        points: Positions in world frame [batch, n_points, 3].
+        grid_features: Signed distance of voxels [n_envs, n_layers, n_voxels, 1].
+        grid_params: Dimensions and voxel size of grids [n_envs, n_layers, 4].
+        grid_pose: Inverse pose of grids as [x, y, z, qw, qx, qy, qz, 0] [n_envs, n_layers, 8].
+        grid_enable: Enable flag of grids [n_envs, n_layers].
+        env_idx: Environment index of every batch [batch].
+
+    Returns:
+        Tuple[torch.Tensor, torch.Tensor]: Signed distance with positive values inside obstacles
+        [batch, n_points, n_layers] and its gradient in world frame [batch, n_points, n_layers, 3].
+        Points outside of grids, and points of disabled grids, return VOXEL_UNOBSERVED_DISTANCE
+        with zero gradient.
+    """
+    batch_size, n_points, _ = points.shape
+    n_envs, n_layers, n_voxels = grid_features.shape[:3]
+    device = points.device
+    esdf = torch.full((batch_size, n_points, n_layers), VOXEL_UNOBSERVED_DISTANCE, device=device)
+    grad = torch.zeros((batch_size, n_points, n_layers, 3), device=device)
+    features = grid_features.view(n_envs * n_layers * n_voxels)
+    corners = _torch_voxel_corners(device)
+    for layer_idx in range(n_layers):
+        enable = grid_enable[env_idx, layer_idx] != 0
+        if not torch.any(enable):
+            continue
+        pose = grid_pose[env_idx, layer_idx].float()
+        params = grid_params[env_idx, layer_idx].float()
+        rot = _torch_quaternion_to_matrix(pose[:, 3:7])
+        local = torch.einsum("bij,bnj->bni", rot, points) + pose[:, None, :3]
+        voxel_size = params[:, None, 3:4]
+        f_grid = params[:, None, :3] / voxel_size
+        # number of voxels along each axis, as in VoxelGrid.get_grid_shape:
+        nearest = torch.round(f_grid)
+        grid_shape = (
+            torch.where(torch.abs(f_grid - nearest) < 1e-4, nearest, torch.floor(f_grid)).long() + 1
+        )
+        u = local / voxel_size + torch.round(0.5 * f_grid) - 0.5
+        # points are in the grid when their nearest voxel is, as in the nearest voxel kernel:
+        nearest_voxel = torch.floor(u + 0.5)
+        inside = torch.all((nearest_voxel >= 0) & (nearest_voxel < grid_shape), dim=-1)
+        # points between the outermost voxel centers and the grid boundary read the boundary:
+        max_u = grid_shape - 1
+        clamped = (u < 0) | (u > max_u)
+        u = torch.minimum(torch.clamp(u, min=0.0), max_u)
+        u0 = torch.clamp(torch.minimum(torch.floor(u), max_u - 1), min=0.0)
+        frac = u - u0
+        voxel = torch.where(inside.unsqueeze(-1), u0.long(), 0).unsqueeze(-2) + corners
+        grid_shape = grid_shape.unsqueeze(-2)
+        voxel = torch.minimum(voxel, grid_shape - 1)
+        voxel_idx = (voxel[..., 0] * grid_shape[..., 1] + voxel[..., 1]) * grid_shape[
+            ..., 2
+        ] + voxel[..., 2]
+        layer_start = (env_idx * n_layers + layer_idx) * n_voxels
+        voxel_idx = layer_start.view(-1, 1, 1) + torch.clamp(voxel_idx, max=n_voxels - 1)
+        values = features[voxel_idx].float()
+        layer_esdf, layer_grad = _torch_trilinear_interpolate(values, frac, corners, voxel_size)
+        layer_grad = torch.where(clamped, 0.0, layer_grad)
+        layer_grad = torch.einsum("bji,bnj->bni", rot, layer_grad)
+        valid = inside & enable.view(-1, 1)
+        esdf[..., layer_idx] = torch.where(valid, layer_esdf, VOXEL_UNOBSERVED_DISTANCE)
+        grad[..., layer_idx, :] = torch.where(valid.unsqueeze(-1), layer_grad, 0.0)
+    return esdf, grad
+
+
+def sparse_voxel_esdf_torch(
+    points: torch.Tensor,
+    block_keys: torch.Tensor,
+    block_features: torch.Tensor,
+    layer_params: torch.Tensor,
+    layer_pose: torch.Tensor,
+    layer_enable: torch.Tensor,
+    env_idx: torch.Tensor,
+    block_size: int,
+    far_distance: float,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Interpolate signed distance of points from voxels stored in hashed blocks.
+
+    Voxels are stored in cubes of block_size^3 voxels. Blocks are looked up by a key packing the
+    layer and block coordinates, in a sorted table. Signed distance at a point is trilinearly
+    interpolated between the eight nearest voxel centers. Voxels of unallocated blocks read as
+    -far_distance.
+
+    Args:
+        points: Positions in world frame [batch, n_points, 3].
+        block_keys: Sorted keys of allocated blocks [n_blocks].
+        block_features: Signed distance of voxels in blocks [n_blocks, block_size^3].
+        layer_params: Offset of voxel grid origin from layer frame and voxel size
+            [n_envs, n_layers, 4]. Voxel v has its center at (v + 0.5) * voxel_size - offset.
+        layer_pose: Inverse pose of layers as [x, y, z, qw, qx, qy, qz, 0] [n_envs, n_layers, 8].
+        layer_enable: Enable flag of layers [n_envs, n_layers].
+        env_idx: Environment index of every batch [batch].
+        block_size: Number of voxels along each edge of a block.
+        far_distance: Distance of voxels in unallocated blocks from obstacles.
+
+    Returns:
+        Tuple[torch.Tensor, torch.Tensor]: Signed distance with positive values inside obstacles
+        [batch, n_points, n_layers] and its gradient in world frame [batch, n_points, n_layers, 3].
+        Disabled layers return -far_distance with zero gradient.
+    """
+    batch_size, n_points, _ = points.shape
+    n_layers = layer_params.shape[1]
+    device = points.device
+    esdf = torch.full((batch_size, n_points, n_layers), -far_distance, device=device)
+    grad = torch.zeros((batch_size, n_points, n_layers, 3), device=device)
+    if block_keys.shape[0] == 0:
+        return esdf, grad
+    corners = _torch_voxel_corners(device)
+    for layer_idx in range(n_layers):
+        enable = layer_enable[env_idx, layer_idx] != 0
+        if not torch.any(enable):
+            continue
+        pose = layer_pose[env_idx, layer_idx].float()
+        params = layer_params[env_idx, layer_idx].float()
+        rot = _torch_quaternion_to_matrix(pose[:, 3:7])
+        local = torch.einsum("bij,bnj->bni", rot, points) + pose[:, None, :3]
+        voxel_size = params[:, None, 3:4]
+        u = (local + params[:, None, :3]) / voxel_size - 0.5
+        u0 = torch.floor(u)
+        frac = u - u0
+        voxel = u0.long().unsqueeze(-2) + corners
+        slot = (env_idx * n_layers + layer_idx).view(-1, 1, 1)
+        keys = _torch_sparse_voxel_block_keys(
+            torch.div(voxel, block_size, rounding_mode="floor"), slot
+        )
+        block_idx = torch.clamp(torch.searchsorted(block_keys, keys), max=block_keys.shape[0] - 1)
+        found = block_keys[block_idx] == keys
+        local_voxel = torch.remainder(voxel, block_size)
+        local_idx = (
+            local_voxel[..., 0] * block_size + local_voxel[..., 1]
+        ) * block_size + local_voxel[..., 2]
+        values = block_features[block_idx, local_idx].float()
+        values = torch.where(found, values, -far_distance)
+
+        layer_esdf, layer_grad = _torch_trilinear_interpolate(values, frac, corners, voxel_size)
+        layer_grad = torch.einsum("bji,bnj->bni", rot, layer_grad)
+        esdf[..., layer_idx] = torch.where(enable.view(-1, 1), layer_esdf, -far_distance)
+        grad[..., layer_idx, :] = torch.where(enable.view(-1, 1, 1), layer_grad, 0.0)
+    return esdf, grad
+
+
+def _torch_sparse_voxel_cost(
+    esdf: torch.Tensor,
+    esdf_grad: torch.Tensor,
+    radius: torch.Tensor,
+    eta: torch.Tensor,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Collision cost of spheres summed over layers, from signed distance of sphere centers."""
+    sphere_distance = esdf + radius.unsqueeze(-1)
+    cost, grad = _torch_scale_eta_metric(esdf_grad, sphere_distance, eta)
+    return torch.sum(cost, dim=-1), torch.sum(grad, dim=-2)
+
+
+def _torch_get_env_idx(
+    env_query_idx: torch.Tensor, batch_size: int, use_batch_env: bool, device: torch.device
+) -> torch.Tensor:
+    """Environment index of every batch of query spheres, all zero when use_batch_env is False."""
+    if use_batch_env:
+        return env_query_idx.view(-1)[:batch_size].to(dtype=torch.long)
+    return torch.zeros(batch_size, dtype=torch.long, device=device)
+
+
+def _torch_sphere_esdf_clpt(
+    query_sphere: torch.Tensor,
+    out_buffer: torch.Tensor,
+    grad_out_buffer: torch.Tensor,
+    sparsity_idx: torch.Tensor,
+    weight: torch.Tensor,
+    activation_distance: torch.Tensor,
+    max_distance: torch.Tensor,
+    esdf_fn: Callable[[torch.Tensor], Tuple[torch.Tensor, torch.Tensor]],
+    batch_size: int,
+    horizon: int,
+    n_spheres: int,
+    transform_back: bool,
+    compute_distance: bool,
+    compute_esdf: bool,
+) -> List[torch.Tensor]:
+    """Compute collision between spheres and layers of signed distance in PyTorch.
+
+    Follows the cost of ``geom_cu.closest_point_voxel``. esdf_fn maps sphere centers
+    [batch, n_points, 3] to signed distance [batch, n_points, n_layers] and its gradient
+    [batch, n_points, n_layers, 3]. Costs of all layers are summed.
+    """
+    spheres = query_sphere.detach().view(batch_size, horizon * n_spheres, 4).float()
+    esdf, esdf_grad = esdf_fn(spheres[..., :3])
+    valid_sphere = spheres[..., 3] >= 0.0
+    weight = weight.view(()).float()
+    eta = activation_distance.view(()).float()
+
+    if not compute_distance:
+        collision = torch.any(esdf + (spheres[..., 3] + eta).unsqueeze(-1) > 0.0, dim=-1)
+        out_distance = torch.where(valid_sphere & collision, weight, 0.0)
+        out_buffer.view(valid_sphere.shape).copy_(out_distance)
+        return [out_buffer, grad_out_buffer, sparsity_idx]
+
+    if compute_esdf:
+        # follows sphere_voxel_esdf_fn, with max_distance as the lowest sphere distance:
+        eta = max_distance.view(()).float()
+        sphere_distance, max_layer = torch.max(esdf + spheres[..., 3:4], dim=-1)
+        update = sphere_distance > -eta
+        sphere_distance = torch.where(update, sphere_distance, -eta)
+        out_distance = torch.where(valid_sphere, sphere_distance - spheres[..., 3], 0.0)
+        out_buffer.view(valid_sphere.shape).copy_(out_distance)
+        if transform_back:
+            grad = torch.gather(
+                esdf_grad, 2, max_layer.view(batch_size, -1, 1, 1).expand(-1, -1, 1, 3)
+            ).squeeze(2)
+            grad = torch.where((valid_sphere & update).unsqueeze(-1), grad, 0.0)
+            grad_out_buffer.view(valid_sphere.shape + (4,))[..., :3].copy_(grad)
+        return [out_buffer, grad_out_buffer, sparsity_idx]
+
+    cost, grad = _torch_sparse_voxel_cost(esdf, esdf_grad, spheres[..., 3] + eta, eta)
+    _torch_write_sphere_distance(
+        out_buffer,
+        grad_out_buffer,
+        sparsity_idx,
+        valid_sphere,
+        cost,
+        grad,
+        weight,
+        transform_back,
+    )
+    return [out_buffer, grad_out_buffer, sparsity_idx]
+
+
+def _torch_swept_sphere_esdf_clpt(
+    query_sphere: torch.Tensor,
+    out_buffer: torch.Tensor,
+    grad_out_buffer: torch.Tensor,
+    sparsity_idx: torch.Tensor,
+    weight: torch.Tensor,
+    activation_distance: torch.Tensor,
+    speed_dt: torch.Tensor,
+    esdf_fn: Callable[[torch.Tensor], Tuple[torch.Tensor, torch.Tensor]],
+    batch_size: int,
+    horizon: int,
+    n_spheres: int,
+    sweep_steps: int,
+    enable_speed_metric: bool,
+    transform_back: bool,
+    compute_distance: bool,
+) -> List[torch.Tensor]:
+    """Compute collision between swept spheres and layers of signed distance in PyTorch.
+
+    Spheres are swept towards the previous and next timestep by evaluating the cost at
+    sweep_steps evenly spaced points along each segment, summing costs of all points. esdf_fn is
+    as in :func:`_torch_sphere_esdf_clpt`.
+    """
+    spheres = query_sphere.detach().view(batch_size, horizon, n_spheres, 4).float()
+    eta = activation_distance.view(()).float()
+    weight = weight.view(()).float()
+    valid_sphere = spheres[..., 3] >= 0.0
+    radius = spheres[..., 3] + eta
+    sphere_1 = spheres[..., :3]
+    sphere_0 = torch.cat([sphere_1[:, :1], sphere_1[:, :-1]], dim=1)
+    sphere_2 = torch.cat([sphere_1[:, 1:], sphere_1[:, -1:]], dim=1)
+    time_idx = torch.arange(horizon, device=spheres.device).view(1, -1, 1)
+
+    positions = [sphere_1]
+    valid_times = [torch.ones_like(valid_sphere)]
+    n_steps = 2 * sweep_steps + 1
+    for j in range(sweep_steps):
+        k0 = (j + 1) / n_steps
+        positions += [k0 * sphere_1 + (1 - k0) * sphere_0, k0 * sphere_1 + (1 - k0) * sphere_2]
+        valid_times += [
+            (time_idx > 0).expand_as(valid_sphere),
+            (time_idx < horizon - 1).expand_as(valid_sphere),
+        ]
+    n_samples = len(positions)
+    sample_points = torch.stack(positions, dim=0).view(n_samples, batch_size, -1, 3)
+    sample_points = sample_points.transpose(0, 1).reshape(batch_size, -1, 3)
+    esdf, esdf_grad = esdf_fn(sample_points)
+    sample_shape = (batch_size, n_samples, horizon, n_spheres)
+    esdf = esdf.view(sample_shape + (-1,))
+    esdf_grad = esdf_grad.view(sample_shape + (-1, 3))
+    valid_time = torch.stack(valid_times, dim=1)
+
+    if not compute_distance:
+        collision = torch.any(
+            esdf + radius.view(batch_size, 1, horizon, n_spheres, 1) > 0.0, dim=-1
+        )
+        collision = torch.any(collision & valid_time, dim=1)
+        out_distance = torch.where(valid_sphere & collision, weight, 0.0)
+        out_buffer.view(valid_sphere.shape).copy_(out_distance)
+        return [out_buffer, grad_out_buffer, sparsity_idx]
+
+    cost, grad = _torch_sparse_voxel_cost(
+        esdf, esdf_grad, radius.unsqueeze(1).expand_as(valid_time), eta
+    )
+    cost = torch.sum(torch.where(valid_time, cost, 0.0), dim=1)
+    grad = torch.sum(torch.where(valid_time.unsqueeze(-1), grad, 0.0), dim=1)
+    if enable_speed_metric:
+        scale = (time_idx > 0) & (time_idx < horizon - 1) & (cost != 0.0)
+        speed_cost, speed_grad = _torch_scale_speed_metric(
+            sphere_0, sphere_1, sphere_2, speed_dt.view(()).float(), transform_back, cost, grad
+        )
+        cost = torch.where(scale, speed_cost, cost)
+        grad = torch.where(scale.unsqueeze(-1), speed_grad, grad)
+    _torch_write_sphere_distance(
+        out_buffer,
+        grad_out_buffer,
+        sparsity_idx,
+        valid_sphere,
+        cost,
+        grad,
+        weight,
+        transform_back,
+    )
+    return [out_buffer, grad_out_buffer, sparsity_idx]
+
+
+def sphere_voxel_clpt_torch(
+    query_sphere: torch.Tensor,
+    out_buffer: torch.Tensor,
+    grad_out_buffer: torch.Tensor,
+    sparsity_idx: torch.Tensor,
+    weight: torch.Tensor,
+    activation_distance: torch.Tensor,
+    max_distance: torch.Tensor,
+    grid_features: torch.Tensor,
+    grid_params: torch.Tensor,
+    grid_pose: torch.Tensor,
+    grid_enable: torch.Tensor,
+    env_query_idx: torch.Tensor,
+    batch_size: int,
+    horizon: int,
+    n_spheres: int,
+    transform_back: bool,
+    compute_distance: bool,
+    use_batch_env: bool,
+    compute_esdf: bool = False,
+) -> List[torch.Tensor]:
+    """Compute collision between spheres and dense voxel grids in PyTorch.
+
+    Takes the voxel tensors of ``geom_cu.closest_point_voxel``, with signed distance of sphere
+    centers trilinearly interpolated by :func:`voxel_esdf_torch`. Costs of all grids are summed.
+
+    Returns:
+        List[torch.Tensor]: Distance, gradient, and sparsity buffers.
+    """
+    env_idx = _torch_get_env_idx(env_query_idx, batch_size, use_batch_env, query_sphere.device)
+    return _torch_sphere_esdf_clpt(
+        query_sphere,
+        out_buffer,
+        grad_out_buffer,
+        sparsity_idx,
+        weight,
+        activation_distance,
+        max_distance,
+        lambda points: voxel_esdf_torch(
+            points, grid_features, grid_params, grid_pose, grid_enable, env_idx
+        ),
+        batch_size,
+        horizon,
+        n_spheres,
+        transform_back,
+        compute_distance,
+        compute_esdf,
+    )
+
+
+def swept_sphere_voxel_clpt_torch(
+    query_sphere: torch.Tensor,
+    out_buffer: torch.Tensor,
+    grad_out_buffer: torch.Tensor,
+    sparsity_idx: torch.Tensor,
+    weight: torch.Tensor,
+    activation_distance: torch.Tensor,
+    speed_dt: torch.Tensor,
+    grid_features: torch.Tensor,
+    grid_params: torch.Tensor,
+    grid_pose: torch.Tensor,
+    grid_enable: torch.Tensor,
+    env_query_idx: torch.Tensor,
+    batch_size: int,
+    horizon: int,
+    n_spheres: int,
+    sweep_steps: int,
+    enable_speed_metric: bool,
+    transform_back: bool,
+    compute_distance: bool,
+    use_batch_env: bool,
+) -> List[torch.Tensor]:
+    """Compute collision between swept spheres and dense voxel grids in PyTorch.
+
+    Spheres are swept as in :func:`_torch_swept_sphere_esdf_clpt`, with signed distance
+    trilinearly interpolated by :func:`voxel_esdf_torch`.
+
+    Returns:
+        List[torch.Tensor]: Distance, gradient, and sparsity buffers.
+    """
+    env_idx = _torch_get_env_idx(env_query_idx, batch_size, use_batch_env, query_sphere.device)
+    return _torch_swept_sphere_esdf_clpt(
+        query_sphere,
+        out_buffer,
+        grad_out_buffer,
+        sparsity_idx,
+        weight,
+        activation_distance,
+        speed_dt,
+        lambda points: voxel_esdf_torch(
+            points, grid_features, grid_params, grid_pose, grid_enable, env_idx
+        ),
+        batch_size,
+        horizon,
+        n_spheres,
+        sweep_steps,
+        enable_speed_metric,
+        transform_back,
+        compute_distance,
+    )
+
+
+def _torch_point_cloud_cell_keys(
+    points: torch.Tensor, env_idx: torch.Tensor, cell_size: float
+) -> torch.Tensor:
+    """Hash keys [...] of cells containing points [..., 3] in environments env_idx [...].
+
+    Keys are packed as in :func:`_torch_sparse_voxel_block_keys`, with the environment index in
+    place of the layer slot. Points outside the 16 bit range of cells get key -1.
+    """
+    cell_xyz = torch.floor(points / cell_size).to(dtype=torch.long)
+    return _torch_sparse_voxel_block_keys(cell_xyz, env_idx)
+
+
+def point_cloud_esdf_torch(
+    points: torch.Tensor,
+    point_keys: torch.Tensor,
+    hashed_points: torch.Tensor,
+    point_slots: torch.Tensor,
+    cloud_enable: torch.Tensor,
+    env_idx: torch.Tensor,
+    cell_size: float,
+    far_distance: float,
+    point_radius: float,
+    max_cell_points: int,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Compute signed distance of positions from the nearest stored point of a point cloud.
+
+    Stored points are sorted by the hash key of their cell. Positions search the cells within
+    far_distance of their cell, reading at most max_cell_points points per cell, so distance is
+    exact up to far_distance.
+
+    Args:
+        points: Positions in world frame [batch, n_points, 3].
+        point_keys: Sorted cell keys of stored points [n_stored], see
+            :func:`_torch_point_cloud_cell_keys`.
+        hashed_points: Stored points in world frame [n_stored, 3].
+        point_slots: Index of the point cloud of each stored point in its environment [n_stored].
+        cloud_enable: Enable flag of point clouds [n_envs, n_clouds].
+        env_idx: Environment index of every batch [batch].
+        cell_size: Edge length of hash cells.
+        far_distance: Distance beyond which points are not searched.
+        point_radius: Radius of stored points.
+        max_cell_points: Largest number of points stored in a cell.
+
+    Returns:
+        Tuple[torch.Tensor, torch.Tensor]: Signed distance with positive values inside points
+        [batch, n_points, 1] and its gradient [batch, n_points, 1, 3]. Positions farther than
+        far_distance from all points read point_radius - far_distance with zero gradient.
+    """
+    batch_size, n_points, _ = points.shape
+    device = points.device
+    esdf = torch.full((batch_size, n_points, 1), point_radius - far_distance, device=device)
+    grad = torch.zeros((batch_size, n_points, 1, 3), device=device)
+    if point_keys.shape[0] == 0 or max_cell_points == 0:
+        return esdf, grad
+    n_rings = math.ceil(far_distance / cell_size)
+    ring = torch.arange(-n_rings, n_rings + 1, device=device)
+    offsets = torch.cartesian_prod(ring, ring, ring)
+    cell_xyz = torch.floor(points / cell_size).to(dtype=torch.long)
+    env = env_idx.view(-1, 1, 1)
+    keys = _torch_sparse_voxel_block_keys(cell_xyz.unsqueeze(-2) + offsets, env)
+    start = torch.searchsorted(point_keys, keys)
+    count = torch.searchsorted(point_keys, keys, right=True) - start
+
+    best_sq = torch.full((batch_size, n_points), float("inf"), device=device)
+    best_point = torch.zeros((batch_size, n_points, 3), device=device)
+    for j in range(max_cell_points):
+        point_idx = torch.clamp(start + j, max=point_keys.shape[0] - 1)
+        valid = (j < count) & (cloud_enable[env, point_slots[point_idx]] != 0)
+        candidate = hashed_points[point_idx].float()
+        d_sq = torch.sum(torch.square(candidate - points.unsqueeze(-2)), dim=-1)
+        d_sq = torch.where(valid, d_sq, float("inf"))
+        d_sq, cell_idx = torch.min(d_sq, dim=-1)
+        update = d_sq < best_sq
+        best_sq = torch.where(update, d_sq, best_sq)
+        candidate = torch.gather(
+            candidate, 2, cell_idx.view(batch_size, n_points, 1, 1).expand(-1, -1, 1, 3)
+        ).squeeze(2)
+        best_point = torch.where(update.unsqueeze(-1), candidate, best_point)
+
+    distance = torch.sqrt(best_sq)
+    near = distance < far_distance
+    esdf[..., 0] = torch.where(near, point_radius - distance, point_radius - far_distance)
+    # signed distance increases towards the nearest point:
+    delta = best_point - points
+    delta = delta / torch.clamp(distance, min=1e-10).unsqueeze(-1)
+    grad[..., 0, :] = torch.where((near & (distance > 0.0)).unsqueeze(-1), delta, 0.0)
+    return esdf, grad
+
+
+class SdfSphereOBB(torch.autograd.Function):
+    @staticmethod
+    def forward(
+        ctx,
+        query_sphere,
+        out_buffer,
+        grad_out_buffer,
+        sparsity_idx,
+        weight,
+        activation_distance,
+        max_distance,
+        box_accel,
+        box_dims,
+        box_pose,
+        box_enable,
+        n_env_obb,
+        env_query_idx,
+        max_nobs,
+        batch_size,
+        horizon,
+        n_spheres,
+        transform_back,
+        compute_distance,
+        use_batch_env,
+        return_loss: bool = False,
+        sum_collisions: bool = True,
+        compute_esdf: bool = False,
+        use_torch_backend: bool = False,
+    ):
+        if use_torch_backend or geom_cu is None or not query_sphere.is_cuda:
+            closest_point = sphere_obb_clpt_torch
+        else:
+            closest_point = geom_cu.closest_point
+        r = closest_point(
+            query_sphere,
+            out_buffer,
+            grad_out_buffer,
+            sparsity_idx,
+            weight,
+            activation_distance,
+            max_distance,
+            box_accel,
+            box_dims,
+            box_pose,
+            box_enable,
+            n_env_obb,
+            env_query_idx,
+            max_nobs,
+            batch_size,
+            horizon,
+            n_spheres,
+            transform_back,
+            compute_distance,
+            use_batch_env,
+            sum_collisions,
+            compute_esdf,
+        )
+        # r[1][r[1]!=r[1]] = 0.0
+        ctx.compute_esdf = compute_esdf
+        ctx.return_loss = return_loss
+        ctx.save_for_backward(r[1])
+        return r[0]
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        grad_pt = None
+        if ctx.needs_input_grad[0]:
+            # if ctx.compute_esdf:
+            #    raise NotImplementedError("Gradients not implemented for compute_esdf=True")
+            (r,) = ctx.saved_tensors
+            if ctx.return_loss:
+                r = r * grad_output.unsqueeze(-1)
+            grad_pt = r
+        return (
+            grad_pt,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+        )
+
+
+class SdfSweptSphereOBB(torch.autograd.Function):
+    @staticmethod
+    def forward(
+        ctx,
+        query_sphere,
+        out_buffer,
+        grad_out_buffer,
+        sparsity_idx,
+        weight,
+        activation_distance,
+        speed_dt,
+        box_accel,
+        box_dims,
+        box_pose,
+        box_enable,
+        n_env_obb,
+        env_query_idx,
+        max_nobs,
+        batch_size,
+        horizon,
+        n_spheres,
+        sweep_steps,
+        enable_speed_metric,
+        transform_back,
+        compute_distance,
+        use_batch_env,
+        return_loss: bool = False,
+        sum_collisions: bool = True,
+        use_torch_backend: bool = False,
+    ):
+        if use_torch_backend or geom_cu is None or not query_sphere.is_cuda:
+            swept_closest_point = swept_sphere_obb_clpt_torch
+        else:
+            swept_closest_point = geom_cu.swept_closest_point
+        r = swept_closest_point(
+            query_sphere,
+            out_buffer,
+            grad_out_buffer,
+            sparsity_idx,
+            weight,
+            activation_distance,
             speed_dt,
             box_accel,
             box_dims,
@@ -699,21 +2408,108 @@ class SdfSweptSphereOBB(torch.autograd.Function):
             box_enable,
             n_env_obb,
             env_query_idx,
-            max_nobs,
+            max_nobs,
+            batch_size,
+            horizon,
+            n_spheres,
+            sweep_steps,
+            enable_speed_metric,
+            transform_back,
+            compute_distance,
+            use_batch_env,
+            sum_collisions,
+        )
+        ctx.return_loss = return_loss
+        ctx.save_for_backward(
+            r[1],
+        )
+        return r[0]
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        grad_pt = None
+        if ctx.needs_input_grad[0]:
+            (r,) = ctx.saved_tensors
+            if ctx.return_loss:
+                r = r * grad_output.unsqueeze(-1)
+            grad_pt = r
+        return (
+            grad_pt,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+        )
+
+
+class SdfSphereCapsule(torch.autograd.Function):
+    @staticmethod
+    def forward(
+        ctx,
+        query_sphere,
+        out_buffer,
+        grad_out_buffer,
+        sparsity_idx,
+        weight,
+        activation_distance,
+        max_distance,
+        capsule_params,
+        capsule_pose,
+        capsule_enable,
+        n_env_capsule,
+        env_query_idx,
+        batch_size,
+        horizon,
+        n_spheres,
+        transform_back,
+        compute_distance,
+        use_batch_env,
+        return_loss: bool = False,
+        compute_esdf: bool = False,
+    ):
+        r = sphere_capsule_clpt_torch(
+            query_sphere,
+            out_buffer,
+            grad_out_buffer,
+            sparsity_idx,
+            weight,
+            activation_distance,
+            max_distance,
+            capsule_params,
+            capsule_pose,
+            capsule_enable,
+            n_env_capsule,
+            env_query_idx,
             batch_size,
             horizon,
             n_spheres,
-            sweep_steps,
-            enable_speed_metric,
             transform_back,
             compute_distance,
             use_batch_env,
-            sum_collisions,
+            compute_esdf,
         )
         ctx.return_loss = return_loss
-        ctx.save_for_backward(
-            r[1],
-        )
+        ctx.save_for_backward(r[1])
         return r[0]
 
     @staticmethod
@@ -745,14 +2541,10 @@ class SdfSweptSphereOBB(torch.autograd.Function):
             None,
             None,
             None,
-            None,
-            None,
-            None,
-            None,
         )
 
 
-class SdfSphereVoxel(torch.autograd.Function):
+class SdfSweptSphereCapsule(torch.autograd.Function):
     @staticmethod
     def forward(
         ctx,
@@ -762,49 +2554,157 @@ class SdfSphereVoxel(torch.autograd.Function):
         sparsity_idx,
         weight,
         activation_distance,
-        max_distance,
-        grid_features,
-        grid_params,
-        grid_pose,
-        grid_enable,
-        n_env_grid,
+        speed_dt,
+        capsule_params,
+        capsule_pose,
+        capsule_enable,
+        n_env_capsule,
         env_query_idx,
-        max_nobs,
         batch_size,
         horizon,
         n_spheres,
+        sweep_steps,
+        enable_speed_metric,
         transform_back,
         compute_distance,
         use_batch_env,
         return_loss: bool = False,
-        sum_collisions: bool = True,
-        compute_esdf: bool = False,
     ):
-
-        r = geom_cu.closest_point_voxel(
+        r = swept_sphere_capsule_clpt_torch(
             query_sphere,
             out_buffer,
             grad_out_buffer,
             sparsity_idx,
             weight,
             activation_distance,
-            max_distance,
-            grid_features,
-            grid_params,
-            grid_pose,
-            grid_enable,
-            n_env_grid,
+            speed_dt,
+            capsule_params,
+            capsule_pose,
+            capsule_enable,
+            n_env_capsule,
             env_query_idx,
-            max_nobs,
             batch_size,
             horizon,
             n_spheres,
+            sweep_steps,
+            enable_speed_metric,
             transform_back,
             compute_distance,
             use_batch_env,
-            sum_collisions,
-            compute_esdf,
         )
+        ctx.return_loss = return_loss
+        ctx.save_for_backward(r[1])
+        return r[0]
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        grad_pt = None
+        if ctx.needs_input_grad[0]:
+            (r,) = ctx.saved_tensors
+            if ctx.return_loss:
+                r = r * grad_output.unsqueeze(-1)
+            grad_pt = r
+        return (
+            grad_pt,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+        )
+
+
+class SdfSphereVoxel(torch.autograd.Function):
+    @staticmethod
+    def forward(
+        ctx,
+        query_sphere,
+        out_buffer,
+        grad_out_buffer,
+        sparsity_idx,
+        weight,
+        activation_distance,
+        max_distance,
+        grid_features,
+        grid_params,
+        grid_pose,
+        grid_enable,
+        n_env_grid,
+        env_query_idx,
+        max_nobs,
+        batch_size,
+        horizon,
+        n_spheres,
+        transform_back,
+        compute_distance,
+        use_batch_env,
+        return_loss: bool = False,
+        sum_collisions: bool = True,
+        compute_esdf: bool = False,
+        interpolate: bool = False,
+    ):
+        if interpolate:
+            r = sphere_voxel_clpt_torch(
+                query_sphere,
+                out_buffer,
+                grad_out_buffer,
+                sparsity_idx,
+                weight,
+                activation_distance,
+                max_distance,
+                grid_features,
+                grid_params,
+                grid_pose,
+                grid_enable,
+                env_query_idx,
+                batch_size,
+                horizon,
+                n_spheres,
+                transform_back,
+                compute_distance,
+                use_batch_env,
+                compute_esdf,
+            )
+        else:
+            r = geom_cu.closest_point_voxel(
+                query_sphere,
+                out_buffer,
+                grad_out_buffer,
+                sparsity_idx,
+                weight,
+                activation_distance,
+                max_distance,
+                grid_features,
+                grid_params,
+                grid_pose,
+                grid_enable,
+                n_env_grid,
+                env_query_idx,
+                max_nobs,
+                batch_size,
+                horizon,
+                n_spheres,
+                transform_back,
+                compute_distance,
+                use_batch_env,
+                sum_collisions,
+                compute_esdf,
+            )
         ctx.compute_esdf = compute_esdf
         ctx.return_loss = return_loss
         ctx.save_for_backward(r[1])
@@ -844,6 +2744,7 @@ class SdfSphereVoxel(torch.autograd.Function):
             None,
             None,
             None,
+            None,
         )
 
 
@@ -876,8 +2777,134 @@ class SdfSweptSphereVoxel(torch.autograd.Function):
         use_batch_env,
         return_loss: bool = False,
         sum_collisions: bool = True,
+        interpolate: bool = False,
+    ):
+        if interpolate:
+            r = swept_sphere_voxel_clpt_torch(
+                query_sphere,
+                out_buffer,
+                grad_out_buffer,
+                sparsity_idx,
+                weight,
+                activation_distance,
+                speed_dt,
+                grid_features,
+                grid_params,
+                grid_pose,
+                grid_enable,
+                env_query_idx,
+                batch_size,
+                horizon,
+                n_spheres,
+                sweep_steps,
+                enable_speed_metric,
+                transform_back,
+                compute_distance,
+                use_batch_env,
+            )
+        else:
+            r = geom_cu.swept_closest_point_voxel(
+                query_sphere,
+                out_buffer,
+                grad_out_buffer,
+                sparsity_idx,
+                weight,
+                activation_distance,
+                max_distance,
+                speed_dt,
+                grid_features,
+                grid_params,
+                grid_pose,
+                grid_enable,
+                n_env_grid,
+                env_query_idx,
+                max_nobs,
+                batch_size,
+                horizon,
+                n_spheres,
+                sweep_steps,
+                enable_speed_metric,
+                transform_back,
+                compute_distance,
+                use_batch_env,
+                sum_collisions,
+            )
+
+        ctx.return_loss = return_loss
+        ctx.save_for_backward(
+            r[1],
+        )
+        return r[0]
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        grad_pt = None
+        if ctx.needs_input_grad[0]:
+            (r,) = ctx.saved_tensors
+            if ctx.return_loss:
+                r = r * grad_output.unsqueeze(-1)
+            grad_pt = r
+        return (
+            grad_pt,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+        )
+
+
+class SdfSphereEsdf(torch.autograd.Function):
+    """Collision between spheres and obstacles given by a signed distance lookup, in PyTorch.
+
+    esdf_fn maps positions [batch, n_points, 3] and the environment index of every batch [batch]
+    to signed distance and its gradient, as :func:`sparse_voxel_esdf_torch` and
+    :func:`point_cloud_esdf_torch`.
+    """
+
+    @staticmethod
+    def forward(
+        ctx,
+        query_sphere,
+        out_buffer,
+        grad_out_buffer,
+        sparsity_idx,
+        weight,
+        activation_distance,
+        max_distance,
+        esdf_fn,
+        env_query_idx,
+        batch_size,
+        horizon,
+        n_spheres,
+        transform_back,
+        compute_distance,
+        use_batch_env,
+        return_loss: bool = False,
+        compute_esdf: bool = False,
     ):
-        r = geom_cu.swept_closest_point_voxel(
+        env_idx = _torch_get_env_idx(env_query_idx, batch_size, use_batch_env, query_sphere.device)
+        r = _torch_sphere_esdf_clpt(
             query_sphere,
             out_buffer,
             grad_out_buffer,
@@ -885,29 +2912,16 @@ class SdfSweptSphereVoxel(torch.autograd.Function):
             weight,
             activation_distance,
             max_distance,
-            speed_dt,
-            grid_features,
-            grid_params,
-            grid_pose,
-            grid_enable,
-            n_env_grid,
-            env_query_idx,
-            max_nobs,
+            lambda points: esdf_fn(points, env_idx),
             batch_size,
             horizon,
             n_spheres,
-            sweep_steps,
-            enable_speed_metric,
             transform_back,
             compute_distance,
-            use_batch_env,
-            sum_collisions,
+            compute_esdf,
         )
-
         ctx.return_loss = return_loss
-        ctx.save_for_backward(
-            r[1],
-        )
+        ctx.save_for_backward(r[1])
         return r[0]
 
     @staticmethod
@@ -936,6 +2950,78 @@ class SdfSweptSphereVoxel(torch.autograd.Function):
             None,
             None,
             None,
+        )
+
+
+class SdfSweptSphereEsdf(torch.autograd.Function):
+    """Collision between swept spheres and obstacles given by a signed distance lookup.
+
+    esdf_fn is as in :class:`SdfSphereEsdf`.
+    """
+
+    @staticmethod
+    def forward(
+        ctx,
+        query_sphere,
+        out_buffer,
+        grad_out_buffer,
+        sparsity_idx,
+        weight,
+        activation_distance,
+        speed_dt,
+        esdf_fn,
+        env_query_idx,
+        batch_size,
+        horizon,
+        n_spheres,
+        sweep_steps,
+        enable_speed_metric,
+        transform_back,
+        compute_distance,
+        use_batch_env,
+        return_loss: bool = False,
+    ):
+        env_idx = _torch_get_env_idx(env_query_idx, batch_size, use_batch_env, query_sphere.device)
+        r = _torch_swept_sphere_esdf_clpt(
+            query_sphere,
+            out_buffer,
+            grad_out_buffer,
+            sparsity_idx,
+            weight,
+            activation_distance,
+            speed_dt,
+            lambda points: esdf_fn(points, env_idx),
+            batch_size,
+            horizon,
+            n_spheres,
+            sweep_steps,
+            enable_speed_metric,
+            transform_back,
+            compute_distance,
+        )
+        ctx.return_loss = return_loss
+        ctx.save_for_backward(r[1])
+        return r[0]
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        grad_pt = None
+        if ctx.needs_input_grad[0]:
+            (r,) = ctx.saved_tensors
+            if ctx.return_loss:
+                r = r * grad_output.unsqueeze(-1)
+            grad_pt = r
+        return (
+            grad_pt,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
             None,
             None,
             None,
@@ -8,36 +8,54 @@
 # without an express license agreement from NVIDIA CORPORATION or
 # its affiliates is strictly prohibited.
 #
+# Standard Library
+from typing import List, Tuple
+
 # Third Party
 import torch
 from torch.autograd import Function
 
 # CuRobo
-from curobo.util.logger import log_warn
+from curobo.util.logger import log_info, log_warn
 
 try:
     # CuRobo
     from curobo.curobolib import kinematics_fused_cu
 except ImportError:
-    log_warn("kinematics_fused_cu not found, JIT compiling...")
-    # Third Party
-    from torch.utils.cpp_extension import load
+    kinematics_fused_cu = None
+    if torch.cuda.is_available():
+        log_warn("kinematics_fused_cu not found, JIT compiling...")
+        try:
+            # Third Party
+            from torch.utils.cpp_extension import load
 
-    # CuRobo
-    from curobo.util_file import add_cpp_path
-
-    kinematics_fused_cu = load(
-        name="kinematics_fused_cu",
-        sources=add_cpp_path(
-            [
-                "kinematics_fused_cuda.cpp",
-                "kinematics_fused_kernel.cu",
-            ]
-        ),
-    )
+            # CuRobo
+            from curobo.util_file import add_cpp_path
+
+            kinematics_fused_cu = load(
+                name="kinematics_fused_cu",
+                sources=add_cpp_path(
+                    [
+                        "kinematics_fused_cuda.cpp",
+                        "kinematics_fused_kernel.cu",
+                    ]
+                ),
+            )
+        except Exception as e:
+            log_warn("kinematics_fused_cu failed to compile, using pytorch kinematics: " + str(e))
+    else:
+        log_info("CUDA not available, using pytorch kinematics")
+
+
+def is_kinematics_fused_cu_available() -> bool:
+    """Check if the CUDA kinematics extension was loaded."""
+    return kinematics_fused_cu is not None
 
 
 def rotation_matrix_to_quaternion(in_mat, out_quat):
+    if kinematics_fused_cu is None or not in_mat.is_cuda:
+        out_quat.view(-1, 4).copy_(_torch_matrix_to_quaternion(in_mat.reshape(-1, 3, 3)))
+        return out_quat
     r = kinematics_fused_cu.matrix_to_quaternion(out_quat, in_mat.reshape(-1, 9))
     return r[0]
 
@@ -227,6 +245,395 @@ class KinematicsFusedFunction(Function):
         return out_q
 
 
+class KinematicsFusedTorchFunction(Function):
+    """Pure PyTorch implementation of :class:`KinematicsFusedFunction`.
+
+    Takes the same buffers as the CUDA kernel and writes results into them. Links are evaluated
+    depth by depth, so all links at the same depth of the kinematic tree and all batch entries are
+    computed with a single batched matrix multiplication. The backward pass follows the CUDA
+    kernel and maps gradients on link positions, link orientations (xyz components of the
+    quaternion gradient are treated as an angular gradient) and sphere positions to joint space
+    with the geometric jacobian.
+    """
+
+    @staticmethod
+    def forward(
+        ctx,
+        link_pos: torch.Tensor,
+        link_quat: torch.Tensor,
+        b_robot_spheres: torch.tensor,
+        global_cumul_mat: torch.Tensor,
+        joint_seq: torch.Tensor,
+        fixed_transform: torch.tensor,
+        robot_spheres: torch.tensor,
+        link_map: torch.tensor,
+        joint_map: torch.Tensor,
+        joint_map_type: torch.Tensor,
+        store_link_map: torch.Tensor,
+        link_sphere_map: torch.Tensor,
+        link_chain_map: torch.Tensor,
+        joint_offset_map: torch.Tensor,
+        grad_out: torch.Tensor,
+        use_global_cumul: bool = True,
+    ):
+        cumul_mat = torch_forward_cumul_transforms(
+            joint_seq.detach(),
+            fixed_transform,
+            link_map,
+            joint_map,
+            joint_map_type,
+            joint_offset_map,
+        )
+        if use_global_cumul:
+            global_cumul_mat.view(cumul_mat.shape).copy_(cumul_mat)
+        store_mat = cumul_mat[:, store_link_map.to(dtype=torch.long)]
+        link_pos.copy_(store_mat[..., :3, 3])
+        link_quat.copy_(_torch_matrix_to_quaternion(store_mat[..., :3, :3]))
+        if b_robot_spheres.shape[1] > 0:
+            b_robot_spheres.copy_(
+                _torch_transform_spheres(cumul_mat, robot_spheres, link_sphere_map)
+            )
+
+        ctx.save_for_backward(
+            cumul_mat,
+            robot_spheres,
+            joint_map,
+            joint_map_type,
+            store_link_map,
+            link_sphere_map,
+            link_chain_map,
+            joint_offset_map,
+        )
+        ctx.n_joints = joint_seq.shape[-1]
+        return link_pos, link_quat, b_robot_spheres
+
+    @staticmethod
+    def backward(ctx, grad_out_link_pos, grad_out_link_quat, grad_out_spheres):
+        grad_joint = None
+        if ctx.needs_input_grad[4]:
+            (
+                cumul_mat,
+                robot_spheres,
+                joint_map,
+                joint_map_type,
+                store_link_map,
+                link_sphere_map,
+                link_chain_map,
+                joint_offset_map,
+            ) = ctx.saved_tensors
+            grad_joint = _torch_kinematics_backward(
+                grad_out_link_pos,
+                grad_out_link_quat,
+                grad_out_spheres,
+                cumul_mat,
+                robot_spheres,
+                joint_map,
+                joint_map_type,
+                store_link_map,
+                link_sphere_map,
+                link_chain_map,
+                joint_offset_map,
+                ctx.n_joints,
+            )
+
+        return (
+            None,
+            None,
+            None,
+            None,
+            grad_joint,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+        )
+
+
+def _get_link_depth_levels(link_map: torch.Tensor) -> List[Tuple[torch.Tensor, torch.Tensor]]:
+    """Group links by their depth in the kinematic tree.
+
+    Parents are required to have a lower index than their children, which is guaranteed by
+    :class:`~curobo.cuda_robot_model.cuda_robot_generator.CudaRobotGenerator`.
+
+    Args:
+        link_map: Parent link index for every link [n_links].
+
+    Returns:
+        List of (link indices, parent link indices) for every depth, starting at depth 1.
+    """
+    parents = link_map.tolist()
+    depth = [0 for _ in parents]
+    levels = {}
+    for i in range(1, len(parents)):
+        depth[i] = depth[parents[i]] + 1
+        levels.setdefault(depth[i], []).append(i)
+    out = []
+    for d in sorted(levels.keys()):
+        idx = levels[d]
+        out.append(
+            (
+                torch.as_tensor(idx, dtype=torch.long, device=link_map.device),
+                torch.as_tensor(
+                    [parents[i] for i in idx], dtype=torch.long, device=link_map.device
+                ),
+            )
+        )
+    return out
+
+
+def _torch_joint_axis_data(
+    joint_map_type: torch.Tensor, dtype: torch.dtype
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """Get unit axis, revolute mask and prismatic mask for every link.
+
+    Args:
+        joint_map_type: Joint type for every link, values from
+            :class:`~curobo.cuda_robot_model.types.JointType` [n_links].
+        dtype: Floating point type of returned tensors.
+
+    Returns:
+        Joint axis [n_links, 3], revolute mask [n_links], prismatic mask [n_links].
+    """
+    joint_type = joint_map_type.to(dtype=torch.long)
+    axis = torch.nn.functional.one_hot(torch.clamp(joint_type, min=0) % 3, 3).to(dtype=dtype)
+    is_rot = ((joint_type >= 3) & (joint_type <= 5)).to(dtype=dtype)
+    is_prism = ((joint_type >= 0) & (joint_type <= 2)).to(dtype=dtype)
+    return axis, is_rot, is_prism
+
+
+def torch_forward_cumul_transforms(
+    q: torch.Tensor,
+    fixed_transform: torch.Tensor,
+    link_map: torch.Tensor,
+    joint_map: torch.Tensor,
+    joint_map_type: torch.Tensor,
+    joint_offset_map: torch.Tensor,
+) -> torch.Tensor:
+    """Compute pose of every link in the kinematic tree with PyTorch.
+
+    This is differentiable with autograd and is used by :class:`KinematicsFusedTorchFunction`.
+
+    Args:
+        q: Joint configuration [batch, n_joints].
+        fixed_transform: Static transform from parent link to joint of each link [n_links, 4, 4].
+        link_map: Parent link index for every link [n_links].
+        joint_map: Joint index for every link [n_links].
+        joint_map_type: Joint type for every link [n_links].
+        joint_offset_map: Scale and offset of joint value for every link [n_links * 2].
+
+    Returns:
+        torch.Tensor: Homogenous transform of every link from base link [batch, n_links, 4, 4].
+    """
+    n_links = fixed_transform.shape[0]
+    fixed_transform = fixed_transform.view(n_links, 4, 4).to(dtype=q.dtype)
+    axis, is_rot, is_prism = _torch_joint_axis_data(joint_map_type, q.dtype)
+    joint_offset = joint_offset_map.view(n_links, 2).to(dtype=q.dtype)
+    joint_idx = torch.clamp(joint_map.to(dtype=torch.long), min=0)
+    angle = q[:, joint_idx] * joint_offset[:, 0] + joint_offset[:, 1]
+
+    # rotation about unit axis with rodrigues formula:
+    skew = torch.zeros((n_links, 3, 3), device=q.device, dtype=q.dtype)
+    skew[:, 0, 1] = -axis[:, 2]
+    skew[:, 0, 2] = axis[:, 1]
+    skew[:, 1, 0] = axis[:, 2]
+    skew[:, 1, 2] = -axis[:, 0]
+    skew[:, 2, 0] = -axis[:, 1]
+    skew[:, 2, 1] = axis[:, 0]
+    rot_angle = (angle * is_rot).unsqueeze(-1).unsqueeze(-1)
+    joint_mat = torch.eye(4, device=q.device, dtype=q.dtype).repeat(q.shape[0], n_links, 1, 1)
+    joint_mat[..., :3, :3] = (
+        joint_mat[..., :3, :3]
+        + torch.sin(rot_angle) * skew
+        + (1.0 - torch.cos(rot_angle)) * (skew @ skew)
+    )
+    joint_mat[..., :3, 3] = axis * (angle * is_prism).unsqueeze(-1)
+    local_mat = fixed_transform @ joint_mat
+
+    cumul_mat = local_mat.clone()
+    cumul_mat[:, 0] = fixed_transform[0]
+    for link_idx, parent_idx in _get_link_depth_levels(link_map):
+        cumul_mat[:, link_idx] = cumul_mat[:, parent_idx] @ local_mat[:, link_idx]
+    return cumul_mat
+
+
+def _torch_matrix_to_quaternion(rot_mat: torch.Tensor) -> torch.Tensor:
+    """Convert rotation matrices to quaternions (wxyz) following the CUDA kernel's convention.
+
+    Args:
+        rot_mat: Rotation matrices [..., 3, 3].
+
+    Returns:
+        torch.Tensor: Normalized quaternions [..., 4].
+    """
+    m00, m01, m02 = rot_mat[..., 0, 0], rot_mat[..., 0, 1], rot_mat[..., 0, 2]
+    m10, m11, m12 = rot_mat[..., 1, 0], rot_mat[..., 1, 1], rot_mat[..., 1, 2]
+    m20, m21, m22 = rot_mat[..., 2, 0], rot_mat[..., 2, 1], rot_mat[..., 2, 2]
+
+    n_a = 1 + m00 - m11 - m22
+    q_a = torch.stack([-(m12 - m21), n_a, m01 + m10, m20 + m02], dim=-1)
+    n_b = 1 - m00 + m11 - m22
+    q_b = torch.stack([-(m20 - m02), m01 + m10, n_b, m12 + m21], dim=-1)
+    n_c = 1 - m00 - m11 + m22
+    q_c = torch.stack([-(m01 - m10), m20 + m02, m12 + m21, n_c], dim=-1)
+    n_d = 1 + m00 + m11 + m22
+    q_d = torch.stack([-n_d, m12 - m21, m20 - m02, m01 - m10], dim=-1)
+
+    quat = torch.where(
+        (m22 < 0.0).unsqueeze(-1),
+        torch.where((m00 > m11).unsqueeze(-1), q_a, q_b),
+        torch.where((m00 < -m11).unsqueeze(-1), q_c, q_d),
+    )
+    return quat / torch.linalg.norm(quat, dim=-1, keepdim=True)
+
+
+def _torch_transform_spheres(
+    cumul_mat: torch.Tensor, robot_spheres: torch.Tensor, link_sphere_map: torch.Tensor
+) -> torch.Tensor:
+    """Transform spheres from their link frame to the base frame.
+
+    Args:
+        cumul_mat: Pose of every link [batch, n_links, 4, 4].
+        robot_spheres: Spheres in link frame as x, y, z, radius [n_spheres, 4].
+        link_sphere_map: Link index for every sphere [n_spheres].
+
+    Returns:
+        torch.Tensor: Spheres in base frame [batch, n_spheres, 4].
+    """
+    robot_spheres = robot_spheres.view(-1, 4)
+    sphere_mat = cumul_mat[:, link_sphere_map.to(dtype=torch.long)]
+    center = robot_spheres[:, :3].to(dtype=cumul_mat.dtype).unsqueeze(-1)
+    position = (sphere_mat[..., :3, :3] @ center).squeeze(-1) + sphere_mat[..., :3, 3]
+    radius = robot_spheres[:, 3].to(dtype=cumul_mat.dtype).expand(cumul_mat.shape[0], -1)
+    return torch.cat((position, radius.unsqueeze(-1)), dim=-1)
+
+
+def _torch_kinematics_backward(
+    grad_link_pos: torch.Tensor,
+    grad_link_quat: torch.Tensor,
+    grad_spheres: torch.Tensor,
+    cumul_mat: torch.Tensor,
+    robot_spheres: torch.Tensor,
+    joint_map: torch.Tensor,
+    joint_map_type: torch.Tensor,
+    store_link_map: torch.Tensor,
+    link_sphere_map: torch.Tensor,
+    link_chain_map: torch.Tensor,
+    joint_offset_map: torch.Tensor,
+    n_joints: int,
+) -> torch.Tensor:
+    """Map gradients of kinematics outputs to joint space, matching the CUDA backward kernel.
+
+    For every link j with an actuated joint, the gradient is accumulated over all stored links
+    and spheres that have j in their kinematic chain. A revolute joint with world axis a and
+    position p contributes a . ((x - p) x g) for a point x with position gradient g and a . w
+    for an orientation gradient w. A prismatic joint contributes a . g.
+    """
+    batch = cumul_mat.shape[0]
+    n_links = cumul_mat.shape[1]
+    dtype = cumul_mat.dtype
+    store_idx = store_link_map.to(dtype=torch.long)
+    sphere_link_idx = link_sphere_map.to(dtype=torch.long)
+    chain = link_chain_map.view(n_links, n_links).to(dtype=dtype)
+
+    point_chain = [chain[store_idx]]
+    point_pos = [cumul_mat[:, store_idx, :3, 3]]
+    point_grad = [grad_link_pos.to(dtype=dtype)]
+    if grad_spheres is not None and grad_spheres.shape[1] > 0:
+        point_chain.append(chain[sphere_link_idx])
+        point_pos.append(
+            _torch_transform_spheres(cumul_mat, robot_spheres, link_sphere_map)[..., :3]
+        )
+        point_grad.append(grad_spheres[..., :3].to(dtype=dtype))
+    point_chain = torch.cat(point_chain, dim=0)
+    point_pos = torch.cat(point_pos, dim=1)
+    point_grad = torch.cat(point_grad, dim=1)
+
+    # sum of gradients and moments of gradients over all points that depend on link j:
+    sum_grad = torch.einsum("pj,bpk->bjk", point_chain, point_grad)
+    sum_moment = torch.einsum(
+        "pj,bpk->bjk", point_chain, torch.cross(point_pos, point_grad, dim=-1)
+    )
+    sum_rot_grad = torch.einsum(
+        "pj,bpk->bjk", chain[store_idx], grad_link_quat[..., 1:].to(dtype=dtype)
+    )
+
+    axis, is_rot, is_prism = _torch_joint_axis_data(joint_map_type, dtype)
+    world_axis = (cumul_mat[..., :3, :3] @ axis.unsqueeze(-1)).squeeze(-1)
+    joint_pos = cumul_mat[..., :3, 3]
+    rot_grad = torch.sum(
+        world_axis * (sum_moment - torch.cross(joint_pos, sum_grad, dim=-1) + sum_rot_grad),
+        dim=-1,
+    )
+    prism_grad = torch.sum(world_axis * sum_grad, dim=-1)
+    axis_sign = joint_offset_map.view(n_links, 2)[:, 0].to(dtype=dtype)
+    link_grad = (rot_grad * is_rot + prism_grad * is_prism) * axis_sign
+
+    active = (is_rot + is_prism) > 0
+    grad_q = torch.zeros((batch, n_joints), device=cumul_mat.device, dtype=dtype)
+    grad_q.index_add_(1, joint_map.to(dtype=torch.long)[active], link_grad[:, active])
+    return grad_q
+
+
+def get_link_jacobians(
+    cumul_mat: torch.Tensor,
+    link_idx: torch.Tensor,
+    joint_map: torch.Tensor,
+    joint_map_type: torch.Tensor,
+    link_chain_map: torch.Tensor,
+    joint_offset_map: torch.Tensor,
+    n_joints: int,
+) -> torch.Tensor:
+    """Compute geometric jacobian of links from their cumulative transforms.
+
+    Jacobians of all requested links are computed in one batched pass. Mimic joints add their
+    contribution (scaled by their multiplier) to the column of the joint they mimic. Locked joints
+    are fixed joints in the kinematic tree and hence do not contribute.
+
+    Args:
+        cumul_mat: Pose of every link in the kinematic tree, as written by forward kinematics
+            [batch, n_links, 4, 4].
+        link_idx: Index of links in the kinematic tree to compute jacobian for [n].
+        joint_map: Joint index for every link [n_links].
+        joint_map_type: Joint type for every link [n_links].
+        link_chain_map: Kinematic chain of every link [n_links, n_links].
+        joint_offset_map: Scale and offset of joint value for every link [n_links * 2].
+        n_joints: Number of actuated joints.
+
+    Returns:
+        torch.Tensor: Jacobian with linear velocity in the first three rows and angular velocity
+        in the last three rows, expressed in the base frame [batch, n, 6, n_joints].
+    """
+    n_links = cumul_mat.shape[1]
+    dtype = cumul_mat.dtype
+    link_idx = link_idx.to(dtype=torch.long)
+    axis, is_rot, is_prism = _torch_joint_axis_data(joint_map_type, dtype)
+    world_axis = (cumul_mat[..., :3, :3] @ axis.unsqueeze(-1)).squeeze(-1).unsqueeze(1)
+    joint_pos = cumul_mat[..., :3, 3].unsqueeze(1)
+    link_pos = cumul_mat[:, link_idx, :3, 3].unsqueeze(2)
+
+    # [batch, n, n_links, 3] contribution of every joint in the tree:
+    lin_jac = torch.cross(world_axis, link_pos - joint_pos, dim=-1) * is_rot.view(
+        -1, 1
+    ) + world_axis * is_prism.view(-1, 1)
+    ang_jac = (world_axis * is_rot.view(-1, 1)).expand_as(lin_jac)
+    axis_sign = joint_offset_map.view(n_links, 2)[:, 0].to(dtype=dtype)
+    chain = link_chain_map.view(n_links, n_links)[link_idx].to(dtype=dtype) * axis_sign
+    link_jac = torch.cat((lin_jac, ang_jac), dim=-1) * chain.unsqueeze(-1)
+
+    # accumulate contributions of links into their joints:
+    active = (is_rot + is_prism) > 0
+    joint_select = torch.zeros((n_links, n_joints), device=cumul_mat.device, dtype=dtype)
+    joint_select[active, joint_map.to(dtype=torch.long)[active]] = 1.0
+    return torch.einsum("bnlk,lj->bnkj", link_jac, joint_select)
+
+
 def get_cuda_kinematics(
     link_pos_seq,
     link_quat_seq,
@@ -247,7 +654,10 @@ def get_cuda_kinematics(
 ):
     # if not q_in.is_contiguous():
     #    q_in = q_in.contiguous()
-    link_pos, link_quat, robot_spheres = KinematicsFusedFunction.apply(
+    kinematics_fn = KinematicsFusedFunction
+    if kinematics_fused_cu is None or not q_in.is_cuda:
+        kinematics_fn = KinematicsFusedTorchFunction
+    link_pos, link_quat, robot_spheres = kinematics_fn.apply(
         link_pos_seq,
         link_quat_seq,
         batch_robot_spheres,
@@ -12,30 +12,36 @@
 import torch
 
 # CuRobo
-from curobo.util.logger import log_warn
+from curobo.util.logger import log_info, log_warn
 
 try:
     # CuRobo
     from curobo.curobolib import line_search_cu
 except ImportError:
-    log_warn("line_search_cu not found, JIT compiling...")
+    line_search_cu = None
+    if torch.cuda.is_available():
+        log_warn("line_search_cu not found, JIT compiling...")
+        try:
+            # Third Party
+            from torch.utils.cpp_extension import load
 
-    # Third Party
-    from torch.utils.cpp_extension import load
+            # CuRobo
+            from curobo.util_file import add_cpp_path
 
-    # CuRobo
-    from curobo.util_file import add_cpp_path
-
-    line_search_cu = load(
-        name="line_search_cu",
-        sources=add_cpp_path(
-            [
-                "line_search_cuda.cpp",
-                "line_search_kernel.cu",
-                "update_best_kernel.cu",
-            ]
-        ),
-    )
+            line_search_cu = load(
+                name="line_search_cu",
+                sources=add_cpp_path(
+                    [
+                        "line_search_cuda.cpp",
+                        "line_search_kernel.cu",
+                        "update_best_kernel.cu",
+                    ]
+                ),
+            )
+        except Exception as e:
+            log_warn("line_search_cu failed to compile: " + str(e))
+    else:
+        log_info("CUDA not available, line_search_cu is not loaded")
 
 
 def wolfe_line_search(
@@ -13,28 +13,35 @@ import torch
 from torch.autograd import Function
 
 # CuRobo
-from curobo.util.logger import log_warn
+from curobo.util.logger import log_info, log_warn
 
 try:
     # CuRobo
     from curobo.curobolib import lbfgs_step_cu
 except ImportError:
-    log_warn("lbfgs_step_cu not found, JIT compiling...")
-    # Third Party
-    from torch.utils.cpp_extension import load
+    lbfgs_step_cu = None
+    if torch.cuda.is_available():
+        log_warn("lbfgs_step_cu not found, JIT compiling...")
+        try:
+            # Third Party
+            from torch.utils.cpp_extension import load
 
-    # CuRobo
-    from curobo.util_file import add_cpp_path
+            # CuRobo
+            from curobo.util_file import add_cpp_path
 
-    lbfgs_step_cu = load(
-        name="lbfgs_step_cu",
-        sources=add_cpp_path(
-            [
-                "lbfgs_step_cuda.cpp",
-                "lbfgs_step_kernel.cu",
-            ]
-        ),
-    )
+            lbfgs_step_cu = load(
+                name="lbfgs_step_cu",
+                sources=add_cpp_path(
+                    [
+                        "lbfgs_step_cuda.cpp",
+                        "lbfgs_step_kernel.cu",
+                    ]
+                ),
+            )
+        except Exception as e:
+            log_warn("lbfgs_step_cu failed to compile: " + str(e))
+    else:
+        log_info("CUDA not available, lbfgs_step_cu is not loaded")
 
 
 class LBFGScu(Function):
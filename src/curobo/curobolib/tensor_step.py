@@ -12,24 +12,31 @@
 import torch
 
 # CuRobo
-from curobo.util.logger import log_warn
+from curobo.util.logger import log_info, log_warn
 
 try:
     # CuRobo
     from curobo.curobolib import tensor_step_cu
 
 except ImportError:
-    # Third Party
-    from torch.utils.cpp_extension import load
+    tensor_step_cu = None
+    if torch.cuda.is_available():
+        log_warn("tensor_step_cu not found, jit compiling...")
+        try:
+            # Third Party
+            from torch.utils.cpp_extension import load
 
-    # CuRobo
-    from curobo.util_file import add_cpp_path
+            # CuRobo
+            from curobo.util_file import add_cpp_path
 
-    log_warn("tensor_step_cu not found, jit compiling...")
-    tensor_step_cu = load(
-        name="tensor_step_cu",
-        sources=add_cpp_path(["tensor_step_cuda.cpp", "tensor_step_kernel.cu"]),
-    )
+            tensor_step_cu = load(
+                name="tensor_step_cu",
+                sources=add_cpp_path(["tensor_step_cuda.cpp", "tensor_step_kernel.cu"]),
+            )
+        except Exception as e:
+            log_warn("tensor_step_cu failed to compile: " + str(e))
+    else:
+        log_info("CUDA not available, tensor_step_cu is not loaded")
 
 
 def tensor_step_pos_clique_idx_fwd(
@@ -0,0 +1,438 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""
+Conservative simplification of meshes before loading them for collision checking.
+
+Scanned meshes can have hundreds of thousands of faces. Collision queries against meshes traverse
+a BVH, whose depth grows with the number of faces. :func:`decimate_mesh_data` simplifies a mesh
+by clustering vertices in a uniform grid, replacing the vertices of a cell by their mean and
+removing faces that collapse. Cells are sized so that no vertex moves farther than
+:attr:`MeshDecimationConfig.tolerance`. When :attr:`MeshDecimationConfig.max_faces` is set, cells
+are enlarged until the mesh fits the face budget, increasing the error. Meshes are not simplified
+when the error would exceed :attr:`MeshDecimationConfig.max_error`.
+
+Clustering can move the surface inwards, which would let robot spheres penetrate obstacles
+without a collision cost. Simplified meshes are therefore inflated: each vertex is moved along its
+normal so that every adjacent face plane moves outwards by the largest distance a vertex moved
+when clustered. The reported error bounds the distance between both surfaces. Clustering can
+fold the surface at sharp or thin features, where no inflation along vertex normals encloses the
+original mesh. Inflated meshes are therefore checked against points of the original surface, its
+vertices and face centroids: every point should lie on the inner side of its nearest face of the
+inflated mesh, i.e., opposite to the face normal, or have a winding number above one half.
+The original mesh is used when a point does not. The face test uses face orientation instead of a
+closed volume, so it also applies to open meshes such as scans. As only sampled points are
+checked, edges of the original mesh can protrude between them.
+
+Use :meth:`~curobo.geom.types.WorldConfig.get_collision_check_world` with a
+:class:`MeshDecimationConfig` to simplify meshes of a world. Results are cached on disk, keyed by
+a hash of the mesh file contents (or vertices) and the decimation parameters. The cache
+directory defaults to the environment variable ``CUROBO_MESH_CACHE_DIR``.
+"""
+
+from __future__ import annotations
+
+# Standard Library
+import hashlib
+import json
+import math
+import os
+from dataclasses import asdict, dataclass
+from typing import Optional, Tuple
+
+# Third Party
+import numpy as np
+import trimesh
+
+# CuRobo
+from curobo.util.logger import log_error, log_info, log_warn
+
+#: Version of the cache format. Increment when the layout of cached data or the simplification
+#: algorithm changes.
+MESH_DECIMATION_CACHE_VERSION = 3
+
+
+@dataclass
+class MeshDecimationConfig:
+    """Parameters to simplify meshes for collision checking."""
+
+    #: Largest distance in meters that a vertex moves when clustered. Sets the size of cells.
+    tolerance: float = 0.005
+
+    #: Largest number of faces of a simplified mesh. Cells are enlarged until the mesh fits,
+    #: increasing the error beyond :attr:`tolerance`. Not used when None.
+    max_faces: Optional[int] = None
+
+    #: Largest error in meters of a simplified mesh, see :attr:`MeshDecimationStats.max_error`.
+    #: Meshes are not simplified when the error is larger, e.g., when :attr:`max_faces` requires
+    #: large cells. Defaults to ten times :attr:`tolerance` when None.
+    max_error: Optional[float] = None
+
+    #: Meshes with fewer faces than this are not simplified.
+    min_faces: int = 5000
+
+    #: Inflate simplified meshes so that they enclose the original mesh. The original mesh is
+    #: used when sampled points of the original surface are outside the inflated mesh.
+    conservative: bool = True
+
+    #: Smallest cosine between the normal of a vertex and normals of its faces used to compute
+    #: the inflation of the vertex. Limits inflation at sharp corners to
+    #: ``error / min_normal_cosine``. Corners that need more inflation are not enclosed, and the
+    #: original mesh is used.
+    min_normal_cosine: float = 0.25
+
+    def __post_init__(self):
+        if self.tolerance <= 0.0:
+            log_error("tolerance should be positive, got " + str(self.tolerance))
+        if self.max_faces is not None and self.max_faces < 4:
+            log_error("max_faces should be at least 4, got " + str(self.max_faces))
+        if self.max_error is not None and self.max_error < self.tolerance:
+            log_error("max_error should be at least tolerance, got " + str(self.max_error))
+        if self.min_normal_cosine <= 0.0 or self.min_normal_cosine > 1.0:
+            log_error("min_normal_cosine should be in (0, 1], got " + str(self.min_normal_cosine))
+
+
+@dataclass
+class MeshDecimationStats:
+    """Result of simplifying a mesh."""
+
+    #: Number of faces of the input mesh.
+    input_faces: int
+
+    #: Number of faces of the simplified mesh.
+    output_faces: int
+
+    #: Bound on distance between surfaces of input and simplified mesh in meters.
+    max_error: float
+
+    #: True if the simplified mesh was loaded from cache.
+    cached: bool = False
+
+
+def get_mesh_decimation_cache_path() -> Optional[str]:
+    """Get directory of the mesh decimation cache from ``CUROBO_MESH_CACHE_DIR``.
+
+    Returns:
+        Optional[str]: Path to cache directory. None if cache is disabled.
+    """
+    cache_dir = os.environ.get("CUROBO_MESH_CACHE_DIR")
+    if cache_dir is None or cache_dir == "":
+        return None
+    return cache_dir
+
+
+def get_mesh_decimation_cache_key(mesh_digest: str, config: MeshDecimationConfig) -> str:
+    """Compute cache key of a simplified mesh.
+
+    Args:
+        mesh_digest: Hash of mesh geometry, e.g., of the contents of the mesh file and its scale.
+        config: Decimation parameters.
+
+    Returns:
+        str: Hex digest of mesh and parameters.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(str(MESH_DECIMATION_CACHE_VERSION).encode())
+    hasher.update(mesh_digest.encode())
+    hasher.update(json.dumps(asdict(config), sort_keys=True).encode())
+    return hasher.hexdigest()
+
+
+def _get_cache_file(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, "mesh_" + key + ".npz")
+
+
+def load_mesh_decimation_cache(
+    key: str, cache_dir: Optional[str] = None
+) -> Optional[Tuple[np.ndarray, np.ndarray, MeshDecimationStats]]:
+    """Load a simplified mesh from cache.
+
+    Args:
+        key: Cache key from :func:`get_mesh_decimation_cache_key`.
+        cache_dir: Directory of cache. Defaults to :func:`get_mesh_decimation_cache_path`.
+
+    Returns:
+        Vertices, faces, and stats of the simplified mesh. None if not found or cache is disabled.
+    """
+    if cache_dir is None:
+        cache_dir = get_mesh_decimation_cache_path()
+    if cache_dir is None:
+        return None
+    cache_file = _get_cache_file(cache_dir, key)
+    if not os.path.isfile(cache_file):
+        return None
+    try:
+        with np.load(cache_file) as data:
+            if int(data["version"]) != MESH_DECIMATION_CACHE_VERSION:
+                log_warn("Invalid mesh decimation cache " + cache_file)
+                return None
+            vertices = data["vertices"]
+            faces = data["faces"]
+            stats = MeshDecimationStats(
+                input_faces=int(data["input_faces"]),
+                output_faces=int(faces.shape[0]),
+                max_error=float(data["max_error"]),
+                cached=True,
+            )
+    except Exception as e:
+        log_warn("Failed to load mesh decimation cache " + cache_file + ": " + str(e))
+        return None
+    log_info("Loaded simplified mesh from cache " + cache_file)
+    return vertices, faces, stats
+
+
+def save_mesh_decimation_cache(
+    key: str,
+    vertices: np.ndarray,
+    faces: np.ndarray,
+    stats: MeshDecimationStats,
+    cache_dir: Optional[str] = None,
+) -> Optional[str]:
+    """Save a simplified mesh to cache.
+
+    The file is written to a temporary path and then renamed, so concurrent processes loading the
+    cache never read a partially written file.
+
+    Args:
+        key: Cache key from :func:`get_mesh_decimation_cache_key`.
+        vertices: Vertices of the simplified mesh.
+        faces: Faces of the simplified mesh.
+        stats: Stats of the simplified mesh.
+        cache_dir: Directory of cache. Defaults to :func:`get_mesh_decimation_cache_path`.
+
+    Returns:
+        Optional[str]: Path of written cache file, None if cache is disabled or write failed.
+    """
+    if cache_dir is None:
+        cache_dir = get_mesh_decimation_cache_path()
+    if cache_dir is None:
+        return None
+    cache_file = _get_cache_file(cache_dir, key)
+    tmp_file = cache_file + "." + str(os.getpid()) + ".tmp.npz"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez(
+            tmp_file,
+            version=MESH_DECIMATION_CACHE_VERSION,
+            vertices=vertices,
+            faces=faces,
+            input_faces=stats.input_faces,
+            max_error=stats.max_error,
+        )
+        os.replace(tmp_file, cache_file)
+    except Exception as e:
+        log_warn("Failed to write mesh decimation cache " + cache_file + ": " + str(e))
+        if os.path.isfile(tmp_file):
+            os.remove(tmp_file)
+        return None
+    log_info("Saved simplified mesh to cache " + cache_file)
+    return cache_file
+
+
+def _cluster_vertices(
+    vertices: np.ndarray, faces: np.ndarray, cell_size: float
+) -> Tuple[np.ndarray, np.ndarray, float]:
+    """Merge vertices within cells of a uniform grid, removing collapsed and duplicate faces.
+
+    Returns:
+        Vertices, faces, and largest distance a vertex moved.
+    """
+    cell = np.floor((vertices - np.min(vertices, axis=0)) / cell_size).astype(np.int64)
+    _, cluster, counts = np.unique(cell, axis=0, return_inverse=True, return_counts=True)
+    cluster = cluster.reshape(-1)
+    cluster_vertices = np.zeros((counts.shape[0], 3), dtype=np.float64)
+    np.add.at(cluster_vertices, cluster, vertices)
+    cluster_vertices /= counts[:, None]
+    displacement = float(np.max(np.linalg.norm(vertices - cluster_vertices[cluster], axis=-1)))
+
+    cluster_faces = cluster[faces]
+    valid = (
+        (cluster_faces[:, 0] != cluster_faces[:, 1])
+        & (cluster_faces[:, 1] != cluster_faces[:, 2])
+        & (cluster_faces[:, 0] != cluster_faces[:, 2])
+    )
+    cluster_faces = cluster_faces[valid]
+    _, unique_idx = np.unique(np.sort(cluster_faces, axis=-1), axis=0, return_index=True)
+    cluster_faces = cluster_faces[np.sort(unique_idx)]
+
+    # remove vertices that are not referenced by faces:
+    used, new_faces = np.unique(cluster_faces, return_inverse=True)
+    return cluster_vertices[used], new_faces.reshape(-1, 3), displacement
+
+
+def _inflate_vertices(
+    vertices: np.ndarray, faces: np.ndarray, distance: float, min_normal_cosine: float
+) -> Tuple[np.ndarray, float]:
+    """Move vertices along their normal so that adjacent face planes move out by distance.
+
+    Returns:
+        Vertices and largest distance a vertex moved.
+    """
+    face_normals = np.cross(
+        vertices[faces[:, 1]] - vertices[faces[:, 0]], vertices[faces[:, 2]] - vertices[faces[:, 0]]
+    )
+    vertex_normals = np.zeros_like(vertices)
+    for i in range(3):
+        np.add.at(vertex_normals, faces[:, i], face_normals)
+    face_normals /= np.maximum(np.linalg.norm(face_normals, axis=-1, keepdims=True), 1e-12)
+    vertex_normals /= np.maximum(np.linalg.norm(vertex_normals, axis=-1, keepdims=True), 1e-12)
+
+    cosine = np.ones(vertices.shape[0])
+    for i in range(3):
+        np.minimum.at(
+            cosine, faces[:, i], np.sum(vertex_normals[faces[:, i]] * face_normals, axis=-1)
+        )
+    offset = distance / np.maximum(cosine, min_normal_cosine)
+    return vertices + offset[:, None] * vertex_normals, float(np.max(offset))
+
+
+def _get_surface_points(vertices: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    """Get vertices and face centroids of a mesh, used to check enclosure."""
+    return np.concatenate([vertices, np.mean(vertices[faces], axis=1)], axis=0)
+
+
+def _get_winding_numbers(
+    vertices: np.ndarray, faces: np.ndarray, points: np.ndarray, batch_size: int = 2**22
+) -> np.ndarray:
+    """Get generalized winding numbers of points with respect to a mesh.
+
+    The winding number sums the signed solid angles of all faces, it is one inside and zero outside
+    of a closed mesh and degrades gracefully on meshes with folds or non-manifold edges.
+
+    Args:
+        vertices: Vertices of the mesh.
+        faces: Faces of the mesh.
+        points: Points to query.
+        batch_size: Maximum number of point-face pairs evaluated at once.
+
+    Returns:
+        Winding number of each point.
+    """
+    triangles = vertices[faces]
+    winding = np.zeros(len(points))
+    step = max(1, batch_size // len(faces))
+    for start in range(0, len(points), step):
+        d = triangles[None, :, :, :] - points[start : start + step, None, None, :]
+        length = np.linalg.norm(d, axis=-1)
+        a, b, c = d[..., 0, :], d[..., 1, :], d[..., 2, :]
+        numerator = np.sum(a * np.cross(b, c), axis=-1)
+        denominator = (
+            length[..., 0] * length[..., 1] * length[..., 2]
+            + np.sum(a * b, axis=-1) * length[..., 2]
+            + np.sum(b * c, axis=-1) * length[..., 0]
+            + np.sum(c * a, axis=-1) * length[..., 1]
+        )
+        winding[start : start + step] = np.sum(np.arctan2(numerator, denominator), axis=-1)
+    return winding / (2.0 * np.pi)
+
+
+def _encloses_points(
+    vertices: np.ndarray, faces: np.ndarray, points: np.ndarray, tolerance: float = 1e-6
+) -> bool:
+    """Check that points are on the inner side of their nearest face of a mesh.
+
+    The inner side of a face is opposite to its normal, which also holds for open meshes. Faces
+    folded by clustering can face inwards, so points outside of their nearest face are accepted
+    when their winding number shows they are inside of the mesh. On open meshes, the winding number
+    stays below one half near the surface and does not accept points.
+
+    Returns:
+        True if no point is farther than tolerance outside of the mesh.
+    """
+    mesh = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+    closest, _, face_idx = trimesh.proximity.closest_point(mesh, points)
+    outside = np.sum((points - closest) * mesh.face_normals[face_idx], axis=-1) > tolerance
+    if np.any(outside):
+        outside[outside] = _get_winding_numbers(vertices, faces, points[outside]) < 0.5
+    return not bool(np.any(outside))
+
+
+def decimate_mesh_data(
+    vertices: np.ndarray,
+    faces: np.ndarray,
+    config: MeshDecimationConfig = MeshDecimationConfig(),
+    cache_key: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+) -> Tuple[np.ndarray, np.ndarray, MeshDecimationStats]:
+    """Simplify a triangle mesh, reusing a cached result if found.
+
+    Args:
+        vertices: Vertices of mesh [n_vertices, 3]. Faces should share vertices, e.g., from a
+            trimesh loaded with process=True.
+        faces: Faces of mesh [n_faces, 3].
+        config: Decimation parameters.
+        cache_key: Key from :func:`get_mesh_decimation_cache_key`. The cache is not used when None.
+        cache_dir: Directory of cache. Defaults to :func:`get_mesh_decimation_cache_path`.
+
+    Returns:
+        Vertices, faces, and stats of the simplified mesh. Meshes with fewer than
+        :attr:`MeshDecimationConfig.min_faces` faces are returned unchanged.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    n_faces = faces.shape[0]
+    if n_faces < config.min_faces:
+        return vertices, faces, MeshDecimationStats(n_faces, n_faces, 0.0)
+    if cache_key is not None:
+        cached = load_mesh_decimation_cache(cache_key, cache_dir)
+        if cached is not None:
+            return cached
+
+    max_error = config.max_error
+    if max_error is None:
+        max_error = 10.0 * config.tolerance
+
+    # vertices move at most the diagonal of a cell:
+    cell_size = config.tolerance / math.sqrt(3)
+    new_vertices, new_faces, error = _cluster_vertices(vertices, faces, cell_size)
+    while (
+        config.max_faces is not None
+        and new_faces.shape[0] > config.max_faces
+        and error <= max_error
+    ):
+        cell_size *= 1.5
+        new_vertices, new_faces, error = _cluster_vertices(vertices, faces, cell_size)
+    if new_faces.shape[0] == 0:
+        log_warn("Mesh collapsed when simplified, using original mesh")
+        return vertices, faces, MeshDecimationStats(n_faces, n_faces, 0.0)
+    if config.conservative and error > 0.0:
+        new_vertices, offset = _inflate_vertices(
+            new_vertices, new_faces, error, config.min_normal_cosine
+        )
+        error += offset
+    # the original mesh is cached like a simplified mesh, to not simplify it again:
+    if error > max_error:
+        log_warn(
+            "Simplified mesh error "
+            + "{:.4f}".format(error)
+            + " exceeds max_error "
+            + "{:.4f}".format(max_error)
+            + ", using original mesh"
+        )
+        new_vertices, new_faces, error = vertices, faces, 0.0
+    elif (
+        config.conservative
+        and error > 0.0
+        and not _encloses_points(new_vertices, new_faces, _get_surface_points(vertices, faces))
+    ):
+        log_warn("Simplified mesh does not enclose the original mesh, using original mesh")
+        new_vertices, new_faces, error = vertices, faces, 0.0
+    stats = MeshDecimationStats(n_faces, int(new_faces.shape[0]), error)
+    log_info(
+        "Simplified mesh from "
+        + str(n_faces)
+        + " to "
+        + str(stats.output_faces)
+        + " faces, max error: "
+        + "{:.4f}".format(error)
+    )
+    if cache_key is not None:
+        save_mesh_decimation_cache(cache_key, new_vertices, new_faces, stats, cache_dir)
+    return new_vertices, new_faces, stats
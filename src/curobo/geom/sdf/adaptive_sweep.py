@@ -0,0 +1,184 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""
+Choose the number of sweep steps of swept sphere collision queries from sphere displacement.
+
+Swept sphere queries check ``sweep_steps`` points on each side of a sphere, towards the sphere at
+the previous and next timestep. Points of both neighbors together split the segment between two
+timesteps into ``2 * sweep_steps + 1`` equal parts. An obstacle thinner than the spacing between
+points minus the sphere diameter can be missed, while slow spheres are checked with more points
+than needed.
+
+When :attr:`~curobo.geom.sdf.world.WorldCollisionConfig.adaptive_sweep` is set, the number of
+steps of each sphere is the smallest number such that points are at most
+:attr:`AdaptiveSweepConfig.max_spacing_ratio` times the sphere radius apart, bounded by
+:attr:`AdaptiveSweepConfig.max_steps`. Collision kernels take one number of steps for all
+spheres, so queries use the largest number of steps across spheres. This synchronizes with the
+device, so adaptive sweep steps cannot be used inside a CUDA graph.
+
+:func:`get_swept_sphere_collision_reference` checks each sphere with its own number of steps by
+querying interpolated spheres with discrete collision checking. It runs on any device and is
+used to validate swept queries.
+"""
+
+from __future__ import annotations
+
+# Standard Library
+from dataclasses import dataclass
+from typing import Optional
+
+# Third Party
+import torch
+
+# CuRobo
+from curobo.util.logger import log_error
+
+
+@dataclass
+class AdaptiveSweepConfig:
+    """Parameters to choose sweep steps from displacement of spheres between timesteps."""
+
+    #: Largest distance between checked points along a segment, as a multiple of the sphere
+    #: radius. Obstacles thinner than ``(max_spacing_ratio - 2) * radius`` can be missed, so
+    #: values up to 2 check every point of the segment.
+    max_spacing_ratio: float = 1.0
+
+    #: Smallest number of steps, used when spheres do not move.
+    min_steps: int = 0
+
+    #: Largest number of steps, bounding collision checks of each sphere to
+    #: ``2 * max_steps + 1``.
+    max_steps: int = 8
+
+    def __post_init__(self):
+        if self.max_spacing_ratio <= 0.0:
+            log_error("max_spacing_ratio should be positive, got " + str(self.max_spacing_ratio))
+        if self.min_steps < 0:
+            log_error("min_steps should not be negative, got " + str(self.min_steps))
+        if self.max_steps < self.min_steps:
+            log_error(
+                "max_steps should not be smaller than min_steps, got "
+                + str(self.max_steps)
+                + " < "
+                + str(self.min_steps)
+            )
+
+
+def get_sphere_sweep_steps(query_sphere: torch.Tensor, config: AdaptiveSweepConfig) -> torch.Tensor:
+    """Compute the number of sweep steps of each sphere from its displacement.
+
+    Args:
+        query_sphere: Query spheres [batch, horizon, number of spheres, 4].
+        config: Parameters to choose sweep steps.
+
+    Returns:
+        torch.Tensor: Number of sweep steps [batch, horizon, number of spheres]. Spheres with a
+        negative radius are not checked and have zero steps.
+    """
+    spheres = query_sphere.detach()
+    position = spheres[..., :3]
+    radius = spheres[..., 3]
+    displacement = torch.zeros_like(radius)
+    if spheres.shape[1] > 1:
+        segment = torch.linalg.norm(position[:, 1:] - position[:, :-1], dim=-1)
+        displacement[:, 1:] = segment
+        displacement[:, :-1] = torch.maximum(displacement[:, :-1], segment)
+    spacing = torch.clamp(radius * config.max_spacing_ratio, min=1e-6)
+    steps = torch.ceil(0.5 * (displacement / spacing - 1.0))
+    steps = torch.clamp(steps, min=config.min_steps, max=config.max_steps).to(dtype=torch.long)
+    return torch.where(radius >= 0.0, steps, 0)
+
+
+def get_adaptive_sweep_steps(query_sphere: torch.Tensor, config: AdaptiveSweepConfig) -> int:
+    """Compute the number of sweep steps that is enough for all spheres.
+
+    Args:
+        query_sphere: Query spheres [batch, horizon, number of spheres, 4].
+        config: Parameters to choose sweep steps.
+
+    Returns:
+        int: Largest number of sweep steps across spheres.
+    """
+    if query_sphere.numel() == 0:
+        return config.min_steps
+    steps = get_sphere_sweep_steps(query_sphere, config)
+    return max(config.min_steps, int(torch.max(steps).item()))
+
+
+def get_swept_sphere_samples(query_sphere: torch.Tensor, sweep_steps: torch.Tensor) -> torch.Tensor:
+    """Interpolate spheres at the points checked by swept sphere queries.
+
+    Points follow the sweep of the collision kernels: a sphere with ``s`` steps is checked at its
+    position and at ``s`` points towards each neighbor in time, spaced by ``1 / (2 * s + 1)`` of
+    the segment length.
+
+    Args:
+        query_sphere: Query spheres [batch, horizon, number of spheres, 4].
+        sweep_steps: Number of sweep steps of each sphere [batch, horizon, number of spheres].
+
+    Returns:
+        torch.Tensor: Interpolated spheres [batch, horizon * (2 * max_steps + 1), number of
+        spheres, 4], ordered by timestep. Unused points have a negative radius.
+    """
+    b, h, n, _ = query_sphere.shape
+    spheres = query_sphere.detach()
+    max_steps = int(torch.max(sweep_steps).item()) if sweep_steps.numel() > 0 else 0
+    sphere_0 = torch.cat([spheres[:, :1], spheres[:, :-1]], dim=1)
+    sphere_2 = torch.cat([spheres[:, 1:], spheres[:, -1:]], dim=1)
+    time_idx = torch.arange(h, device=spheres.device).view(1, -1, 1)
+    n_steps = (2 * sweep_steps + 1).to(dtype=spheres.dtype).unsqueeze(-1)
+
+    samples = [spheres]
+    for sphere_other, valid_time in [(sphere_0, time_idx > 0), (sphere_2, time_idx < h - 1)]:
+        for j in range(max_steps):
+            k0 = (j + 1) / n_steps
+            sample = k0 * spheres + (1 - k0) * sphere_other
+            sample[..., 3] = spheres[..., 3]
+            valid = valid_time & (j < sweep_steps) & (spheres[..., 3] >= 0.0)
+            sample[..., 3] = torch.where(valid, sample[..., 3], -1.0)
+            samples.append(sample)
+    samples = torch.stack(samples, dim=2)
+    return samples.view(b, h * samples.shape[2], n, 4)
+
+
+def get_swept_sphere_collision_reference(
+    world_coll_checker,
+    query_sphere: torch.Tensor,
+    sweep_steps: torch.Tensor,
+    activation_distance: torch.Tensor,
+    env_query_idx: Optional[torch.Tensor] = None,
+) -> torch.Tensor:
+    """Check swept spheres for collision with their own number of sweep steps.
+
+    Args:
+        world_coll_checker: Instance of :class:`~curobo.geom.sdf.world.WorldCollision`.
+        query_sphere: Query spheres [batch, horizon, number of spheres, 4].
+        sweep_steps: Number of sweep steps of each sphere [batch, horizon, number of spheres],
+            e.g., from :func:`get_sphere_sweep_steps`.
+        activation_distance: Distance outside obstacles at which spheres are in collision.
+        env_query_idx: Environment index for each batch of query spheres.
+
+    Returns:
+        torch.Tensor: True for spheres whose sweep collides [batch, horizon, number of spheres].
+    """
+    # CuRobo
+    from curobo.geom.sdf.world import CollisionQueryBuffer
+
+    b, h, n, _ = query_sphere.shape
+    samples = get_swept_sphere_samples(query_sphere, sweep_steps)
+    query_buffer = CollisionQueryBuffer.initialize_from_shape(
+        samples.shape, world_coll_checker.tensor_args, world_coll_checker.collision_types
+    )
+    weight = world_coll_checker.tensor_args.to_device([1.0])
+    collision = world_coll_checker.get_sphere_collision(
+        samples, query_buffer, weight, activation_distance, env_query_idx=env_query_idx
+    )
+    return torch.any(collision.view(b, h, -1, n) > 0.0, dim=2)
@@ -0,0 +1,394 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""
+Bake signed distance of static worlds into voxel grids, with an on-disk cache.
+
+Collision queries against meshes traverse a BVH per sphere. For static scenes (e.g.,
+``collision_mesh_scene.yml``), the signed distance can instead be sampled once into a
+:class:`~curobo.geom.types.VoxelGrid` and served by
+:class:`~curobo.geom.sdf.world_voxel.WorldVoxelCollision`, which reads the distance of a sphere from
+the grid. :func:`bake_world_esdf` samples the grid with a mesh (or primitive) collision checker and
+stores it on disk, keyed by a hash of obstacle geometry (including contents of mesh files),
+obstacle poses, and bake parameters. Any change to the inputs results in a new key, so stale grids
+are never loaded.
+
+By default, :class:`~curobo.geom.sdf.world_voxel.WorldVoxelCollision` reads the distance of the
+voxel nearest to a sphere. Set
+:attr:`~curobo.geom.sdf.world.WorldCollisionConfig.interpolate_voxel_esdf` to trilinearly
+interpolate distance between voxel centers instead, which gives a continuous distance and gradient
+from baked grids.
+
+Example:
+
+.. code-block:: python
+
+    world_file = join_path(get_world_configs_path(), "collision_mesh_scene.yml")
+    world = WorldConfig.from_dict(load_yaml(world_file))
+    esdf = bake_world_esdf(world, EsdfBakeConfig(voxel_size=0.02), cache_dir="/tmp/curobo_esdf")
+    voxel_world = WorldConfig(voxel=[esdf])
+    voxel_checker = WorldVoxelCollision(
+        WorldCollisionConfig(world_model=voxel_world, interpolate_voxel_esdf=True)
+    )
+
+The cache directory defaults to the environment variable ``CUROBO_ESDF_CACHE_DIR``. Baking does not
+use a cache when neither is set.
+"""
+
+from __future__ import annotations
+
+# Standard Library
+import hashlib
+import json
+import os
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional
+
+# Third Party
+import numpy as np
+import torch
+from packaging import version
+
+# CuRobo
+from curobo.geom.sdf.utils import create_collision_checker
+from curobo.geom.sdf.world import CollisionCheckerType, WorldCollisionConfig
+from curobo.geom.types import Cuboid, Mesh, Obstacle, VoxelGrid, WorldConfig
+from curobo.types.base import TensorDeviceType
+from curobo.util.logger import log_error, log_info, log_warn
+
+#: Version of the cache format. Increment when the layout of cached data changes.
+ESDF_CACHE_VERSION = 1
+
+#: Obstacle fields that do not change geometry, ignored when computing cache keys.
+_NON_GEOMETRY_FIELDS = [
+    "name",
+    "color",
+    "texture_id",
+    "texture",
+    "material",
+    "tensor_args",
+    "vertex_colors",
+    "vertex_normals",
+    "face_colors",
+]
+
+
+@dataclass
+class EsdfBakeConfig:
+    """Parameters to bake signed distance of a world into a voxel grid."""
+
+    #: Size of voxels in meters.
+    voxel_size: float = 0.02
+
+    #: Maximum distance to compute signed distance from obstacles in meters. Voxels farther than
+    #: this from all obstacles store -max_distance.
+    max_distance: float = 0.5
+
+    #: Region to bake. Defaults to the axis aligned bounding box of all obstacles, expanded by
+    #: :attr:`padding`.
+    bounds: Optional[Cuboid] = None
+
+    #: Padding added to each side of the bounding box of obstacles in meters. Not used when
+    #: :attr:`bounds` is given.
+    padding: float = 0.2
+
+    #: Data type to store signed distance. Use :var:`torch.bfloat16` or :var:`torch.float8_e4m3fn`
+    #: for reduced memory usage.
+    feature_dtype: torch.dtype = torch.float32
+
+    #: Collision checker used to compute signed distance. Use MESH for worlds with meshes.
+    checker_type: CollisionCheckerType = CollisionCheckerType.MESH
+
+    #: Name of the baked voxel grid obstacle.
+    name: str = "baked_esdf"
+
+    def __post_init__(self):
+        if self.voxel_size <= 0.0:
+            log_error("voxel_size should be positive, got " + str(self.voxel_size))
+        if self.max_distance <= 0.0:
+            log_error("max_distance should be positive, got " + str(self.max_distance))
+        if self.padding < 0.0:
+            log_error("padding should not be negative, got " + str(self.padding))
+        if isinstance(self.checker_type, str):
+            self.checker_type = CollisionCheckerType(self.checker_type)
+
+
+def get_esdf_cache_path() -> Optional[str]:
+    """Get directory of the ESDF cache from ``CUROBO_ESDF_CACHE_DIR``.
+
+    Returns:
+        Optional[str]: Path to cache directory. None if cache is disabled.
+    """
+    cache_dir = os.environ.get("CUROBO_ESDF_CACHE_DIR")
+    if cache_dir is None or cache_dir == "":
+        return None
+    return cache_dir
+
+
+def _to_hashable(value: Any) -> Any:
+    """Convert a value to a json serializable representation."""
+    if isinstance(value, torch.Tensor):
+        value = value.detach().cpu().numpy()
+    if isinstance(value, np.ndarray):
+        return hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()
+    if isinstance(value, (list, tuple)):
+        return [_to_hashable(v) for v in value]
+    if isinstance(value, (np.floating, np.integer, np.bool_)):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def _get_obstacle_digest(obstacle: Obstacle) -> str:
+    """Hash geometry and pose of an obstacle. Contents of mesh files are hashed, not paths."""
+    hasher = hashlib.sha256()
+    hasher.update(type(obstacle).__name__.encode())
+    data = {
+        f.name: _to_hashable(getattr(obstacle, f.name))
+        for f in fields(obstacle)
+        if f.name not in _NON_GEOMETRY_FIELDS
+    }
+    if isinstance(obstacle, Mesh):
+        data.pop("file_path")
+        for key in ["vertices", "faces"]:
+            if data[key] is not None:
+                data[key] = _to_hashable(np.asarray(getattr(obstacle, key), dtype=np.float64))
+        if obstacle.file_path is not None:
+            if not os.path.isfile(obstacle.file_path):
+                log_error("Mesh file not found: " + obstacle.file_path)
+            with open(obstacle.file_path, "rb") as f:
+                hasher.update(f.read())
+    hasher.update(json.dumps(data, sort_keys=True).encode())
+    return hasher.hexdigest()
+
+
+def _get_obstacles(world_config: WorldConfig) -> List[Obstacle]:
+    """Get obstacles of world that can be baked."""
+    return (
+        world_config.sphere
+        + world_config.cuboid
+        + world_config.capsule
+        + world_config.cylinder
+        + world_config.mesh
+    )
+
+
+def get_esdf_cache_key(world_config: WorldConfig, bake_config: EsdfBakeConfig) -> str:
+    """Compute cache key of a baked world.
+
+    The key does not depend on names or order of obstacles.
+
+    Args:
+        world_config: Obstacles to bake.
+        bake_config: Bake parameters.
+
+    Returns:
+        str: Hex digest of obstacles and bake parameters.
+    """
+    # CuRobo
+    from curobo import __version__
+
+    hasher = hashlib.sha256()
+    hasher.update(str(ESDF_CACHE_VERSION).encode())
+    hasher.update(str(__version__).encode())
+    for digest in sorted(_get_obstacle_digest(o) for o in _get_obstacles(world_config)):
+        hasher.update(digest.encode())
+    bounds = None
+    if bake_config.bounds is not None:
+        bounds = [_to_hashable(bake_config.bounds.pose), _to_hashable(bake_config.bounds.dims)]
+    bake_data = {
+        "voxel_size": bake_config.voxel_size,
+        "max_distance": bake_config.max_distance,
+        "bounds": bounds,
+        "padding": bake_config.padding,
+        "feature_dtype": str(bake_config.feature_dtype),
+        "checker_type": bake_config.checker_type.name,
+        "name": bake_config.name,
+    }
+    hasher.update(json.dumps(bake_data, sort_keys=True).encode())
+    return hasher.hexdigest()
+
+
+def get_world_bounds(world_config: WorldConfig, padding: float = 0.0) -> Cuboid:
+    """Get axis aligned bounding box of all obstacles in a world.
+
+    Args:
+        world_config: Obstacles in world.
+        padding: Distance in meters to expand each side of the bounding box.
+
+    Returns:
+        Cuboid: Bounding box in world frame.
+    """
+    if len(_get_obstacles(world_config)) == 0:
+        log_error("Cannot compute bounds of an empty world")
+    bounds = WorldConfig.get_scene_graph(world_config, process_color=False).bounds
+    low = bounds[0] - padding
+    high = bounds[1] + padding
+    center = 0.5 * (low + high)
+    return Cuboid(
+        name="bounds",
+        pose=center.tolist() + [1, 0, 0, 0],
+        dims=(high - low).tolist(),
+    )
+
+
+def _get_cache_file(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, "esdf_" + key + ".pt")
+
+
+def load_esdf_cache(
+    key: str, tensor_args: TensorDeviceType = TensorDeviceType(), cache_dir: Optional[str] = None
+) -> Optional[VoxelGrid]:
+    """Load baked signed distance from cache.
+
+    Args:
+        key: Cache key from :func:`get_esdf_cache_key`.
+        tensor_args: Device to load signed distance to.
+        cache_dir: Directory of cache. Defaults to :func:`get_esdf_cache_path`.
+
+    Returns:
+        Optional[VoxelGrid]: Baked voxel grid, None if not found or cache is disabled.
+    """
+    if cache_dir is None:
+        cache_dir = get_esdf_cache_path()
+    if cache_dir is None:
+        return None
+    cache_file = _get_cache_file(cache_dir, key)
+    if not os.path.isfile(cache_file):
+        return None
+    try:
+        if version.parse(torch.__version__) >= version.parse("1.13"):
+            data = torch.load(cache_file, map_location=tensor_args.device, weights_only=True)
+        else:
+            data = torch.load(cache_file, map_location=tensor_args.device)
+    except Exception as e:
+        log_warn("Failed to load ESDF cache " + cache_file + ": " + str(e))
+        return None
+    if not isinstance(data, dict) or data.get("version") != ESDF_CACHE_VERSION:
+        log_warn("Invalid ESDF cache " + cache_file)
+        return None
+    log_info("Loaded ESDF from cache " + cache_file)
+    return VoxelGrid(
+        name=data["name"],
+        pose=data["pose"],
+        dims=data["dims"],
+        voxel_size=data["voxel_size"],
+        feature_tensor=data["feature_tensor"],
+        tensor_args=tensor_args,
+    )
+
+
+def save_esdf_cache(
+    key: str, voxel_grid: VoxelGrid, cache_dir: Optional[str] = None
+) -> Optional[str]:
+    """Save baked signed distance to cache.
+
+    The file is written to a temporary path and then renamed, so concurrent processes loading the
+    cache never read a partially written file.
+
+    Args:
+        key: Cache key from :func:`get_esdf_cache_key`.
+        voxel_grid: Baked voxel grid.
+        cache_dir: Directory of cache. Defaults to :func:`get_esdf_cache_path`.
+
+    Returns:
+        Optional[str]: Path of written cache file, None if cache is disabled or write failed.
+    """
+    if cache_dir is None:
+        cache_dir = get_esdf_cache_path()
+    if cache_dir is None:
+        return None
+    data: Dict[str, Any] = {
+        "version": ESDF_CACHE_VERSION,
+        "name": voxel_grid.name,
+        "pose": [float(x) for x in voxel_grid.pose],
+        "dims": [float(x) for x in voxel_grid.dims],
+        "voxel_size": float(voxel_grid.voxel_size),
+        "feature_tensor": voxel_grid.feature_tensor.detach().cpu(),
+    }
+    cache_file = _get_cache_file(cache_dir, key)
+    tmp_file = cache_file + "." + str(os.getpid()) + ".tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        torch.save(data, tmp_file)
+        os.replace(tmp_file, cache_file)
+    except Exception as e:
+        log_warn("Failed to write ESDF cache " + cache_file + ": " + str(e))
+        if os.path.isfile(tmp_file):
+            os.remove(tmp_file)
+        return None
+    log_info("Saved ESDF to cache " + cache_file)
+    return cache_file
+
+
+def bake_world_esdf(
+    world_config: WorldConfig,
+    bake_config: EsdfBakeConfig = EsdfBakeConfig(),
+    tensor_args: TensorDeviceType = TensorDeviceType(),
+    cache_dir: Optional[str] = None,
+) -> VoxelGrid:
+    """Sample signed distance of world obstacles into a voxel grid, reusing a cached grid if found.
+
+    Distance is positive inside obstacles and negative outside obstacles, matching
+    :meth:`~curobo.geom.sdf.world.WorldCollision.get_esdf_in_bounding_box`. Load the returned grid
+    as a voxel obstacle (``WorldConfig(voxel=[grid])``) into
+    :class:`~curobo.geom.sdf.world_voxel.WorldVoxelCollision` to serve collision queries, with
+    :attr:`~curobo.geom.sdf.world.WorldCollisionConfig.interpolate_voxel_esdf` set for trilinear
+    lookup of distance.
+
+    Args:
+        world_config: Static obstacles to bake. Voxel grids and nvblox maps are not supported.
+        bake_config: Bake parameters.
+        tensor_args: Device to compute signed distance on and to return the grid on.
+        cache_dir: Directory of cache. Defaults to :func:`get_esdf_cache_path`.
+
+    Returns:
+        VoxelGrid: Signed distance of obstacles in the baked region.
+    """
+    if len(world_config.voxel) > 0 or len(world_config.blox) > 0:
+        log_error("Voxel grids and nvblox maps cannot be baked, only primitives and meshes")
+    key = get_esdf_cache_key(world_config, bake_config)
+    voxel_grid = load_esdf_cache(key, tensor_args, cache_dir)
+    if voxel_grid is not None:
+        return voxel_grid
+
+    bounds = bake_config.bounds
+    if bounds is None:
+        bounds = get_world_bounds(world_config, bake_config.padding)
+    if bake_config.checker_type == CollisionCheckerType.MESH:
+        collision_world = WorldConfig.create_collision_support_world(world_config)
+    elif bake_config.checker_type == CollisionCheckerType.PRIMITIVE:
+        collision_world = WorldConfig.create_obb_world(world_config)
+    else:
+        log_error("Only MESH and PRIMITIVE checkers can bake ESDF")
+    collision_checker = create_collision_checker(
+        WorldCollisionConfig(
+            tensor_args=tensor_args,
+            world_model=collision_world,
+            checker_type=bake_config.checker_type,
+            max_distance=bake_config.max_distance,
+        )
+    )
+    esdf = collision_checker.get_esdf_in_bounding_box(
+        Cuboid(name=bake_config.name, pose=bounds.pose, dims=bounds.dims),
+        voxel_size=bake_config.voxel_size,
+        dtype=bake_config.feature_dtype,
+    )
+    voxel_grid = VoxelGrid(
+        name=bake_config.name,
+        pose=list(bounds.pose),
+        dims=list(bounds.dims),
+        voxel_size=bake_config.voxel_size,
+        feature_tensor=esdf.feature_tensor.to(dtype=bake_config.feature_dtype),
+        tensor_args=tensor_args,
+    )
+    save_esdf_cache(key, voxel_grid, cache_dir)
+    return voxel_grid
@@ -0,0 +1,175 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""
+Recompute signed distance of voxel grids around regions that changed.
+
+Mapping pipelines change a small region of a large voxel grid per frame. Writing the changed
+region into the grid leaves signed distance of voxels around the region stale, as their nearest
+obstacle may have been added or removed. Signed distance is recomputed from occupancy, where a
+voxel is occupied when its signed distance is positive, in a box containing all voxels within
+:attr:`EsdfUpdateConfig.max_distance` of the changed region. Occupancy is read from a window that
+is larger than this box by ``max_distance`` on each side, so voxels at the border of the box find
+obstacles outside the box.
+
+Recomputed distance is truncated to ``[-max_distance, max_distance]``. With truncated distance,
+voxels farther than ``max_distance`` from the changed region are not affected by the change, so
+cost of an update depends on the size of the changed region and not on the size of the grid. Grids
+with untruncated distance keep stale distance beyond ``max_distance`` from changed regions.
+
+Voxels store the distance between the boundary of occupied and free voxels, i.e., distance
+between voxel centers minus half the voxel size. :func:`compute_esdf_from_occupancy` computes
+distance with PyTorch on any device, as a separable transform that only searches within
+``max_distance`` along each axis. :func:`compute_esdf_from_occupancy_reference` computes the same
+distance on CPU with :func:`scipy.ndimage.distance_transform_edt` and is used for testing.
+"""
+
+from __future__ import annotations
+
+# Standard Library
+import math
+from dataclasses import dataclass
+from typing import List, Tuple
+
+# Third Party
+import numpy as np
+import torch
+
+# CuRobo
+from curobo.util.logger import log_error
+
+
+@dataclass
+class EsdfUpdateConfig:
+    """Parameters to recompute signed distance of voxel grids around changed regions."""
+
+    #: Distance in meters from obstacles within which signed distance is recomputed exactly.
+    #: Recomputed voxels farther than this from obstacles store -max_distance. Should be larger
+    #: than the radius of query spheres plus the collision activation distance.
+    max_distance: float = 0.5
+
+    def __post_init__(self):
+        if self.max_distance <= 0.0:
+            log_error("max_distance should be positive, got " + str(self.max_distance))
+
+
+def get_esdf_band(voxel_size: float, max_distance: float) -> int:
+    """Get the number of voxels between a voxel and obstacles that affect its signed distance.
+
+    Args:
+        voxel_size: Size of voxels in meters.
+        max_distance: Truncation distance of signed distance in meters.
+
+    Returns:
+        int: Number of voxels.
+    """
+    return int(math.ceil(max_distance / voxel_size + 0.5))
+
+
+def get_dirty_box(
+    start: List[int], shape: List[int], grid_shape: List[int], band: int
+) -> Tuple[List[int], List[int]]:
+    """Get the box of voxels within a band of voxels around a changed box, clipped to the grid.
+
+    Args:
+        start: Index of the first voxel of the changed box along each axis.
+        shape: Number of voxels of the changed box along each axis.
+        grid_shape: Number of voxels of the grid along each axis.
+        band: Number of voxels to add on each side of the changed box.
+
+    Returns:
+        Tuple[List[int], List[int]]: Start index and shape of the dilated box.
+    """
+    low = [max(start[i] - band, 0) for i in range(3)]
+    high = [min(start[i] + shape[i] + band, grid_shape[i]) for i in range(3)]
+    return low, [high[i] - low[i] for i in range(3)]
+
+
+def compute_esdf_from_occupancy(
+    occupancy: torch.Tensor, voxel_size: float, max_distance: float
+) -> torch.Tensor:
+    """Compute truncated signed distance of voxels from occupancy.
+
+    Args:
+        occupancy: Boolean occupancy of voxels [x_voxels, y_voxels, z_voxels].
+        voxel_size: Size of voxels in meters.
+        max_distance: Truncation distance in meters.
+
+    Returns:
+        torch.Tensor: Signed distance of voxels, positive in occupied voxels and negative in free
+        voxels, with the shape of occupancy.
+    """
+    band = get_esdf_band(voxel_size, max_distance)
+    occupancy = occupancy.to(dtype=torch.bool)
+    distance_occupied = torch.sqrt(_squared_distance_transform(occupancy, band))
+    distance_free = torch.sqrt(_squared_distance_transform(~occupancy, band))
+    esdf = torch.where(
+        occupancy,
+        distance_free * voxel_size - 0.5 * voxel_size,
+        0.5 * voxel_size - distance_occupied * voxel_size,
+    )
+    return torch.clamp(esdf, -max_distance, max_distance)
+
+
+def compute_esdf_from_occupancy_reference(
+    occupancy: np.ndarray, voxel_size: float, max_distance: float
+) -> np.ndarray:
+    """Compute truncated signed distance of voxels from occupancy on CPU.
+
+    Reference implementation of :func:`compute_esdf_from_occupancy`.
+
+    Args:
+        occupancy: Boolean occupancy of voxels [x_voxels, y_voxels, z_voxels].
+        voxel_size: Size of voxels in meters.
+        max_distance: Truncation distance in meters.
+
+    Returns:
+        np.ndarray: Signed distance of voxels, positive in occupied voxels and negative in free
+        voxels, with the shape of occupancy.
+    """
+    # Third Party
+    from scipy import ndimage
+
+    occupancy = np.asarray(occupancy, dtype=bool)
+    distance_occupied = np.full(occupancy.shape, np.inf)
+    distance_free = np.full(occupancy.shape, np.inf)
+    # distance_transform_edt returns distance of non-zero elements to the nearest zero element:
+    if np.any(occupancy):
+        distance_occupied = ndimage.distance_transform_edt(~occupancy)
+    if not np.all(occupancy):
+        distance_free = ndimage.distance_transform_edt(occupancy)
+    esdf = np.where(
+        occupancy,
+        distance_free * voxel_size - 0.5 * voxel_size,
+        0.5 * voxel_size - distance_occupied * voxel_size,
+    )
+    return np.clip(esdf, -max_distance, max_distance).astype(np.float32)
+
+
+def _squared_distance_transform(sites: torch.Tensor, band: int) -> torch.Tensor:
+    """Squared distance in voxels to the nearest site, exact for distances up to band voxels.
+
+    Squared Euclidean distance is separable, so it is computed as a minimum over offsets of up to
+    band voxels along each axis in turn. Sites farther than band voxels are at a squared distance
+    larger than band squared.
+    """
+    distance = torch.full(sites.shape, float("inf"), dtype=torch.float32, device=sites.device)
+    distance[sites] = 0.0
+    for dim in range(3):
+        n = distance.shape[dim]
+        new_distance = distance.clone()
+        for k in range(1, min(band, n - 1) + 1):
+            offset = float(k * k)
+            high = new_distance.narrow(dim, k, n - k)
+            high.copy_(torch.minimum(high, distance.narrow(dim, 0, n - k) + offset))
+            low = new_distance.narrow(dim, 0, n - k)
+            low.copy_(torch.minimum(low, distance.narrow(dim, k, n - k) + offset))
+        distance = new_distance
+    return distance
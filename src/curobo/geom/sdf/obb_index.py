@@ -0,0 +1,326 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""
+Uniform grid index over cuboid obstacles for culling collision queries.
+
+:class:`~curobo.geom.sdf.world.WorldPrimitiveCollision` tests every query sphere against every
+cuboid in its environment, so query time grows linearly with the number of cuboids. Large scenes
+(e.g., warehouses converted with :meth:`~curobo.geom.types.WorldConfig.create_obb_world`) contain
+thousands of cuboids, of which only a few are near the robot.
+
+:class:`ObbGridIndex` stores the world axis aligned bounding box of every enabled cuboid in a
+hashed uniform grid. A query takes bounds of query spheres, inflated by the distance at which
+obstacles contribute to the cost, and returns the cuboids that share a grid cell with any query.
+The collision checker then compacts these candidates into smaller obstacle tensors, so the
+collision kernels only visit cuboids near the queried spheres. Candidates are a superset of the
+cuboids within the inflated bounds, so collision results are unchanged.
+
+The grid is stored as a sorted list of (cell key, cuboid) pairs in device tensors, and queries are
+vectorized with :func:`torch.searchsorted`. Bounds are recomputed only for cuboids passed to
+:meth:`ObbGridIndex.update_obbs`. Other in-place edits of the obstacle tensors are detected from
+tensor versions at the next query and trigger a recompute of all bounds. Queries synchronize with
+the device to size the compacted tensors, so the index cannot be used inside a CUDA graph.
+"""
+
+from __future__ import annotations
+
+# Standard Library
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
+
+# Third Party
+import torch
+
+# CuRobo
+from curobo.geom.transform import torch_quaternion_to_matrix
+from curobo.types.base import TensorDeviceType
+from curobo.util.logger import log_error
+
+#: Number of grid cells per axis that can be addressed in a cell key.
+_CELL_KEY_RANGE = 1 << 16
+
+
+@dataclass
+class ObbGridIndexConfig:
+    """Parameters of the uniform grid index over cuboid obstacles."""
+
+    #: Length of a grid cell in meters. Should be close to the size of query spheres inflated by
+    #: the activation distance. Smaller cells cull more cuboids but store more cells per cuboid.
+    cell_size: float = 0.25
+
+    #: Cuboids covering more grid cells than this (e.g., floors and walls) are not stored in the
+    #: grid and are instead returned as candidates for every query in their environment.
+    max_cells_per_obb: int = 512
+
+    def __post_init__(self):
+        if self.cell_size <= 0.0:
+            log_error("cell_size should be positive, got " + str(self.cell_size))
+        if self.max_cells_per_obb <= 0:
+            log_error("max_cells_per_obb should be positive, got " + str(self.max_cells_per_obb))
+
+
+def get_obb_world_bounds(
+    obb_dims: torch.Tensor, obb_inv_pose: torch.Tensor
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Compute world axis aligned bounding boxes of cuboids.
+
+    Args:
+        obb_dims: Dimensions of cuboids [..., 3 or 4].
+        obb_inv_pose: Pose of world in cuboid frame [..., 7 or 8] as (x, y, z, qw, qx, qy, qz).
+
+    Returns:
+        Tuple[torch.Tensor, torch.Tensor]: Lower and upper corners of bounding boxes [..., 3].
+    """
+    rot = torch_quaternion_to_matrix(obb_inv_pose[..., 3:7].float())
+    center = -torch.einsum("...ji,...j->...i", rot, obb_inv_pose[..., :3].float())
+    half_extents = torch.einsum("...ji,...j->...i", torch.abs(rot), obb_dims[..., :3].float() / 2)
+    return center - half_extents, center + half_extents
+
+
+def _enumerate_cells(
+    lo_cell: torch.Tensor, hi_cell: torch.Tensor
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """List grid cells covered by integer bounds.
+
+    Args:
+        lo_cell: Lower cell index of every box [n, 3].
+        hi_cell: Upper cell index of every box (inclusive) [n, 3].
+
+    Returns:
+        Tuple[torch.Tensor, torch.Tensor]: Index of box owning each cell [m], and cell index [m, 3].
+    """
+    extent = hi_cell - lo_cell + 1
+    counts = torch.prod(extent, dim=-1)
+    owner = torch.repeat_interleave(torch.arange(lo_cell.shape[0], device=lo_cell.device), counts)
+    offsets = torch.cumsum(counts, dim=0) - counts
+    local = torch.arange(owner.shape[0], device=lo_cell.device) - offsets[owner]
+    owner_extent = extent[owner]
+    z = local % owner_extent[:, 2]
+    local = local // owner_extent[:, 2]
+    y = local % owner_extent[:, 1]
+    x = local // owner_extent[:, 1]
+    cells = lo_cell[owner] + torch.stack([x, y, z], dim=-1)
+    return owner, cells
+
+
+class ObbGridIndex:
+    """Hashed uniform grid over cuboid obstacles of all environments."""
+
+    def __init__(
+        self,
+        config: ObbGridIndexConfig = ObbGridIndexConfig(),
+        tensor_args: TensorDeviceType = TensorDeviceType(),
+    ):
+        """Initialize an empty index.
+
+        Args:
+            config: Parameters of the grid.
+            tensor_args: Device of obstacle tensors.
+        """
+        self.config = config
+        self.tensor_args = tensor_args
+        self._obb_tensors = None
+        self._tensor_version = None
+        self._lower = None
+        self._upper = None
+        self._valid = None
+        self._table_dirty = True
+        self._cell_keys = None
+        self._cell_obbs = None
+        self._large_obbs = None
+        #: Number of times bounds of all cuboids were recomputed.
+        self.full_updates = 0
+        #: Number of times the sorted cell table was rebuilt.
+        self.table_updates = 0
+
+    @property
+    def n_obbs(self) -> int:
+        """Number of enabled cuboids in the index, across all environments."""
+        if self._valid is None:
+            return 0
+        return int(torch.count_nonzero(self._valid).item())
+
+    def set_obb_tensors(
+        self,
+        obb_dims: torch.Tensor,
+        obb_inv_pose: torch.Tensor,
+        obb_enable: torch.Tensor,
+        env_n_obbs: torch.Tensor,
+    ):
+        """Set obstacle tensors to index and compute bounds of all cuboids.
+
+        Args:
+            obb_dims: Dimensions of cuboids [n_envs, n_obbs, 4].
+            obb_inv_pose: Pose of world in cuboid frame [n_envs, n_obbs, 8].
+            obb_enable: Enable flag of cuboids [n_envs, n_obbs].
+            env_n_obbs: Number of cuboids in every environment [n_envs].
+        """
+        self._obb_tensors = [obb_dims, obb_inv_pose, obb_enable, env_n_obbs]
+        self.refresh()
+
+    def update_obbs(
+        self,
+        env_idx: Union[int, torch.Tensor],
+        obb_idx: Union[int, torch.Tensor],
+    ):
+        """Recompute bounds of modified cuboids.
+
+        Call after changing pose, dimensions, or enable flag of cuboids in the indexed tensors.
+
+        Args:
+            env_idx: Environment index of modified cuboids.
+            obb_idx: Index of modified cuboids in their environment.
+        """
+        if self._obb_tensors is None:
+            return
+        obb_dims, obb_inv_pose, obb_enable, env_n_obbs = self._obb_tensors
+        lower, upper = get_obb_world_bounds(
+            obb_dims[env_idx, obb_idx], obb_inv_pose[env_idx, obb_idx]
+        )
+        self._lower[env_idx, obb_idx] = lower
+        self._upper[env_idx, obb_idx] = upper
+        self._valid[env_idx, obb_idx] = (obb_enable[env_idx, obb_idx] != 0) & (
+            torch.as_tensor(obb_idx, device=obb_dims.device) < env_n_obbs[env_idx]
+        )
+        self._tensor_version = self._get_tensor_version()
+        self._table_dirty = True
+
+    def refresh(self):
+        """Recompute bounds of all cuboids. Call after modifying many cuboids at once."""
+        if self._obb_tensors is None:
+            return
+        obb_dims, obb_inv_pose, obb_enable, env_n_obbs = self._obb_tensors
+        self._lower, self._upper = get_obb_world_bounds(obb_dims, obb_inv_pose)
+        n_obbs = obb_dims.shape[1]
+        obb_range = torch.arange(n_obbs, device=obb_dims.device).unsqueeze(0)
+        self._valid = (obb_enable != 0) & (obb_range < env_n_obbs.view(-1, 1))
+        self._tensor_version = self._get_tensor_version()
+        self._table_dirty = True
+        self.full_updates += 1
+
+    def get_candidates(
+        self,
+        lower: torch.Tensor,
+        upper: torch.Tensor,
+        env_idx: Optional[torch.Tensor] = None,
+    ) -> torch.Tensor:
+        """Find cuboids that may intersect query bounds.
+
+        Args:
+            lower: Lower corner of query bounds [n, 3].
+            upper: Upper corner of query bounds [n, 3].
+            env_idx: Environment index of every query [n]. All queries are in environment 0 when
+                None.
+
+        Returns:
+            torch.Tensor: Boolean mask of candidate cuboids [n_envs, n_obbs].
+        """
+        if self._obb_tensors is None:
+            log_error("ObbGridIndex has no obstacle tensors, call set_obb_tensors first")
+        if self._tensor_version != self._get_tensor_version():
+            self.refresh()
+        if self._table_dirty:
+            self._build_table()
+        n_envs, n_obbs = self._valid.shape
+        device = self._valid.device
+        candidates = torch.zeros((n_envs * n_obbs), dtype=torch.bool, device=device)
+        if env_idx is None:
+            env_idx = torch.zeros(lower.shape[0], dtype=torch.long, device=device)
+        env_idx = env_idx.to(dtype=torch.long)
+        if lower.shape[0] > 0:
+            # large cuboids of queried environments:
+            query_envs = torch.zeros(n_envs, dtype=torch.bool, device=device)
+            query_envs[env_idx] = True
+            large = self._large_obbs & query_envs.unsqueeze(1)
+            candidates |= large.view(-1)
+
+            lo_cell = self._get_cell(lower)
+            hi_cell = self._get_cell(upper)
+            large_query = torch.prod(hi_cell - lo_cell + 1, dim=-1) > self.config.max_cells_per_obb
+            if torch.any(large_query):
+                # queries covering many cells visit all cuboids of their environment:
+                query_envs[:] = False
+                query_envs[env_idx[large_query]] = True
+                candidates |= (self._valid & query_envs.unsqueeze(1)).view(-1)
+                lo_cell = lo_cell[~large_query]
+                hi_cell = hi_cell[~large_query]
+                env_idx = env_idx[~large_query]
+            if self._cell_keys.shape[0] > 0 and lo_cell.shape[0] > 0:
+                owner, cells = _enumerate_cells(lo_cell, hi_cell)
+                keys = torch.unique(self._get_cell_keys(env_idx[owner], cells))
+                start = torch.searchsorted(self._cell_keys, keys, side="left")
+                end = torch.searchsorted(self._cell_keys, keys, side="right")
+                counts = end - start
+                match = torch.repeat_interleave(start, counts)
+                match_offsets = torch.cumsum(counts, dim=0) - counts
+                match = match + (
+                    torch.arange(match.shape[0], device=device)
+                    - torch.repeat_interleave(match_offsets, counts)
+                )
+                candidates[self._cell_obbs[match]] = True
+        return candidates.view(n_envs, n_obbs)
+
+    def compact(self, candidates: torch.Tensor) -> Tuple[List[torch.Tensor], torch.Tensor, int]:
+        """Gather candidate cuboids into the leading indices of smaller obstacle tensors.
+
+        Args:
+            candidates: Boolean mask of cuboids from :meth:`get_candidates`.
+
+        Returns:
+            Tuple[List[torch.Tensor], torch.Tensor, int]: Dimensions, inverse poses, and enable
+            flags of candidate cuboids, number of candidates in every environment, and maximum
+            number of candidates across environments.
+        """
+        obb_dims, obb_inv_pose, obb_enable, _ = self._obb_tensors
+        n_env_candidates = torch.count_nonzero(candidates, dim=1)
+        max_candidates = max(int(torch.max(n_env_candidates).item()), 1)
+        order = torch.argsort((~candidates).to(torch.uint8), dim=1, stable=True)
+        order = order[:, :max_candidates]
+        dims = torch.gather(obb_dims, 1, order.unsqueeze(-1).expand(-1, -1, obb_dims.shape[-1]))
+        pose = torch.gather(
+            obb_inv_pose, 1, order.unsqueeze(-1).expand(-1, -1, obb_inv_pose.shape[-1])
+        )
+        enable = torch.gather(obb_enable, 1, order) * torch.gather(candidates, 1, order)
+        return [dims, pose, enable], n_env_candidates.to(dtype=torch.int32), max_candidates
+
+    def _get_tensor_version(self) -> Tuple:
+        return tuple((id(t), t._version) for t in self._obb_tensors)
+
+    def _get_cell(self, position: torch.Tensor) -> torch.Tensor:
+        cell = torch.floor(position / self.config.cell_size).to(dtype=torch.long)
+        half_range = _CELL_KEY_RANGE // 2
+        return torch.clamp(cell, -half_range, half_range - 1)
+
+    def _get_cell_keys(self, env_idx: torch.Tensor, cells: torch.Tensor) -> torch.Tensor:
+        cells = cells + _CELL_KEY_RANGE // 2
+        key = env_idx
+        for i in range(3):
+            key = key * _CELL_KEY_RANGE + cells[:, i]
+        return key
+
+    def _build_table(self):
+        n_envs, n_obbs = self._valid.shape
+        lo_cell = self._get_cell(self._lower.view(-1, 3))
+        hi_cell = self._get_cell(self._upper.view(-1, 3))
+        n_cells = torch.prod(hi_cell - lo_cell + 1, dim=-1)
+        valid = self._valid.view(-1)
+        large = valid & (n_cells > self.config.max_cells_per_obb)
+        small_idx = torch.nonzero(valid & ~large).view(-1)
+
+        owner, cells = _enumerate_cells(lo_cell[small_idx], hi_cell[small_idx])
+        obb_flat_idx = small_idx[owner]
+        keys = self._get_cell_keys(obb_flat_idx // n_obbs, cells)
+        keys, order = torch.sort(keys)
+        self._cell_keys = keys
+        self._cell_obbs = obb_flat_idx[order]
+        self._large_obbs = large.view(n_envs, n_obbs)
+        self._table_dirty = False
+        self.table_updates += 1
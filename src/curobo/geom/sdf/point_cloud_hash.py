@@ -0,0 +1,206 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""
+Spatial hash of point clouds for collision checking without meshing.
+
+:class:`~curobo.geom.types.PointCloud` obstacles are converted to meshes before other collision
+checkers can use them, which adds a meshing step for every frame of streaming depth data.
+:class:`PointCloudHash` instead stores points of all environments in world frame, in a table
+sorted by the hash key of the cubic cell of :attr:`PointCloudHashConfig.cell_size` containing
+each point. Keys pack the environment index and cell coordinates as in
+:mod:`curobo.geom.sdf.sparse_voxel`, so looking up the points of a cell is a vectorized
+:func:`torch.searchsorted`.
+
+Signed distance of a position is the distance to the nearest point, subtracted from
+:attr:`PointCloudHashConfig.point_radius`. Positions search all cells within
+:attr:`PointCloudHashConfig.far_distance` of their cell, so distance is exact up to
+``far_distance`` and positions farther from all points read ``point_radius - far_distance``.
+Collision cost is zero for spheres farther than their radius plus activation distance from
+points, so costs are exact when ``far_distance`` is larger than the radius of query spheres plus
+the activation distance and ``point_radius``.
+
+Points are inserted and removed in batches, each batch being a named point cloud in an
+environment. Only the table is re-sorted on insert and remove, queries read the table with
+PyTorch and run on any device, see
+:class:`~curobo.geom.sdf.world_point_cloud.WorldPointCloudCollision`. Queries read
+:attr:`PointCloudHash.max_cell_points` points from every searched cell, so denser clouds are
+slower to query.
+"""
+
+from __future__ import annotations
+
+# Standard Library
+from dataclasses import dataclass
+
+# Third Party
+import torch
+
+# CuRobo
+from curobo.curobolib.geom import _torch_point_cloud_cell_keys
+from curobo.types.base import TensorDeviceType
+from curobo.util.logger import log_error, log_warn
+
+
+@dataclass
+class PointCloudHashConfig:
+    """Parameters of the spatial hash storing point clouds."""
+
+    #: Edge length of hash cells in meters. Queries search ``(2 * ceil(far_distance / cell_size)
+    #: + 1) ^ 3`` cells, while larger cells store more points that are read by every query.
+    cell_size: float = 0.1
+
+    #: Distance in meters from points within which signed distance is exact. Should be larger
+    #: than the radius of query spheres plus the collision activation distance.
+    far_distance: float = 0.1
+
+    #: Radius of points in meters. Points are checked as spheres of this radius, e.g., to account
+    #: for noise of depth sensors or the spacing between points on a surface.
+    point_radius: float = 0.0
+
+    def __post_init__(self):
+        if self.cell_size <= 0.0:
+            log_error("cell_size should be positive, got " + str(self.cell_size))
+        if self.far_distance <= 0.0:
+            log_error("far_distance should be positive, got " + str(self.far_distance))
+        if self.point_radius < 0.0:
+            log_error("point_radius should not be negative, got " + str(self.point_radius))
+
+
+class PointCloudHash:
+    """Points of all environments stored in a table sorted by the hash key of their cell."""
+
+    def __init__(
+        self,
+        config: PointCloudHashConfig = PointCloudHashConfig(),
+        tensor_args: TensorDeviceType = TensorDeviceType(),
+    ):
+        """Initialize an empty hash.
+
+        Args:
+            config: Parameters of the hash.
+            tensor_args: Device and floating point precision of stored points.
+        """
+        self.config = config
+        self.tensor_args = tensor_args
+        #: Sorted cell keys of stored points [n_points].
+        self.keys = torch.zeros(0, dtype=torch.long, device=tensor_args.device)
+        #: Stored points in world frame [n_points, 3].
+        self.points = torch.zeros((0, 3), dtype=tensor_args.dtype, device=tensor_args.device)
+        #: Index of the point cloud of each stored point in its environment [n_points].
+        self.slots = torch.zeros(0, dtype=torch.long, device=tensor_args.device)
+        #: Largest number of points stored in a cell, read by queries from every searched cell.
+        self.max_cell_points = 0
+
+    @property
+    def n_points(self) -> int:
+        """Number of stored points across all point clouds and environments."""
+        return self.keys.shape[0]
+
+    @property
+    def memory_bytes(self) -> int:
+        """Memory used to store points in bytes, including keys and point cloud indices."""
+        return sum(t.numel() * t.element_size() for t in [self.keys, self.points, self.slots])
+
+    def insert(self, points: torch.Tensor, env_idx: int, slot: int) -> int:
+        """Insert points of a point cloud.
+
+        Points that are not finite or that are too far from the origin to be hashed are dropped.
+
+        Args:
+            points: Points in world frame [n, 3].
+            env_idx: Environment index of the point cloud.
+            slot: Index of the point cloud in its environment.
+
+        Returns:
+            int: Number of inserted points.
+        """
+        points = points.view(-1, 3).to(device=self.tensor_args.device, dtype=self.tensor_args.dtype)
+        env = torch.full_like(points[:, 0], env_idx, dtype=torch.long)
+        keys = _torch_point_cloud_cell_keys(points, env, self.config.cell_size)
+        valid = torch.all(torch.isfinite(points), dim=-1) & (keys >= 0)
+        n_valid = int(torch.count_nonzero(valid).item())
+        if n_valid < points.shape[0]:
+            log_warn(
+                "Dropped "
+                + str(points.shape[0] - n_valid)
+                + " points that are not finite or too far from the origin"
+            )
+            points = points[valid]
+            keys = keys[valid]
+        slots = torch.full_like(keys, slot)
+        keys = torch.cat([self.keys, keys])
+        order = torch.argsort(keys, stable=True)
+        self.keys = keys[order]
+        self.points = torch.cat([self.points, points])[order]
+        self.slots = torch.cat([self.slots, slots])[order]
+        self._update_max_cell_points()
+        return n_valid
+
+    def remove(self, env_idx: int, slot: int) -> int:
+        """Remove all points of a point cloud.
+
+        Args:
+            env_idx: Environment index of the point cloud.
+            slot: Index of the point cloud in its environment.
+
+        Returns:
+            int: Number of removed points.
+        """
+        return self._remove_points(self._get_cloud_mask(env_idx, slot))
+
+    def remove_env(self, env_idx: int) -> int:
+        """Remove points of all point clouds in an environment.
+
+        Args:
+            env_idx: Environment index.
+
+        Returns:
+            int: Number of removed points.
+        """
+        return self._remove_points(self.keys >> 48 == env_idx)
+
+    def clear(self):
+        """Remove all stored points."""
+        self._remove_points(torch.ones_like(self.keys, dtype=torch.bool))
+
+    def get_points(self, env_idx: int, slot: int) -> torch.Tensor:
+        """Get stored points of a point cloud in world frame.
+
+        Args:
+            env_idx: Environment index of the point cloud.
+            slot: Index of the point cloud in its environment.
+
+        Returns:
+            torch.Tensor: Points in world frame [n, 3].
+        """
+        return self.points[self._get_cloud_mask(env_idx, slot)]
+
+    def _get_cloud_mask(self, env_idx: int, slot: int) -> torch.Tensor:
+        """Boolean mask of stored points that belong to a point cloud."""
+        return (self.keys >> 48 == env_idx) & (self.slots == slot)
+
+    def _remove_points(self, remove: torch.Tensor) -> int:
+        """Remove stored points given a boolean mask over points."""
+        n_remove = int(torch.count_nonzero(remove).item())
+        if n_remove > 0:
+            self.keys = self.keys[~remove]
+            self.points = self.points[~remove]
+            self.slots = self.slots[~remove]
+            self._update_max_cell_points()
+        return n_remove
+
+    def _update_max_cell_points(self):
+        """Count points of the fullest cell, so that queries do not synchronize with the device."""
+        if self.keys.shape[0] == 0:
+            self.max_cell_points = 0
+            return
+        _, counts = torch.unique_consecutive(self.keys, return_counts=True)
+        self.max_cell_points = int(torch.max(counts).item())
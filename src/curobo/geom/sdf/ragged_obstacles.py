@@ -0,0 +1,149 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""
+Ragged storage of obstacles across environments of a batched world.
+
+Obstacle caches of :class:`~curobo.geom.sdf.world.WorldPrimitiveCollision` and
+:class:`~curobo.geom.sdf.world_mesh.WorldMeshCollision` store obstacles in tensors of shape
+[n_envs, max_obstacles, ...], so every environment uses memory for as many obstacles as the
+largest environment. With :attr:`~curobo.geom.sdf.world.WorldCollisionConfig.ragged_obstacles`,
+obstacles of all environments are instead stored back to back in slots of tensors of shape
+[n_slots, 1, ...], and :class:`RaggedObstacleSlots` stores the first slot of every environment.
+
+Collision kernels read obstacle ``i`` of environment ``e`` from ``max_obstacles * e + i`` and
+the number of obstacles of ``e`` from ``n_env_obstacles[e]``. Ragged tensors have
+``max_obstacles = 1``, so the kernels read environment ``e`` from its first slot when queries
+pass :meth:`RaggedObstacleSlots.get_env_query_idx` as the environment index and
+:attr:`RaggedObstacleSlots.slot_counts`, which stores the number of slots of every environment
+at its first slot, as the number of obstacles. Queries of an environment only iterate over the
+slots of that environment, and the existing kernels are used without changes.
+
+Every environment has at least one slot, so that environment 0 always starts at slot 0 and
+queries without environment indices read environment 0. Slots that do not store an obstacle are
+disabled.
+"""
+
+from __future__ import annotations
+
+# Standard Library
+from typing import List, Optional
+
+# Third Party
+import torch
+
+# CuRobo
+from curobo.util.logger import log_error
+
+
+class RaggedObstacleSlots:
+    """Slots of every environment in ragged obstacle tensors of shape [n_slots, 1, ...]."""
+
+    def __init__(self, env_capacity: List[int], device: torch.device):
+        """Initialize slots of environments.
+
+        Args:
+            env_capacity: Number of obstacles to store in every environment. Environments
+                get at least one slot.
+            device: Device of tensors passed to collision kernels.
+        """
+        if len(env_capacity) < 1:
+            log_error("Ragged obstacle storage requires at least one environment")
+        self.device = device
+        #: Number of slots of every environment.
+        self.env_capacity = [max(int(c), 1) for c in env_capacity]
+        #: First slot of every environment, followed by the total number of slots [n_envs + 1].
+        self.env_offsets = [0]
+        for c in self.env_capacity:
+            self.env_offsets.append(self.env_offsets[-1] + c)
+        #: First slot of every environment, used as environment index by kernels [n_envs].
+        self.env_start = torch.as_tensor(self.env_offsets[:-1], dtype=torch.int32, device=device)
+        #: Number of slots of every environment, stored at its first slot [n_slots].
+        self.slot_counts = torch.zeros(self.n_slots, dtype=torch.int32, device=device)
+        self.slot_counts[self.env_start.long()] = torch.as_tensor(
+            self.env_capacity, dtype=torch.int32, device=device
+        )
+
+    @property
+    def n_envs(self) -> int:
+        """Number of environments."""
+        return len(self.env_capacity)
+
+    @property
+    def n_slots(self) -> int:
+        """Number of slots across all environments."""
+        return self.env_offsets[-1]
+
+    def get_slot(self, env_idx: int, obs_idx: int) -> int:
+        """Get the slot of an obstacle.
+
+        Args:
+            env_idx: Environment index of the obstacle.
+            obs_idx: Index of the obstacle in its environment.
+
+        Returns:
+            int: Index of the slot in ragged tensors.
+        """
+        return self.env_offsets[env_idx] + int(obs_idx)
+
+    def get_env_tensors(self, tensors: List[torch.Tensor], env_idx: int) -> List[torch.Tensor]:
+        """Get views of the slots of an environment.
+
+        Args:
+            tensors: Ragged tensors of shape [n_slots, 1, ...].
+            env_idx: Environment index.
+
+        Returns:
+            List[torch.Tensor]: Views of shape [env_capacity, ...], matching ``tensor[env_idx]``
+            of padded tensors.
+        """
+        start = self.env_offsets[env_idx]
+        end = self.env_offsets[env_idx + 1]
+        return [t[start:end, 0] for t in tensors]
+
+    def get_env_query_idx(
+        self, env_query_idx: Optional[torch.Tensor], batch_size: int
+    ) -> Optional[torch.Tensor]:
+        """Convert environment indices of queries to the first slot of their environments.
+
+        Args:
+            env_query_idx: Environment index of every batch of query spheres.
+            batch_size: Number of batches of query spheres.
+
+        Returns:
+            Optional[torch.Tensor]: Index to pass to collision kernels as the environment index
+            [batch_size]. None when env_query_idx is None, as environment 0 starts at slot 0.
+        """
+        if env_query_idx is None:
+            return None
+        return self.env_start[env_query_idx.view(-1)[:batch_size].long()]
+
+    def copy_slots(
+        self,
+        tensors: List[torch.Tensor],
+        new_slots: RaggedObstacleSlots,
+        new_tensors: List[torch.Tensor],
+    ):
+        """Copy obstacles to ragged tensors with different slots.
+
+        Environments keep their index, and obstacles that do not fit in the new slots of their
+        environment are dropped.
+
+        Args:
+            tensors: Ragged tensors with these slots.
+            new_slots: Slots of new_tensors.
+            new_tensors: Ragged tensors to copy obstacles to.
+        """
+        for env_idx in range(min(self.n_envs, new_slots.n_envs)):
+            n = min(self.env_capacity[env_idx], new_slots.env_capacity[env_idx])
+            src = self.get_env_tensors(tensors, env_idx)
+            dst = new_slots.get_env_tensors(new_tensors, env_idx)
+            for s, d in zip(src, dst):
+                d[:n] = s[:n]
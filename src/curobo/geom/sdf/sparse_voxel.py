@@ -0,0 +1,98 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""
+Sparse storage of signed distance voxel grids in fixed-size blocks.
+
+Dense voxel grids store every voxel of their bounding box, although most voxels of large scenes
+are far from any obstacle and only contribute a constant negative distance. A sparse voxel grid
+splits a grid into cubes of :attr:`SparseVoxelConfig.block_size` voxels per edge and stores only
+blocks with at least one voxel closer to an obstacle than :attr:`SparseVoxelConfig.far_distance`.
+Voxels of blocks that are not stored read as ``-far_distance``.
+
+Blocks are addressed by an integer key packing the layer and block coordinates. Keys of stored
+blocks are kept sorted, so a lookup is a vectorized :func:`torch.searchsorted`, as in
+:mod:`curobo.geom.sdf.obb_index`. Signed distance is trilinearly interpolated between voxel
+centers, giving a continuous gradient. Queries run on any device with PyTorch, see
+:class:`~curobo.geom.sdf.world_sparse_voxel.WorldSparseVoxelCollision`.
+
+Collision cost is zero for spheres farther than their radius plus activation distance from
+obstacles, so dropping blocks does not change collision cost when ``far_distance`` is larger than
+the radius of query spheres plus the activation distance.
+"""
+
+from __future__ import annotations
+
+# Standard Library
+from dataclasses import dataclass
+from typing import Tuple
+
+# Third Party
+import torch
+
+# CuRobo
+from curobo.util.logger import log_error
+
+
+@dataclass
+class SparseVoxelConfig:
+    """Parameters of sparse block storage for voxel grids."""
+
+    #: Number of voxels along each edge of a block.
+    block_size: int = 8
+
+    #: Distance in meters from obstacles beyond which voxels are not stored. Should be larger
+    #: than the radius of query spheres plus the collision activation distance.
+    far_distance: float = 0.5
+
+    def __post_init__(self):
+        if self.block_size <= 0:
+            log_error("block_size should be positive, got " + str(self.block_size))
+        if self.far_distance <= 0.0:
+            log_error("far_distance should be positive, got " + str(self.far_distance))
+
+
+def get_sparse_voxel_blocks(
+    features: torch.Tensor, block_size: int, far_distance: float
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Split a dense grid of signed distances into blocks, keeping blocks near obstacles.
+
+    Distances are clamped to ``-far_distance``, so that interpolation across stored and
+    unallocated blocks is continuous.
+
+    Args:
+        features: Signed distance of voxels, positive inside obstacles [x_voxels, y_voxels,
+            z_voxels].
+        block_size: Number of voxels along each edge of a block.
+        far_distance: Distance from obstacles beyond which voxels are not stored.
+
+    Returns:
+        Tuple[torch.Tensor, torch.Tensor]: Coordinates of stored blocks [n_blocks, 3] and signed
+        distance of their voxels [n_blocks, block_size^3], in x, y, z order within a block.
+    """
+    if features.ndim != 3:
+        log_error("features should have shape [x, y, z], got " + str(features.shape))
+    n_blocks = [-(-s // block_size) for s in features.shape]
+    padded = torch.full(
+        [n * block_size for n in n_blocks],
+        -far_distance,
+        dtype=features.dtype,
+        device=features.device,
+    )
+    padded[: features.shape[0], : features.shape[1], : features.shape[2]] = torch.clamp(
+        features, min=-far_distance
+    )
+    blocks = padded.view(
+        n_blocks[0], block_size, n_blocks[1], block_size, n_blocks[2], block_size
+    ).permute(0, 2, 4, 1, 3, 5)
+    blocks = blocks.reshape(n_blocks[0], n_blocks[1], n_blocks[2], block_size**3)
+    occupied = torch.any(blocks > -far_distance, dim=-1)
+    block_xyz = torch.nonzero(occupied)
+    return block_xyz, blocks[occupied]
@@ -46,5 +46,15 @@ def create_collision_checker(config: WorldCollisionConfig) -> WorldCollision:
         from curobo.geom.sdf.world_voxel import WorldVoxelCollision
 
         return WorldVoxelCollision(config)
+    elif config.checker_type == CollisionCheckerType.SPARSE_VOXEL:
+        # CuRobo
+        from curobo.geom.sdf.world_sparse_voxel import WorldSparseVoxelCollision
+
+        return WorldSparseVoxelCollision(config)
+    elif config.checker_type == CollisionCheckerType.POINT_CLOUD:
+        # CuRobo
+        from curobo.geom.sdf.world_point_cloud import WorldPointCloudCollision
+
+        return WorldPointCloudCollision(config)
     else:
         log_error("Unknown Collision Checker type: " + config.checker_type, exc_info=True)
@@ -0,0 +1,240 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""
+Coarse-to-fine pyramid over voxel grids for culling collision queries.
+
+:class:`~curobo.geom.sdf.world_voxel.WorldVoxelCollision` reads the full resolution grid for
+every query sphere, although most spheres of a trajectory are far from obstacles and have zero
+collision cost. :class:`VoxelPyramid` stores coarser levels of each voxel grid, where a voxel of
+a level holds the maximum signed distance of the :attr:`VoxelPyramidConfig.factor` ^ 3 voxels it
+covers in the finer level. Signed distance is positive inside obstacles, so the value of a coarse
+voxel is an upper bound of signed distance in its region.
+
+A query first reads the coarsest level. Spheres whose upper bound is farther than their radius
+plus the activation distance from obstacles have zero cost and are resolved. Only unresolved
+spheres read the next finer level. Spheres that are resolved in every voxel grid are passed to
+the collision kernels with a negative radius, which the kernels skip without reading voxels.
+Collision results are unchanged.
+
+Swept queries check segments between consecutive timesteps. Signed distance changes by at most
+the distance moved, so the bound of a swept sphere is inflated by half the length of its
+segments and by the diagonal of a voxel. This assumes voxels store Euclidean distance, grids of
+truncated distance should be clamped to a constant beyond the truncation distance.
+
+Queries synchronize with the device to compact unresolved spheres, so the pyramid cannot be
+used inside a CUDA graph. The pyramid is rebuilt when voxel features are modified in place.
+"""
+
+from __future__ import annotations
+
+# Standard Library
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Third Party
+import torch
+import torch.nn.functional as F
+
+# CuRobo
+from curobo.geom.transform import torch_quaternion_to_matrix
+from curobo.util.logger import log_error
+
+
+@dataclass
+class VoxelPyramidConfig:
+    """Parameters of the coarse-to-fine pyramid over voxel grids."""
+
+    #: Number of coarse levels above the full resolution grid.
+    levels: int = 2
+
+    #: Number of voxels along each edge of the region covered by a voxel of the next level.
+    factor: int = 4
+
+    def __post_init__(self):
+        if self.levels <= 0:
+            log_error("levels should be positive, got " + str(self.levels))
+        if self.factor <= 1:
+            log_error("factor should be larger than 1, got " + str(self.factor))
+
+
+class VoxelPyramid:
+    """Max-distance pyramid over voxel grids of all environments."""
+
+    def __init__(self, config: VoxelPyramidConfig = VoxelPyramidConfig()):
+        """Initialize an empty pyramid.
+
+        Args:
+            config: Parameters of the pyramid.
+        """
+        self.config = config
+        self._voxel_tensors = None
+        self._grid_shape = None
+        self._tensor_version = None
+        self._levels = None
+        #: Number of times all levels were rebuilt.
+        self.full_updates = 0
+        #: Number of query spheres checked against the pyramid.
+        self.queried_spheres = 0
+        #: Number of query spheres resolved by the pyramid.
+        self.culled_spheres = 0
+
+    def set_voxel_tensors(
+        self,
+        voxel_params: torch.Tensor,
+        voxel_pose: torch.Tensor,
+        voxel_enable: torch.Tensor,
+        voxel_features: torch.Tensor,
+        grid_shape: List[int],
+    ):
+        """Set voxel tensors to build the pyramid over.
+
+        Args:
+            voxel_params: Dimensions and voxel size of grids [n_envs, n_layers, 4].
+            voxel_pose: Pose of world in grid frame [n_envs, n_layers, 8].
+            voxel_enable: Enable flag of grids [n_envs, n_layers].
+            voxel_features: Signed distance of voxels [n_envs, n_layers, n_voxels, 1].
+            grid_shape: Number of voxels along each axis of a grid.
+        """
+        self._voxel_tensors = [voxel_params, voxel_pose, voxel_enable, voxel_features]
+        self._grid_shape = list(grid_shape)
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild all levels from voxel features."""
+        if self._voxel_tensors is None:
+            return
+        voxel_features = self._voxel_tensors[3]
+        n_envs, n_layers = voxel_features.shape[:2]
+        level = voxel_features.view(n_envs * n_layers, 1, *self._grid_shape).float()
+        self._levels = []
+        for _ in range(self.config.levels):
+            level = F.max_pool3d(
+                level, self.config.factor, stride=self.config.factor, ceil_mode=True
+            )
+            self._levels.append(level.view(n_envs, n_layers, *level.shape[2:]))
+        self._tensor_version = self._get_tensor_version()
+        self.full_updates += 1
+
+    @property
+    def memory_bytes(self) -> int:
+        """Memory used by coarse levels in bytes."""
+        if self._levels is None:
+            return 0
+        return sum(t.numel() * t.element_size() for t in self._levels)
+
+    def get_far_spheres(
+        self,
+        query_sphere: torch.Tensor,
+        margin: torch.Tensor,
+        env_query_idx: Optional[torch.Tensor] = None,
+        sweep: bool = False,
+    ) -> torch.Tensor:
+        """Find query spheres that have zero collision cost in all voxel grids.
+
+        Args:
+            query_sphere: Query spheres [batch, horizon, number of spheres, 4].
+            margin: Distance outside spheres at which obstacles contribute to the cost.
+            env_query_idx: Environment index for each batch of query spheres. All batches are in
+                environment 0 when None.
+            sweep: Include the segments swept by spheres between consecutive timesteps.
+
+        Returns:
+            torch.Tensor: Boolean mask of far spheres [batch, horizon, number of spheres].
+        """
+        if self._voxel_tensors is None:
+            log_error("VoxelPyramid has no voxel tensors, call set_voxel_tensors first")
+        if self._tensor_version != self._get_tensor_version():
+            self.refresh()
+        voxel_params, voxel_pose, voxel_enable, _ = self._voxel_tensors
+        b, h, n, _ = query_sphere.shape
+        spheres = query_sphere.detach().float()
+        radius = spheres[..., 3] + margin.view(-1)[0]
+        if sweep and h > 1:
+            sphere_0 = torch.cat([spheres[:, :1], spheres[:, :-1]], dim=1)
+            sphere_2 = torch.cat([spheres[:, 1:], spheres[:, -1:]], dim=1)
+            segment = torch.maximum(
+                torch.linalg.norm(spheres[..., :3] - sphere_0[..., :3], dim=-1),
+                torch.linalg.norm(spheres[..., :3] - sphere_2[..., :3], dim=-1),
+            )
+            radius = radius + 0.5 * segment
+        position = spheres[..., :3].reshape(b, h * n, 3)
+        radius = radius.reshape(b, h * n)
+        if env_query_idx is None:
+            env_idx = torch.zeros(b, dtype=torch.long, device=spheres.device)
+        else:
+            env_idx = env_query_idx.view(-1)[:b].to(dtype=torch.long)
+
+        far = spheres[..., 3].reshape(b, h * n) >= 0.0
+        for layer_idx in range(voxel_params.shape[1]):
+            enable = (voxel_enable[env_idx, layer_idx] != 0).view(b, 1)
+            params = voxel_params[env_idx, layer_idx].float()
+            pose = voxel_pose[env_idx, layer_idx].float()
+            rot = torch_quaternion_to_matrix(pose[:, 3:7])
+            local = torch.einsum("bij,bnj->bni", rot, position) + pose[:, None, :3]
+            voxel_size = params[:, None, 3]
+            voxel_idx = torch.floor(
+                (local + 0.5 * params[:, None, :3]) / voxel_size.unsqueeze(-1)
+            ).long()
+            layer_radius = radius
+            if sweep:
+                layer_radius = layer_radius + math.sqrt(3) * voxel_size
+            layer_far = self._get_layer_far(
+                voxel_idx, layer_radius, env_idx.view(b, 1).expand(-1, h * n), layer_idx
+            )
+            far &= layer_far | ~enable
+        self.queried_spheres += b * h * n
+        self.culled_spheres += int(torch.count_nonzero(far).item())
+        return far.view(b, h, n)
+
+    def _get_layer_far(
+        self,
+        voxel_idx: torch.Tensor,
+        radius: torch.Tensor,
+        env_idx: torch.Tensor,
+        layer_idx: int,
+    ) -> torch.Tensor:
+        """Resolve spheres of a voxel grid from the coarsest level to the finest level.
+
+        Spheres outside the grid are never resolved, as swept spheres can enter the grid.
+        """
+        grid_shape = torch.as_tensor(self._grid_shape, device=voxel_idx.device)
+        inside = torch.all((voxel_idx >= 0) & (voxel_idx < grid_shape), dim=-1)
+        far = torch.zeros_like(inside)
+        active = torch.nonzero(inside.view(-1)).view(-1)
+        voxel_idx = voxel_idx.view(-1, 3)[active]
+        radius = radius.reshape(-1)[active]
+        env_idx = env_idx.reshape(-1)[active]
+        for level_idx in range(len(self._levels) - 1, -1, -1):
+            if active.shape[0] == 0:
+                break
+            level = self._levels[level_idx]
+            level_voxel = torch.div(
+                voxel_idx, self.config.factor ** (level_idx + 1), rounding_mode="floor"
+            )
+            bound = level[
+                env_idx, layer_idx, level_voxel[:, 0], level_voxel[:, 1], level_voxel[:, 2]
+            ]
+            resolved = bound + radius <= 0.0
+            far.view(-1)[active[resolved]] = True
+            active, voxel_idx, radius, env_idx = self._compact(
+                ~resolved, active, voxel_idx, radius, env_idx
+            )
+        return far
+
+    @staticmethod
+    def _compact(keep: torch.Tensor, *tensors: torch.Tensor) -> Tuple[torch.Tensor, ...]:
+        return tuple(t[keep] for t in tensors)
+
+    def _get_tensor_version(self) -> Tuple:
+        # only features are reduced into levels, poses and enable flags are read at query time:
+        voxel_features = self._voxel_tensors[3]
+        return (id(voxel_features), voxel_features._version)
@@ -0,0 +1,101 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""
+Streaming of large voxel grids into the collision cache, around the reach of a robot.
+
+Facility-scale signed distance maps can be several gigabytes, while a robot only queries voxels
+within its reach. A :class:`~curobo.geom.types.VoxelGrid` with a
+:attr:`~curobo.geom.types.VoxelGrid.file_path` is memory-mapped from disk, and
+:class:`~curobo.geom.sdf.world_voxel.WorldVoxelCollision` copies only a cube of voxels around the
+robot base into the collision cache when :attr:`WorldCollisionConfig.voxel_stream` is set. The cube
+extends :attr:`VoxelStreamConfig.reach_radius` plus :attr:`VoxelStreamConfig.page_margin` from the
+base. Call :meth:`~curobo.geom.sdf.world_voxel.WorldVoxelCollision.update_voxel_region` when the
+robot base moves. A new cube is read from disk only when the reach of the robot leaves the loaded
+cube, so small base motions do not read from disk.
+"""
+
+from __future__ import annotations
+
+# Standard Library
+from dataclasses import dataclass
+from typing import List, Optional
+
+# CuRobo
+from curobo.geom.types import VoxelGrid
+from curobo.types.math import Pose
+from curobo.util.logger import log_error
+
+
+@dataclass
+class VoxelStreamConfig:
+    """Parameters to stream regions of memory-mapped voxel grids into the collision cache."""
+
+    #: Distance in meters from the robot base to the farthest point the robot can reach,
+    #: including the radius of collision spheres.
+    reach_radius: float = 1.5
+
+    #: Additional distance in meters loaded around the reach of the robot. The base can move this
+    #: far before a new region is read from disk.
+    page_margin: float = 0.25
+
+    #: Position of robot base in world frame used when loading the world. Defaults to the center
+    #: of each voxel grid.
+    base_position: Optional[List[float]] = None
+
+    def __post_init__(self):
+        if self.reach_radius <= 0.0:
+            log_error("reach_radius should be positive, got " + str(self.reach_radius))
+        if self.page_margin < 0.0:
+            log_error("page_margin should not be negative, got " + str(self.page_margin))
+
+    @property
+    def region_half_extent(self) -> float:
+        """Distance from robot base to each face of the streamed region."""
+        return self.reach_radius + self.page_margin
+
+
+@dataclass
+class StreamedVoxelRegion:
+    """Region of a memory-mapped voxel grid that is loaded in the collision cache."""
+
+    #: Memory-mapped voxel grid that the region is read from.
+    voxel_grid: VoxelGrid
+
+    #: Center of the loaded region in the frame of :attr:`voxel_grid`.
+    center: List[float]
+
+    #: Distance from center to each face of the loaded region in meters, excluding voxels at the
+    #: border of the region that are not used by collision queries.
+    half_extent: float
+
+    def contains(self, position: List[float], radius: float) -> bool:
+        """Check if a cube around a position is inside the loaded region.
+
+        Args:
+            position: Center of cube in world frame.
+            radius: Distance from center to each face of the cube, in meters.
+
+        Returns:
+            bool: True if the cube is inside the region.
+        """
+        position_local = get_voxel_grid_position(self.voxel_grid, position)
+        return all(
+            abs(p - c) + radius <= self.half_extent for p, c in zip(position_local, self.center)
+        )
+
+
+def get_voxel_grid_position(voxel_grid: VoxelGrid, position: List[float]) -> List[float]:
+    """Transform a position from world frame to the frame of a voxel grid."""
+    grid_pose = Pose.from_list(voxel_grid.pose, tensor_args=voxel_grid.tensor_args)
+    position_local = grid_pose.inverse().transform_points(
+        voxel_grid.tensor_args.to_device([position]).view(1, 3)
+    )
+    return position_local.view(3).cpu().tolist()
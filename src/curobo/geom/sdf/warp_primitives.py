@@ -17,7 +17,7 @@ import warp as wp
 wp.set_module_options({"fast_math": False})
 
 # CuRobo
-from curobo.util.warp import warp_support_sdf_struct
+from curobo.util.warp import get_warp_stream, warp_support_sdf_struct
 
 # Check version of warp and import the supported SDF function.
 if warp_support_sdf_struct():
@@ -79,7 +79,7 @@ class SdfMeshWarpPy(torch.autograd.Function):
                 use_batch_env,
                 compute_esdf,
             ],
-            stream=wp.stream_from_torch(query_spheres.device),
+            stream=get_warp_stream(query_spheres.device),
         )
         ctx.return_loss = return_loss
         ctx.save_for_backward(out_grad)
@@ -167,7 +167,7 @@ class SweptSdfMeshWarpPy(torch.autograd.Function):
                 wp.from_torch(env_query_idx.view(-1), dtype=wp.int32),
                 use_batch_env,
             ],
-            stream=wp.stream_from_torch(query_spheres.device),
+            stream=get_warp_stream(query_spheres.device),
         )
         ctx.return_loss = return_loss
         ctx.save_for_backward(out_grad)
@@ -13,18 +13,43 @@
 from __future__ import annotations
 
 # Standard Library
-from dataclasses import dataclass
+import itertools
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 # Third Party
+import numpy as np
 import torch
 
 # CuRobo
-from curobo.curobolib.geom import SdfSphereOBB, SdfSweptSphereOBB
-from curobo.geom.types import Cuboid, Mesh, Obstacle, VoxelGrid, WorldConfig, batch_tensor_cube
+from curobo.curobolib.geom import (
+    SdfSphereCapsule,
+    SdfSphereOBB,
+    SdfSweptSphereCapsule,
+    SdfSweptSphereOBB,
+)
+from curobo.geom.sdf.adaptive_sweep import AdaptiveSweepConfig, get_adaptive_sweep_steps
+from curobo.geom.sdf.esdf_update import EsdfUpdateConfig
+from curobo.geom.sdf.obb_index import ObbGridIndex, ObbGridIndexConfig
+from curobo.geom.sdf.point_cloud_hash import PointCloudHashConfig
+from curobo.geom.sdf.ragged_obstacles import RaggedObstacleSlots
+from curobo.geom.sdf.sparse_voxel import SparseVoxelConfig
+from curobo.geom.sdf.voxel_pyramid import VoxelPyramidConfig
+from curobo.geom.sdf.voxel_stream import VoxelStreamConfig
+from curobo.geom.types import (
+    Capsule,
+    Cuboid,
+    Mesh,
+    Obstacle,
+    Sphere,
+    VoxelGrid,
+    WorldConfig,
+    batch_tensor_cube,
+)
 from curobo.types.base import TensorDeviceType
 from curobo.types.math import Pose
+from curobo.util.buffer_pool import BufferPool
 from curobo.util.logger import log_error, log_info, log_warn
 
 
@@ -46,9 +71,15 @@ class CollisionBuffer:
     #: Shape of the distance buffer. This is used to check if the buffer needs to be recreated.
     shape: Optional[torch.Size] = None
 
+    #: Pool of buffers bucketed by batch size. Changing the batch size within a bucket returns
+    #: views of existing buffers instead of allocating new buffers.
+    buffer_pool: Optional[BufferPool] = None
+
     def __post_init__(self):
         """Initialize the buffer shape if not provided."""
         self.shape = self.distance_buffer.shape
+        if self.buffer_pool is None:
+            self.buffer_pool = BufferPool()
 
     @classmethod
     def initialize_from_shape(
@@ -63,23 +94,42 @@ class CollisionBuffer:
         Returns:
             CollisionBuffer: Initialized CollisionBuffer object.
         """
+        buffer_pool = BufferPool()
+        distance_buffer, grad_distance_buffer, sparsity_idx = cls._get_pool_buffers(
+            buffer_pool, shape, tensor_args
+        )
+        return CollisionBuffer(
+            distance_buffer, grad_distance_buffer, sparsity_idx, buffer_pool=buffer_pool
+        )
+
+    @staticmethod
+    def _get_pool_buffers(
+        buffer_pool: BufferPool, shape: torch.Size, tensor_args: TensorDeviceType
+    ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """Get distance, gradient, and sparsity buffers for query spheres from a buffer pool.
+
+        Rows of pooled buffers keep values from previous queries. This is valid as the sparsity
+        index of a row is always written together with its distance and gradient.
+        """
         batch, horizon, n_spheres, _ = shape
-        distance_buffer = torch.zeros(
-            (batch, horizon, n_spheres),
-            device=tensor_args.device,
-            dtype=tensor_args.collision_distance_dtype,
+        distance_buffer = buffer_pool.get(
+            "distance",
+            batch,
+            (horizon, n_spheres),
+            tensor_args.collision_distance_dtype,
+            tensor_args.device,
         )
-        grad_distance_buffer = torch.zeros(
-            (batch, horizon, n_spheres, 4),
-            device=tensor_args.device,
-            dtype=tensor_args.collision_gradient_dtype,
+        grad_distance_buffer = buffer_pool.get(
+            "grad_distance",
+            batch,
+            (horizon, n_spheres, 4),
+            tensor_args.collision_gradient_dtype,
+            tensor_args.device,
         )
-        sparsity_idx = torch.zeros(
-            (batch, horizon, n_spheres),
-            device=tensor_args.device,
-            dtype=torch.uint8,
+        sparsity_idx = buffer_pool.get(
+            "sparsity_index", batch, (horizon, n_spheres), torch.uint8, tensor_args.device
         )
-        return CollisionBuffer(distance_buffer, grad_distance_buffer, sparsity_idx)
+        return distance_buffer, grad_distance_buffer, sparsity_idx
 
     def _update_from_shape(self, shape: torch.Size, tensor_args: TensorDeviceType):
         """Update shape of buffers.
@@ -88,22 +138,11 @@ class CollisionBuffer:
             shape: New shape of the query spheres.
             tensor_args: device and precision of the tensors.
         """
-        batch, horizon, n_spheres, _ = shape
-        self.distance_buffer = torch.zeros(
-            (batch, horizon, n_spheres),
-            device=tensor_args.device,
-            dtype=tensor_args.collision_distance_dtype,
-        )
-        self.grad_distance_buffer = torch.zeros(
-            (batch, horizon, n_spheres, 4),
-            device=tensor_args.device,
-            dtype=tensor_args.collision_gradient_dtype,
-        )
-        self.sparsity_index_buffer = torch.zeros(
-            (batch, horizon, n_spheres),
-            device=tensor_args.device,
-            dtype=torch.uint8,
-        )
+        (
+            self.distance_buffer,
+            self.grad_distance_buffer,
+            self.sparsity_index_buffer,
+        ) = self._get_pool_buffers(self.buffer_pool, shape, tensor_args)
         self.shape = shape[:3]
 
     def update_buffer_shape(self, shape: torch.Size, tensor_args: TensorDeviceType):
@@ -147,6 +186,12 @@ class CollisionQueryBuffer:
     #: Buffer to store signed distance cost value for Voxel world obstacles.
     voxel_collision_buffer: Optional[CollisionBuffer] = None
 
+    #: Buffer to store signed distance cost value for Sphere and Capsule world obstacles.
+    capsule_collision_buffer: Optional[CollisionBuffer] = None
+
+    #: Buffer to store signed distance cost value for PointCloud world obstacles.
+    pointcloud_collision_buffer: Optional[CollisionBuffer] = None
+
     #: Shape of the query spheres. This is used to check if the buffer needs to be recreated.
     shape: Optional[torch.Size] = None
 
@@ -161,6 +206,10 @@ class CollisionQueryBuffer:
                 self.shape = self.blox_collision_buffer.shape
             elif self.voxel_collision_buffer is not None:
                 self.shape = self.voxel_collision_buffer.shape
+            elif self.capsule_collision_buffer is not None:
+                self.shape = self.capsule_collision_buffer.shape
+            elif self.pointcloud_collision_buffer is not None:
+                self.shape = self.pointcloud_collision_buffer.shape
 
     def __mul__(self, scalar: float) -> CollisionQueryBuffer:
         """Multiply tensors by a scalar value."""
@@ -172,11 +221,16 @@ class CollisionQueryBuffer:
             self.blox_collision_buffer = self.blox_collision_buffer * scalar
         if self.voxel_collision_buffer is not None:
             self.voxel_collision_buffer = self.voxel_collision_buffer * scalar
+        if self.capsule_collision_buffer is not None:
+            self.capsule_collision_buffer = self.capsule_collision_buffer * scalar
+        if self.pointcloud_collision_buffer is not None:
+            self.pointcloud_collision_buffer = self.pointcloud_collision_buffer * scalar
         return self
 
     def clone(self) -> CollisionQueryBuffer:
         """Clone the CollisionQueryBuffer object."""
-        prim_buffer = mesh_buffer = blox_buffer = voxel_buffer = None
+        prim_buffer = mesh_buffer = blox_buffer = voxel_buffer = capsule_buffer = None
+        pointcloud_buffer = None
         if self.primitive_collision_buffer is not None:
             prim_buffer = self.primitive_collision_buffer.clone()
         if self.mesh_collision_buffer is not None:
@@ -185,11 +239,17 @@ class CollisionQueryBuffer:
             blox_buffer = self.blox_collision_buffer.clone()
         if self.voxel_collision_buffer is not None:
             voxel_buffer = self.voxel_collision_buffer.clone()
+        if self.capsule_collision_buffer is not None:
+            capsule_buffer = self.capsule_collision_buffer.clone()
+        if self.pointcloud_collision_buffer is not None:
+            pointcloud_buffer = self.pointcloud_collision_buffer.clone()
         return CollisionQueryBuffer(
             prim_buffer,
             mesh_buffer,
             blox_buffer,
             voxel_collision_buffer=voxel_buffer,
+            capsule_collision_buffer=capsule_buffer,
+            pointcloud_collision_buffer=pointcloud_buffer,
             shape=self.shape,
         )
 
@@ -210,7 +270,8 @@ class CollisionQueryBuffer:
         Returns:
             CollisionQueryBuffer: Initialized CollisionQueryBuffer object.
         """
-        primitive_buffer = mesh_buffer = blox_buffer = voxel_buffer = None
+        primitive_buffer = mesh_buffer = blox_buffer = voxel_buffer = capsule_buffer = None
+        pointcloud_buffer = None
         if "primitive" in collision_types and collision_types["primitive"]:
             primitive_buffer = CollisionBuffer.initialize_from_shape(shape, tensor_args)
         if "mesh" in collision_types and collision_types["mesh"]:
@@ -219,8 +280,17 @@ class CollisionQueryBuffer:
             blox_buffer = CollisionBuffer.initialize_from_shape(shape, tensor_args)
         if "voxel" in collision_types and collision_types["voxel"]:
             voxel_buffer = CollisionBuffer.initialize_from_shape(shape, tensor_args)
+        if "capsule" in collision_types and collision_types["capsule"]:
+            capsule_buffer = CollisionBuffer.initialize_from_shape(shape, tensor_args)
+        if "pointcloud" in collision_types and collision_types["pointcloud"]:
+            pointcloud_buffer = CollisionBuffer.initialize_from_shape(shape, tensor_args)
         return CollisionQueryBuffer(
-            primitive_buffer, mesh_buffer, blox_buffer, voxel_collision_buffer=voxel_buffer
+            primitive_buffer,
+            mesh_buffer,
+            blox_buffer,
+            voxel_collision_buffer=voxel_buffer,
+            capsule_collision_buffer=capsule_buffer,
+            pointcloud_collision_buffer=pointcloud_buffer,
         )
 
     def create_from_shape(
@@ -249,6 +319,14 @@ class CollisionQueryBuffer:
             self.blox_collision_buffer = CollisionBuffer.initialize_from_shape(shape, tensor_args)
         if "voxel" in collision_types and collision_types["voxel"]:
             self.voxel_collision_buffer = CollisionBuffer.initialize_from_shape(shape, tensor_args)
+        if "capsule" in collision_types and collision_types["capsule"]:
+            self.capsule_collision_buffer = CollisionBuffer.initialize_from_shape(
+                shape, tensor_args
+            )
+        if "pointcloud" in collision_types and collision_types["pointcloud"]:
+            self.pointcloud_collision_buffer = CollisionBuffer.initialize_from_shape(
+                shape, tensor_args
+            )
         self.shape = shape
 
     def update_buffer_shape(
@@ -280,6 +358,10 @@ class CollisionQueryBuffer:
                 self.blox_collision_buffer.update_buffer_shape(shape, tensor_args)
             if self.voxel_collision_buffer is not None:
                 self.voxel_collision_buffer.update_buffer_shape(shape, tensor_args)
+            if self.capsule_collision_buffer is not None:
+                self.capsule_collision_buffer.update_buffer_shape(shape, tensor_args)
+            if self.pointcloud_collision_buffer is not None:
+                self.pointcloud_collision_buffer.update_buffer_shape(shape, tensor_args)
             self.shape = shape
 
     def get_gradient_buffer(
@@ -314,6 +396,18 @@ class CollisionQueryBuffer:
                 current_buffer = voxel_buffer.clone()
             else:
                 current_buffer += voxel_buffer
+        if self.capsule_collision_buffer is not None:
+            capsule_buffer = self.capsule_collision_buffer.grad_distance_buffer
+            if current_buffer is None:
+                current_buffer = capsule_buffer.clone()
+            else:
+                current_buffer += capsule_buffer
+        if self.pointcloud_collision_buffer is not None:
+            pointcloud_buffer = self.pointcloud_collision_buffer.grad_distance_buffer
+            if current_buffer is None:
+                current_buffer = pointcloud_buffer.clone()
+            else:
+                current_buffer += pointcloud_buffer
 
         return current_buffer
 
@@ -325,6 +419,112 @@ class CollisionCheckerType(Enum):
     BLOX = "BLOX"
     MESH = "MESH"
     VOXEL = "VOXEL"
+    SPARSE_VOXEL = "SPARSE_VOXEL"
+    POINT_CLOUD = "POINT_CLOUD"
+
+
+@dataclass
+class WorldUpdateResult:
+    """Changes written to a collision checker when updating it from a world configuration."""
+
+    #: Obstacles that were added, or re-enabled after being removed in a previous update.
+    added: List[str] = field(default_factory=list)
+
+    #: Obstacles that were disabled as they are not in the new world configuration.
+    removed: List[str] = field(default_factory=list)
+
+    #: Obstacles whose pose was updated.
+    pose_updated: List[str] = field(default_factory=list)
+
+    #: Cuboids whose dimensions were updated.
+    dims_updated: List[str] = field(default_factory=list)
+
+    #: Meshes whose geometry changed and were reloaded.
+    mesh_updated: List[str] = field(default_factory=list)
+
+    #: True if the collision model was reloaded from the world configuration instead of writing
+    #: individual changes, e.g., when the obstacle cache is full.
+    full_reload: bool = False
+
+    @property
+    def n_changes(self) -> int:
+        """Number of obstacle changes written. Not valid when :attr:`full_reload` is True."""
+        return (
+            len(self.added)
+            + len(self.removed)
+            + len(self.pose_updated)
+            + len(self.dims_updated)
+            + len(self.mesh_updated)
+        )
+
+    @property
+    def changed(self) -> bool:
+        """True if the collision model was modified."""
+        return self.full_reload or self.n_changes > 0
+
+
+@dataclass
+class LoadedObstacleState:
+    """Parameters of an obstacle loaded into a collision checker, used to find changes."""
+
+    #: Geometry of obstacle, e.g., dimensions of a cuboid or identity of a mesh.
+    geometry: Optional[Tuple] = None
+
+    #: Pose of obstacle in world frame, [x, y, z, qw, qx, qy, qz].
+    pose: Optional[Tuple[float, ...]] = None
+
+    #: True if obstacle is enabled for collision checking. None if unknown, e.g., after the
+    #: enable flag was written by cache index.
+    enabled: Optional[bool] = True
+
+
+def _is_close(
+    current: Optional[Tuple[float, ...]], new: Tuple[float, ...], tolerance: float
+) -> bool:
+    """Check if two parameter tuples are equal within tolerance. None is never close."""
+    if current is None or len(current) != len(new):
+        return False
+    return all(abs(a - b) <= tolerance for a, b in zip(current, new))
+
+
+def _record_obstacle_change(
+    env_state: Optional[List[Dict[str, LoadedObstacleState]]],
+    name: Optional[str],
+    env_idx: Optional[int],
+    pose: bool = False,
+    geometry: bool = False,
+    enable: Optional[bool] = None,
+):
+    """Record a change written to the obstacle cache outside of ``update_collision_model``.
+
+    Changed pose and geometry become unknown, so that ``update_collision_model`` rewrites them
+    from the world configuration. Obstacles written by cache index cannot be matched to a name,
+    so all obstacles of the environment become unknown, including their enable flag.
+
+    Args:
+        env_state: State of loaded obstacles in every environment.
+        name: Name of the changed obstacle. None if the obstacle was written by cache index.
+        env_idx: Environment index of the changed obstacle. None for all environments.
+        pose: True if pose of the obstacle was written.
+        geometry: True if geometry of the obstacle was written.
+        enable: Enable flag written to the obstacle. None if not written.
+    """
+    if env_state is None:
+        return
+    if name is None:
+        env_list = env_state if env_idx is None else [env_state[env_idx]]
+        changes = [(state, obs_name) for state in env_list for obs_name in list(state.keys())]
+        enabled = None
+    else:
+        changes = [(env_state[env_idx], name)]
+        enabled = enable
+    for state, obs_name in changes:
+        current = state.get(obs_name, LoadedObstacleState(enabled=None))
+        state[obs_name] = LoadedObstacleState(
+            geometry=None if geometry else current.geometry,
+            pose=None if pose else current.pose,
+            enabled=current.enabled if enable is None else enabled,
+        )
 
 
 @dataclass
@@ -358,8 +558,89 @@ class WorldCollisionConfig:
     #: (ESDF) from different world representations.
     max_esdf_distance: Union[torch.Tensor, float] = 100.0
 
+    #: Compute collision with cuboid obstacles using PyTorch instead of CUDA kernels. This
+    #: allows collision checking on devices without CUDA (e.g., CPU workers validating
+    #: trajectories). The PyTorch implementation is always used when the query spheres are not
+    #: on a CUDA device or when the CUDA kernels are not available.
+    use_torch_backend: bool = False
+
+    #: Number of threads used to read and process mesh files when loading worlds. Only used by
+    #: :class:`~curobo.geom.sdf.world_mesh.WorldMeshCollision` and its subclasses. A value of 1
+    #: reads meshes in the calling thread.
+    mesh_load_workers: int = 8
+
+    #: Index cuboid obstacles in a uniform grid, so that collision queries only visit cuboids
+    #: near query spheres. This speeds up queries in worlds with many cuboids, but synchronizes
+    #: with the device on every query and hence cannot be used with CUDA graphs. See
+    #: :mod:`curobo.geom.sdf.obb_index`.
+    obb_index: Optional[Union[ObbGridIndexConfig, Dict]] = None
+
+    #: Load only a region around the robot base from voxel grids with a file_path, instead of
+    #: the full grid. Only used by :class:`~curobo.geom.sdf.world_voxel.WorldVoxelCollision`. See
+    #: :mod:`curobo.geom.sdf.voxel_stream`.
+    voxel_stream: Optional[Union[VoxelStreamConfig, Dict]] = None
+
+    #: Storage of voxel grids in sparse blocks. Only used by
+    #: :class:`~curobo.geom.sdf.world_sparse_voxel.WorldSparseVoxelCollision`, which uses default
+    #: parameters when this is None. See :mod:`curobo.geom.sdf.sparse_voxel`.
+    sparse_voxel: Optional[Union[SparseVoxelConfig, Dict]] = None
+
+    #: Storage of point clouds in a spatial hash of cells. Only used by
+    #: :class:`~curobo.geom.sdf.world_point_cloud.WorldPointCloudCollision`, which uses default
+    #: parameters when this is None. See :mod:`curobo.geom.sdf.point_cloud_hash`.
+    point_cloud: Optional[Union[PointCloudHashConfig, Dict]] = None
+
+    #: Cull collision queries with a coarse-to-fine pyramid over voxel grids, so that spheres far
+    #: from obstacles do not read full resolution voxels. Only used by
+    #: :class:`~curobo.geom.sdf.world_voxel.WorldVoxelCollision`. Synchronizes with the device on
+    #: every query and hence cannot be used with CUDA graphs. See
+    #: :mod:`curobo.geom.sdf.voxel_pyramid`.
+    voxel_pyramid: Optional[Union[VoxelPyramidConfig, Dict]] = None
+
+    #: Choose the number of sweep steps of swept sphere queries from the displacement of spheres
+    #: between timesteps, instead of the sweep_steps passed to queries. Synchronizes with the
+    #: device on every swept query and hence cannot be used with CUDA graphs. See
+    #: :mod:`curobo.geom.sdf.adaptive_sweep`.
+    adaptive_sweep: Optional[Union[AdaptiveSweepConfig, Dict]] = None
+
+    #: Recompute signed distance of voxels around regions written to voxel grids with
+    #: :meth:`~curobo.geom.sdf.world_voxel.WorldVoxelCollision.update_voxel_subgrid`. Only used by
+    #: :class:`~curobo.geom.sdf.world_voxel.WorldVoxelCollision`, which uses default parameters
+    #: when this is None. See :mod:`curobo.geom.sdf.esdf_update`.
+    esdf_update: Optional[Union[EsdfUpdateConfig, Dict]] = None
+
+    #: Store cuboids and meshes of all environments back to back in ragged tensors, instead of
+    #: padding every environment to the largest number of obstacles. This reduces memory of
+    #: batched worlds with different numbers of obstacles per environment. Only used by
+    #: :class:`WorldPrimitiveCollision` and
+    #: :class:`~curobo.geom.sdf.world_mesh.WorldMeshCollision`, and cannot be used with
+    #: obb_index. See :mod:`curobo.geom.sdf.ragged_obstacles`.
+    ragged_obstacles: bool = False
+
+    #: Trilinearly interpolate signed distance of voxel grids in PyTorch, instead of reading the
+    #: nearest voxel. This gives a continuous distance and gradient between voxel centers, e.g.,
+    #: for grids baked with :func:`~curobo.geom.sdf.esdf_cache.bake_world_esdf`. Only used by
+    #: :class:`~curobo.geom.sdf.world_voxel.WorldVoxelCollision`.
+    interpolate_voxel_esdf: bool = False
+
     def __post_init__(self):
         """Post initialization method to set default values."""
+        if isinstance(self.obb_index, dict):
+            self.obb_index = ObbGridIndexConfig(**self.obb_index)
+        if isinstance(self.voxel_stream, dict):
+            self.voxel_stream = VoxelStreamConfig(**self.voxel_stream)
+        if isinstance(self.sparse_voxel, dict):
+            self.sparse_voxel = SparseVoxelConfig(**self.sparse_voxel)
+        if isinstance(self.point_cloud, dict):
+            self.point_cloud = PointCloudHashConfig(**self.point_cloud)
+        if isinstance(self.voxel_pyramid, dict):
+            self.voxel_pyramid = VoxelPyramidConfig(**self.voxel_pyramid)
+        if isinstance(self.adaptive_sweep, dict):
+            self.adaptive_sweep = AdaptiveSweepConfig(**self.adaptive_sweep)
+        if isinstance(self.esdf_update, dict):
+            self.esdf_update = EsdfUpdateConfig(**self.esdf_update)
+        if self.ragged_obstacles and self.obb_index is not None:
+            log_error("ragged_obstacles cannot be used with obb_index")
         if self.world_model is not None and isinstance(self.world_model, list):
             self.n_envs = len(self.world_model)
         if isinstance(self.max_distance, float):
@@ -416,6 +697,34 @@ class WorldCollision(WorldCollisionConfig):
         """Load the world obstacles for collision checking."""
         raise NotImplementedError
 
+    def update_collision_model(
+        self,
+        world_config: WorldConfig,
+        env_idx: int = 0,
+        fix_cache_reference: bool = False,
+        tolerance: float = 1e-6,
+    ) -> WorldUpdateResult:
+        """Update loaded obstacles to match a world configuration.
+
+        Collision checkers that can diff obstacles only write obstacles that changed since the
+        last load or update. This implementation reloads the full collision model.
+
+        Args:
+            world_config: Obstacles that should be in the world after the update.
+            env_idx: Environment index to update.
+            fix_cache_reference: If True, throws error if number of obstacles is greater than
+                cache when a full reload is required.
+            tolerance: Maximum difference in pose and dimensions to consider an obstacle
+                unchanged.
+
+        Returns:
+            WorldUpdateResult: Changes written to the collision checker.
+        """
+        self.load_collision_model(
+            world_config, env_idx=env_idx, fix_cache_reference=fix_cache_reference
+        )
+        return WorldUpdateResult(full_reload=True)
+
     def update_obstacle_pose_in_world_model(self, name: str, pose: Pose, env_idx: int = 0):
         """Update the pose of an obstacle in the world model.
 
@@ -474,6 +783,7 @@ class WorldCollision(WorldCollisionConfig):
         env_query_idx: Optional[torch.Tensor] = None,
         return_loss: bool = False,
         sum_collisions: bool = True,
+        adapt_sweep_steps: bool = True,
     ):
         """Compute the signed distance between trajectory of spheres and world obstacles."""
         raise NotImplementedError
@@ -489,10 +799,24 @@ class WorldCollision(WorldCollisionConfig):
         enable_speed_metric=False,
         env_query_idx: Optional[torch.Tensor] = None,
         return_loss: bool = False,
+        adapt_sweep_steps: bool = True,
     ):
         """Compute binary collision between trajectory of spheres and world obstacles."""
         raise NotImplementedError
 
+    def _get_sweep_steps(
+        self, query_sphere: torch.Tensor, sweep_steps: int, adapt_sweep_steps: bool = True
+    ) -> int:
+        """Get the number of sweep steps of a swept query.
+
+        Returns sweep_steps when :attr:`adaptive_sweep` is None or adapt_sweep_steps is False.
+        Otherwise, steps are computed from the displacement of query spheres. Subclasses compute
+        steps once and pass them to their base class with adapt_sweep_steps set to False.
+        """
+        if self.adaptive_sweep is None or not adapt_sweep_steps:
+            return sweep_steps
+        return get_adaptive_sweep_steps(query_sphere, self.adaptive_sweep)
+
     def get_voxels_in_bounding_box(
         self,
         cuboid: Cuboid = Cuboid(name="test", pose=[0, 0, 0, 1, 0, 0, 0], dims=[1, 1, 1]),
@@ -629,6 +953,140 @@ class WorldCollision(WorldCollisionConfig):
 
         return voxel_grid
 
+    def iter_occupancy_in_bounding_box(
+        self,
+        cuboid: Cuboid = Cuboid(name="test", pose=[0, 0, 0, 1, 0, 0, 0], dims=[1, 1, 1]),
+        voxel_size: float = 0.02,
+        chunk_voxels: int = 64,
+        file_path: Optional[str] = None,
+    ) -> Iterator[Tuple[List[int], VoxelGrid]]:
+        """Get the occupancy of voxels in a grid bounded by the given cuboid, chunk by chunk.
+
+        Unlike :meth:`get_occupancy_in_bounding_box`, only voxels of one chunk are queried at a
+        time, so memory use does not depend on the size of the grid.
+
+        Args:
+            cuboid: Bounding cuboid to query occupancy.
+            voxel_size: Size of the voxels in meters.
+            chunk_voxels: Number of voxels along each edge of a chunk.
+            file_path: Path of a ``.npy`` file to write occupancy of all voxels of the grid to. The
+                file is memory-mapped and written chunk by chunk. Load it by setting
+                :attr:`~curobo.geom.types.VoxelGrid.file_path` of a grid with the pose and
+                dimensions of the cuboid.
+
+        Yields:
+            Index of the first voxel of the chunk in the grid along each axis, and the chunk as a
+            grid with the occupancy of its voxels.
+        """
+        return self._iter_features_in_bounding_box(
+            cuboid, voxel_size, chunk_voxels, file_path, torch.float32, compute_esdf=False
+        )
+
+    def iter_esdf_in_bounding_box(
+        self,
+        cuboid: Cuboid = Cuboid(name="test", pose=[0, 0, 0, 1, 0, 0, 0], dims=[1, 1, 1]),
+        voxel_size: float = 0.02,
+        dtype=torch.float32,
+        chunk_voxels: int = 64,
+        file_path: Optional[str] = None,
+    ) -> Iterator[Tuple[List[int], VoxelGrid]]:
+        """Get the Euclidean signed distance in a grid bounded by the given cuboid, chunk by chunk.
+
+        Distance is positive inside obstacles and negative outside obstacles. Unlike
+        :meth:`get_esdf_in_bounding_box`, only voxels of one chunk are queried at a time, so
+        memory use does not depend on the size of the grid.
+
+        Args:
+            cuboid: Bounding cuboid to query signed distance.
+            voxel_size: Size of the voxels in meters.
+            dtype: Data type of the feature tensor of chunks. Use :var:`torch.bfloat16` or
+                :var:`torch.float8_e4m3fn` for reduced memory usage.
+            chunk_voxels: Number of voxels along each edge of a chunk.
+            file_path: Path of a ``.npy`` file to write signed distance of all voxels of the grid
+                to. The file stores float16 values when dtype is :var:`torch.float16` and float32
+                values otherwise. The file is memory-mapped and written chunk by chunk. Load it by
+                setting :attr:`~curobo.geom.types.VoxelGrid.file_path` of a grid with the pose and
+                dimensions of the cuboid.
+
+        Yields:
+            Index of the first voxel of the chunk in the grid along each axis, and the chunk as a
+            grid with the signed distance of its voxels.
+        """
+        return self._iter_features_in_bounding_box(
+            cuboid, voxel_size, chunk_voxels, file_path, dtype, compute_esdf=True
+        )
+
+    def _iter_features_in_bounding_box(
+        self,
+        cuboid: Cuboid,
+        voxel_size: float,
+        chunk_voxels: int,
+        file_path: Optional[str],
+        dtype: torch.dtype,
+        compute_esdf: bool,
+    ) -> Iterator[Tuple[List[int], VoxelGrid]]:
+        """Query occupancy or signed distance of voxels in a bounding box, chunk by chunk."""
+        if chunk_voxels < 1:
+            log_error("chunk_voxels should be positive, got " + str(chunk_voxels))
+        grid = VoxelGrid(
+            name=cuboid.name,
+            dims=cuboid.dims,
+            pose=cuboid.pose,
+            voxel_size=voxel_size,
+            feature_dtype=dtype,
+            tensor_args=self.tensor_args,
+        )
+        grid_shape = grid.get_grid_shape()[0]
+        features = None
+        if file_path is not None:
+            features = np.lib.format.open_memmap(
+                file_path,
+                mode="w+",
+                dtype=np.float16 if dtype == torch.float16 else np.float32,
+                shape=tuple(grid_shape),
+            )
+
+        # chunks at the end of each axis are smaller, they are padded to query spheres of the same
+        # shape so that the collision buffer is allocated once:
+        n_query = int(np.prod([min(chunk_voxels, x) for x in grid_shape]))
+        xyzr = torch.zeros((n_query, 1, 1, 4), **(self.tensor_args.as_torch_dict()))
+        query_buffer = CollisionQueryBuffer.initialize_from_shape(
+            xyzr.shape, self.tensor_args, self.collision_types
+        )
+        weight = self.tensor_args.to_device([1.0])
+        act_distance = self.tensor_args.to_device([0.0])
+        try:
+            for start in itertools.product(*[range(0, x, chunk_voxels) for x in grid_shape]):
+                start = list(start)
+                shape = [min(chunk_voxels, grid_shape[i] - start[i]) for i in range(3)]
+                tile = grid.get_tile(start, shape)
+                tile.xyzr_tensor = tile.create_xyzr_tensor(
+                    transform_to_origin=True, tensor_args=self.tensor_args
+                )
+                n_voxels = tile.xyzr_tensor.shape[0]
+                xyzr[:n_voxels, 0, 0] = tile.xyzr_tensor
+                xyzr[n_voxels:, 0, 0] = tile.xyzr_tensor[0]
+                if compute_esdf:
+                    d_sph = self.get_sphere_distance(
+                        xyzr,
+                        query_buffer,
+                        weight,
+                        self.max_distance,
+                        sum_collisions=False,
+                        compute_esdf=True,
+                    )
+                else:
+                    d_sph = self.get_sphere_collision(xyzr, query_buffer, weight, act_distance)
+                tile.feature_tensor = d_sph.reshape(-1)[:n_voxels].to(dtype=dtype, copy=True)
+                if features is not None:
+                    features[tuple(slice(start[i], start[i] + shape[i]) for i in range(3))] = (
+                        tile.feature_tensor.view(shape).to(dtype=torch.float32).cpu().numpy()
+                    )
+                yield start, tile
+        finally:
+            if features is not None:
+                features.flush()
+
     def get_mesh_in_bounding_box(
         self,
         cuboid: Cuboid = Cuboid(name="test", pose=[0, 0, 0, 1, 0, 0, 0], dims=[1, 1, 1]),
@@ -700,7 +1158,15 @@ class WorldCollision(WorldCollisionConfig):
 
 
 class WorldPrimitiveCollision(WorldCollision):
-    """World collision checking with oriented bounding boxes (cuboids) for obstacles."""
+    """World collision checking with cuboids, spheres, and capsules for obstacles.
+
+    Cuboids are checked as oriented bounding boxes. Spheres and capsules are stored in a
+    separate cache as capsules, where a sphere is a capsule with zero length, and are checked
+    with the closed form distance to the segment of each capsule. Capsule queries are
+    implemented in PyTorch and run on any device. With
+    :attr:`WorldCollisionConfig.ragged_obstacles`, cuboids are stored in ragged tensors, see
+    :mod:`curobo.geom.sdf.ragged_obstacles`.
+    """
 
     def __init__(self, config: WorldCollisionConfig):
         """Initialize the WorldPrimitiveCollision object.
@@ -713,6 +1179,13 @@ class WorldPrimitiveCollision(WorldCollision):
         self._cube_tensor_list = None
         self._env_n_obbs = None
         self._env_obbs_names = None
+        self._obb_grid_index = None
+        self._obb_slots = None
+        self._env_obb_state = None
+        self._capsule_tensor_list = None
+        self._env_n_capsules = None
+        self._env_capsule_names = None
+        self._env_capsule_state = None
         self._init_cache()
 
         if self.world_model is not None:
@@ -725,6 +1198,11 @@ class WorldPrimitiveCollision(WorldCollision):
         """Initialize obstacles cache to allow for dynamic addition of obstacles."""
         if self.cache is not None and "obb" in self.cache and self.cache["obb"] not in [None, 0]:
             self._create_obb_cache(self.cache["obb"])
+        if self.cache is not None:
+            # spheres are stored as capsules:
+            capsule_cache = sum(self.cache.get(k) or 0 for k in ["capsule", "sphere"])
+            if capsule_cache > 0:
+                self._create_capsule_cache(capsule_cache)
 
     def load_collision_model(
         self, world_config: WorldConfig, env_idx=0, fix_cache_reference: bool = False
@@ -753,6 +1231,10 @@ class WorldPrimitiveCollision(WorldCollision):
             Obstacle names in the world.
         """
         base_obstacles = super().get_obstacle_names(env_idx)
+        if self._env_capsule_names is not None:
+            base_obstacles = self._env_capsule_names[env_idx] + base_obstacles
+        if self._env_obbs_names is None:
+            return base_obstacles
         return self._env_obbs_names[env_idx] + base_obstacles
 
     def load_batch_collision_model(self, world_config_list: List[WorldConfig]):
@@ -761,6 +1243,7 @@ class WorldPrimitiveCollision(WorldCollision):
         Args:
             world_config_list: list of world configs to load from.
         """
+        self._load_batch_capsules(world_config_list)
         # First find largest number of cuboid:
         c_len = []
         pose_batch = []
@@ -792,7 +1275,9 @@ class WorldPrimitiveCollision(WorldCollision):
                 (self.n_envs), device=self.tensor_args.device, dtype=torch.int32
             )
 
-        if self._cube_tensor_list is not None and self._cube_tensor_list[0].shape[1] < max_obb:
+        if self._cube_tensor_list is not None and any(
+            len(names) < n for names, n in zip(self._env_obbs_names, c_len)
+        ):
             log_warn(
                 "number of obbs is greater than buffer, reloading collision buffers (breaks CG)"
             )
@@ -800,52 +1285,203 @@ class WorldPrimitiveCollision(WorldCollision):
         # create cache if does not exist:
         if self._cube_tensor_list is None or reset_buffers:
             log_info("Creating Obb cache" + str(max_obb))
-            self._create_obb_cache(max_obb)
+            self._create_obb_cache(c_len if self.ragged_obstacles else max_obb)
 
         # load obstacles:
         ## load data into gpu:
         cube_batch = batch_tensor_cube(pose_batch, dims_batch, self.tensor_args)
         c_start = 0
         for i in range(len(self._env_n_obbs)):
+            env_tensors = self._get_env_obb_tensors(i)
             if c_len[i] > 0:
                 # load obb:
-                self._cube_tensor_list[0][i, : c_len[i], :3] = cube_batch[0][
-                    c_start : c_start + c_len[i]
-                ]
-                self._cube_tensor_list[1][i, : c_len[i], :7] = cube_batch[1][
-                    c_start : c_start + c_len[i]
-                ]
-                self._cube_tensor_list[2][i, : c_len[i]] = 1
+                env_tensors[0][: c_len[i], :3] = cube_batch[0][c_start : c_start + c_len[i]]
+                env_tensors[1][: c_len[i], :7] = cube_batch[1][c_start : c_start + c_len[i]]
+                env_tensors[2][: c_len[i]] = 1
                 self._env_obbs_names[i][: c_len[i]] = names_batch[c_start : c_start + c_len[i]]
-                self._cube_tensor_list[2][i, c_len[i] :] = 0
+                self._env_obb_state[i] = self._get_obb_state(world_config_list[i].cuboid)
                 c_start += c_len[i]
+            # ragged kernels read every slot of an environment, so unused slots are disabled:
+            env_tensors[2][c_len[i] :] = 0
         self._env_n_obbs[:] = torch.as_tensor(
             c_len, dtype=torch.int32, device=self.tensor_args.device
         )
+        self._update_obb_grid_index()
         self.collision_types["primitive"] = True
 
+    def update_collision_model(
+        self,
+        world_config: WorldConfig,
+        env_idx: int = 0,
+        fix_cache_reference: bool = False,
+        tolerance: float = 1e-6,
+    ) -> WorldUpdateResult:
+        """Update loaded obstacles to match a world configuration, writing only changes.
+
+        Obstacles are matched by name against the obstacles loaded in the environment. Cuboids,
+        spheres, and capsules with a changed pose or dimensions are updated in place, obstacles
+        not in the new world are disabled, and new obstacles are written to free cache slots
+        (including slots of disabled obstacles). The full collision model is reloaded only when
+        the cache has no free slots. Tensor references are unchanged unless a full reload grows
+        the cache, so this can be used with CUDA graphs.
+
+        Args:
+            world_config: Obstacles that should be in the world after the update.
+            env_idx: Environment index to update.
+            fix_cache_reference: If True, throws error if number of obstacles is greater than
+                cache when a full reload is required.
+            tolerance: Maximum difference in pose and dimensions to consider an obstacle
+                unchanged.
+
+        Returns:
+            WorldUpdateResult: Changes written to the collision checker.
+        """
+        cuboids = world_config.cuboid
+        capsules = self._get_capsule_obstacles(world_config)
+        if not self._can_update_obbs(cuboids, env_idx) or not self._can_update_capsules(
+            capsules, env_idx
+        ):
+            return self._reload_collision_model(world_config, env_idx, fix_cache_reference)
+        result = WorldUpdateResult()
+        self._update_obbs_from_config(cuboids, env_idx, result, tolerance)
+        self._update_capsules_from_config(capsules, env_idx, result, tolerance)
+        self.world_model = world_config
+        return result
+
+    def _reload_collision_model(
+        self, world_config: WorldConfig, env_idx: int, fix_cache_reference: bool
+    ) -> WorldUpdateResult:
+        """Reload full collision model when changes cannot be written incrementally."""
+        log_info("Reloading collision model, obstacle cache cannot fit incremental update")
+        self.load_collision_model(
+            world_config, env_idx=env_idx, fix_cache_reference=fix_cache_reference
+        )
+        return WorldUpdateResult(full_reload=True)
+
+    @staticmethod
+    def _get_obb_state(cuboids: Optional[List[Cuboid]]) -> Dict[str, LoadedObstacleState]:
+        """Get state of cuboids to compare against in :meth:`update_collision_model`."""
+        if cuboids is None:
+            return {}
+        return {
+            c.name: LoadedObstacleState(
+                geometry=tuple(float(x) for x in c.dims[:3]),
+                pose=tuple(float(x) for x in c.pose),
+            )
+            for c in cuboids
+        }
+
+    def _can_update_obbs(self, cuboids: List[Cuboid], env_idx: int) -> bool:
+        """Check if cuboids can be written to the cache without a full reload."""
+        if self._cube_tensor_list is None:
+            return len(cuboids) == 0
+        n_obbs = int(self._env_n_obbs[env_idx])
+        loaded_names = set(self._env_obbs_names[env_idx][:n_obbs])
+        new_names = set(c.name for c in cuboids)
+        if len(new_names) != len(cuboids):
+            log_error("Cuboid names should be unique when updating collision model")
+        n_new = len(new_names - loaded_names)
+        n_free = len(self._env_obbs_names[env_idx]) - n_obbs + len(loaded_names - new_names)
+        return n_new <= n_free
+
+    def _update_obbs_from_config(
+        self,
+        cuboids: List[Cuboid],
+        env_idx: int,
+        result: WorldUpdateResult,
+        tolerance: float,
+    ):
+        """Write changed cuboids to the cache. Check :meth:`_can_update_obbs` before calling."""
+        if self._cube_tensor_list is None:
+            return
+        n_obbs = int(self._env_n_obbs[env_idx])
+        names = self._env_obbs_names[env_idx]
+        obb_idx = {name: i for i, name in enumerate(names[:n_obbs])}
+        state = self._env_obb_state[env_idx]
+        env_tensors = self._get_env_obb_tensors(env_idx)
+        new_names = set(c.name for c in cuboids)
+
+        # disable cuboids that are not in the new world, reusing their slots for new cuboids:
+        free_slots = []
+        for name, obs_idx in obb_idx.items():
+            if name in new_names:
+                continue
+            current = state.get(name)
+            if current is None or current.enabled is not False:
+                env_tensors[2][obs_idx] = 0
+                self._update_obb_grid_index(env_idx, obs_idx)
+                result.removed.append(name)
+                state[name] = LoadedObstacleState(enabled=False)
+            free_slots.append(obs_idx)
+        free_slots.reverse()
+
+        for cuboid in cuboids:
+            dims = tuple(float(x) for x in cuboid.dims[:3])
+            pose = tuple(float(x) for x in cuboid.pose)
+            current = state.get(cuboid.name)
+            obs_idx = obb_idx.get(cuboid.name)
+            if obs_idx is None:
+                if len(free_slots) == 0:
+                    self.add_obb(cuboid, env_idx)
+                    result.added.append(cuboid.name)
+                    state[cuboid.name] = LoadedObstacleState(geometry=dims, pose=pose)
+                    continue
+                obs_idx = free_slots.pop()
+                state.pop(names[obs_idx], None)
+                names[obs_idx] = cuboid.name
+                current = LoadedObstacleState(enabled=False)
+            if current is None:
+                current = LoadedObstacleState(enabled=None)
+            changed = False
+            if not _is_close(current.pose, pose, tolerance):
+                obj_w_pose = Pose.from_list(list(pose), self.tensor_args).inverse()
+                env_tensors[1][obs_idx, :7] = obj_w_pose.get_pose_vector()
+                changed = True
+                if current.enabled is not False:
+                    result.pose_updated.append(cuboid.name)
+            if not _is_close(current.geometry, dims, tolerance):
+                env_tensors[0][obs_idx, :3] = self.tensor_args.to_device(list(dims))
+                changed = True
+                if current.enabled is not False:
+                    result.dims_updated.append(cuboid.name)
+            if current.enabled is not True:
+                env_tensors[2][obs_idx] = 1
+                changed = True
+                if current.enabled is False:
+                    result.added.append(cuboid.name)
+            if changed:
+                self._update_obb_grid_index(env_idx, obs_idx)
+            state[cuboid.name] = LoadedObstacleState(geometry=dims, pose=pose)
+        if len(cuboids) > 0:
+            self.collision_types["primitive"] = True
+
     def _load_collision_model_in_cache(
         self, world_config: WorldConfig, env_idx: int = 0, fix_cache_reference: bool = False
     ):
-        """Load world obstacles into collision checker cache. This only loads cuboids.
+        """Load world obstacles into collision checker cache. This loads cuboids, spheres, and
+        capsules.
 
         Args:
             world_config: World obstacles to load into the collision checker.
             env_idx: Environment index to load the obstacles.
             fix_cache_reference: If True, does not allow to load more obstacles than cache size.
         """
+        self._load_capsules_in_cache(world_config, env_idx, fix_cache_reference)
         cube_objs = world_config.cuboid
         max_obb = len(cube_objs)
         self.world_model = world_config
         if max_obb < 1:
             log_info("No OBB objs")
             return
-        if self._cube_tensor_list is None or self._cube_tensor_list[0].shape[1] < max_obb:
-            if not fix_cache_reference:
-                log_info("Creating Obb cache" + str(max_obb))
-                self._create_obb_cache(max_obb)
-            else:
+        if self._cube_tensor_list is None or len(self._env_obbs_names[env_idx]) < max_obb:
+            if fix_cache_reference:
                 log_error("number of OBB is larger than collision cache, create larger cache.")
+            log_info("Creating Obb cache" + str(max_obb))
+            if self._cube_tensor_list is not None and self._obb_slots is not None:
+                # other environments keep their cuboids in ragged storage:
+                self._resize_env_obb_cache(env_idx, max_obb)
+            else:
+                self._create_obb_cache(max_obb)
 
         # load as a batch:
         pose_batch = [c.pose for c in cube_objs]
@@ -853,47 +1489,101 @@ class WorldPrimitiveCollision(WorldCollision):
         names_batch = [c.name for c in cube_objs]
         cube_batch = batch_tensor_cube(pose_batch, dims_batch, self.tensor_args)
 
-        self._cube_tensor_list[0][env_idx, :max_obb, :3] = cube_batch[0]
-        self._cube_tensor_list[1][env_idx, :max_obb, :7] = cube_batch[1]
+        env_tensors = self._get_env_obb_tensors(env_idx)
+        env_tensors[0][:max_obb, :3] = cube_batch[0]
+        env_tensors[1][:max_obb, :7] = cube_batch[1]
 
-        self._cube_tensor_list[2][env_idx, :max_obb] = 1  # enabling obstacle
+        env_tensors[2][:max_obb] = 1  # enabling obstacle
 
-        self._cube_tensor_list[2][env_idx, max_obb:] = 0  # disabling obstacle
+        env_tensors[2][max_obb:] = 0  # disabling obstacle
         # self._cube_tensor_list[1][env_idx, max_obb:, 0] = 1000.0  # Not needed. TODO: remove
 
         self._env_n_obbs[env_idx] = max_obb
         self._env_obbs_names[env_idx][:max_obb] = names_batch
+        self._env_obb_state[env_idx] = self._get_obb_state(cube_objs)
+        self._update_obb_grid_index()
         self.collision_types["primitive"] = True
 
-    def _create_obb_cache(self, obb_cache: int):
+    def _create_obb_cache(self, obb_cache: Union[int, List[int]]):
         """Create cache for cuboid (oriented bounding box) obstacles.
 
         Args:
-            obb_cache: Number of cuboids to cache for collision checking.
+            obb_cache: Number of cuboids to cache for collision checking in every environment.
+                With ragged storage, this can also be a list with the number of cuboids to
+                cache in each environment.
         """
+        if self.ragged_obstacles:
+            if isinstance(obb_cache, int):
+                obb_cache = [obb_cache for _ in range(self.n_envs)]
+            self._obb_slots = RaggedObstacleSlots(obb_cache, self.tensor_args.device)
+            env_obb_cache = self._obb_slots.env_capacity
+            cache_shape = (self._obb_slots.n_slots, 1)
+        else:
+            env_obb_cache = [obb_cache for _ in range(self.n_envs)]
+            cache_shape = (self.n_envs, obb_cache)
         box_dims = (
             torch.zeros(
-                (self.n_envs, obb_cache, 4),
+                cache_shape + (4,),
                 dtype=self.tensor_args.dtype,
                 device=self.tensor_args.device,
             )
             + 0.01
         )
         box_pose = torch.zeros(
-            (self.n_envs, obb_cache, 8),
+            cache_shape + (8,),
             dtype=self.tensor_args.dtype,
             device=self.tensor_args.device,
         )
         box_pose[..., 3] = 1.0
-        obs_enable = torch.zeros(
-            (self.n_envs, obb_cache), dtype=torch.uint8, device=self.tensor_args.device
-        )
+        obs_enable = torch.zeros(cache_shape, dtype=torch.uint8, device=self.tensor_args.device)
         self._env_n_obbs = torch.zeros(
-            (self.n_envs), device=self.tensor_args.device, dtype=torch.int32
+            (len(env_obb_cache)), device=self.tensor_args.device, dtype=torch.int32
         )
         self._cube_tensor_list = [box_dims, box_pose, obs_enable]
         self.collision_types["primitive"] = True
-        self._env_obbs_names = [[None for _ in range(obb_cache)] for _ in range(self.n_envs)]
+        self._env_obbs_names = [[None for _ in range(n)] for n in env_obb_cache]
+        self._env_obb_state = [{} for _ in range(len(env_obb_cache))]
+        if self.obb_index is not None:
+            self._obb_grid_index = ObbGridIndex(self.obb_index, self.tensor_args)
+            self._obb_grid_index.set_obb_tensors(box_dims, box_pose, obs_enable, self._env_n_obbs)
+
+    def _resize_env_obb_cache(self, env_idx: int, obb_cache: int):
+        """Grow the cuboid cache of one environment in ragged storage.
+
+        Cuboids of all environments are kept. This creates new tensors, which breaks CUDA
+        graphs that reference the cache.
+
+        Args:
+            env_idx: Environment index to resize.
+            obb_cache: Number of cuboids to cache in the environment.
+        """
+        env_obb_cache = list(self._obb_slots.env_capacity)
+        env_obb_cache[env_idx] = obb_cache
+        obb_slots, cube_tensor_list = self._obb_slots, self._cube_tensor_list
+        env_n_obbs, env_obbs_names = self._env_n_obbs, self._env_obbs_names
+        env_obb_state = self._env_obb_state
+        self._create_obb_cache(env_obb_cache)
+        obb_slots.copy_slots(cube_tensor_list, self._obb_slots, self._cube_tensor_list)
+        self._env_n_obbs[:] = env_n_obbs
+        self._env_obbs_names = [
+            names + [None for _ in range(n - len(names))]
+            for names, n in zip(env_obbs_names, self._obb_slots.env_capacity)
+        ]
+        self._env_obb_state = env_obb_state
+
+    def _get_env_obb_tensors(self, env_idx: int) -> List[torch.Tensor]:
+        """Get views of the cuboid cache of an environment.
+
+        Args:
+            env_idx: Environment index.
+
+        Returns:
+            List[torch.Tensor]: Dimensions [n_cache, 4], inverse poses [n_cache, 8], and enable
+            flags [n_cache] of cuboids in the environment, for padded and ragged storage.
+        """
+        if self._obb_slots is not None:
+            return self._obb_slots.get_env_tensors(self._cube_tensor_list, env_idx)
+        return [t[env_idx] for t in self._cube_tensor_list]
 
     def add_obb_from_raw(
         self,
@@ -922,14 +1612,23 @@ class WorldPrimitiveCollision(WorldCollision):
             obj_w_pose = w_obj_pose.inverse()
         # cube = tensor_cube(w_obj_pose, dims, tensor_args=self.tensor_args)
 
-        self._cube_tensor_list[0][env_idx, self._env_n_obbs[env_idx], :3] = dims
-        self._cube_tensor_list[1][
-            env_idx, self._env_n_obbs[env_idx], :7
-        ] = obj_w_pose.get_pose_vector()
-        self._cube_tensor_list[2][env_idx, self._env_n_obbs[env_idx]] = 1
-        self._env_obbs_names[env_idx][self._env_n_obbs[env_idx]] = name
+        obs_idx = int(self._env_n_obbs[env_idx])
+        if self._obb_slots is not None and obs_idx >= len(self._env_obbs_names[env_idx]):
+            log_warn(
+                "number of obbs is greater than buffer, reloading collision buffers (breaks CG)"
+            )
+            self._resize_env_obb_cache(env_idx, obs_idx + 1)
+        env_tensors = self._get_env_obb_tensors(env_idx)
+        env_tensors[0][obs_idx, :3] = dims
+        env_tensors[1][obs_idx, :7] = obj_w_pose.get_pose_vector()
+        env_tensors[2][obs_idx] = 1
+        self._env_obbs_names[env_idx][obs_idx] = name
         self._env_n_obbs[env_idx] += 1
-        return self._env_n_obbs[env_idx] - 1
+        self._update_obb_grid_index(env_idx, obs_idx)
+        _record_obstacle_change(
+            self._env_obb_state, name, env_idx, pose=True, geometry=True, enable=True
+        )
+        return obs_idx
 
     def add_obb(
         self,
@@ -945,12 +1644,14 @@ class WorldPrimitiveCollision(WorldCollision):
         Returns:
             Index of the obstacle in the world.
         """
-        return self.add_obb_from_raw(
+        obs_idx = self.add_obb_from_raw(
             cuboid.name,
             self.tensor_args.to_device(cuboid.dims),
             env_idx,
             Pose.from_list(cuboid.pose, self.tensor_args),
         )
+        self._env_obb_state[env_idx].update(self._get_obb_state([cuboid]))
+        return obs_idx
 
     def update_obb_dims(
         self,
@@ -969,11 +1670,15 @@ class WorldPrimitiveCollision(WorldCollision):
         """
         if env_obj_idx is not None:
             self._cube_tensor_list[0][env_obj_idx, :3] = obj_dims
+            self._update_obb_grid_index()
+            _record_obstacle_change(self._env_obb_state, None, None, geometry=True)
         else:
             # find index of given name:
             obs_idx = self.get_obb_idx(name, env_idx)
 
-            self._cube_tensor_list[0][env_idx, obs_idx, :3] = obj_dims
+            self._get_env_obb_tensors(env_idx)[0][obs_idx, :3] = obj_dims
+            self._update_obb_grid_index(env_idx, obs_idx)
+            _record_obstacle_change(self._env_obb_state, name, env_idx, geometry=True)
 
     def enable_obstacle(
         self,
@@ -988,6 +1693,8 @@ class WorldPrimitiveCollision(WorldCollision):
             enable: True to enable, False to disable.
             env_idx: Index of the environment to enable the obstacle in.
         """
+        if self._env_capsule_names is not None and name in self._env_capsule_names[env_idx]:
+            return self.enable_capsule(enable, name, None, env_idx)
         return self.enable_obb(enable, name, None, env_idx)
 
     def enable_obb(
@@ -1007,11 +1714,15 @@ class WorldPrimitiveCollision(WorldCollision):
         """
         if env_obj_idx is not None:
             self._cube_tensor_list[2][env_obj_idx] = int(enable)  # enable == 1
+            self._update_obb_grid_index()
+            _record_obstacle_change(self._env_obb_state, None, None, enable=bool(enable))
         else:
             # find index of given name:
             obs_idx = self.get_obb_idx(name, env_idx)
 
-            self._cube_tensor_list[2][env_idx, obs_idx] = int(enable)
+            self._get_env_obb_tensors(env_idx)[2][obs_idx] = int(enable)
+            self._update_obb_grid_index(env_idx, obs_idx)
+            _record_obstacle_change(self._env_obb_state, name, env_idx, enable=bool(enable))
 
     def update_obstacle_pose(
         self,
@@ -1035,8 +1746,14 @@ class WorldPrimitiveCollision(WorldCollision):
                 w_obj_pose=w_obj_pose,
                 env_idx=env_idx,
             )
+        elif self._env_capsule_names is not None and name in self._env_capsule_names[env_idx]:
+            self.update_capsule_pose(
+                name=name,
+                w_obj_pose=w_obj_pose,
+                env_idx=env_idx,
+            )
         else:
-            log_warn("obstacle not found in OBB world model: " + name)
+            log_warn("obstacle not found in primitive world model: " + name)
 
         if update_cpu_reference:
             self.update_obstacle_pose_in_world_model(name, w_obj_pose, env_idx)
@@ -1064,9 +1781,13 @@ class WorldPrimitiveCollision(WorldCollision):
         obj_w_pose = self._get_obstacle_poses(w_obj_pose, obj_w_pose)
         if env_obj_idx is not None:
             self._cube_tensor_list[1][env_obj_idx, :7] = obj_w_pose.get_pose_vector()
+            self._update_obb_grid_index()
+            _record_obstacle_change(self._env_obb_state, None, None, pose=True)
         else:
             obs_idx = self.get_obb_idx(name, env_idx)
-            self._cube_tensor_list[1][env_idx, obs_idx, :7] = obj_w_pose.get_pose_vector()
+            self._get_env_obb_tensors(env_idx)[1][obs_idx, :7] = obj_w_pose.get_pose_vector()
+            self._update_obb_grid_index(env_idx, obs_idx)
+            _record_obstacle_change(self._env_obb_state, name, env_idx, pose=True)
 
     @classmethod
     def _get_obstacle_poses(
@@ -1091,6 +1812,92 @@ class WorldPrimitiveCollision(WorldCollision):
             log_error("Object pose is not given")
         return w_inv_pose
 
+    def _update_obb_grid_index(
+        self,
+        env_idx: Optional[Union[int, torch.Tensor]] = None,
+        obb_idx: Optional[Union[int, torch.Tensor]] = None,
+    ):
+        """Update grid index after modifying cuboids.
+
+        Args:
+            env_idx: Environment index of modified cuboid. All cuboids are updated when None.
+            obb_idx: Index of modified cuboid. All cuboids are updated when None.
+        """
+        if self._obb_grid_index is None:
+            return
+        if env_idx is None or obb_idx is None:
+            self._obb_grid_index.refresh()
+        else:
+            self._obb_grid_index.update_obbs(env_idx, obb_idx)
+
+    def _get_obb_query_tensors(
+        self,
+        query_sphere: torch.Tensor,
+        margin: torch.Tensor,
+        env_query_idx: Optional[torch.Tensor] = None,
+        sweep: bool = False,
+    ) -> Tuple[List[torch.Tensor], torch.Tensor]:
+        """Get cuboid tensors to pass to collision kernels for a query.
+
+        Without a grid index, this returns the cuboid cache. With a grid index, cuboids that can
+        be within ``margin`` of a query sphere are compacted into smaller tensors. With ragged
+        storage, the number of cuboids is the number of slots of every environment at its first
+        slot, see :meth:`_get_obb_env_query_idx`.
+
+        Args:
+            query_sphere: Query spheres [batch, horizon, number of spheres, 4].
+            margin: Distance outside spheres at which cuboids contribute to the result.
+            env_query_idx: Environment index for each batch of query spheres.
+            sweep: Include the segments swept by spheres between consecutive timesteps.
+
+        Returns:
+            Tuple[List[torch.Tensor], torch.Tensor]: Dimensions, inverse poses, and enable flags
+            of cuboids, and number of cuboids in every environment.
+        """
+        if self._obb_slots is not None:
+            return self._cube_tensor_list, self._obb_slots.slot_counts
+        if self._obb_grid_index is None:
+            return self._cube_tensor_list, self._env_n_obbs
+        b, h, n, _ = query_sphere.shape
+        spheres = query_sphere.detach()
+        radius = spheres[..., 3:] + margin.view(-1)[0]
+        lower = spheres[..., :3] - radius
+        upper = spheres[..., :3] + radius
+        if sweep and h > 1:
+            lower = torch.minimum(lower, torch.cat([lower[:, :1], lower[:, :-1]], dim=1))
+            lower = torch.minimum(lower, torch.cat([lower[:, 1:], lower[:, -1:]], dim=1))
+            upper = torch.maximum(upper, torch.cat([upper[:, :1], upper[:, :-1]], dim=1))
+            upper = torch.maximum(upper, torch.cat([upper[:, 1:], upper[:, -1:]], dim=1))
+        valid = spheres[..., 3].reshape(-1) >= 0.0
+        env_idx = None
+        if env_query_idx is not None:
+            env_idx = env_query_idx.view(-1)[:b].view(b, 1, 1).expand(b, h, n).reshape(-1)
+            env_idx = env_idx[valid]
+        candidates = self._obb_grid_index.get_candidates(
+            lower.reshape(-1, 3)[valid], upper.reshape(-1, 3)[valid], env_idx
+        )
+        obb_tensors, env_n_obbs, _ = self._obb_grid_index.compact(candidates)
+        return obb_tensors, env_n_obbs
+
+    def _get_obb_env_query_idx(
+        self, env_query_idx: Optional[torch.Tensor], batch_size: int
+    ) -> Optional[torch.Tensor]:
+        """Get environment index to pass to cuboid kernels for a query.
+
+        With ragged storage, this is the first slot of the environment of every batch, as
+        kernels read cuboids of environment ``e`` from ``e * obb_tensors[0].shape[1]``.
+
+        Args:
+            env_query_idx: Environment index for each batch of query spheres.
+            batch_size: Number of batches of query spheres.
+
+        Returns:
+            Optional[torch.Tensor]: Environment index for each batch of query spheres.
+        """
+        if self._obb_slots is None:
+            return env_query_idx
+        return self._obb_slots.get_env_query_idx(env_query_idx, batch_size)
+
     def get_obb_idx(
         self,
         name: str,
@@ -1109,6 +1916,517 @@ class WorldPrimitiveCollision(WorldCollision):
             log_error("Obstacle with name: " + name + " not found in current world", exc_info=True)
         return self._env_obbs_names[env_idx].index(name)
 
+    @staticmethod
+    def _get_capsule_obstacles(world_config: WorldConfig) -> List[Union[Sphere, Capsule]]:
+        """Get spheres and capsules of a world, which are stored in the capsule cache."""
+        spheres = world_config.sphere if world_config.sphere is not None else []
+        capsules = world_config.capsule if world_config.capsule is not None else []
+        return spheres + capsules
+
+    @staticmethod
+    def _get_capsule_params(obstacle: Union[Sphere, Capsule]) -> List[float]:
+        """Get base, tip, and radius of a sphere or capsule in its frame.
+
+        Args:
+            obstacle: Sphere or capsule obstacle.
+
+        Returns:
+            [base.x, base.y, base.z, tip.x, tip.y, tip.z, radius].
+        """
+        if isinstance(obstacle, Sphere):
+            return [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, float(obstacle.radius)]
+        if isinstance(obstacle, Capsule):
+            return (
+                [float(x) for x in obstacle.base]
+                + [float(x) for x in obstacle.tip]
+                + [float(obstacle.radius)]
+            )
+        log_error("Only spheres and capsules can be stored in capsule cache: " + obstacle.name)
+
+    @staticmethod
+    def _get_capsule_state(
+        obstacles: List[Union[Sphere, Capsule]],
+    ) -> Dict[str, LoadedObstacleState]:
+        """Get state of spheres and capsules to compare against in
+        :meth:`update_collision_model`."""
+        return {
+            c.name: LoadedObstacleState(
+                geometry=tuple(WorldPrimitiveCollision._get_capsule_params(c)),
+                pose=tuple(float(x) for x in c.pose),
+            )
+            for c in obstacles
+        }
+
+    def _create_capsule_cache(self, capsule_cache: int):
+        """Create cache for sphere and capsule obstacles.
+
+        Args:
+            capsule_cache: Number of spheres and capsules to cache for collision checking.
+        """
+        capsule_params = torch.zeros(
+            (self.n_envs, capsule_cache, 8),
+            dtype=self.tensor_args.dtype,
+            device=self.tensor_args.device,
+        )
+        capsule_pose = torch.zeros(
+            (self.n_envs, capsule_cache, 8),
+            dtype=self.tensor_args.dtype,
+            device=self.tensor_args.device,
+        )
+        capsule_pose[..., 3] = 1.0
+        capsule_enable = torch.zeros(
+            (self.n_envs, capsule_cache), dtype=torch.uint8, device=self.tensor_args.device
+        )
+        self._env_n_capsules = torch.zeros(
+            (self.n_envs), device=self.tensor_args.device, dtype=torch.int32
+        )
+        self._capsule_tensor_list = [capsule_params, capsule_pose, capsule_enable]
+        self.collision_types["primitive"] = True
+        self.collision_types["capsule"] = True
+        self._env_capsule_names = [[None for _ in range(capsule_cache)] for _ in range(self.n_envs)]
+        self._env_capsule_state = [{} for _ in range(self.n_envs)]
+
+    def _write_env_capsules(self, obstacles: List[Union[Sphere, Capsule]], env_idx: int):
+        """Write spheres and capsules of an environment to the cache, disabling other slots.
+
+        Args:
+            obstacles: Spheres and capsules of the environment.
+            env_idx: Environment index to write to.
+        """
+        n_capsules = len(obstacles)
+        if n_capsules > 0:
+            params = self.tensor_args.to_device([self._get_capsule_params(c) for c in obstacles])
+            obj_w_pose = Pose.from_batch_list(
+                [c.pose for c in obstacles], tensor_args=self.tensor_args
+            ).inverse()
+            self._capsule_tensor_list[0][env_idx, :n_capsules, :7] = params
+            self._capsule_tensor_list[1][env_idx, :n_capsules, :7] = obj_w_pose.get_pose_vector()
+            self._capsule_tensor_list[2][env_idx, :n_capsules] = 1
+        self._capsule_tensor_list[2][env_idx, n_capsules:] = 0
+        self._env_n_capsules[env_idx] = n_capsules
+        names = self._env_capsule_names[env_idx]
+        names[:] = [c.name for c in obstacles] + [None] * (len(names) - n_capsules)
+        self._env_capsule_state[env_idx] = self._get_capsule_state(obstacles)
+
+    def _load_capsules_in_cache(
+        self, world_config: WorldConfig, env_idx: int = 0, fix_cache_reference: bool = False
+    ):
+        """Load spheres and capsules of a world into the capsule cache.
+
+        Args:
+            world_config: World obstacles to load.
+            env_idx: Environment index to load the obstacles.
+            fix_cache_reference: If True, does not allow to load more obstacles than cache size.
+        """
+        capsules = self._get_capsule_obstacles(world_config)
+        n_capsules = len(capsules)
+        if self._capsule_tensor_list is None and n_capsules < 1:
+            return
+        if self._capsule_tensor_list is None or self._capsule_tensor_list[0].shape[1] < n_capsules:
+            if not fix_cache_reference:
+                log_info("Creating Capsule cache" + str(n_capsules))
+                self._create_capsule_cache(n_capsules)
+            else:
+                log_error("number of capsules is larger than collision cache, create larger cache.")
+        self._write_env_capsules(capsules, env_idx)
+
+    def _load_batch_capsules(self, world_config_list: List[WorldConfig]):
+        """Load spheres and capsules of a batch of environments into the capsule cache.
+
+        Args:
+            world_config_list: World obstacles of every environment.
+        """
+        capsules = [self._get_capsule_obstacles(w) for w in world_config_list]
+        max_capsules = max(len(c) for c in capsules)
+        n_envs = len(world_config_list)
+        if self._capsule_tensor_list is None and max_capsules < 1:
+            return
+        if (
+            self._capsule_tensor_list is None
+            or self._capsule_tensor_list[0].shape[0] != n_envs
+            or self._capsule_tensor_list[0].shape[1] < max_capsules
+        ):
+            if self._capsule_tensor_list is not None:
+                log_warn(
+                    "Capsule cache does not fit batch, reloading collision buffers (breaks CG)"
+                )
+            self.n_envs = n_envs
+            self._create_capsule_cache(max(max_capsules, 1))
+        for env_idx, env_capsules in enumerate(capsules):
+            self._write_env_capsules(env_capsules, env_idx)
+
+    def _can_update_capsules(self, capsules: List[Union[Sphere, Capsule]], env_idx: int) -> bool:
+        """Check if spheres and capsules can be written to the cache without a full reload."""
+        if self._capsule_tensor_list is None:
+            return len(capsules) == 0
+        n_capsules = int(self._env_n_capsules[env_idx])
+        loaded_names = set(self._env_capsule_names[env_idx][:n_capsules])
+        new_names = set(c.name for c in capsules)
+        if len(new_names) != len(capsules):
+            log_error("Sphere and capsule names should be unique when updating collision model")
+        n_new = len(new_names - loaded_names)
+        n_free = self._capsule_tensor_list[0].shape[1] - n_capsules + len(loaded_names - new_names)
+        return n_new <= n_free
+
+    def _update_capsules_from_config(
+        self,
+        capsules: List[Union[Sphere, Capsule]],
+        env_idx: int,
+        result: WorldUpdateResult,
+        tolerance: float,
+    ):
+        """Write changed spheres and capsules to the cache. Check :meth:`_can_update_capsules`
+        before calling."""
+        if self._capsule_tensor_list is None:
+            return
+        n_capsules = int(self._env_n_capsules[env_idx])
+        names = self._env_capsule_names[env_idx]
+        capsule_idx = {name: i for i, name in enumerate(names[:n_capsules])}
+        state = self._env_capsule_state[env_idx]
+        new_names = set(c.name for c in capsules)
+
+        # disable obstacles that are not in the new world, reusing their slots:
+        free_slots = []
+        for name, obs_idx in capsule_idx.items():
+            if name in new_names:
+                continue
+            current = state.get(name)
+            if current is None or current.enabled is not False:
+                self._capsule_tensor_list[2][env_idx, obs_idx] = 0
+                result.removed.append(name)
+                state[name] = LoadedObstacleState(enabled=False)
+            free_slots.append(obs_idx)
+        free_slots.reverse()
+
+        for capsule in capsules:
+            params = tuple(self._get_capsule_params(capsule))
+            pose = tuple(float(x) for x in capsule.pose)
+            current = state.get(capsule.name)
+            obs_idx = capsule_idx.get(capsule.name)
+            if obs_idx is None:
+                if len(free_slots) > 0:
+                    obs_idx = free_slots.pop()
+                    state.pop(names[obs_idx], None)
+                else:
+                    obs_idx = n_capsules
+                    n_capsules += 1
+                    self._env_n_capsules[env_idx] = n_capsules
+                names[obs_idx] = capsule.name
+                current = LoadedObstacleState(enabled=False)
+            if current is None:
+                current = LoadedObstacleState(enabled=None)
+            if not _is_close(current.pose, pose, tolerance):
+                obj_w_pose = Pose.from_list(list(pose), self.tensor_args).inverse()
+                self._capsule_tensor_list[1][env_idx, obs_idx, :7] = obj_w_pose.get_pose_vector()
+                if current.enabled is not False:
+                    result.pose_updated.append(capsule.name)
+            if not _is_close(current.geometry, params, tolerance):
+                self._capsule_tensor_list[0][env_idx, obs_idx, :7] = self.tensor_args.to_device(
+                    list(params)
+                )
+                if current.enabled is not False:
+                    result.dims_updated.append(capsule.name)
+            if current.enabled is not True:
+                self._capsule_tensor_list[2][env_idx, obs_idx] = 1
+                if current.enabled is False:
+                    result.added.append(capsule.name)
+            state[capsule.name] = LoadedObstacleState(geometry=params, pose=pose)
+
+    def add_capsule_from_raw(
+        self,
+        name: str,
+        capsule_params: torch.Tensor,
+        env_idx: int,
+        w_obj_pose: Optional[Pose] = None,
+        obj_w_pose: Optional[Pose] = None,
+    ) -> int:
+        """Add capsule obstacle to world.
+
+        Args:
+            name: Name of the obstacle. Must be unique.
+            capsule_params: Base, tip, and radius of capsule in its frame
+                [base.x, base.y, base.z, tip.x, tip.y, tip.z, radius].
+            env_idx: Environment index to add the obstacle to.
+            w_obj_pose: Pose of the obstacle in world frame.
+            obj_w_pose: Inverse pose of the obstacle in world frame.
+
+        Returns:
+            Index of the obstacle in the world.
+        """
+        if self._capsule_tensor_list is None:
+            log_error("Capsule cache is not created, set cache={'capsule': n} in config")
+        if name in self._env_capsule_names[env_idx]:
+            log_error("Obstacle already exists with name: " + name, exc_info=True)
+        obs_idx = int(self._env_n_capsules[env_idx])
+        if obs_idx >= self._capsule_tensor_list[0].shape[1]:
+            log_error("Capsule cache is full, create larger cache to add: " + name)
+        obj_w_pose = self._get_obstacle_poses(w_obj_pose, obj_w_pose)
+        self._capsule_tensor_list[0][env_idx, obs_idx, :7] = capsule_params
+        self._capsule_tensor_list[1][env_idx, obs_idx, :7] = obj_w_pose.get_pose_vector()
+        self._capsule_tensor_list[2][env_idx, obs_idx] = 1
+        self._env_capsule_names[env_idx][obs_idx] = name
+        self._env_n_capsules[env_idx] += 1
+        _record_obstacle_change(
+            self._env_capsule_state, name, env_idx, pose=True, geometry=True, enable=True
+        )
+        return obs_idx
+
+    def add_capsule(self, capsule: Capsule, env_idx: int = 0) -> int:
+        """Add capsule obstacle to world.
+
+        Args:
+            capsule: Capsule to add.
+            env_idx: Environment index to add the obstacle to.
+
+        Returns:
+            Index of the obstacle in the world.
+        """
+        obs_idx = self.add_capsule_from_raw(
+            capsule.name,
+            self.tensor_args.to_device(self._get_capsule_params(capsule)),
+            env_idx,
+            Pose.from_list(capsule.pose, self.tensor_args),
+        )
+        self._env_capsule_state[env_idx].update(self._get_capsule_state([capsule]))
+        return obs_idx
+
+    def add_sphere(self, sphere: Sphere, env_idx: int = 0) -> int:
+        """Add sphere obstacle to world. Spheres are stored as capsules with zero length.
+
+        Args:
+            sphere: Sphere to add.
+            env_idx: Environment index to add the obstacle to.
+
+        Returns:
+            Index of the obstacle in the world.
+        """
+        obs_idx = self.add_capsule_from_raw(
+            sphere.name,
+            self.tensor_args.to_device(self._get_capsule_params(sphere)),
+            env_idx,
+            Pose.from_list(sphere.pose, self.tensor_args),
+        )
+        self._env_capsule_state[env_idx].update(self._get_capsule_state([sphere]))
+        return obs_idx
+
+    def update_capsule_params(
+        self,
+        capsule_params: torch.Tensor,
+        name: Optional[str] = None,
+        env_obj_idx: Optional[torch.Tensor] = None,
+        env_idx: int = 0,
+    ):
+        """Update base, tip, and radius of an existing sphere or capsule obstacle.
+
+        Args:
+            capsule_params: [base.x, base.y, base.z, tip.x, tip.y, tip.z, radius]. Base and tip
+                of a sphere are zero.
+            name: Name of the obstacle to update.
+            env_obj_idx: Index of the obstacle to update. Not required if name is provided.
+            env_idx: Environment index to update the obstacle.
+        """
+        if env_obj_idx is not None:
+            self._capsule_tensor_list[0][env_obj_idx, :7] = capsule_params
+            _record_obstacle_change(self._env_capsule_state, None, None, geometry=True)
+        else:
+            obs_idx = self.get_capsule_idx(name, env_idx)
+            self._capsule_tensor_list[0][env_idx, obs_idx, :7] = capsule_params
+            _record_obstacle_change(self._env_capsule_state, name, env_idx, geometry=True)
+
+    def enable_capsule(
+        self,
+        enable: bool = True,
+        name: Optional[str] = None,
+        env_obj_idx: Optional[torch.Tensor] = None,
+        env_idx: int = 0,
+    ):
+        """Enable/Disable sphere or capsule in collision checking functions.
+
+        Args:
+            enable: True to enable, False to disable.
+            name: Name of the obstacle to enable.
+            env_obj_idx: Index of the obstacle to enable. Not required if name is provided.
+            env_idx: Index of the environment to enable the obstacle in.
+        """
+        if env_obj_idx is not None:
+            self._capsule_tensor_list[2][env_obj_idx] = int(enable)
+            _record_obstacle_change(self._env_capsule_state, None, None, enable=bool(enable))
+        else:
+            obs_idx = self.get_capsule_idx(name, env_idx)
+            self._capsule_tensor_list[2][env_idx, obs_idx] = int(enable)
+            _record_obstacle_change(self._env_capsule_state, name, env_idx, enable=bool(enable))
+
+    def update_capsule_pose(
+        self,
+        w_obj_pose: Optional[Pose] = None,
+        obj_w_pose: Optional[Pose] = None,
+        name: Optional[str] = None,
+        env_obj_idx: Optional[torch.Tensor] = None,
+        env_idx: int = 0,
+    ):
+        """Update pose of an existing sphere or capsule obstacle.
+
+        Args:
+            w_obj_pose: Pose of the obstacle in world frame.
+            obj_w_pose: Inverse pose of the obstacle in world frame. Not required if w_obj_pose is
+                provided.
+            name: Name of the obstacle to update.
+            env_obj_idx: Index of the obstacle to update. Not required if name is provided.
+            env_idx: Index of the environment to update the obstacle.
+        """
+        obj_w_pose = self._get_obstacle_poses(w_obj_pose, obj_w_pose)
+        if env_obj_idx is not None:
+            self._capsule_tensor_list[1][env_obj_idx, :7] = obj_w_pose.get_pose_vector()
+            _record_obstacle_change(self._env_capsule_state, None, None, pose=True)
+        else:
+            obs_idx = self.get_capsule_idx(name, env_idx)
+            self._capsule_tensor_list[1][env_idx, obs_idx, :7] = obj_w_pose.get_pose_vector()
+            _record_obstacle_change(self._env_capsule_state, name, env_idx, pose=True)
+
+    def get_capsule_idx(
+        self,
+        name: str,
+        env_idx: int = 0,
+    ) -> int:
+        """Get index of the sphere or capsule obstacle in the world.
+
+        Args:
+            name: Name of the obstacle to get the index.
+            env_idx: Environment index to get the obstacle index.
+
+        Returns:
+            Index of the obstacle in the world.
+        """
+        if self._env_capsule_names is None or name not in self._env_capsule_names[env_idx]:
+            log_error("Obstacle with name: " + name + " not found in current world", exc_info=True)
+        return self._env_capsule_names[env_idx].index(name)
+
+    def _get_capsule_query_buffer(
+        self, query_sphere: torch.Tensor, collision_query_buffer: CollisionQueryBuffer
+    ) -> CollisionBuffer:
+        """Get buffer of capsule queries, creating it when capsules were loaded after the
+        query buffer was created."""
+        if collision_query_buffer.capsule_collision_buffer is None:
+            collision_query_buffer.capsule_collision_buffer = CollisionBuffer.initialize_from_shape(
+                query_sphere.shape, self.tensor_args
+            )
+        return collision_query_buffer.capsule_collision_buffer
+
+    def _get_capsule_sphere_distance(
+        self,
+        query_sphere: torch.Tensor,
+        collision_query_buffer: CollisionQueryBuffer,
+        weight: torch.Tensor,
+        activation_distance: torch.Tensor,
+        env_query_idx: Optional[torch.Tensor],
+        return_loss: bool,
+        compute_distance: bool,
+        compute_esdf: bool,
+    ) -> torch.Tensor:
+        """Compute collision between query spheres and sphere and capsule obstacles.
+
+        Args:
+            query_sphere: Input tensor with query spheres [batch, horizon, number of spheres, 4].
+            collision_query_buffer: Buffer to store collision query results.
+            weight: Weight of the collision cost.
+            activation_distance: Distance outside the object to start computing the cost.
+            env_query_idx: Environment index for each batch of query spheres.
+            return_loss: Scale gradient by gradient of returned tensor in backward.
+            compute_distance: Compute collision cost, binary collision is computed when False.
+            compute_esdf: Compute Euclidean signed distance instead of collision cost.
+
+        Returns:
+            Collision cost, binary collision, or signed distance of query spheres.
+        """
+        b, h, n, _ = query_sphere.shape
+        capsule_buffer = self._get_capsule_query_buffer(query_sphere, collision_query_buffer)
+        use_batch_env = True
+        if env_query_idx is None:
+            use_batch_env = False
+            env_query_idx = self._env_n_capsules
+        return SdfSphereCapsule.apply(
+            query_sphere,
+            capsule_buffer.distance_buffer,
+            capsule_buffer.grad_distance_buffer,
+            capsule_buffer.sparsity_index_buffer,
+            weight,
+            activation_distance,
+            self.max_distance,
+            self._capsule_tensor_list[0],
+            self._capsule_tensor_list[1],
+            self._capsule_tensor_list[2],
+            self._env_n_capsules,
+            env_query_idx,
+            b,
+            h,
+            n,
+            query_sphere.requires_grad,
+            compute_distance,
+            use_batch_env,
+            return_loss,
+            compute_esdf,
+        )
+
+    def _get_capsule_swept_sphere_distance(
+        self,
+        query_sphere: torch.Tensor,
+        collision_query_buffer: CollisionQueryBuffer,
+        weight: torch.Tensor,
+        activation_distance: torch.Tensor,
+        speed_dt: torch.Tensor,
+        sweep_steps: int,
+        enable_speed_metric: bool,
+        env_query_idx: Optional[torch.Tensor],
+        return_loss: bool,
+        compute_distance: bool,
+    ) -> torch.Tensor:
+        """Compute collision between trajectory of spheres and sphere and capsule obstacles.
+
+        Args:
+            query_sphere: Input tensor with query spheres [batch, horizon, number of spheres, 4].
+            collision_query_buffer: Buffer to store collision query results.
+            weight: Weight of the collision cost.
+            activation_distance: Distance outside the object to start computing the cost.
+            speed_dt: Length of time (seconds) to use when calculating the speed of the sphere.
+            sweep_steps: Number of steps to sweep the sphere along the trajectory.
+            enable_speed_metric: Scale the collision cost by the speed of the sphere.
+            env_query_idx: Environment index for each batch of query spheres.
+            return_loss: Scale gradient by gradient of returned tensor in backward.
+            compute_distance: Compute collision cost, binary collision is computed when False.
+
+        Returns:
+            Collision cost or binary collision of trajectory of spheres.
+        """
+        b, h, n, _ = query_sphere.shape
+        capsule_buffer = self._get_capsule_query_buffer(query_sphere, collision_query_buffer)
+        use_batch_env = True
+        if env_query_idx is None:
+            use_batch_env = False
+            env_query_idx = self._env_n_capsules
+        return SdfSweptSphereCapsule.apply(
+            query_sphere,
+            capsule_buffer.distance_buffer,
+            capsule_buffer.grad_distance_buffer,
+            capsule_buffer.sparsity_index_buffer,
+            weight,
+            activation_distance,
+            speed_dt,
+            self._capsule_tensor_list[0],
+            self._capsule_tensor_list[1],
+            self._capsule_tensor_list[2],
+            self._env_n_capsules,
+            env_query_idx,
+            b,
+            h,
+            n,
+            sweep_steps,
+            enable_speed_metric,
+            query_sphere.requires_grad,
+            compute_distance,
+            use_batch_env,
+            return_loss,
+        )
+
     def get_sphere_distance(
         self,
         query_sphere: torch.Tensor,
@@ -1146,12 +2464,33 @@ class WorldPrimitiveCollision(WorldCollision):
         """
         if "primitive" not in self.collision_types or not self.collision_types["primitive"]:
             log_error("Primitive Collision has no obstacles")
+        d_capsule = None
+        if self._capsule_tensor_list is not None:
+            d_capsule = self._get_capsule_sphere_distance(
+                query_sphere,
+                collision_query_buffer,
+                weight,
+                activation_distance,
+                env_query_idx,
+                return_loss,
+                True,
+                compute_esdf,
+            )
+            if self._cube_tensor_list is None:
+                return d_capsule
 
         b, h, n, _ = query_sphere.shape  # This can be read from collision query buffer
+        obb_tensors, env_n_obbs = self._get_obb_query_tensors(
+            query_sphere,
+            self.max_distance if compute_esdf else activation_distance,
+            env_query_idx,
+            sweep=False,
+        )
+        env_query_idx = self._get_obb_env_query_idx(env_query_idx, b)
         use_batch_env = True
         if env_query_idx is None:
             use_batch_env = False
-            env_query_idx = self._env_n_obbs
+            env_query_idx = env_n_obbs
 
         dist = SdfSphereOBB.apply(
             query_sphere,
@@ -1161,13 +2500,13 @@ class WorldPrimitiveCollision(WorldCollision):
             weight,
             activation_distance,
             self.max_distance,
-            self._cube_tensor_list[0],
-            self._cube_tensor_list[0],
-            self._cube_tensor_list[1],
-            self._cube_tensor_list[2],
-            self._env_n_obbs,
+            obb_tensors[0],
+            obb_tensors[0],
+            obb_tensors[1],
+            obb_tensors[2],
+            env_n_obbs,
             env_query_idx,
-            self._cube_tensor_list[0].shape[1],
+            obb_tensors[0].shape[1],
             b,
             h,
             n,
@@ -1177,7 +2516,10 @@ class WorldPrimitiveCollision(WorldCollision):
             return_loss,
             sum_collisions,
             compute_esdf,
+            self.use_torch_backend,
         )
+        if d_capsule is not None:
+            dist = torch.maximum(dist, d_capsule) if compute_esdf else dist + d_capsule
 
         return dist
 
@@ -1209,11 +2551,29 @@ class WorldPrimitiveCollision(WorldCollision):
             log_error("Primitive Collision has no obstacles")
         if return_loss:
             log_error("cannot return loss for classification, use get_sphere_distance")
+        d_capsule = None
+        if self._capsule_tensor_list is not None:
+            d_capsule = self._get_capsule_sphere_distance(
+                query_sphere,
+                collision_query_buffer,
+                weight,
+                activation_distance,
+                env_query_idx,
+                return_loss,
+                False,
+                False,
+            )
+            if self._cube_tensor_list is None:
+                return d_capsule
         b, h, n, _ = query_sphere.shape
+        obb_tensors, env_n_obbs = self._get_obb_query_tensors(
+            query_sphere, activation_distance, env_query_idx, sweep=False
+        )
+        env_query_idx = self._get_obb_env_query_idx(env_query_idx, b)
         use_batch_env = True
         if env_query_idx is None:
             use_batch_env = False
-            env_query_idx = self._env_n_obbs
+            env_query_idx = env_n_obbs
 
         dist = SdfSphereOBB.apply(
             query_sphere,
@@ -1223,13 +2583,13 @@ class WorldPrimitiveCollision(WorldCollision):
             weight,
             activation_distance,
             self.max_distance,
-            self._cube_tensor_list[0],
-            self._cube_tensor_list[0],
-            self._cube_tensor_list[1],
-            self._cube_tensor_list[2],
-            self._env_n_obbs,
+            obb_tensors[0],
+            obb_tensors[0],
+            obb_tensors[1],
+            obb_tensors[2],
+            env_n_obbs,
             env_query_idx,
-            self._cube_tensor_list[0].shape[1],
+            obb_tensors[0].shape[1],
             b,
             h,
             n,
@@ -1237,7 +2597,12 @@ class WorldPrimitiveCollision(WorldCollision):
             True,
             use_batch_env,
             return_loss,
+            True,
+            False,
+            self.use_torch_backend,
         )
+        if d_capsule is not None:
+            dist = dist + d_capsule
         return dist
 
     def get_swept_sphere_distance(
@@ -1252,6 +2617,7 @@ class WorldPrimitiveCollision(WorldCollision):
         env_query_idx: Optional[torch.Tensor] = None,
         return_loss=False,
         sum_collisions: bool = True,
+        adapt_sweep_steps: bool = True,
     ) -> torch.Tensor:
         """Compute the signed distance between trajectory of spheres and world obstacles.
 
@@ -1266,7 +2632,8 @@ class WorldPrimitiveCollision(WorldCollision):
             speed_dt: Length of time (seconds) to use when calculating the speed of the sphere
                 using finite difference.
             sweep_steps: Number of steps to sweep the sphere along the trajectory. More steps will
-                allow for catching small obstacles, taking more time to compute.
+                allow for catching small obstacles, taking more time to compute. Computed from
+                displacement of spheres when :attr:`adaptive_sweep` is set.
             enable_speed_metric: True will scale the collision cost by the speed of the sphere.
                 This has the effect of slowing down the robot when near obstacles. This also has
                 shown to improve convergence from poor initialization.
@@ -1277,19 +2644,43 @@ class WorldPrimitiveCollision(WorldCollision):
             sum_collisions: Sum the collision cost across all obstacles. This variable is currently
                 not passed to the underlying CUDA kernel as setting this to False caused poor
                 performance.
+            adapt_sweep_steps: Compute sweep_steps from displacement of spheres when
+                :attr:`adaptive_sweep` is set. Subclasses pass False to their base class with
+                the steps they computed.
 
         Returns:
             Collision cost between trajectory of spheres and world obstacles.
         """
+        sweep_steps = self._get_sweep_steps(query_sphere, sweep_steps, adapt_sweep_steps)
 
         if "primitive" not in self.collision_types or not self.collision_types["primitive"]:
             log_error("Primitive Collision has no obstacles")
+        d_capsule = None
+        if self._capsule_tensor_list is not None:
+            d_capsule = self._get_capsule_swept_sphere_distance(
+                query_sphere,
+                collision_query_buffer,
+                weight,
+                activation_distance,
+                speed_dt,
+                sweep_steps,
+                enable_speed_metric,
+                env_query_idx,
+                return_loss,
+                True,
+            )
+            if self._cube_tensor_list is None:
+                return d_capsule
 
         b, h, n, _ = query_sphere.shape
+        obb_tensors, env_n_obbs = self._get_obb_query_tensors(
+            query_sphere, activation_distance, env_query_idx, sweep=True
+        )
+        env_query_idx = self._get_obb_env_query_idx(env_query_idx, b)
         use_batch_env = True
         if env_query_idx is None:
             use_batch_env = False
-            env_query_idx = self._env_n_obbs
+            env_query_idx = env_n_obbs
 
         dist = SdfSweptSphereOBB.apply(
             query_sphere,
@@ -1299,13 +2690,13 @@ class WorldPrimitiveCollision(WorldCollision):
             weight,
             activation_distance,
             speed_dt,
-            self._cube_tensor_list[0],
-            self._cube_tensor_list[0],
-            self._cube_tensor_list[1],
-            self._cube_tensor_list[2],
-            self._env_n_obbs,
+            obb_tensors[0],
+            obb_tensors[0],
+            obb_tensors[1],
+            obb_tensors[2],
+            env_n_obbs,
             env_query_idx,
-            self._cube_tensor_list[0].shape[1],
+            obb_tensors[0].shape[1],
             b,
             h,
             n,
@@ -1316,7 +2707,10 @@ class WorldPrimitiveCollision(WorldCollision):
             use_batch_env,
             return_loss,
             sum_collisions,
+            self.use_torch_backend,
         )
+        if d_capsule is not None:
+            dist = dist + d_capsule
 
         return dist
 
@@ -1331,6 +2725,7 @@ class WorldPrimitiveCollision(WorldCollision):
         enable_speed_metric=False,
         env_query_idx: Optional[torch.Tensor] = None,
         return_loss=False,
+        adapt_sweep_steps: bool = True,
     ) -> torch.Tensor:
         """Get binary collision between trajectory of spheres and world obstacles.
 
@@ -1345,27 +2740,52 @@ class WorldPrimitiveCollision(WorldCollision):
             speed_dt: Length of time (seconds) to use when calculating the speed of the sphere
                 using finite difference. This is not used.
             sweep_steps: Number of steps to sweep the sphere along the trajectory. More steps will
-                allow for catching small obstacles, taking more time to compute.
+                allow for catching small obstacles, taking more time to compute. Computed from
+                displacement of spheres when :attr:`adaptive_sweep` is set.
             enable_speed_metric: True will scale the collision cost by the speed of the sphere.
                 This has the effect of slowing down the robot when near obstacles. This also has
                 shown to improve convergence from poor initialization. This is not used.
             env_query_idx: Environment index for each batch of query spheres.
             return_loss: This is not supported for binary classification. Set to False.
+            adapt_sweep_steps: Compute sweep_steps from displacement of spheres when
+                :attr:`adaptive_sweep` is set. Subclasses pass False to their base class with
+                the steps they computed.
 
         Returns:
             Collision value between trajectory of spheres and world obstacles.
         """
+        sweep_steps = self._get_sweep_steps(query_sphere, sweep_steps, adapt_sweep_steps)
 
         if "primitive" not in self.collision_types or not self.collision_types["primitive"]:
             log_error("Primitive Collision has no obstacles")
         if return_loss:
             log_error("cannot return loss for classify, use get_swept_sphere_distance")
+        d_capsule = None
+        if self._capsule_tensor_list is not None:
+            d_capsule = self._get_capsule_swept_sphere_distance(
+                query_sphere,
+                collision_query_buffer,
+                weight,
+                activation_distance,
+                speed_dt,
+                sweep_steps,
+                enable_speed_metric,
+                env_query_idx,
+                return_loss,
+                False,
+            )
+            if self._cube_tensor_list is None:
+                return d_capsule
         b, h, n, _ = query_sphere.shape
 
+        obb_tensors, env_n_obbs = self._get_obb_query_tensors(
+            query_sphere, activation_distance, env_query_idx, sweep=True
+        )
+        env_query_idx = self._get_obb_env_query_idx(env_query_idx, b)
         use_batch_env = True
         if env_query_idx is None:
             use_batch_env = False
-            env_query_idx = self._env_n_obbs
+            env_query_idx = env_n_obbs
         dist = SdfSweptSphereOBB.apply(
             query_sphere,
             collision_query_buffer.primitive_collision_buffer.distance_buffer,
@@ -1374,13 +2794,13 @@ class WorldPrimitiveCollision(WorldCollision):
             weight,
             activation_distance,
             speed_dt,
-            self._cube_tensor_list[0],
-            self._cube_tensor_list[0],
-            self._cube_tensor_list[1],
-            self._cube_tensor_list[2],
-            self._env_n_obbs,
+            obb_tensors[0],
+            obb_tensors[0],
+            obb_tensors[1],
+            obb_tensors[2],
+            env_n_obbs,
             env_query_idx,
-            self._cube_tensor_list[0].shape[1],
+            obb_tensors[0].shape[1],
             b,
             h,
             n,
@@ -1390,12 +2810,22 @@ class WorldPrimitiveCollision(WorldCollision):
             True,
             use_batch_env,
             return_loss,
+            True,
+            self.use_torch_backend,
         )
+        if d_capsule is not None:
+            dist = dist + d_capsule
 
         return dist
 
     def clear_cache(self):
-        """Delete all cuboid obstacles from the world."""
+        """Delete all cuboid, sphere, and capsule obstacles from the world."""
         if self._cube_tensor_list is not None:
             self._cube_tensor_list[2][:] = 0
             self._env_n_obbs[:] = 0
+            self._env_obb_state = [{} for _ in range(self.n_envs)]
+        if self._capsule_tensor_list is not None:
+            self._capsule_tensor_list[2][:] = 0
+            self._env_n_capsules[:] = 0
+            self._env_capsule_names = [[None for _ in names] for names in self._env_capsule_names]
+            self._env_capsule_state = [{} for _ in range(len(self._env_capsule_names))]
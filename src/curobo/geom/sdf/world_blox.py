@@ -17,7 +17,7 @@ import torch
 import torch.autograd.profiler as profiler
 
 # CuRobo
-from curobo.geom.sdf.world import CollisionQueryBuffer, WorldCollisionConfig
+from curobo.geom.sdf.world import CollisionQueryBuffer, WorldCollisionConfig, WorldUpdateResult
 from curobo.geom.sdf.world_voxel import WorldVoxelCollision
 from curobo.geom.types import Cuboid, Mesh, Sphere, SphereFitType, WorldConfig
 from curobo.types.camera import CameraObservation
@@ -118,6 +118,37 @@ class WorldBloxCollision(WorldVoxelCollision):
 
         super().load_collision_model(world_model, fix_cache_reference=fix_cache_reference)
 
+    def update_collision_model(
+        self,
+        world_config: WorldConfig,
+        env_idx: int = 0,
+        fix_cache_reference: bool = False,
+        tolerance: float = 1e-6,
+    ) -> WorldUpdateResult:
+        """Update loaded obstacles to match a world configuration.
+
+        nvblox maps and voxel grids are not diffed, the full collision model is reloaded when the
+        new world has nvblox layers or voxel grids. Otherwise, only changed meshes and cuboids are
+        written. Only 1 environment is supported.
+
+        Args:
+            world_config: Obstacles that should be in the world after the update.
+            env_idx: Environment index to update. Only 0 is supported.
+            fix_cache_reference: If True, throws error if number of obstacles is greater than
+                cache when a full reload is required.
+            tolerance: Maximum difference in pose and dimensions to consider an obstacle
+                unchanged.
+
+        Returns:
+            WorldUpdateResult: Changes written to the collision checker.
+        """
+        if len(world_config.blox) > 0 or len(world_config.voxel) > 0:
+            self.load_collision_model(world_config, fix_cache_reference=fix_cache_reference)
+            return WorldUpdateResult(full_reload=True)
+        return super().update_collision_model(
+            world_config, env_idx, fix_cache_reference=fix_cache_reference, tolerance=tolerance
+        )
+
     def clear_cache(self):
         """Clear obstacle cache, clears nvblox maps and other obstacles."""
         self._blox_mapper.clear()
@@ -275,6 +306,7 @@ class WorldBloxCollision(WorldVoxelCollision):
         env_query_idx: Optional[torch.Tensor] = None,
         return_loss: bool = False,
         sum_collisions: bool = True,
+        adapt_sweep_steps: bool = True,
     ) -> torch.Tensor:
         """Compute the signed distance between trajectory of spheres and world obstacles.
 
@@ -300,10 +332,14 @@ class WorldBloxCollision(WorldVoxelCollision):
             sum_collisions: Sum the collision cost across all obstacles. This variable is currently
                 not passed to the underlying CUDA kernel as setting this to False caused poor
                 performance.
+            adapt_sweep_steps: Compute sweep_steps from displacement of spheres when
+                :attr:`adaptive_sweep` is set. Subclasses pass False to their base class with
+                the steps they computed.
 
         Returns:
             Collision cost between trajectory of spheres and world obstacles.
         """
+        sweep_steps = self._get_sweep_steps(query_sphere, sweep_steps, adapt_sweep_steps)
         if "blox" not in self.collision_types or not self.collision_types["blox"]:
             return super().get_swept_sphere_distance(
                 query_sphere,
@@ -316,6 +352,7 @@ class WorldBloxCollision(WorldVoxelCollision):
                 env_query_idx,
                 return_loss=return_loss,
                 sum_collisions=sum_collisions,
+                adapt_sweep_steps=False,
             )
 
         d = self._get_blox_swept_sdf(
@@ -344,6 +381,7 @@ class WorldBloxCollision(WorldVoxelCollision):
             env_query_idx,
             return_loss=return_loss,
             sum_collisions=sum_collisions,
+            adapt_sweep_steps=False,
         )
         d = d + d_base
 
@@ -360,6 +398,7 @@ class WorldBloxCollision(WorldVoxelCollision):
         enable_speed_metric=False,
         env_query_idx: Optional[torch.Tensor] = None,
         return_loss: bool = False,
+        adapt_sweep_steps: bool = True,
     ) -> torch.Tensor:
         """Get binary collision between trajectory of spheres and world obstacles.
 
@@ -380,10 +419,14 @@ class WorldBloxCollision(WorldVoxelCollision):
                 shown to improve convergence from poor initialization. This is not used.
             env_query_idx: Environment index for each batch of query spheres.
             return_loss: This is not supported for binary classification. Set to False.
+            adapt_sweep_steps: Compute sweep_steps from displacement of spheres when
+                :attr:`adaptive_sweep` is set. Subclasses pass False to their base class with
+                the steps they computed.
 
         Returns:
             Collision value between trajectory of spheres and world obstacles.
         """
+        sweep_steps = self._get_sweep_steps(query_sphere, sweep_steps, adapt_sweep_steps)
         if "blox" not in self.collision_types or not self.collision_types["blox"]:
             return super().get_swept_sphere_collision(
                 query_sphere,
@@ -395,6 +438,7 @@ class WorldBloxCollision(WorldVoxelCollision):
                 enable_speed_metric,
                 env_query_idx,
                 return_loss=return_loss,
+                adapt_sweep_steps=False,
             )
         d = self._get_blox_swept_sdf(
             query_sphere,
@@ -421,6 +465,7 @@ class WorldBloxCollision(WorldVoxelCollision):
             enable_speed_metric,
             env_query_idx,
             return_loss=return_loss,
+            adapt_sweep_steps=False,
         )
         d = d + d_base
         return d
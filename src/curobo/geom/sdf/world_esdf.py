@@ -0,0 +1,411 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""Base for worlds whose obstacles are queried through a signed distance lookup in PyTorch."""
+
+# Standard Library
+from typing import Optional, Tuple
+
+# Third Party
+import torch
+
+# CuRobo
+from curobo.curobolib.geom import SdfSphereEsdf, SdfSweptSphereEsdf
+from curobo.geom.sdf.world import CollisionBuffer, CollisionQueryBuffer, WorldPrimitiveCollision
+from curobo.util.logger import log_error
+
+
+class WorldEsdfCollision(WorldPrimitiveCollision):
+    """Obstacles queried through a signed distance lookup, with primitives from the base class.
+
+    Subclasses store obstacles of one collision type, e.g., voxel grids in sparse blocks or point
+    clouds in a spatial hash, and implement :meth:`_get_esdf` and
+    :meth:`_get_esdf_collision_buffer`. Sphere and swept sphere queries compute costs of these
+    obstacles with PyTorch, so checkers also run on CPU, and add costs of primitives.
+    """
+
+    #: Key of obstacles queried through :meth:`_get_esdf` in :attr:`collision_types`.
+    esdf_collision_type: str = ""
+
+    def _get_esdf(
+        self, points: torch.Tensor, env_idx: torch.Tensor
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Get signed distance of positions from stored obstacles.
+
+        Args:
+            points: Positions in world frame [batch, n_points, 3].
+            env_idx: Environment index of every batch [batch].
+
+        Returns:
+            Tuple[torch.Tensor, torch.Tensor]: Signed distance with positive values inside
+            obstacles [batch, n_points, n_layers] and its gradient [batch, n_points, n_layers, 3].
+        """
+        raise NotImplementedError
+
+    def _get_esdf_collision_buffer(
+        self, collision_query_buffer: CollisionQueryBuffer
+    ) -> CollisionBuffer:
+        """Get the buffer of stored obstacles from a collision query buffer."""
+        raise NotImplementedError
+
+    def _has_esdf_obstacles(self) -> bool:
+        """Check if obstacles queried through :meth:`_get_esdf` are loaded."""
+        return (
+            self.esdf_collision_type in self.collision_types
+            and self.collision_types[self.esdf_collision_type]
+        )
+
+    def _has_primitives(self) -> bool:
+        """Check if primitives are loaded in addition to stored obstacles."""
+        return "primitive" in self.collision_types and self.collision_types["primitive"]
+
+    def get_sphere_distance(
+        self,
+        query_sphere,
+        collision_query_buffer: CollisionQueryBuffer,
+        weight: torch.Tensor,
+        activation_distance: torch.Tensor,
+        env_query_idx: Optional[torch.Tensor] = None,
+        return_loss=False,
+        sum_collisions: bool = True,
+        compute_esdf: bool = False,
+    ) -> torch.Tensor:
+        """Compute the signed distance between query spheres and world obstacles.
+
+        This distance can be used as a collision cost for optimization.
+
+        Args:
+            query_sphere: Input tensor with query spheres [batch, horizon, number of spheres, 4].
+                With [x, y, z, radius] as the last column for each sphere.
+            collision_query_buffer: Buffer to store collision query results.
+            weight: Weight of the collision cost.
+            activation_distance: Distance outside the object to start computing the cost.
+            env_query_idx: Environment index for each batch of query spheres.
+            return_loss: If the returned tensor will be scaled or changed before calling backward,
+                set this to True. If the returned tensor will be used directly through addition,
+                set this to False.
+            sum_collisions: Sum the collision cost across all obstacles. Costs of obstacles
+                queried through a signed distance lookup are always summed.
+            compute_esdf: Compute Euclidean signed distance instead of collision cost. When True,
+                the returned tensor will be the signed distance with positive values inside an
+                obstacle and negative values outside obstacles.
+
+        Returns:
+            Signed distance between query spheres and world obstacles.
+        """
+        if not self._has_esdf_obstacles():
+            return super().get_sphere_distance(
+                query_sphere,
+                collision_query_buffer,
+                weight,
+                activation_distance,
+                env_query_idx=env_query_idx,
+                return_loss=return_loss,
+                sum_collisions=sum_collisions,
+                compute_esdf=compute_esdf,
+            )
+
+        b, h, n, _ = query_sphere.shape
+        buffer = self._get_esdf_collision_buffer(collision_query_buffer)
+        dist = SdfSphereEsdf.apply(
+            query_sphere,
+            buffer.distance_buffer,
+            buffer.grad_distance_buffer,
+            buffer.sparsity_index_buffer,
+            weight,
+            activation_distance,
+            self.max_esdf_distance,
+            self._get_esdf,
+            env_query_idx,
+            b,
+            h,
+            n,
+            query_sphere.requires_grad,
+            True,
+            env_query_idx is not None,
+            return_loss,
+            compute_esdf,
+        )
+        if not self._has_primitives():
+            return dist
+        d_prim = super().get_sphere_distance(
+            query_sphere,
+            collision_query_buffer,
+            weight=weight,
+            activation_distance=activation_distance,
+            env_query_idx=env_query_idx,
+            return_loss=return_loss,
+            sum_collisions=sum_collisions,
+            compute_esdf=compute_esdf,
+        )
+        if compute_esdf:
+            d_val = torch.maximum(dist.view(d_prim.shape), d_prim)
+        else:
+            d_val = dist.view(d_prim.shape) + d_prim
+        return d_val
+
+    def get_sphere_collision(
+        self,
+        query_sphere,
+        collision_query_buffer: CollisionQueryBuffer,
+        weight: torch.Tensor,
+        activation_distance: torch.Tensor,
+        env_query_idx: Optional[torch.Tensor] = None,
+        return_loss=False,
+        **kwargs,
+    ) -> torch.Tensor:
+        """Compute binary collision between query spheres and world obstacles.
+
+        Args:
+            query_sphere: Input tensor with query spheres [batch, horizon, number of spheres, 4].
+                With [x, y, z, radius] as the last column for each sphere.
+            collision_query_buffer: Collision query buffer to store the results.
+            weight: Weight to scale the collision cost.
+            activation_distance: Distance outside the object to start computing the cost.
+            env_query_idx: Environment index for each batch of query spheres.
+            return_loss: True is not supported for binary classification. Set to False.
+
+        Returns:
+            Tensor with binary collision results.
+        """
+        if not self._has_esdf_obstacles():
+            return super().get_sphere_collision(
+                query_sphere,
+                collision_query_buffer,
+                weight,
+                activation_distance,
+                env_query_idx=env_query_idx,
+                return_loss=return_loss,
+            )
+
+        if return_loss:
+            log_error("cannot return loss for classification, use get_sphere_distance")
+        b, h, n, _ = query_sphere.shape
+        buffer = self._get_esdf_collision_buffer(collision_query_buffer)
+        dist = SdfSphereEsdf.apply(
+            query_sphere,
+            buffer.distance_buffer,
+            buffer.grad_distance_buffer,
+            buffer.sparsity_index_buffer,
+            weight,
+            activation_distance,
+            self.max_esdf_distance,
+            self._get_esdf,
+            env_query_idx,
+            b,
+            h,
+            n,
+            query_sphere.requires_grad,
+            False,
+            env_query_idx is not None,
+            False,
+            False,
+        )
+        if not self._has_primitives():
+            return dist
+        d_prim = super().get_sphere_collision(
+            query_sphere,
+            collision_query_buffer,
+            weight,
+            activation_distance=activation_distance,
+            env_query_idx=env_query_idx,
+            return_loss=return_loss,
+        )
+        d_val = dist.view(d_prim.shape) + d_prim
+        return d_val
+
+    def get_swept_sphere_distance(
+        self,
+        query_sphere,
+        collision_query_buffer: CollisionQueryBuffer,
+        weight: torch.Tensor,
+        activation_distance: torch.Tensor,
+        speed_dt: torch.Tensor,
+        sweep_steps: int,
+        enable_speed_metric=False,
+        env_query_idx: Optional[torch.Tensor] = None,
+        return_loss=False,
+        sum_collisions: bool = True,
+        adapt_sweep_steps: bool = True,
+    ) -> torch.Tensor:
+        """Compute the signed distance between trajectory of spheres and world obstacles.
+
+        Args:
+            query_sphere: Input tensor with query spheres [batch, horizon, number of spheres, 4].
+                With [x, y, z, radius] as the last column for each sphere.
+            collision_query_buffer: Collision query buffer to store the results.
+            weight: Collision cost weight.
+            activation_distance: Distance outside the object to start computing the cost. A smooth
+                scaling is applied to the cost starting from this distance. See
+                :ref:`research_page` for more details.
+            speed_dt: Length of time (seconds) to use when calculating the speed of the sphere
+                using finite difference.
+            sweep_steps: Number of points checked between consecutive timesteps, in each
+                direction.
+            enable_speed_metric: True will scale the collision cost by the speed of the sphere.
+                This has the effect of slowing down the robot when near obstacles. This also has
+                shown to improve convergence from poor initialization.
+            env_query_idx: Environment index for each batch of query spheres.
+            return_loss: If the returned tensor will be scaled or changed before calling backward,
+                set this to True. If the returned tensor will be used directly through addition,
+                set this to False.
+            sum_collisions: Sum the collision cost across all obstacles. Costs of obstacles
+                queried through a signed distance lookup are always summed.
+            adapt_sweep_steps: Compute sweep_steps from displacement of spheres when
+                :attr:`adaptive_sweep` is set. Subclasses pass False to their base class with
+                the steps they computed.
+
+        Returns:
+            Collision cost between trajectory of spheres and world obstacles.
+        """
+        sweep_steps = self._get_sweep_steps(query_sphere, sweep_steps, adapt_sweep_steps)
+        if not self._has_esdf_obstacles():
+            return super().get_swept_sphere_distance(
+                query_sphere,
+                collision_query_buffer,
+                weight=weight,
+                env_query_idx=env_query_idx,
+                sweep_steps=sweep_steps,
+                activation_distance=activation_distance,
+                speed_dt=speed_dt,
+                enable_speed_metric=enable_speed_metric,
+                return_loss=return_loss,
+                sum_collisions=sum_collisions,
+                adapt_sweep_steps=False,
+            )
+        b, h, n, _ = query_sphere.shape
+        buffer = self._get_esdf_collision_buffer(collision_query_buffer)
+        dist = SdfSweptSphereEsdf.apply(
+            query_sphere,
+            buffer.distance_buffer,
+            buffer.grad_distance_buffer,
+            buffer.sparsity_index_buffer,
+            weight,
+            activation_distance,
+            speed_dt,
+            self._get_esdf,
+            env_query_idx,
+            b,
+            h,
+            n,
+            sweep_steps,
+            enable_speed_metric,
+            query_sphere.requires_grad,
+            True,
+            env_query_idx is not None,
+            return_loss,
+        )
+        if not self._has_primitives():
+            return dist
+        d_prim = super().get_swept_sphere_distance(
+            query_sphere,
+            collision_query_buffer,
+            weight=weight,
+            env_query_idx=env_query_idx,
+            sweep_steps=sweep_steps,
+            activation_distance=activation_distance,
+            speed_dt=speed_dt,
+            enable_speed_metric=enable_speed_metric,
+            return_loss=return_loss,
+            sum_collisions=sum_collisions,
+            adapt_sweep_steps=False,
+        )
+        d_val = dist.view(d_prim.shape) + d_prim
+        return d_val
+
+    def get_swept_sphere_collision(
+        self,
+        query_sphere,
+        collision_query_buffer: CollisionQueryBuffer,
+        weight: torch.Tensor,
+        activation_distance: torch.Tensor,
+        speed_dt: torch.Tensor,
+        sweep_steps: int,
+        enable_speed_metric=False,
+        env_query_idx: Optional[torch.Tensor] = None,
+        return_loss=False,
+        adapt_sweep_steps: bool = True,
+    ) -> torch.Tensor:
+        """Get binary collision between trajectory of spheres and world obstacles.
+
+        Args:
+            query_sphere: Input tensor with query spheres [batch, horizon, number of spheres, 4].
+                With [x, y, z, radius] as the last column for each sphere.
+            collision_query_buffer: Collision query buffer to store the results.
+            weight: Collision cost weight.
+            activation_distance: Distance outside the object to start computing the cost.
+            speed_dt: Length of time (seconds) to use when calculating the speed of the sphere
+                using finite difference. This is not used.
+            sweep_steps: Number of points checked between consecutive timesteps, in each
+                direction.
+            enable_speed_metric: This is not used.
+            env_query_idx: Environment index for each batch of query spheres.
+            return_loss: This is not supported for binary classification. Set to False.
+            adapt_sweep_steps: Compute sweep_steps from displacement of spheres when
+                :attr:`adaptive_sweep` is set. Subclasses pass False to their base class with
+                the steps they computed.
+
+        Returns:
+            Collision value between trajectory of spheres and world obstacles.
+        """
+        sweep_steps = self._get_sweep_steps(query_sphere, sweep_steps, adapt_sweep_steps)
+        if not self._has_esdf_obstacles():
+            return super().get_swept_sphere_collision(
+                query_sphere,
+                collision_query_buffer,
+                weight=weight,
+                env_query_idx=env_query_idx,
+                sweep_steps=sweep_steps,
+                activation_distance=activation_distance,
+                speed_dt=speed_dt,
+                enable_speed_metric=enable_speed_metric,
+                return_loss=return_loss,
+                adapt_sweep_steps=False,
+            )
+        if return_loss:
+            log_error("cannot return loss for classify, use get_swept_sphere_distance")
+        b, h, n, _ = query_sphere.shape
+        buffer = self._get_esdf_collision_buffer(collision_query_buffer)
+        dist = SdfSweptSphereEsdf.apply(
+            query_sphere,
+            buffer.distance_buffer,
+            buffer.grad_distance_buffer,
+            buffer.sparsity_index_buffer,
+            weight,
+            activation_distance,
+            speed_dt,
+            self._get_esdf,
+            env_query_idx,
+            b,
+            h,
+            n,
+            sweep_steps,
+            enable_speed_metric,
+            query_sphere.requires_grad,
+            False,
+            env_query_idx is not None,
+            False,
+        )
+        if not self._has_primitives():
+            return dist
+        d_prim = super().get_swept_sphere_collision(
+            query_sphere,
+            collision_query_buffer,
+            weight=weight,
+            env_query_idx=env_query_idx,
+            sweep_steps=sweep_steps,
+            activation_distance=activation_distance,
+            speed_dt=speed_dt,
+            enable_speed_metric=enable_speed_metric,
+            return_loss=return_loss,
+            adapt_sweep_steps=False,
+        )
+        d_val = dist.view(d_prim.shape) + d_prim
+        return d_val
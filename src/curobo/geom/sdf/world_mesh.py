@@ -11,8 +11,10 @@
 """World represented as Meshes can be used with this module for collision checking."""
 
 # Standard Library
-from dataclasses import dataclass
-from typing import List, Optional
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import List, Optional, Tuple, Union
 
 # Third Party
 import numpy as np
@@ -20,11 +22,16 @@ import torch
 import warp as wp
 
 # CuRobo
+from curobo.geom.sdf.ragged_obstacles import RaggedObstacleSlots
 from curobo.geom.sdf.warp_primitives import SdfMeshWarpPy, SweptSdfMeshWarpPy
 from curobo.geom.sdf.world import (
     CollisionQueryBuffer,
+    LoadedObstacleState,
     WorldCollisionConfig,
     WorldPrimitiveCollision,
+    WorldUpdateResult,
+    _is_close,
+    _record_obstacle_change,
 )
 from curobo.geom.types import Mesh, WorldConfig
 from curobo.types.math import Pose
@@ -53,7 +60,11 @@ class WarpMeshData:
 
 
 class WorldMeshCollision(WorldPrimitiveCollision):
-    """World Mesh Collision using Nvidia's warp library."""
+    """World Mesh Collision using Nvidia's warp library.
+
+    With :attr:`~curobo.geom.sdf.world.WorldCollisionConfig.ragged_obstacles`, meshes are stored
+    in ragged tensors, see :mod:`curobo.geom.sdf.ragged_obstacles`.
+    """
 
     def __init__(self, config: WorldCollisionConfig):
         """Initialize World Mesh Collision with given configuration."""
@@ -63,9 +74,12 @@ class WorldMeshCollision(WorldPrimitiveCollision):
 
         self._env_n_mesh = None
         self._mesh_tensor_list = None
+        self._mesh_slots = None
         self._env_mesh_names = None
         self._wp_device = wp.torch.device_from_torch(self.tensor_args.device)
         self._wp_mesh_cache = {}  # stores warp meshes across environments
+        self._wp_mesh_replaced = []  # replaced warp meshes still referenced by other environments
+        self._env_mesh_state = None
 
         super().__init__(config)
 
@@ -100,21 +114,16 @@ class WorldMeshCollision(WorldPrimitiveCollision):
         """
         max_nmesh = len(world_model.mesh)
         if max_nmesh > 0:
-            if self._mesh_tensor_list is None or self._mesh_tensor_list[0].shape[1] < max_nmesh:
+            if self._mesh_tensor_list is None or len(self._env_mesh_names[env_idx]) < max_nmesh:
                 log_warn("Creating new Mesh cache: " + str(max_nmesh))
-                self._create_mesh_cache(max_nmesh)
-
-            # load all meshes as a batch:
-            name_list, w_mid, w_inv_pose = self._load_batch_mesh_to_warp(world_model.mesh)
-            self._mesh_tensor_list[0][env_idx, :max_nmesh] = w_mid
-            self._mesh_tensor_list[1][env_idx, :max_nmesh, :7] = w_inv_pose
-            self._mesh_tensor_list[2][env_idx, :max_nmesh] = 1
-            self._mesh_tensor_list[2][env_idx, max_nmesh:] = 0
-
-            self._env_mesh_names[env_idx][:max_nmesh] = name_list
-            self._env_n_mesh[env_idx] = max_nmesh
-
-            self.collision_types["mesh"] = True
+                if self._mesh_tensor_list is not None and self._mesh_slots is not None:
+                    # other environments keep their meshes in ragged storage:
+                    self._resize_env_mesh_cache(env_idx, max_nmesh)
+                else:
+                    self._create_mesh_cache(max_nmesh)
+
+            mesh_data, identities = self._load_meshes_into_cache(world_model.mesh)
+            self._write_env_meshes(world_model.mesh, mesh_data, identities, env_idx)
         if load_obb_obs:
             super().load_collision_model(
                 world_model, env_idx, fix_cache_reference=fix_cache_reference
@@ -128,13 +137,32 @@ class WorldMeshCollision(WorldPrimitiveCollision):
         Args:
             world_config_list: List of obstacles to load.
         """
-        max_nmesh = max([len(x.mesh) for x in world_config_list])
-        if self._mesh_tensor_list is None or self._mesh_tensor_list[0].shape[1] < max_nmesh:
+        env_nmesh = [len(x.mesh) for x in world_config_list]
+        max_nmesh = max(env_nmesh)
+        if (
+            self._mesh_tensor_list is None
+            or (self._mesh_slots is not None and self._mesh_slots.n_envs != len(env_nmesh))
+            or any(len(names) < n for names, n in zip(self._env_mesh_names, env_nmesh))
+        ):
             log_warn("Creating new Mesh cache: " + str(max_nmesh))
-            self._create_mesh_cache(max_nmesh)
+            self._create_mesh_cache(env_nmesh if self.ragged_obstacles else max_nmesh)
 
+        # load meshes of all environments together, so that meshes shared across environments
+        # are read and loaded into warp once:
+        mesh_data, identities = self._load_meshes_into_cache(
+            [m for world_model in world_config_list for m in world_model.mesh]
+        )
+        start = 0
         for env_idx, world_model in enumerate(world_config_list):
-            self.load_collision_model(world_model, env_idx=env_idx, load_obb_obs=False)
+            end = start + len(world_model.mesh)
+            if end > start:
+                self._write_env_meshes(
+                    world_model.mesh, mesh_data[start:end], identities[start:end], env_idx
+                )
+            else:
+                # ragged kernels read every slot of an environment, so unused slots are disabled:
+                self._get_env_mesh_tensors(env_idx)[2][:] = 0
+            start = end
         super().load_batch_collision_model(world_config_list)
 
     def _load_mesh_to_warp(self, mesh: Mesh) -> WarpMeshData:
@@ -147,13 +175,26 @@ class WorldMeshCollision(WorldPrimitiveCollision):
             loaded mesh data.
         """
         verts, faces = mesh.get_mesh_data()
+        return self._create_warp_mesh(mesh.name, verts, faces)
+
+    def _create_warp_mesh(self, name: str, verts: np.ndarray, faces: np.ndarray) -> WarpMeshData:
+        """Create warp mesh from vertices and faces.
+
+        Args:
+            name: Name of the mesh.
+            verts: Vertices of the mesh.
+            faces: Faces of the mesh.
+
+        Returns:
+            loaded mesh data.
+        """
         v = wp.array(verts, dtype=wp.vec3, device=self._wp_device)
         f = wp.array(np.ravel(faces), dtype=int, device=self._wp_device)
         if warp_support_bvh_constructor_type():
             new_mesh = wp.Mesh(points=v, indices=f, bvh_constructor="sah")
         else:
             new_mesh = wp.Mesh(points=v, indices=f)
-        return WarpMeshData(mesh.name, new_mesh.id, v, f, new_mesh)
+        return WarpMeshData(name, new_mesh.id, v, f, new_mesh)
 
     def _load_mesh_into_cache(self, mesh: Mesh) -> WarpMeshData:
         """Load cuRobo mesh into cache.
@@ -172,29 +213,91 @@ class WorldMeshCollision(WorldPrimitiveCollision):
             log_warn("Object already in warp cache, using existing instance for: " + mesh.name)
         return self._wp_mesh_cache[mesh.name]
 
-    def _load_batch_mesh_to_warp(self, mesh_list: List[Mesh]) -> List:
-        """Load multiple meshes into warp.
+    def _load_meshes_into_cache(
+        self, mesh_list: List[Mesh]
+    ) -> Tuple[List[WarpMeshData], List[Tuple]]:
+        """Load multiple meshes into cache.
+
+        Meshes with a name that is already in the cache use the cached instance. Meshes with
+        identical geometry, e.g., a mesh file used in many environments, are read and loaded into
+        warp once and share the warp mesh. Mesh files are read and processed in parallel with
+        :attr:`mesh_load_workers` threads. Warp meshes are created in the calling thread.
 
         Args:
             mesh_list: List of meshes to load.
 
         Returns:
-            List of mesh names, mesh ids, and inverse poses.
+            Loaded mesh data and geometry identity of each mesh.
         """
-        # First load all verts and faces:
-        name_list = []
-        pose_list = []
-        id_list = torch.zeros((len(mesh_list)), device=self.tensor_args.device, dtype=torch.int64)
-        for i, m_idx in enumerate(mesh_list):
-            m_data = self._load_mesh_into_cache(m_idx)
-            pose_list.append(m_idx.pose)
-
-            id_list[i] = m_data.m_id
-            name_list.append(m_data.name)
+        identities = [self._get_mesh_identity(m) for m in mesh_list]
+        load_list = []
+        load_idx = {}
+        new_names = set()
+        for mesh, identity in zip(mesh_list, identities):
+            if mesh.name in self._wp_mesh_cache or mesh.name in new_names:
+                continue
+            new_names.add(mesh.name)
+            if identity not in load_idx:
+                load_idx[identity] = len(load_list)
+                load_list.append(mesh)
+
+        mesh_data = self._read_mesh_data(load_list)
+        warp_data = [
+            self._create_warp_mesh(m.name, verts, faces)
+            for m, (verts, faces) in zip(load_list, mesh_data)
+        ]
+
+        data_list = []
+        for mesh, identity in zip(mesh_list, identities):
+            if mesh.name in self._wp_mesh_cache:
+                log_warn("Object already in warp cache, using existing instance for: " + mesh.name)
+            else:
+                self._wp_mesh_cache[mesh.name] = replace(
+                    warp_data[load_idx[identity]], name=mesh.name
+                )
+            data_list.append(self._wp_mesh_cache[mesh.name])
+        return data_list, identities
+
+    def _read_mesh_data(self, mesh_list: List[Mesh]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Read vertices and faces of meshes, using a thread pool for multiple meshes."""
+        n_workers = min(self.mesh_load_workers, len(mesh_list))
+        if n_workers <= 1:
+            return [m.get_mesh_data() for m in mesh_list]
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            return list(executor.map(lambda m: m.get_mesh_data(), mesh_list))
+
+    def _write_env_meshes(
+        self,
+        mesh_list: List[Mesh],
+        mesh_data: List[WarpMeshData],
+        identities: List[Tuple],
+        env_idx: int,
+    ):
+        """Write loaded meshes of an environment into the mesh cache.
 
-        pose_buffer = Pose.from_batch_list(pose_list, self.tensor_args)
-        inv_pose_buffer = pose_buffer.inverse()
-        return name_list, id_list, inv_pose_buffer.get_pose_vector()
+        Args:
+            mesh_list: Meshes of the environment.
+            mesh_data: Loaded data of each mesh, from :meth:`_load_meshes_into_cache`.
+            identities: Geometry identity of each mesh.
+            env_idx: Environment index to write meshes into.
+        """
+        n_mesh = len(mesh_list)
+        pose_buffer = Pose.from_batch_list([m.pose for m in mesh_list], self.tensor_args)
+        env_tensors = self._get_env_mesh_tensors(env_idx)
+        env_tensors[0][:n_mesh] = torch.as_tensor(
+            [d.m_id for d in mesh_data], device=self.tensor_args.device, dtype=torch.int64
+        )
+        env_tensors[1][:n_mesh, :7] = pose_buffer.inverse().get_pose_vector()
+        env_tensors[2][:n_mesh] = 1
+        env_tensors[2][n_mesh:] = 0
+
+        self._env_mesh_names[env_idx][:n_mesh] = [d.name for d in mesh_data]
+        self._env_n_mesh[env_idx] = n_mesh
+        self._env_mesh_state[env_idx] = {
+            m.name: LoadedObstacleState(geometry=identity, pose=tuple(float(x) for x in m.pose))
+            for m, identity in zip(mesh_list, identities)
+        }
+        self.collision_types["mesh"] = True
 
     def add_mesh(self, new_mesh: Mesh, env_idx: int = 0):
         """Add a mesh to the world.
@@ -203,11 +306,16 @@ class WorldMeshCollision(WorldPrimitiveCollision):
             new_mesh: Mesh to add.
             env_idx: Environment index to add mesh to.
         """
-        if self._env_n_mesh[env_idx] >= self._mesh_tensor_list[0].shape[1]:
-            log_error(
-                "Cannot add new mesh as we are at mesh cache limit, increase cache limit in WorldMeshCollision"
-            )
-            return
+        curr_idx = int(self._env_n_mesh[env_idx])
+        if curr_idx >= len(self._env_mesh_names[env_idx]):
+            if self._mesh_slots is None:
+                log_error(
+                    "Cannot add new mesh as we are at mesh cache limit, increase cache limit in "
+                    + "WorldMeshCollision"
+                )
+                return
+            log_warn("Growing mesh cache of environment " + str(env_idx) + " (breaks CG)")
+            self._resize_env_mesh_cache(env_idx, curr_idx + 1)
 
         wp_mesh_data = self._load_mesh_into_cache(new_mesh)
 
@@ -215,12 +323,172 @@ class WorldMeshCollision(WorldPrimitiveCollision):
         w_obj_pose = Pose.from_list(new_mesh.pose, self.tensor_args)
         # add loaded mesh into scene:
 
-        curr_idx = self._env_n_mesh[env_idx]
-        self._mesh_tensor_list[0][env_idx, curr_idx] = wp_mesh_data.m_id
-        self._mesh_tensor_list[1][env_idx, curr_idx, :7] = w_obj_pose.inverse().get_pose_vector()
-        self._mesh_tensor_list[2][env_idx, curr_idx] = 1
+        env_tensors = self._get_env_mesh_tensors(env_idx)
+        env_tensors[0][curr_idx] = wp_mesh_data.m_id
+        env_tensors[1][curr_idx, :7] = w_obj_pose.inverse().get_pose_vector()
+        env_tensors[2][curr_idx] = 1
         self._env_mesh_names[env_idx][curr_idx] = wp_mesh_data.name
         self._env_n_mesh[env_idx] = curr_idx + 1
+        self._env_mesh_state[env_idx][new_mesh.name] = LoadedObstacleState(
+            geometry=self._get_mesh_identity(new_mesh),
+            pose=tuple(float(x) for x in new_mesh.pose),
+        )
+
+    def update_collision_model(
+        self,
+        world_config: WorldConfig,
+        env_idx: int = 0,
+        fix_cache_reference: bool = False,
+        tolerance: float = 1e-6,
+    ) -> WorldUpdateResult:
+        """Update loaded obstacles to match a world configuration, writing only changes.
+
+        Meshes are matched by name. A mesh is reloaded into warp only when its geometry changed,
+        which is detected from its file path, scale, and a hash of its vertices and faces. Meshes
+        with only a changed pose are updated in place. Cuboids, spheres, and capsules are updated
+        as in :meth:`WorldPrimitiveCollision.update_collision_model`.
+
+        Args:
+            world_config: Obstacles that should be in the world after the update.
+            env_idx: Environment index to update.
+            fix_cache_reference: If True, throws error if number of obstacles is greater than
+                cache when a full reload is required.
+            tolerance: Maximum difference in pose to consider an obstacle unchanged.
+
+        Returns:
+            WorldUpdateResult: Changes written to the collision checker.
+        """
+        meshes = world_config.mesh
+        cuboids = world_config.cuboid
+        capsules = self._get_capsule_obstacles(world_config)
+        if (
+            not self._can_update_meshes(meshes, env_idx)
+            or not self._can_update_obbs(cuboids, env_idx)
+            or not self._can_update_capsules(capsules, env_idx)
+        ):
+            return self._reload_collision_model(world_config, env_idx, fix_cache_reference)
+        result = WorldUpdateResult()
+        self._update_meshes_from_config(meshes, env_idx, result, tolerance)
+        self._update_obbs_from_config(cuboids, env_idx, result, tolerance)
+        self._update_capsules_from_config(capsules, env_idx, result, tolerance)
+        self.world_model = world_config
+        return result
+
+    @staticmethod
+    def _get_mesh_identity(mesh: Mesh) -> Tuple:
+        """Get identity of mesh geometry, used to detect meshes that need to be reloaded."""
+        vertices_hash = None
+        if mesh.vertices is not None:
+            vertices_hash = hashlib.sha1(
+                np.ascontiguousarray(mesh.vertices, dtype=np.float32).tobytes()
+            )
+            if mesh.faces is not None:
+                vertices_hash.update(np.ascontiguousarray(mesh.faces, dtype=np.int64).tobytes())
+            vertices_hash = vertices_hash.hexdigest()
+        scale = None if mesh.scale is None else tuple(float(x) for x in np.ravel(mesh.scale))
+        return (mesh.file_path, scale, vertices_hash)
+
+    def _can_update_meshes(self, meshes: List[Mesh], env_idx: int) -> bool:
+        """Check if meshes can be written to the cache without a full reload."""
+        if self._mesh_tensor_list is None:
+            return len(meshes) == 0
+        n_mesh = int(self._env_n_mesh[env_idx])
+        loaded_names = set(self._env_mesh_names[env_idx][:n_mesh])
+        new_names = set(m.name for m in meshes)
+        if len(new_names) != len(meshes):
+            log_error("Mesh names should be unique when updating collision model")
+        n_new = len(new_names - loaded_names)
+        n_free = len(self._env_mesh_names[env_idx]) - n_mesh + len(loaded_names - new_names)
+        return n_new <= n_free
+
+    def _update_meshes_from_config(
+        self,
+        meshes: List[Mesh],
+        env_idx: int,
+        result: WorldUpdateResult,
+        tolerance: float,
+    ):
+        """Write changed meshes to the cache. Check :meth:`_can_update_meshes` before calling."""
+        if self._mesh_tensor_list is None:
+            return
+        n_mesh = int(self._env_n_mesh[env_idx])
+        names = self._env_mesh_names[env_idx]
+        mesh_idx = {name: i for i, name in enumerate(names[:n_mesh])}
+        state = self._env_mesh_state[env_idx]
+        env_tensors = self._get_env_mesh_tensors(env_idx)
+        new_names = set(m.name for m in meshes)
+
+        # disable meshes that are not in the new world, reusing their slots for new meshes:
+        free_slots = []
+        for name, obs_idx in mesh_idx.items():
+            if name in new_names:
+                continue
+            current = state.get(name)
+            if current is None or current.enabled is not False:
+                env_tensors[2][obs_idx] = 0
+                result.removed.append(name)
+                state[name] = LoadedObstacleState(enabled=False)
+            free_slots.append(obs_idx)
+        free_slots.reverse()
+
+        replaced = False
+        for mesh in meshes:
+            identity = self._get_mesh_identity(mesh)
+            pose = tuple(float(x) for x in mesh.pose)
+            current = state.get(mesh.name)
+            obs_idx = mesh_idx.get(mesh.name)
+            if obs_idx is None:
+                if len(free_slots) == 0:
+                    self.add_mesh(mesh, env_idx)
+                    result.added.append(mesh.name)
+                    continue
+                obs_idx = free_slots.pop()
+                state.pop(names[obs_idx], None)
+                names[obs_idx] = mesh.name
+                current = LoadedObstacleState(enabled=False)
+            if current is None:
+                current = LoadedObstacleState(enabled=None)
+            if current.geometry != identity:
+                self._replace_warp_mesh(mesh, env_idx)
+                env_tensors[0][obs_idx] = self._wp_mesh_cache[mesh.name].m_id
+                replaced = True
+                if current.enabled is not False:
+                    result.mesh_updated.append(mesh.name)
+            if not _is_close(current.pose, pose, tolerance):
+                obj_w_pose = Pose.from_list(list(pose), self.tensor_args).inverse()
+                env_tensors[1][obs_idx, :7] = obj_w_pose.get_pose_vector()
+                if current.enabled is not False:
+                    result.pose_updated.append(mesh.name)
+            if current.enabled is not True:
+                env_tensors[2][obs_idx] = 1
+                if current.enabled is False:
+                    result.added.append(mesh.name)
+            state[mesh.name] = LoadedObstacleState(geometry=identity, pose=pose)
+        if replaced:
+            self._release_replaced_warp_meshes()
+        if len(meshes) > 0:
+            self.collision_types["mesh"] = True
+
+    def _replace_warp_mesh(self, mesh: Mesh, env_idx: int):
+        """Load new geometry of a mesh into warp cache, replacing the cached mesh of same name.
+
+        The replaced warp mesh is kept alive if another environment still references it.
+        """
+        old_mesh = self._wp_mesh_cache.pop(mesh.name, None)
+        if old_mesh is not None and any(
+            mesh.name in names[: int(self._env_n_mesh[i])]
+            for i, names in enumerate(self._env_mesh_names)
+            if i != env_idx
+        ):
+            self._wp_mesh_replaced.append(old_mesh)
+        self._load_mesh_into_cache(mesh)
+
+    def _release_replaced_warp_meshes(self):
+        """Release replaced warp meshes that are no longer referenced by the mesh cache."""
+        if len(self._wp_mesh_replaced) == 0:
+            return
+        mesh_ids = set(self._mesh_tensor_list[0].view(-1).tolist())
+        self._wp_mesh_replaced = [m for m in self._wp_mesh_replaced if m.m_id in mesh_ids]
 
     def get_mesh_idx(
         self,
@@ -260,29 +528,36 @@ class WorldMeshCollision(WorldPrimitiveCollision):
         if obb_cache is not None:
             self._create_obb_cache(obb_cache)
 
-    def _create_mesh_cache(self, mesh_cache: int):
+    def _create_mesh_cache(self, mesh_cache: Union[int, List[int]]):
         """Create cache for mesh obstacles.
 
         Args:
-            mesh_cache: Number of mesh obstacles to cache.
+            mesh_cache: Number of mesh obstacles to cache in every environment. With ragged
+                storage, this can also be a list with the number of meshes to cache in each
+                environment.
         """
         # create cache to store meshes, mesh poses and inverse poses
+        if self.ragged_obstacles:
+            if isinstance(mesh_cache, int):
+                mesh_cache = [mesh_cache for _ in range(self.n_envs)]
+            self._mesh_slots = RaggedObstacleSlots(mesh_cache, self.tensor_args.device)
+            env_mesh_cache = self._mesh_slots.env_capacity
+            cache_shape = (self._mesh_slots.n_slots, 1)
+        else:
+            env_mesh_cache = [mesh_cache for _ in range(self.n_envs)]
+            cache_shape = (self.n_envs, mesh_cache)
 
         self._env_n_mesh = torch.zeros(
-            (self.n_envs), device=self.tensor_args.device, dtype=torch.int32
+            (len(env_mesh_cache)), device=self.tensor_args.device, dtype=torch.int32
         )
 
-        obs_enable = torch.zeros(
-            (self.n_envs, mesh_cache), dtype=torch.uint8, device=self.tensor_args.device
-        )
+        obs_enable = torch.zeros(cache_shape, dtype=torch.uint8, device=self.tensor_args.device)
         obs_inverse_pose = torch.zeros(
-            (self.n_envs, mesh_cache, 8),
+            cache_shape + (8,),
             dtype=self.tensor_args.dtype,
             device=self.tensor_args.device,
         )
-        obs_ids = torch.zeros(
-            (self.n_envs, mesh_cache), device=self.tensor_args.device, dtype=torch.int64
-        )
+        obs_ids = torch.zeros(cache_shape, device=self.tensor_args.device, dtype=torch.int64)
 
         # warp requires uint64 for mesh indices, supports conversion from int64 to uint64
         self._mesh_tensor_list = [
@@ -291,9 +566,74 @@ class WorldMeshCollision(WorldPrimitiveCollision):
             obs_enable,
         ]  # 0=mesh idx, 1=pose, 2=mesh enable
         self.collision_types["mesh"] = True  # TODO: enable this after loading first mesh
-        self._env_mesh_names = [[None for _ in range(mesh_cache)] for _ in range(self.n_envs)]
+        self._env_mesh_names = [[None for _ in range(n)] for n in env_mesh_cache]
+        self._env_mesh_state = [{} for _ in range(len(env_mesh_cache))]
 
         self._wp_mesh_cache = {}
+        self._wp_mesh_replaced = []
+
+    def _resize_env_mesh_cache(self, env_idx: int, mesh_cache: int):
+        """Grow the mesh cache of one environment in ragged storage.
+
+        Meshes of all environments and loaded warp meshes are kept. This creates new tensors,
+        which breaks CUDA graphs that reference the cache.
+
+        Args:
+            env_idx: Environment index to resize.
+            mesh_cache: Number of meshes to cache in the environment.
+        """
+        env_mesh_cache = list(self._mesh_slots.env_capacity)
+        env_mesh_cache[env_idx] = mesh_cache
+        mesh_slots, mesh_tensor_list = self._mesh_slots, self._mesh_tensor_list
+        env_n_mesh, env_mesh_names = self._env_n_mesh, self._env_mesh_names
+        env_mesh_state = self._env_mesh_state
+        wp_mesh_cache, wp_mesh_replaced = self._wp_mesh_cache, self._wp_mesh_replaced
+        self._create_mesh_cache(env_mesh_cache)
+        mesh_slots.copy_slots(mesh_tensor_list, self._mesh_slots, self._mesh_tensor_list)
+        self._env_n_mesh[:] = env_n_mesh
+        self._env_mesh_names = [
+            names + [None for _ in range(n - len(names))]
+            for names, n in zip(env_mesh_names, self._mesh_slots.env_capacity)
+        ]
+        self._env_mesh_state = env_mesh_state
+        self._wp_mesh_cache = wp_mesh_cache
+        self._wp_mesh_replaced = wp_mesh_replaced
+
+    def _get_env_mesh_tensors(self, env_idx: int) -> List[torch.Tensor]:
+        """Get views of the mesh cache of an environment.
+
+        Args:
+            env_idx: Environment index.
+
+        Returns:
+            List[torch.Tensor]: Warp mesh ids [n_cache], inverse poses [n_cache, 8], and enable
+            flags [n_cache] of meshes in the environment, for padded and ragged storage.
+        """
+        if self._mesh_slots is not None:
+            return self._mesh_slots.get_env_tensors(self._mesh_tensor_list, env_idx)
+        return [t[env_idx] for t in self._mesh_tensor_list]
+
+    def _get_mesh_query_tensors(
+        self, env_query_idx: Optional[torch.Tensor], batch_size: int
+    ) -> Tuple[torch.Tensor, Optional[torch.Tensor]]:
+        """Get number of meshes and environment index to pass to warp kernels for a query.
+
+        With ragged storage, kernels read meshes of the first slot of the environment of every
+        batch, and the number of slots of every environment at its first slot.
+
+        Args:
+            env_query_idx: Environment index for each batch of query spheres.
+            batch_size: Number of batches of query spheres.
+
+        Returns:
+            Tuple[torch.Tensor, Optional[torch.Tensor]]: Number of meshes in every environment,
+            and environment index for each batch of query spheres.
+        """
+        if self._mesh_slots is None:
+            return self._env_n_mesh, env_query_idx
+        return self._mesh_slots.slot_counts, self._mesh_slots.get_env_query_idx(
+            env_query_idx, batch_size
+        )
 
     def update_mesh_pose(
         self,
@@ -316,9 +656,12 @@ class WorldMeshCollision(WorldPrimitiveCollision):
 
         if name is not None:
             obs_idx = self.get_mesh_idx(name, env_idx)
-            self._mesh_tensor_list[1][env_idx, obs_idx, :7] = w_inv_pose.get_pose_vector()
+            self._get_env_mesh_tensors(env_idx)[1][obs_idx, :7] = w_inv_pose.get_pose_vector()
+            _record_obstacle_change(self._env_mesh_state, name, env_idx, pose=True)
         elif env_obj_idx is not None:
-            self._mesh_tensor_list[1][env_idx, env_obj_idx, :7] = w_inv_pose.get_pose_vector()
+            env_tensors = self._get_env_mesh_tensors(env_idx)
+            env_tensors[1][env_obj_idx, :7] = w_inv_pose.get_pose_vector()
+            _record_obstacle_change(self._env_mesh_state, None, env_idx, pose=True)
         else:
             log_error("name or env_obj_idx needs to be given to update mesh pose")
 
@@ -344,16 +687,20 @@ class WorldMeshCollision(WorldPrimitiveCollision):
         if name is not None:
             obj_idx = self.get_mesh_idx(name, env_idx)
 
-        if obj_idx >= self._mesh_tensor_list[0][env_idx].shape[0]:
+        env_tensors = self._get_env_mesh_tensors(env_idx)
+        if obj_idx >= env_tensors[0].shape[0]:
             log_error("Out of cache memory")
         w_inv_pose = self._get_obstacle_poses(w_obj_pose, obj_w_pose)
 
-        self._mesh_tensor_list[0][env_idx, obj_idx] = warp_mesh_idx
-        self._mesh_tensor_list[1][env_idx, obj_idx] = w_inv_pose
-        self._mesh_tensor_list[2][env_idx, obj_idx] = 1
+        env_tensors[0][obj_idx] = warp_mesh_idx
+        env_tensors[1][obj_idx] = w_inv_pose
+        env_tensors[2][obj_idx] = 1
         self._env_mesh_names[env_idx][obj_idx] = name
         if self._env_n_mesh[env_idx] <= obj_idx:
             self._env_n_mesh[env_idx] = obj_idx + 1
+        _record_obstacle_change(
+            self._env_mesh_state, name, env_idx, pose=True, geometry=True, enable=True
+        )
 
     def update_obstacle_pose(
         self,
@@ -400,6 +747,8 @@ class WorldMeshCollision(WorldPrimitiveCollision):
             self.enable_mesh(enable, name, None, env_idx)
         elif self._env_obbs_names is not None and name in self._env_obbs_names[env_idx]:
             self.enable_obb(enable, name, None, env_idx)
+        elif self._env_capsule_names is not None and name in self._env_capsule_names[env_idx]:
+            self.enable_capsule(enable, name, None, env_idx)
         else:
             log_error("Obstacle not found in world model: " + name)
         self.world_model.objects
@@ -433,10 +782,12 @@ class WorldMeshCollision(WorldPrimitiveCollision):
         """
         if env_mesh_idx is not None:
             self._mesh_tensor_list[2][env_mesh_idx] = int(enable)  # enable == 1
+            _record_obstacle_change(self._env_mesh_state, None, None, enable=bool(enable))
         else:
             # find index of given name:
             obs_idx = self.get_mesh_idx(name, env_idx)
-            self._mesh_tensor_list[2][env_idx, obs_idx] = int(enable)
+            self._get_env_mesh_tensors(env_idx)[2][obs_idx] = int(enable)
+            _record_obstacle_change(self._env_mesh_state, name, env_idx, enable=bool(enable))
 
     def get_sphere_distance(
         self,
@@ -583,6 +934,7 @@ class WorldMeshCollision(WorldPrimitiveCollision):
         env_query_idx: Optional[torch.Tensor] = None,
         return_loss: bool = False,
         sum_collisions: bool = True,
+        adapt_sweep_steps: bool = True,
     ):
         """Compute the signed distance between trajectory of spheres and world obstacles.
 
@@ -608,10 +960,14 @@ class WorldMeshCollision(WorldPrimitiveCollision):
             sum_collisions: Sum the collision cost across all obstacles. This variable is currently
                 not passed to the underlying CUDA kernel as setting this to False caused poor
                 performance.
+            adapt_sweep_steps: Compute sweep_steps from displacement of spheres when
+                :attr:`adaptive_sweep` is set. Subclasses pass False to their base class with
+                the steps they computed.
 
         Returns:
             Collision cost between trajectory of spheres and world obstacles.
         """
+        sweep_steps = self._get_sweep_steps(query_sphere, sweep_steps, adapt_sweep_steps)
         # log_warn("Swept: Mesh + Primitive Collision Checking is experimental")
         if "mesh" not in self.collision_types or not self.collision_types["mesh"]:
             return super().get_swept_sphere_distance(
@@ -625,6 +981,7 @@ class WorldMeshCollision(WorldPrimitiveCollision):
                 enable_speed_metric=enable_speed_metric,
                 return_loss=return_loss,
                 sum_collisions=sum_collisions,
+                adapt_sweep_steps=False,
             )
 
         d = self._get_swept_sdf(
@@ -652,6 +1009,7 @@ class WorldMeshCollision(WorldPrimitiveCollision):
             enable_speed_metric=enable_speed_metric,
             return_loss=return_loss,
             sum_collisions=sum_collisions,
+            adapt_sweep_steps=False,
         )
         d_val = d.view(d_prim.shape) + d_prim
 
@@ -668,6 +1026,7 @@ class WorldMeshCollision(WorldPrimitiveCollision):
         enable_speed_metric=False,
         env_query_idx: Optional[torch.Tensor] = None,
         return_loss: bool = False,
+        adapt_sweep_steps: bool = True,
     ):
         """Get binary collision between trajectory of spheres and world obstacles.
 
@@ -688,10 +1047,14 @@ class WorldMeshCollision(WorldPrimitiveCollision):
                 shown to improve convergence from poor initialization. This is not used.
             env_query_idx: Environment index for each batch of query spheres.
             return_loss: This is not supported for binary classification. Set to False.
+            adapt_sweep_steps: Compute sweep_steps from displacement of spheres when
+                :attr:`adaptive_sweep` is set. Subclasses pass False to their base class with
+                the steps they computed.
 
         Returns:
             Collision value between trajectory of spheres and world obstacles.
         """
+        sweep_steps = self._get_sweep_steps(query_sphere, sweep_steps, adapt_sweep_steps)
         if "mesh" not in self.collision_types or not self.collision_types["mesh"]:
             return super().get_swept_sphere_collision(
                 query_sphere,
@@ -703,6 +1066,7 @@ class WorldMeshCollision(WorldPrimitiveCollision):
                 speed_dt=speed_dt,
                 enable_speed_metric=enable_speed_metric,
                 return_loss=return_loss,
+                adapt_sweep_steps=False,
             )
         d = self._get_swept_sdf(
             query_sphere,
@@ -728,6 +1092,7 @@ class WorldMeshCollision(WorldPrimitiveCollision):
             speed_dt=speed_dt,
             enable_speed_metric=enable_speed_metric,
             return_loss=return_loss,
+            adapt_sweep_steps=False,
         )
         d_val = d.view(d_prim.shape) + d_prim
 
@@ -736,14 +1101,14 @@ class WorldMeshCollision(WorldPrimitiveCollision):
     def clear_cache(self):
         """Delete all cuboid and mesh obstacles from the world."""
         self._wp_mesh_cache = {}
+        self._wp_mesh_replaced = []
         if self._mesh_tensor_list is not None:
             self._mesh_tensor_list[2][:] = 0
+            self._env_mesh_state = [{} for _ in range(self.n_envs)]
         if self._env_n_mesh is not None:
             self._env_n_mesh[:] = 0
         if self._env_mesh_names is not None:
-            self._env_mesh_names = [
-                [None for _ in range(self.cache["mesh"])] for _ in range(self.n_envs)
-            ]
+            self._env_mesh_names = [[None for _ in names] for names in self._env_mesh_names]
 
         super().clear_cache()
 
@@ -776,6 +1141,9 @@ class WorldMeshCollision(WorldPrimitiveCollision):
         Returns:
             Collision cost between query spheres and world obstacles.
         """
+        env_n_mesh, env_query_idx = self._get_mesh_query_tensors(
+            env_query_idx, query_spheres.shape[0]
+        )
         d = SdfMeshWarpPy.apply(
             query_spheres,
             collision_query_buffer.mesh_collision_buffer.distance_buffer,
@@ -786,7 +1154,7 @@ class WorldMeshCollision(WorldPrimitiveCollision):
             self._mesh_tensor_list[0],
             self._mesh_tensor_list[1],
             self._mesh_tensor_list[2],
-            self._env_n_mesh,
+            env_n_mesh,
             self.max_distance,
             env_query_idx,
             return_loss,
@@ -831,6 +1199,9 @@ class WorldMeshCollision(WorldPrimitiveCollision):
         Returns:
             Collision cost between trajectory of spheres and world obstacles.
         """
+        env_n_mesh, env_query_idx = self._get_mesh_query_tensors(
+            env_query_idx, query_spheres.shape[0]
+        )
         d = SweptSdfMeshWarpPy.apply(
             query_spheres,
             collision_query_buffer.mesh_collision_buffer.distance_buffer,
@@ -842,7 +1213,7 @@ class WorldMeshCollision(WorldPrimitiveCollision):
             self._mesh_tensor_list[0],
             self._mesh_tensor_list[1],
             self._mesh_tensor_list[2],
-            self._env_n_mesh,
+            env_n_mesh,
             self.max_distance,
             sweep_steps,
             enable_speed_metric,
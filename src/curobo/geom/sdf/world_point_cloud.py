@@ -0,0 +1,428 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""World represented by point clouds stored in a spatial hash, without meshing."""
+
+# Standard Library
+from typing import List, Optional, Tuple
+
+# Third Party
+import torch
+
+# CuRobo
+from curobo.curobolib.geom import point_cloud_esdf_torch
+from curobo.geom.sdf.point_cloud_hash import PointCloudHash, PointCloudHashConfig
+from curobo.geom.sdf.world import (
+    CollisionBuffer,
+    CollisionQueryBuffer,
+    WorldCollisionConfig,
+    WorldUpdateResult,
+)
+from curobo.geom.sdf.world_esdf import WorldEsdfCollision
+from curobo.geom.transform import torch_quaternion_to_matrix
+from curobo.geom.types import PointCloud, WorldConfig
+from curobo.types.math import Pose
+from curobo.util.logger import log_error, log_info
+
+
+class WorldPointCloudCollision(WorldEsdfCollision):
+    """Point clouds stored in a spatial hash, with cuboids, spheres, and capsules as primitives.
+
+    Point clouds in :attr:`~curobo.geom.types.WorldConfig.pointcloud` are stored in world frame
+    without meshing, see :mod:`curobo.geom.sdf.point_cloud_hash`. Points of streaming sensor data
+    can be added with :meth:`insert_point_cloud` and dropped with :meth:`remove_point_cloud`
+    without reloading the world. Collision queries are computed with PyTorch, so this checker
+    also runs on CPU.
+    """
+
+    esdf_collision_type = "pointcloud"
+
+    def __init__(self, config: WorldCollisionConfig):
+        """Initialize with a world collision configuration."""
+        self._point_cloud_hash = None
+        self._point_cloud_tensors = None
+        self._env_n_point_clouds = None
+        self._env_point_cloud_names = None
+        super().__init__(config)
+
+    def _init_cache(self):
+        """Initialize the cache for the world."""
+        if (
+            self.cache is not None
+            and "pointcloud" in self.cache
+            and self.cache["pointcloud"] not in [None, 0]
+        ):
+            self._create_point_cloud_cache(self.cache["pointcloud"])
+        return super()._init_cache()
+
+    def _create_point_cloud_cache(self, n_clouds: int):
+        """Create a cache for point clouds, without any stored points.
+
+        Args:
+            n_clouds: Number of point clouds in each environment.
+        """
+        cloud_pose = torch.zeros(
+            (self.n_envs, n_clouds, 7),
+            dtype=self.tensor_args.dtype,
+            device=self.tensor_args.device,
+        )
+        cloud_pose[..., 3] = 1.0
+        cloud_enable = torch.zeros(
+            (self.n_envs, n_clouds), dtype=torch.uint8, device=self.tensor_args.device
+        )
+        self._env_n_point_clouds = torch.zeros(
+            (self.n_envs), device=self.tensor_args.device, dtype=torch.int32
+        )
+        self._point_cloud_tensors = [cloud_pose, cloud_enable]
+        self._point_cloud_hash = PointCloudHash(self.point_cloud_config, self.tensor_args)
+        self.collision_types["pointcloud"] = True
+        self._env_point_cloud_names = [[None for _ in range(n_clouds)] for _ in range(self.n_envs)]
+
+    def _grow_point_cloud_cache(self, n_clouds: int):
+        """Add slots for point clouds to every environment, keeping stored points."""
+        cloud_pose, cloud_enable = self._point_cloud_tensors
+        n_new = n_clouds - cloud_enable.shape[1]
+        new_pose = torch.zeros_like(cloud_pose[:, :1]).repeat(1, n_new, 1)
+        new_pose[..., 3] = 1.0
+        self._point_cloud_tensors = [
+            torch.cat([cloud_pose, new_pose], dim=1),
+            torch.cat([cloud_enable, torch.zeros_like(cloud_enable[:, :1]).repeat(1, n_new)], 1),
+        ]
+        for names in self._env_point_cloud_names:
+            names.extend([None] * n_new)
+
+    @property
+    def point_cloud_config(self) -> PointCloudHashConfig:
+        """Parameters of the spatial hash storing point clouds."""
+        if self.point_cloud is None:
+            return PointCloudHashConfig()
+        return self.point_cloud
+
+    @property
+    def n_points(self) -> int:
+        """Number of stored points across all point clouds and environments."""
+        if self._point_cloud_hash is None:
+            return 0
+        return self._point_cloud_hash.n_points
+
+    def load_collision_model(
+        self, world_model: WorldConfig, env_idx=0, fix_cache_reference: bool = False
+    ):
+        """Load collision representation from world obstacles.
+
+        Args:
+            world_model: Obstacles in world to load.
+            env_idx: Environment index to load obstacles into.
+            fix_cache_reference: If True, throws error if number of point clouds is greater than
+                cache. If False, creates a larger cache. Stored points are reallocated on every
+                load, so this checker cannot be used inside a recorded cuda graph.
+        """
+        self._load_point_cloud_collision_model_in_cache(
+            world_model, env_idx, fix_cache_reference=fix_cache_reference
+        )
+        super().load_collision_model(
+            world_model, env_idx=env_idx, fix_cache_reference=fix_cache_reference
+        )
+
+    def load_batch_collision_model(self, world_config_list: List[WorldConfig]):
+        """Load point clouds and primitives for batched environments.
+
+        Args:
+            world_config_list: List of world obstacles for each environment.
+        """
+        max_clouds = max(len(w.pointcloud) for w in world_config_list)
+        if max_clouds > 0:
+            if (
+                self._point_cloud_tensors is None
+                or self._point_cloud_tensors[1].shape[1] < max_clouds
+                or self._point_cloud_tensors[1].shape[0] != len(world_config_list)
+            ):
+                self.n_envs = len(world_config_list)
+                self._create_point_cloud_cache(max_clouds)
+            for env_idx, world_config in enumerate(world_config_list):
+                self._load_point_cloud_collision_model_in_cache(world_config, env_idx)
+        super().load_batch_collision_model(world_config_list)
+
+    def update_collision_model(
+        self,
+        world_config: WorldConfig,
+        env_idx: int = 0,
+        fix_cache_reference: bool = False,
+        tolerance: float = 1e-6,
+    ) -> WorldUpdateResult:
+        """Update loaded obstacles to match a world configuration.
+
+        Point clouds are not diffed, the full collision model is reloaded when the new world or
+        the loaded environment has point clouds. Use :meth:`insert_point_cloud` and
+        :meth:`remove_point_cloud` to change points incrementally. Otherwise, only changed
+        primitives are written as in :meth:`WorldPrimitiveCollision.update_collision_model`.
+
+        Args:
+            world_config: Obstacles that should be in the world after the update.
+            env_idx: Environment index to update.
+            fix_cache_reference: If True, throws error if number of obstacles is greater than
+                cache when a full reload is required.
+            tolerance: Maximum difference in pose and dimensions to consider an obstacle
+                unchanged.
+
+        Returns:
+            WorldUpdateResult: Changes written to the collision checker.
+        """
+        has_clouds = self._point_cloud_tensors is not None and bool(
+            torch.any(self._point_cloud_tensors[1][env_idx] > 0)
+        )
+        if has_clouds or len(world_config.pointcloud) > 0:
+            return self._reload_collision_model(world_config, env_idx, fix_cache_reference)
+        return super().update_collision_model(
+            world_config, env_idx, fix_cache_reference=fix_cache_reference, tolerance=tolerance
+        )
+
+    def _load_point_cloud_collision_model_in_cache(
+        self, world_config: WorldConfig, env_idx: int = 0, fix_cache_reference: bool = False
+    ):
+        """Store points of all point clouds of a world in the hash.
+
+        Args:
+            world_config: Obstacles in world to load.
+            env_idx: Environment index to load point clouds into.
+            fix_cache_reference: If True, throws error if number of point clouds is greater than
+                cache. If False, creates a larger cache.
+        """
+        point_clouds = world_config.pointcloud
+        self.world_model = world_config
+        if self._point_cloud_tensors is not None:
+            self._point_cloud_hash.remove_env(env_idx)
+            self._point_cloud_tensors[1][env_idx] = 0
+            self._env_n_point_clouds[env_idx] = 0
+            names = self._env_point_cloud_names[env_idx]
+            self._env_point_cloud_names[env_idx] = [None] * len(names)
+        if len(point_clouds) < 1:
+            log_info("No PointCloud objs")
+            return
+        if len(set(p.name for p in point_clouds)) != len(point_clouds):
+            log_error("Point clouds should have unique names")
+        for point_cloud in point_clouds:
+            self.insert_point_cloud(point_cloud, env_idx, fix_cache_reference)
+
+    def insert_point_cloud(
+        self, point_cloud: PointCloud, env_idx: int = 0, fix_cache_reference: bool = False
+    ) -> int:
+        """Insert points of a point cloud without reloading other obstacles.
+
+        Points are transformed to world frame with the pose of the point cloud. When a point
+        cloud with the same name is loaded, points are added to it and its pose is kept.
+
+        Args:
+            point_cloud: Point cloud to insert.
+            env_idx: Environment index to insert points into.
+            fix_cache_reference: If True, throws error if number of point clouds is greater than
+                cache. If False, creates a larger cache.
+
+        Returns:
+            int: Number of inserted points. Points that are not finite are dropped.
+        """
+        if self._point_cloud_tensors is None:
+            if fix_cache_reference:
+                log_error(
+                    "number of point clouds is larger than collision cache, create larger cache."
+                )
+            log_info("Creating PointCloud cache")
+            self._create_point_cloud_cache(1)
+        names = self._env_point_cloud_names[env_idx]
+        if point_cloud.name in names:
+            obs_idx = names.index(point_cloud.name)
+        else:
+            if None not in names:
+                if fix_cache_reference:
+                    log_error(
+                        "number of point clouds is larger than collision cache, create larger"
+                        + " cache."
+                    )
+                self._grow_point_cloud_cache(max(2 * len(names), 1))
+            obs_idx = names.index(None)
+            names[obs_idx] = point_cloud.name
+            pose = point_cloud.pose if point_cloud.pose is not None else [0, 0, 0, 1, 0, 0, 0]
+            self._point_cloud_tensors[0][env_idx, obs_idx] = self.tensor_args.to_device(pose)
+            self._point_cloud_tensors[1][env_idx, obs_idx] = 1
+            self._env_n_point_clouds[env_idx] += 1
+        points = self.tensor_args.to_device(point_cloud.points).view(-1, 3)
+        if point_cloud.pose is not None:
+            points = self._transform_points(
+                points, self.tensor_args.to_device(point_cloud.pose).view(7)
+            )
+        return self._point_cloud_hash.insert(points, env_idx, obs_idx)
+
+    def remove_point_cloud(self, name: str, env_idx: int = 0):
+        """Remove all points of a point cloud without reloading other obstacles.
+
+        Args:
+            name: Name of the point cloud.
+            env_idx: Environment index to remove points from.
+        """
+        obs_idx = self.get_point_cloud_idx(name, env_idx)
+        self._point_cloud_hash.remove(env_idx, obs_idx)
+        self._point_cloud_tensors[1][env_idx, obs_idx] = 0
+        self._env_point_cloud_names[env_idx][obs_idx] = None
+        self._env_n_point_clouds[env_idx] -= 1
+
+    @staticmethod
+    def _transform_points(points: torch.Tensor, pose: torch.Tensor) -> torch.Tensor:
+        """Transform points [n, 3] from a frame with pose [x, y, z, qw, qx, qy, qz] to world."""
+        rot = torch_quaternion_to_matrix(pose[3:7])
+        return points @ rot.transpose(0, 1) + pose[:3]
+
+    def enable_obstacle(
+        self,
+        name: str,
+        enable: bool = True,
+        env_idx: int = 0,
+    ):
+        """Enable/Disable object in collision checking functions.
+
+        Args:
+            name: Name of the obstacle to enable.
+            enable: True to enable, False to disable.
+            env_idx: Index of the environment to enable the obstacle in.
+        """
+        if self._env_point_cloud_names is not None and name in self._env_point_cloud_names[env_idx]:
+            self.enable_point_cloud(enable, name, None, env_idx)
+        else:
+            return super().enable_obstacle(name, enable, env_idx)
+
+    def get_obstacle_names(self, env_idx: int = 0) -> List[str]:
+        """Get names of all obstacles in the environment.
+
+        Args:
+            env_idx: Environment index to get obstacles from.
+
+        Returns:
+            List of obstacle names.
+        """
+        base_obstacles = super().get_obstacle_names(env_idx)
+        if self._env_point_cloud_names is None:
+            return base_obstacles
+        names = [n for n in self._env_point_cloud_names[env_idx] if n is not None]
+        return names + base_obstacles
+
+    def enable_point_cloud(
+        self,
+        enable: bool = True,
+        name: Optional[str] = None,
+        env_obj_idx: Optional[torch.Tensor] = None,
+        env_idx: int = 0,
+    ):
+        """Enable/Disable point cloud in collision checking functions.
+
+        Args:
+            enable: True to enable, False to disable.
+            name: Name of point cloud to enable.
+            env_obj_idx: Index of point cloud. If name is provided, this is ignored.
+            env_idx: Environment index to enable the point cloud in.
+        """
+        if env_obj_idx is not None:
+            self._point_cloud_tensors[1][env_obj_idx] = int(enable)
+        else:
+            obs_idx = self.get_point_cloud_idx(name, env_idx)
+            self._point_cloud_tensors[1][env_idx, obs_idx] = int(enable)
+
+    def update_obstacle_pose(
+        self,
+        name: str,
+        w_obj_pose: Pose,
+        env_idx: int = 0,
+        update_cpu_reference: bool = False,
+    ):
+        """Update pose of obstacle.
+
+        Args:
+            name: Name of the obstacle.
+            w_obj_pose: Pose of obstacle in world frame.
+            env_idx: Environment index to update obstacle in.
+            update_cpu_reference: If True, updates the CPU reference with the new pose. This is
+                useful for debugging and visualization. Only supported for env_idx=0.
+        """
+        if self._env_point_cloud_names is not None and name in self._env_point_cloud_names[env_idx]:
+            self.update_point_cloud_pose(w_obj_pose, name, env_idx)
+            if update_cpu_reference:
+                self.update_obstacle_pose_in_world_model(name, w_obj_pose, env_idx)
+        else:
+            super().update_obstacle_pose(name, w_obj_pose, env_idx, update_cpu_reference)
+
+    def update_point_cloud_pose(self, w_obj_pose: Pose, name: str, env_idx: int = 0):
+        """Move all points of a point cloud rigidly to a new pose.
+
+        Points are stored in world frame, so they are transformed and hashed again.
+
+        Args:
+            w_obj_pose: Pose of point cloud in world frame.
+            name: Name of the point cloud.
+            env_idx: Environment index to update point cloud in.
+        """
+        obs_idx = self.get_point_cloud_idx(name, env_idx)
+        old_pose = self._point_cloud_tensors[0][env_idx, obs_idx].clone()
+        new_pose = w_obj_pose.get_pose_vector().view(7).to(dtype=old_pose.dtype)
+        points = self._point_cloud_hash.get_points(env_idx, obs_idx)
+        old_rot = torch_quaternion_to_matrix(old_pose[3:7])
+        points = self._transform_points((points - old_pose[:3]) @ old_rot, new_pose)
+        self._point_cloud_hash.remove(env_idx, obs_idx)
+        self._point_cloud_hash.insert(points, env_idx, obs_idx)
+        self._point_cloud_tensors[0][env_idx, obs_idx] = new_pose
+
+    def get_point_cloud_idx(
+        self,
+        name: str,
+        env_idx: int = 0,
+    ) -> int:
+        """Get index of point cloud in the environment.
+
+        Args:
+            name: Name of the point cloud.
+            env_idx: Environment index to get point cloud from.
+
+        Returns:
+            Index of point cloud.
+        """
+        if self._env_point_cloud_names is None or name not in self._env_point_cloud_names[env_idx]:
+            log_error("Obstacle with name: " + name + " not found in current world", exc_info=True)
+        return self._env_point_cloud_names[env_idx].index(name)
+
+    def _get_esdf(
+        self, points: torch.Tensor, env_idx: torch.Tensor
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Get signed distance of positions from the nearest stored point of all point clouds."""
+        return point_cloud_esdf_torch(
+            points,
+            self._point_cloud_hash.keys,
+            self._point_cloud_hash.points,
+            self._point_cloud_hash.slots,
+            self._point_cloud_tensors[1],
+            env_idx,
+            self.point_cloud_config.cell_size,
+            self.point_cloud_config.far_distance,
+            self.point_cloud_config.point_radius,
+            self._point_cloud_hash.max_cell_points,
+        )
+
+    def _get_esdf_collision_buffer(
+        self, collision_query_buffer: CollisionQueryBuffer
+    ) -> CollisionBuffer:
+        """Get the buffer of point clouds from a collision query buffer."""
+        return collision_query_buffer.pointcloud_collision_buffer
+
+    def clear_cache(self):
+        """Delete all point clouds and primitives from the world."""
+        if self._point_cloud_tensors is not None:
+            self._point_cloud_tensors[1][:] = 0
+            self._env_n_point_clouds[:] = 0
+            self._point_cloud_hash.clear()
+            self._env_point_cloud_names = [
+                [None for _ in names] for names in self._env_point_cloud_names
+            ]
+        super().clear_cache()
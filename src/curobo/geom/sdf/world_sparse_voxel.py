@@ -0,0 +1,451 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""World represented by euclidean signed distance grids stored in sparse blocks."""
+
+# Standard Library
+from typing import List, Optional, Tuple
+
+# Third Party
+import torch
+
+# CuRobo
+from curobo.curobolib.geom import _torch_sparse_voxel_block_keys, sparse_voxel_esdf_torch
+from curobo.geom.sdf.sparse_voxel import SparseVoxelConfig, get_sparse_voxel_blocks
+from curobo.geom.sdf.world import (
+    CollisionBuffer,
+    CollisionQueryBuffer,
+    WorldCollisionConfig,
+    WorldUpdateResult,
+)
+from curobo.geom.sdf.world_esdf import WorldEsdfCollision
+from curobo.geom.types import VoxelGrid, WorldConfig
+from curobo.types.math import Pose
+from curobo.util.logger import log_error, log_info
+
+
+class WorldSparseVoxelCollision(WorldEsdfCollision):
+    """Voxel grids stored in sparse blocks of signed distance, with cuboids as primitives.
+
+    Voxel grids in :attr:`~curobo.geom.types.WorldConfig.voxel` are split into blocks when
+    loaded, see :mod:`curobo.geom.sdf.sparse_voxel`. Collision queries are computed with PyTorch,
+    so this checker also runs on CPU.
+    """
+
+    esdf_collision_type = "voxel"
+
+    def __init__(self, config: WorldCollisionConfig):
+        """Initialize with a world collision configuration."""
+        self._env_n_voxels = None
+        self._env_voxel_names = None
+        self._sparse_layer_tensors = None
+        self._sparse_block_keys = None
+        self._sparse_block_features = None
+        super().__init__(config)
+
+    def _init_cache(self):
+        """Initialize the cache for the world."""
+        if (
+            self.cache is not None
+            and "voxel" in self.cache
+            and self.cache["voxel"] not in [None, 0]
+        ):
+            voxel_cache = self.cache["voxel"]
+            n_layers = voxel_cache["layers"] if isinstance(voxel_cache, dict) else voxel_cache
+            self._create_sparse_voxel_cache(n_layers)
+        return super()._init_cache()
+
+    def _create_sparse_voxel_cache(self, n_layers: int):
+        """Create a cache for sparse voxel grids, without any stored blocks.
+
+        Args:
+            n_layers: Number of voxel grids in each environment.
+        """
+        layer_params = torch.zeros(
+            (self.n_envs, n_layers, 4),
+            dtype=self.tensor_args.dtype,
+            device=self.tensor_args.device,
+        )
+        layer_params[..., 3] = 1.0
+        layer_pose = torch.zeros(
+            (self.n_envs, n_layers, 8),
+            dtype=self.tensor_args.dtype,
+            device=self.tensor_args.device,
+        )
+        layer_pose[..., 3] = 1.0
+        layer_enable = torch.zeros(
+            (self.n_envs, n_layers), dtype=torch.uint8, device=self.tensor_args.device
+        )
+        self._env_n_voxels = torch.zeros(
+            (self.n_envs), device=self.tensor_args.device, dtype=torch.int32
+        )
+        self._sparse_layer_tensors = [layer_params, layer_pose, layer_enable]
+        self._sparse_block_keys = torch.zeros(0, dtype=torch.long, device=self.tensor_args.device)
+        self._sparse_block_features = torch.zeros(
+            (0, self.sparse_voxel_config.block_size**3),
+            dtype=self.tensor_args.dtype,
+            device=self.tensor_args.device,
+        )
+        self.collision_types["voxel"] = True
+        self._env_voxel_names = [[None for _ in range(n_layers)] for _ in range(self.n_envs)]
+
+    @property
+    def sparse_voxel_config(self) -> SparseVoxelConfig:
+        """Parameters of sparse block storage."""
+        if self.sparse_voxel is None:
+            return SparseVoxelConfig()
+        return self.sparse_voxel
+
+    @property
+    def n_voxel_blocks(self) -> int:
+        """Number of stored blocks across all voxel grids and environments."""
+        if self._sparse_block_keys is None:
+            return 0
+        return self._sparse_block_keys.shape[0]
+
+    @property
+    def voxel_memory_bytes(self) -> int:
+        """Memory used to store voxel grids in bytes, including keys and grid parameters."""
+        if self._sparse_layer_tensors is None:
+            return 0
+        tensors = self._sparse_layer_tensors + [
+            self._sparse_block_keys,
+            self._sparse_block_features,
+        ]
+        return sum(t.numel() * t.element_size() for t in tensors)
+
+    def load_collision_model(
+        self, world_model: WorldConfig, env_idx=0, fix_cache_reference: bool = False
+    ):
+        """Load collision representation from world obstacles.
+
+        Args:
+            world_model: Obstacles in world to load.
+            env_idx: Environment index to load obstacles into.
+            fix_cache_reference: If True, throws error if number of voxel grids is greater than
+                cache. If False, creates a larger cache. Stored blocks are reallocated on every
+                load, so this checker cannot be used inside a recorded cuda graph.
+        """
+        self._load_sparse_voxel_collision_model_in_cache(
+            world_model, env_idx, fix_cache_reference=fix_cache_reference
+        )
+        super().load_collision_model(
+            world_model, env_idx=env_idx, fix_cache_reference=fix_cache_reference
+        )
+
+    def load_batch_collision_model(self, world_config_list: List[WorldConfig]):
+        """Load voxel grids and cuboids for batched environments.
+
+        Args:
+            world_config_list: List of world obstacles for each environment.
+        """
+        max_layers = max(len(w.voxel) for w in world_config_list)
+        if max_layers > 0:
+            if (
+                self._sparse_layer_tensors is None
+                or self._sparse_layer_tensors[0].shape[1] < max_layers
+                or self._sparse_layer_tensors[0].shape[0] != len(world_config_list)
+            ):
+                self.n_envs = len(world_config_list)
+                self._create_sparse_voxel_cache(max_layers)
+            for env_idx, world_config in enumerate(world_config_list):
+                self._load_sparse_voxel_collision_model_in_cache(world_config, env_idx)
+        super().load_batch_collision_model(world_config_list)
+
+    def update_collision_model(
+        self,
+        world_config: WorldConfig,
+        env_idx: int = 0,
+        fix_cache_reference: bool = False,
+        tolerance: float = 1e-6,
+    ) -> WorldUpdateResult:
+        """Update loaded obstacles to match a world configuration.
+
+        Voxel grids are not diffed, the full collision model is reloaded when the new world or
+        the loaded environment has voxel grids. Otherwise, only changed cuboids are written as in
+        :meth:`WorldPrimitiveCollision.update_collision_model`.
+
+        Args:
+            world_config: Obstacles that should be in the world after the update.
+            env_idx: Environment index to update.
+            fix_cache_reference: If True, throws error if number of obstacles is greater than
+                cache when a full reload is required.
+            tolerance: Maximum difference in pose and dimensions to consider an obstacle
+                unchanged.
+
+        Returns:
+            WorldUpdateResult: Changes written to the collision checker.
+        """
+        has_voxels = self._sparse_layer_tensors is not None and bool(
+            torch.any(self._sparse_layer_tensors[2][env_idx] > 0)
+        )
+        if has_voxels or len(world_config.voxel) > 0:
+            return self._reload_collision_model(world_config, env_idx, fix_cache_reference)
+        return super().update_collision_model(
+            world_config, env_idx, fix_cache_reference=fix_cache_reference, tolerance=tolerance
+        )
+
+    def _load_sparse_voxel_collision_model_in_cache(
+        self, world_config: WorldConfig, env_idx: int = 0, fix_cache_reference: bool = False
+    ):
+        """Split voxel grids of a world into blocks and store them in the cache.
+
+        Args:
+            world_config: Obstacles in world to load.
+            env_idx: Environment index to load voxel grids into.
+            fix_cache_reference: If True, throws error if number of voxel grids is greater than
+                cache. If False, creates a larger cache.
+        """
+        voxel_objs = world_config.voxel
+        max_obs = len(voxel_objs)
+        self.world_model = world_config
+        if self._sparse_layer_tensors is not None:
+            self._remove_env_blocks(env_idx)
+            self._sparse_layer_tensors[2][env_idx] = 0
+            self._env_n_voxels[env_idx] = 0
+            self._env_voxel_names[env_idx] = [None] * len(self._env_voxel_names[env_idx])
+        if max_obs < 1:
+            log_info("No Voxel objs")
+            return
+        if self._sparse_layer_tensors is None or self._sparse_layer_tensors[0].shape[1] < max_obs:
+            if not fix_cache_reference:
+                log_info("Creating Sparse Voxel cache" + str(max_obs))
+                self._create_sparse_voxel_cache(max_obs)
+            else:
+                log_error(
+                    "number of voxel grids is larger than collision cache, create larger cache."
+                )
+
+        for i, voxel in enumerate(voxel_objs):
+            self._write_voxel_layer(voxel, env_idx, i)
+            self._env_voxel_names[env_idx][i] = voxel.name
+        self._env_n_voxels[env_idx] = max_obs
+        self.collision_types["voxel"] = True
+
+    def _write_voxel_layer(self, voxel: VoxelGrid, env_idx: int, layer_idx: int):
+        """Store blocks, parameters, and pose of a voxel grid in a layer of the cache."""
+        grid_shape = voxel.get_grid_shape()[0]
+        if voxel.feature_tensor is None and voxel.file_path is None:
+            features = torch.full(
+                grid_shape,
+                -self.sparse_voxel_config.far_distance,
+                device=self.tensor_args.device,
+                dtype=self.tensor_args.dtype,
+            )
+        else:
+            features = voxel.load_features().to(device=self.tensor_args.device)
+            if features.numel() != grid_shape[0] * grid_shape[1] * grid_shape[2]:
+                log_error(
+                    "Feature tensor shape mismatch for voxel grid "
+                    + voxel.name
+                    + ", grid shape: "
+                    + str(grid_shape)
+                    + " New shape: "
+                    + str(features.shape)
+                )
+        block_xyz, block_features = get_sparse_voxel_blocks(
+            features.view(grid_shape).to(dtype=self.tensor_args.dtype),
+            self.sparse_voxel_config.block_size,
+            self.sparse_voxel_config.far_distance,
+        )
+        slot = self._get_layer_slot(env_idx, layer_idx)
+        self._remove_blocks(self._sparse_block_keys >> 48 == slot)
+        keys = _torch_sparse_voxel_block_keys(block_xyz, torch.full_like(block_xyz[:, 0], slot))
+        if torch.any(keys < 0):
+            log_error("Voxel grid " + voxel.name + " has too many blocks along an axis")
+        keys = torch.cat([self._sparse_block_keys, keys])
+        features = torch.cat([self._sparse_block_features, block_features])
+        order = torch.argsort(keys)
+        self._sparse_block_keys = keys[order]
+        self._sparse_block_features = features[order]
+
+        offset = [round(0.5 * d / voxel.voxel_size) * voxel.voxel_size for d in voxel.dims]
+        self._sparse_layer_tensors[0][env_idx, layer_idx, :3] = self.tensor_args.to_device(offset)
+        self._sparse_layer_tensors[0][env_idx, layer_idx, 3] = voxel.voxel_size
+        self._sparse_layer_tensors[1][env_idx, layer_idx, :7] = (
+            Pose.from_list(voxel.pose, self.tensor_args).inverse().get_pose_vector()
+        )
+        self._sparse_layer_tensors[2][env_idx, layer_idx] = 1
+
+    def _get_layer_slot(self, env_idx: int, layer_idx: int) -> int:
+        """Get index of a voxel grid across environments, used in block keys."""
+        return env_idx * self._sparse_layer_tensors[0].shape[1] + layer_idx
+
+    def _remove_blocks(self, remove: torch.Tensor):
+        """Remove stored blocks given a boolean mask over blocks."""
+        if torch.any(remove):
+            self._sparse_block_keys = self._sparse_block_keys[~remove]
+            self._sparse_block_features = self._sparse_block_features[~remove]
+
+    def _remove_env_blocks(self, env_idx: int):
+        """Remove stored blocks of all voxel grids in an environment."""
+        n_layers = self._sparse_layer_tensors[0].shape[1]
+        self._remove_blocks(
+            torch.div(self._sparse_block_keys >> 48, n_layers, rounding_mode="floor") == env_idx
+        )
+
+    def enable_obstacle(
+        self,
+        name: str,
+        enable: bool = True,
+        env_idx: int = 0,
+    ):
+        """Enable/Disable object in collision checking functions.
+
+        Args:
+            name: Name of the obstacle to enable.
+            enable: True to enable, False to disable.
+            env_idx: Index of the environment to enable the obstacle in.
+        """
+        if self._env_voxel_names is not None and name in self._env_voxel_names[env_idx]:
+            self.enable_voxel(enable, name, None, env_idx)
+        else:
+            return super().enable_obstacle(name, enable, env_idx)
+
+    def get_obstacle_names(self, env_idx: int = 0) -> List[str]:
+        """Get names of all obstacles in the environment.
+
+        Args:
+            env_idx: Environment index to get obstacles from.
+
+        Returns:
+            List of obstacle names.
+        """
+        base_obstacles = super().get_obstacle_names(env_idx)
+        if self._env_voxel_names is None:
+            return base_obstacles
+        return self._env_voxel_names[env_idx] + base_obstacles
+
+    def enable_voxel(
+        self,
+        enable: bool = True,
+        name: Optional[str] = None,
+        env_obj_idx: Optional[torch.Tensor] = None,
+        env_idx: int = 0,
+    ):
+        """Enable/Disable voxel grid in collision checking functions.
+
+        Args:
+            enable: True to enable, False to disable.
+            name: Name of voxel grid to enable.
+            env_obj_idx: Index of voxel grid. If name is provided, this is ignored.
+            env_idx: Environment index to enable the voxel grid in.
+        """
+        if env_obj_idx is not None:
+            self._sparse_layer_tensors[2][env_obj_idx] = int(enable)
+        else:
+            obs_idx = self.get_voxel_idx(name, env_idx)
+            self._sparse_layer_tensors[2][env_idx, obs_idx] = int(enable)
+
+    def update_obstacle_pose(
+        self,
+        name: str,
+        w_obj_pose: Pose,
+        env_idx: int = 0,
+        update_cpu_reference: bool = False,
+    ):
+        """Update pose of obstacle.
+
+        Args:
+            name: Name of the obstacle.
+            w_obj_pose: Pose of obstacle in world frame.
+            env_idx: Environment index to update obstacle in.
+            update_cpu_reference: If True, updates the CPU reference with the new pose. This is
+                useful for debugging and visualization. Only supported for env_idx=0.
+        """
+        if self._env_voxel_names is not None and name in self._env_voxel_names[env_idx]:
+            self.update_voxel_pose(name=name, w_obj_pose=w_obj_pose, env_idx=env_idx)
+            if update_cpu_reference:
+                self.update_obstacle_pose_in_world_model(name, w_obj_pose, env_idx)
+        else:
+            super().update_obstacle_pose(name, w_obj_pose, env_idx, update_cpu_reference)
+
+    def update_voxel_data(self, new_voxel: VoxelGrid, env_idx: int = 0):
+        """Update parameters and signed distance values of a loaded voxel grid.
+
+        Args:
+            new_voxel: New parameters, matched to a loaded voxel grid by name.
+            env_idx: Environment index to update voxel grid in.
+        """
+        obs_idx = self.get_voxel_idx(new_voxel.name, env_idx)
+        self._write_voxel_layer(new_voxel, env_idx, obs_idx)
+
+    def update_voxel_pose(
+        self,
+        w_obj_pose: Optional[Pose] = None,
+        obj_w_pose: Optional[Pose] = None,
+        name: Optional[str] = None,
+        env_obj_idx: Optional[torch.Tensor] = None,
+        env_idx: int = 0,
+    ):
+        """Update pose of voxel grid.
+
+        Args:
+            w_obj_pose: Pose of voxel grid in world frame.
+            obj_w_pose: Inverse pose of voxel grid. If provided, w_obj_pose is ignored.
+            name: Name of the voxel grid.
+            env_obj_idx: Index of voxel grid. If name is provided, this is ignored.
+            env_idx: Environment index to update voxel grid in.
+        """
+        obj_w_pose = self._get_obstacle_poses(w_obj_pose, obj_w_pose)
+        if env_obj_idx is not None:
+            self._sparse_layer_tensors[1][env_obj_idx, :7] = obj_w_pose.get_pose_vector()
+        else:
+            obs_idx = self.get_voxel_idx(name, env_idx)
+            self._sparse_layer_tensors[1][env_idx, obs_idx, :7] = obj_w_pose.get_pose_vector()
+
+    def get_voxel_idx(
+        self,
+        name: str,
+        env_idx: int = 0,
+    ) -> int:
+        """Get index of voxel grid in the environment.
+
+        Args:
+            name: Name of the voxel grid.
+            env_idx: Environment index to get voxel grid from.
+
+        Returns:
+            Index of voxel grid.
+        """
+        if self._env_voxel_names is None or name not in self._env_voxel_names[env_idx]:
+            log_error("Obstacle with name: " + name + " not found in current world", exc_info=True)
+        return self._env_voxel_names[env_idx].index(name)
+
+    def _get_esdf(
+        self, points: torch.Tensor, env_idx: torch.Tensor
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Interpolate signed distance of positions from stored blocks of all voxel grids."""
+        return sparse_voxel_esdf_torch(
+            points,
+            self._sparse_block_keys,
+            self._sparse_block_features,
+            self._sparse_layer_tensors[0],
+            self._sparse_layer_tensors[1],
+            self._sparse_layer_tensors[2],
+            env_idx,
+            self.sparse_voxel_config.block_size,
+            self.sparse_voxel_config.far_distance,
+        )
+
+    def _get_esdf_collision_buffer(
+        self, collision_query_buffer: CollisionQueryBuffer
+    ) -> CollisionBuffer:
+        """Get the buffer of voxel grids from a collision query buffer."""
+        return collision_query_buffer.voxel_collision_buffer
+
+    def clear_cache(self):
+        """Delete all voxel grids and cuboids from the world."""
+        if self._sparse_layer_tensors is not None:
+            self._sparse_layer_tensors[2][:] = 0
+            self._env_n_voxels[:] = 0
+            self._remove_blocks(torch.ones_like(self._sparse_block_keys, dtype=torch.bool))
+            self._env_voxel_names = [[None for _ in names] for names in self._env_voxel_names]
+        super().clear_cache()
@@ -12,7 +12,7 @@
 
 # Standard Library
 import math
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 # Third Party
 import numpy as np
@@ -20,7 +20,15 @@ import torch
 
 # CuRobo
 from curobo.curobolib.geom import SdfSphereVoxel, SdfSweptSphereVoxel
-from curobo.geom.sdf.world import CollisionQueryBuffer, WorldCollisionConfig
+from curobo.geom.sdf.esdf_update import (
+    EsdfUpdateConfig,
+    compute_esdf_from_occupancy,
+    get_dirty_box,
+    get_esdf_band,
+)
+from curobo.geom.sdf.voxel_pyramid import VoxelPyramid
+from curobo.geom.sdf.voxel_stream import StreamedVoxelRegion, get_voxel_grid_position
+from curobo.geom.sdf.world import CollisionQueryBuffer, WorldCollisionConfig, WorldUpdateResult
 from curobo.geom.sdf.world_mesh import WorldMeshCollision
 from curobo.geom.types import VoxelGrid, WorldConfig
 from curobo.types.math import Pose
@@ -35,6 +43,10 @@ class WorldVoxelCollision(WorldMeshCollision):
         self._env_n_voxels = None
         self._voxel_tensor_list = None
         self._env_voxel_names = None
+        self._env_voxel_regions = None
+        self._voxel_pyramid = None
+        #: Number of voxel grid regions read from memory-mapped files.
+        self.voxel_region_loads = 0
 
         super().__init__(config)
 
@@ -101,6 +113,10 @@ class WorldVoxelCollision(WorldMeshCollision):
         self._voxel_tensor_list = [voxel_params, voxel_pose, voxel_enable, voxel_features]
         self.collision_types["voxel"] = True
         self._env_voxel_names = [[None for _ in range(n_layers)] for _ in range(self.n_envs)]
+        self._env_voxel_regions = [{} for _ in range(self.n_envs)]
+        if self.voxel_pyramid is not None:
+            self._voxel_pyramid = VoxelPyramid(self.voxel_pyramid)
+            self._voxel_pyramid.set_voxel_tensors(*self._voxel_tensor_list, grid_shape)
 
     def load_collision_model(
         self, world_model: WorldConfig, env_idx=0, fix_cache_reference: bool = False
@@ -122,6 +138,39 @@ class WorldVoxelCollision(WorldMeshCollision):
             world_model, env_idx=env_idx, fix_cache_reference=fix_cache_reference
         )
 
+    def update_collision_model(
+        self,
+        world_config: WorldConfig,
+        env_idx: int = 0,
+        fix_cache_reference: bool = False,
+        tolerance: float = 1e-6,
+    ) -> WorldUpdateResult:
+        """Update loaded obstacles to match a world configuration.
+
+        Voxel grids are not diffed, the full collision model is reloaded when the new world or
+        the loaded environment has voxel grids. Otherwise, only changed meshes and cuboids are
+        written as in :meth:`WorldMeshCollision.update_collision_model`.
+
+        Args:
+            world_config: Obstacles that should be in the world after the update.
+            env_idx: Environment index to update.
+            fix_cache_reference: If True, throws error if number of obstacles is greater than
+                cache when a full reload is required.
+            tolerance: Maximum difference in pose and dimensions to consider an obstacle
+                unchanged.
+
+        Returns:
+            WorldUpdateResult: Changes written to the collision checker.
+        """
+        has_voxels = self._voxel_tensor_list is not None and bool(
+            torch.any(self._voxel_tensor_list[2][env_idx] > 0)
+        )
+        if has_voxels or len(world_config.voxel) > 0:
+            return self._reload_collision_model(world_config, env_idx, fix_cache_reference)
+        return super().update_collision_model(
+            world_config, env_idx, fix_cache_reference=fix_cache_reference, tolerance=tolerance
+        )
+
     def _load_voxel_collision_model_in_cache(
         self, world_config: WorldConfig, env_idx: int = 0, fix_cache_reference: bool = False
     ):
@@ -135,7 +184,20 @@ class WorldVoxelCollision(WorldMeshCollision):
                 inside a recorded cuda graph, recreating the cache will break the graph as the
                 reference pointer to the cache will change.
         """
-        voxel_objs = world_config.voxel
+        voxel_objs = []
+        voxel_regions = {}
+        for voxel in world_config.voxel:
+            if (
+                self.voxel_stream is not None
+                and voxel.feature_tensor is None
+                and voxel.file_path is not None
+            ):
+                region, voxel_regions[voxel.name] = self._read_voxel_region(
+                    voxel, self.voxel_stream.base_position
+                )
+                voxel_objs.append(region)
+            else:
+                voxel_objs.append(voxel)
         max_obs = len(voxel_objs)
         self.world_model = world_config
         if max_obs < 1:
@@ -169,11 +231,86 @@ class WorldVoxelCollision(WorldMeshCollision):
         self._voxel_tensor_list[2][env_idx, max_obs:] = 0  # disabling obstacle
 
         # copy voxel grid features:
+        for i, voxel in enumerate(voxel_objs):
+            if voxel.feature_tensor is None and voxel.file_path is None:
+                continue
+            feature_tensor = voxel.load_features().view(-1, 1)
+            if feature_tensor.shape != self._voxel_tensor_list[3][env_idx, i].shape:
+                log_error(
+                    "Feature tensor shape mismatch for voxel grid "
+                    + voxel.name
+                    + ", cache shape: "
+                    + str(self._voxel_tensor_list[3][env_idx, i].shape)
+                    + " New shape: "
+                    + str(feature_tensor.shape)
+                )
+            self._voxel_tensor_list[3][env_idx, i].copy_(feature_tensor)
 
         self._env_n_voxels[env_idx] = max_obs
         self._env_voxel_names[env_idx][:max_obs] = names_batch
+        self._env_voxel_regions[env_idx] = voxel_regions
         self.collision_types["voxel"] = True
 
+    def _read_voxel_region(
+        self, voxel_grid: VoxelGrid, base_position: Optional[List[float]]
+    ) -> Tuple[VoxelGrid, StreamedVoxelRegion]:
+        """Read region of a memory-mapped voxel grid around the robot base.
+
+        Args:
+            voxel_grid: Voxel grid with a file_path.
+            base_position: Position of robot base in world frame. Defaults to center of grid.
+
+        Returns:
+            Tuple[VoxelGrid, StreamedVoxelRegion]: Region to copy into the cache and its bounds.
+        """
+        if base_position is None:
+            base_position = voxel_grid.pose[:3]
+        half_extent = self.voxel_stream.region_half_extent
+        # voxels within two voxels of the region border are not used by collision kernels:
+        region = voxel_grid.get_region(
+            base_position,
+            half_extent + 2 * voxel_grid.voxel_size,
+            fill_value=-1.0 * float(self.max_esdf_distance),
+        )
+        self.voxel_region_loads += 1
+        center = get_voxel_grid_position(voxel_grid, base_position)
+        return region, StreamedVoxelRegion(voxel_grid, center, half_extent)
+
+    def update_voxel_region(
+        self,
+        base_position: Union[List[float], Pose],
+        env_idx: int = 0,
+        force: bool = False,
+    ) -> List[str]:
+        """Stream regions of memory-mapped voxel grids around a new robot base position.
+
+        A region is read from disk only when the reach of the robot, given by
+        :attr:`~curobo.geom.sdf.voxel_stream.VoxelStreamConfig.reach_radius`, is no longer inside
+        the loaded region. Regions are copied into the existing cache, so this can be used with
+        CUDA graphs.
+
+        Args:
+            base_position: Position of robot base in world frame, or pose of robot base.
+            env_idx: Environment index to update.
+            force: Read new regions even if the reach of the robot is inside the loaded regions.
+
+        Returns:
+            List[str]: Names of voxel grids whose region was read from disk.
+        """
+        if self.voxel_stream is None:
+            log_error("voxel_stream is not set in WorldCollisionConfig")
+        if isinstance(base_position, Pose):
+            base_position = base_position.position.view(-1)[:3].cpu().tolist()
+        updated = []
+        regions = self._env_voxel_regions[env_idx] if self._env_voxel_regions is not None else {}
+        for name, region in regions.items():
+            if not force and region.contains(base_position, self.voxel_stream.reach_radius):
+                continue
+            new_region, regions[name] = self._read_voxel_region(region.voxel_grid, base_position)
+            self.update_voxel_data(new_region, env_idx)
+            updated.append(name)
+        return updated
+
     def _batch_tensor_voxel(
         self, pose: List[List[float]], dims: List[float], voxel_size: List[float]
     ) -> List[torch.Tensor]:
@@ -379,6 +516,90 @@ class WorldVoxelCollision(WorldMeshCollision):
         )
         self._voxel_tensor_list[2][env_idx, obs_idx] = int(True)
 
+    def update_voxel_subgrid(
+        self, sub_grid: VoxelGrid, env_idx: int = 0, recompute_distance: bool = True
+    ) -> Tuple[List[int], List[int]]:
+        """Write features of a region of a voxel grid, without copying the rest of the grid.
+
+        Unlike :meth:`update_voxel_data`, only voxels in and around the region are written, so the
+        cost of an update depends on the size of the region. Voxels of the region should be aligned
+        with voxels of the loaded grid, i.e., have the same size and orientation and be offset by a
+        whole number of voxels. Voxels of the region outside the loaded grid are ignored.
+
+        Args:
+            sub_grid: Region with the name of a loaded voxel grid and signed distance of its voxels.
+            env_idx: Environment index to update voxel grid in.
+            recompute_distance: Recompute signed distance of voxels near the region from the sign
+                of features, see :mod:`curobo.geom.sdf.esdf_update`. Set to False when features
+                of the region are signed distance that account for obstacles outside the region.
+
+        Returns:
+            Tuple[List[int], List[int]]: Index of the first written voxel along each axis and the
+            number of written voxels along each axis.
+        """
+        obs_idx = self.get_voxel_idx(sub_grid.name, env_idx)
+        params = self._voxel_tensor_list[0][env_idx, obs_idx].cpu().tolist()
+        dims, voxel_size = params[:3], params[3]
+        grid_shape = VoxelGrid(
+            sub_grid.name, pose=[0, 0, 0, 1, 0, 0, 0], dims=dims, voxel_size=voxel_size
+        ).get_grid_shape()[0]
+        if abs(sub_grid.voxel_size - voxel_size) > 1e-6:
+            log_error(
+                "voxel_size of region "
+                + str(sub_grid.voxel_size)
+                + " does not match voxel grid "
+                + str(voxel_size)
+            )
+
+        # index of first voxel of region, following voxel indexing of collision kernels:
+        grid_pose_vector = self._voxel_tensor_list[1][env_idx, obs_idx, :7].view(1, 7)
+        grid_T_w = Pose(position=grid_pose_vector[:, :3], quaternion=grid_pose_vector[:, 3:7])
+        grid_T_sub = grid_T_w.multiply(Pose.from_list(sub_grid.pose, self.tensor_args))
+        if abs(grid_T_sub.quaternion.view(4)[0].item()) < 1.0 - 1e-5:
+            log_error("Orientation of region does not match voxel grid " + sub_grid.name)
+        sub_shape = sub_grid.get_grid_shape()[0]
+        first_voxel = self.tensor_args.to_device(
+            [[0.5 * voxel_size - 0.5 * sub_grid.dims[i] for i in range(3)]]
+        )
+        first_voxel = grid_T_sub.transform_points(first_voxel).view(3).cpu().tolist()
+        start_f = [(first_voxel[i] + 0.5 * dims[i]) / voxel_size - 0.5 for i in range(3)]
+        start = [int(round(x)) for x in start_f]
+        if any(abs(start_f[i] - start[i]) > 1e-2 for i in range(3)):
+            log_error("Voxels of region are not aligned with voxels of grid " + sub_grid.name)
+
+        low = [max(start[i], 0) for i in range(3)]
+        high = [min(start[i] + sub_shape[i], grid_shape[i]) for i in range(3)]
+        shape = [high[i] - low[i] for i in range(3)]
+        if any(x <= 0 for x in shape):
+            log_warn("Region is outside voxel grid " + sub_grid.name)
+            return low, [0, 0, 0]
+
+        features = self._voxel_tensor_list[3][env_idx, obs_idx, :, 0].view(grid_shape)
+        sub_features = sub_grid.load_features().view(sub_shape)
+        src = tuple(slice(low[i] - start[i], high[i] - start[i]) for i in range(3))
+        dst = tuple(slice(low[i], high[i]) for i in range(3))
+        features[dst] = sub_features[src].to(device=features.device, dtype=features.dtype)
+        if not recompute_distance:
+            return low, shape
+
+        esdf_update = self.esdf_update if self.esdf_update is not None else EsdfUpdateConfig()
+        band = get_esdf_band(voxel_size, esdf_update.max_distance)
+        # voxels within max_distance of the region can have a new nearest obstacle, which can
+        # be up to max_distance farther out:
+        box_start, box_shape = get_dirty_box(low, shape, grid_shape, band)
+        window_start, window_shape = get_dirty_box(box_start, box_shape, grid_shape, band)
+        window = tuple(slice(window_start[i], window_start[i] + window_shape[i]) for i in range(3))
+        esdf = compute_esdf_from_occupancy(
+            features[window].to(dtype=torch.float32) > 0.0, voxel_size, esdf_update.max_distance
+        )
+        box = tuple(
+            slice(box_start[i] - window_start[i], box_start[i] - window_start[i] + box_shape[i])
+            for i in range(3)
+        )
+        dst = tuple(slice(box_start[i], box_start[i] + box_shape[i]) for i in range(3))
+        features[dst] = esdf[box].to(dtype=features.dtype)
+        return box_start, box_shape
+
     def update_voxel_features(
         self,
         features: torch.Tensor,
@@ -479,6 +700,35 @@ class WorldVoxelCollision(WorldMeshCollision):
         )
         return voxel_grid
 
+    def _get_voxel_query_spheres(
+        self,
+        query_sphere: torch.Tensor,
+        activation_distance: torch.Tensor,
+        env_query_idx: Optional[torch.Tensor] = None,
+        sweep: bool = False,
+    ) -> torch.Tensor:
+        """Get query spheres to pass to voxel collision kernels.
+
+        Without a voxel pyramid, this returns the query spheres. With a voxel pyramid, spheres
+        that are far from all voxel grids get a negative radius, so the kernels skip them.
+
+        Args:
+            query_sphere: Query spheres [batch, horizon, number of spheres, 4].
+            activation_distance: Distance outside spheres at which obstacles contribute to cost.
+            env_query_idx: Environment index for each batch of query spheres.
+            sweep: Include the segments swept by spheres between consecutive timesteps.
+
+        Returns:
+            torch.Tensor: Query spheres, differentiable with respect to input query spheres.
+        """
+        if self._voxel_pyramid is None:
+            return query_sphere
+        far = self._voxel_pyramid.get_far_spheres(
+            query_sphere, activation_distance, env_query_idx, sweep=sweep
+        )
+        radius = torch.where(far.unsqueeze(-1), -1.0, query_sphere[..., 3:])
+        return torch.cat([query_sphere[..., :3], radius], dim=-1)
+
     def get_sphere_distance(
         self,
         query_sphere,
@@ -532,8 +782,13 @@ class WorldVoxelCollision(WorldMeshCollision):
         if env_query_idx is None:
             use_batch_env = False
             env_query_idx_voxel = self._env_n_voxels
+        voxel_query_sphere = query_sphere
+        if not compute_esdf:
+            voxel_query_sphere = self._get_voxel_query_spheres(
+                query_sphere, activation_distance, env_query_idx
+            )
         dist = SdfSphereVoxel.apply(
-            query_sphere,
+            voxel_query_sphere,
             collision_query_buffer.voxel_collision_buffer.distance_buffer,
             collision_query_buffer.voxel_collision_buffer.grad_distance_buffer,
             collision_query_buffer.voxel_collision_buffer.sparsity_index_buffer,
@@ -556,6 +811,7 @@ class WorldVoxelCollision(WorldMeshCollision):
             return_loss,
             sum_collisions,
             compute_esdf,
+            self.interpolate_voxel_esdf,
         )
         if ("primitive" not in self.collision_types or not self.collision_types["primitive"]) and (
             "mesh" not in self.collision_types or not self.collision_types["mesh"]
@@ -621,8 +877,11 @@ class WorldVoxelCollision(WorldMeshCollision):
         if env_query_idx is None:
             use_batch_env = False
             env_query_idx_voxel = self._env_n_voxels
+        voxel_query_sphere = self._get_voxel_query_spheres(
+            query_sphere, activation_distance, env_query_idx
+        )
         dist = SdfSphereVoxel.apply(
-            query_sphere,
+            voxel_query_sphere,
             collision_query_buffer.voxel_collision_buffer.distance_buffer,
             collision_query_buffer.voxel_collision_buffer.grad_distance_buffer,
             collision_query_buffer.voxel_collision_buffer.sparsity_index_buffer,
@@ -645,6 +904,7 @@ class WorldVoxelCollision(WorldMeshCollision):
             False,
             False,
             False,
+            self.interpolate_voxel_esdf,
         )
 
         if ("primitive" not in self.collision_types or not self.collision_types["primitive"]) and (
@@ -674,6 +934,7 @@ class WorldVoxelCollision(WorldMeshCollision):
         env_query_idx: Optional[torch.Tensor] = None,
         return_loss=False,
         sum_collisions: bool = True,
+        adapt_sweep_steps: bool = True,
     ) -> torch.Tensor:
         """Compute the signed distance between trajectory of spheres and world obstacles.
 
@@ -699,10 +960,14 @@ class WorldVoxelCollision(WorldMeshCollision):
             sum_collisions: Sum the collision cost across all obstacles. This variable is currently
                 not passed to the underlying CUDA kernel as setting this to False caused poor
                 performance.
+            adapt_sweep_steps: Compute sweep_steps from displacement of spheres when
+                :attr:`adaptive_sweep` is set. Subclasses pass False to their base class with
+                the steps they computed.
 
         Returns:
             Collision cost between trajectory of spheres and world obstacles.
         """
+        sweep_steps = self._get_sweep_steps(query_sphere, sweep_steps, adapt_sweep_steps)
         if "voxel" not in self.collision_types or not self.collision_types["voxel"]:
             return super().get_swept_sphere_distance(
                 query_sphere,
@@ -715,6 +980,7 @@ class WorldVoxelCollision(WorldMeshCollision):
                 enable_speed_metric=enable_speed_metric,
                 return_loss=return_loss,
                 sum_collisions=sum_collisions,
+                adapt_sweep_steps=False,
             )
         b, h, n, _ = query_sphere.shape
         use_batch_env = True
@@ -723,8 +989,11 @@ class WorldVoxelCollision(WorldMeshCollision):
             use_batch_env = False
             env_query_idx_voxel = self._env_n_voxels
 
+        voxel_query_sphere = self._get_voxel_query_spheres(
+            query_sphere, activation_distance, env_query_idx, sweep=True
+        )
         dist = SdfSweptSphereVoxel.apply(
-            query_sphere,
+            voxel_query_sphere,
             collision_query_buffer.voxel_collision_buffer.distance_buffer,
             collision_query_buffer.voxel_collision_buffer.grad_distance_buffer,
             collision_query_buffer.voxel_collision_buffer.sparsity_index_buffer,
@@ -749,6 +1018,7 @@ class WorldVoxelCollision(WorldMeshCollision):
             use_batch_env,
             return_loss,
             sum_collisions,
+            self.interpolate_voxel_esdf,
         )
         if ("primitive" not in self.collision_types or not self.collision_types["primitive"]) and (
             "mesh" not in self.collision_types or not self.collision_types["mesh"]
@@ -765,6 +1035,7 @@ class WorldVoxelCollision(WorldMeshCollision):
             enable_speed_metric=enable_speed_metric,
             return_loss=return_loss,
             sum_collisions=sum_collisions,
+            adapt_sweep_steps=False,
         )
 
         d_val = dist.view(d_prim.shape) + d_prim
@@ -781,6 +1052,7 @@ class WorldVoxelCollision(WorldMeshCollision):
         enable_speed_metric=False,
         env_query_idx: Optional[torch.Tensor] = None,
         return_loss=False,
+        adapt_sweep_steps: bool = True,
     ) -> torch.Tensor:
         """Get binary collision between trajectory of spheres and world obstacles.
 
@@ -801,10 +1073,14 @@ class WorldVoxelCollision(WorldMeshCollision):
                 shown to improve convergence from poor initialization. This is not used.
             env_query_idx: Environment index for each batch of query spheres.
             return_loss: This is not supported for binary classification. Set to False.
+            adapt_sweep_steps: Compute sweep_steps from displacement of spheres when
+                :attr:`adaptive_sweep` is set. Subclasses pass False to their base class with
+                the steps they computed.
 
         Returns:
             Collision value between trajectory of spheres and world obstacles.
         """
+        sweep_steps = self._get_sweep_steps(query_sphere, sweep_steps, adapt_sweep_steps)
         if "voxel" not in self.collision_types or not self.collision_types["voxel"]:
             return super().get_swept_sphere_collision(
                 query_sphere,
@@ -816,6 +1092,7 @@ class WorldVoxelCollision(WorldMeshCollision):
                 speed_dt=speed_dt,
                 enable_speed_metric=enable_speed_metric,
                 return_loss=return_loss,
+                adapt_sweep_steps=False,
             )
         if return_loss:
             log_error("cannot return loss for classify, use get_swept_sphere_distance")
@@ -826,8 +1103,11 @@ class WorldVoxelCollision(WorldMeshCollision):
         if env_query_idx is None:
             use_batch_env = False
             env_query_idx_voxel = self._env_n_voxels
+        voxel_query_sphere = self._get_voxel_query_spheres(
+            query_sphere, activation_distance, env_query_idx, sweep=True
+        )
         dist = SdfSweptSphereVoxel.apply(
-            query_sphere,
+            voxel_query_sphere,
             collision_query_buffer.voxel_collision_buffer.distance_buffer,
             collision_query_buffer.voxel_collision_buffer.grad_distance_buffer,
             collision_query_buffer.voxel_collision_buffer.sparsity_index_buffer,
@@ -852,6 +1132,7 @@ class WorldVoxelCollision(WorldMeshCollision):
             use_batch_env,
             return_loss,
             True,
+            self.interpolate_voxel_esdf,
         )
         if ("primitive" not in self.collision_types or not self.collision_types["primitive"]) and (
             "mesh" not in self.collision_types or not self.collision_types["mesh"]
@@ -867,6 +1148,7 @@ class WorldVoxelCollision(WorldMeshCollision):
             speed_dt=speed_dt,
             enable_speed_metric=enable_speed_metric,
             return_loss=return_loss,
+            adapt_sweep_steps=False,
         )
         d_val = dist.view(d_prim.shape) + d_prim
         return d_val
@@ -883,6 +1165,7 @@ class WorldVoxelCollision(WorldMeshCollision):
                     - self.max_esdf_distance
                 ).to(dtype=self._voxel_tensor_list[3].dtype)
             self._env_n_voxels[:] = 0
+            self._env_voxel_regions = [{} for _ in range(self.n_envs)]
         super().clear_cache()
 
     def get_voxel_grid_shape(
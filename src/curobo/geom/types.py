@@ -13,6 +13,8 @@
 from __future__ import annotations
 
 # Standard Library
+import hashlib
+import math
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
@@ -23,6 +25,12 @@ import trimesh
 import trimesh.scene
 
 # CuRobo
+from curobo.geom.mesh_decimation import (
+    MeshDecimationConfig,
+    MeshDecimationStats,
+    decimate_mesh_data,
+    get_mesh_decimation_cache_key,
+)
 from curobo.geom.sphere_fit import SphereFitType, fit_spheres_to_mesh
 from curobo.types.base import TensorDeviceType
 from curobo.types.camera import CameraObservation
@@ -541,6 +549,43 @@ class Mesh(Obstacle):
 
         return verts, faces
 
+    def get_decimated_mesh(
+        self, config: MeshDecimationConfig, cache_dir: Optional[str] = None
+    ) -> Tuple[Mesh, MeshDecimationStats]:
+        """Get a simplified copy of mesh that encloses the mesh, for faster collision checking.
+
+        Simplified meshes are cached on disk, keyed by the contents of the mesh file (or vertices
+        and faces). See :mod:`curobo.geom.mesh_decimation`.
+
+        Args:
+            config: Decimation parameters.
+            cache_dir: Directory of cache. Defaults to ``CUROBO_MESH_CACHE_DIR``, the cache is not
+                used when neither is set.
+
+        Returns:
+            Tuple[Mesh, MeshDecimationStats]: Simplified mesh and stats of simplification.
+        """
+        hasher = hashlib.sha256()
+        if self.file_path is not None:
+            with open(self.file_path, "rb") as f:
+                hasher.update(f.read())
+            if self.scale is not None:
+                hasher.update(np.ascontiguousarray(self.scale, dtype=np.float64).tobytes())
+        else:
+            hasher.update(np.ascontiguousarray(self.vertices, dtype=np.float64).tobytes())
+            hasher.update(np.ascontiguousarray(self.faces, dtype=np.int64).tobytes())
+        cache_key = get_mesh_decimation_cache_key(hasher.hexdigest(), config)
+        verts, faces = self.get_mesh_data(process=True)
+        verts, faces, stats = decimate_mesh_data(verts, faces, config, cache_key, cache_dir)
+        mesh = Mesh(
+            name=self.name,
+            pose=self.pose,
+            vertices=verts,
+            faces=faces,
+            color=self.color,
+        )
+        return mesh, stats
+
     @staticmethod
     def from_pointcloud(
         pointcloud: np.ndarray,
@@ -714,10 +759,18 @@ class VoxelGrid(Obstacle):
     #: Data type of feature tensor.
     feature_dtype: torch.dtype = torch.float32
 
+    #: Path to a file with features of all voxels, used when :attr:`feature_tensor` is None for
+    #: grids that are too large to keep in memory. Supports ``.npy`` files and raw binary files of
+    #: :attr:`feature_dtype` values, both in the order of :attr:`feature_tensor`. The file is
+    #: memory-mapped, so only voxels read with :meth:`get_region` are loaded from disk.
+    file_path: Optional[str] = None
+
     def __post_init__(self):
         """Post initialization checks."""
         if self.feature_tensor is not None:
             self.feature_dtype = self.feature_tensor.dtype
+        if self.file_path is not None:
+            self.file_path = join_path(get_assets_path(), self.file_path)
 
     def get_grid_shape(self) -> Tuple[List[int], List[float], List[float]]:
         """Get shape of voxel grid."""
@@ -749,16 +802,10 @@ class VoxelGrid(Obstacle):
         """
 
         trange, low, high = self.get_grid_shape()
-        inv_voxel_size = 1.0 / self.voxel_size
-        x = torch.linspace(1, trange[0], trange[0], device=tensor_args.device) - round(
-            (0.5 * self.dims[0]) * inv_voxel_size
-        )
-        y = torch.linspace(1, trange[1], trange[1], device=tensor_args.device) - round(
-            (0.5 * self.dims[1]) * inv_voxel_size
-        )
-        z = torch.linspace(1, trange[2], trange[2], device=tensor_args.device) - round(
-            (0.5 * self.dims[2]) * inv_voxel_size
-        )
+        offset = self._get_voxel_index_offset()
+        x = torch.linspace(1, trange[0], trange[0], device=tensor_args.device) - offset[0]
+        y = torch.linspace(1, trange[1], trange[1], device=tensor_args.device) - offset[1]
+        z = torch.linspace(1, trange[2], trange[2], device=tensor_args.device) - offset[2]
         x = x * self.voxel_size - 0.5 * self.voxel_size
         y = y * self.voxel_size - 0.5 * self.voxel_size
         z = z * self.voxel_size - 0.5 * self.voxel_size
@@ -775,6 +822,167 @@ class VoxelGrid(Obstacle):
 
         return xyzr
 
+    def get_tile(self, start: List[int], shape: List[int]) -> VoxelGrid:
+        """Get a box of voxels of this grid, e.g., to query features of a large grid in chunks.
+
+        Voxels created by :meth:`create_xyzr_tensor` of the tile are at the positions of voxels of
+        this grid, starting at voxel index ``start``. Features are not copied to the tile.
+
+        Args:
+            start: Index of the first voxel of the tile along each axis.
+            shape: Number of voxels of the tile along each axis.
+
+        Returns:
+            VoxelGrid: Tile with the same name, orientation, and voxel size as this grid.
+        """
+        grid_shape = self.get_grid_shape()[0]
+        for i in range(3):
+            if start[i] < 0 or shape[i] < 1 or start[i] + shape[i] > grid_shape[i]:
+                log_error(
+                    "Tile with start "
+                    + str(start)
+                    + " and shape "
+                    + str(shape)
+                    + " is outside grid of shape "
+                    + str(grid_shape)
+                )
+        tile = VoxelGrid(
+            name=self.name,
+            pose=list(self.pose),
+            dims=[(shape[i] - 1) * self.voxel_size for i in range(3)],
+            voxel_size=self.voxel_size,
+            feature_dtype=self.feature_dtype,
+            tensor_args=self.tensor_args,
+        )
+        grid_offset = self._get_voxel_index_offset()
+        tile_offset = tile._get_voxel_index_offset()
+        tile_center_local = [
+            (start[i] - grid_offset[i] + tile_offset[i]) * self.voxel_size for i in range(3)
+        ]
+        grid_pose = Pose.from_list(self.pose, tensor_args=self.tensor_args)
+        tile_position = grid_pose.transform_points(
+            self.tensor_args.to_device([tile_center_local]).view(1, 3)
+        )
+        tile.pose = tile_position.view(3).cpu().tolist() + list(self.pose[3:])
+        return tile
+
+    def _get_voxel_index_offset(self) -> List[int]:
+        """Offset of voxel indices from the center of the grid along each axis."""
+        inv_voxel_size = 1.0 / self.voxel_size
+        return [round((0.5 * self.dims[i]) * inv_voxel_size) for i in range(3)]
+
+    def get_feature_memmap(self) -> np.ndarray:
+        """Memory-map features of voxels from :attr:`file_path`.
+
+        Returns:
+            np.ndarray: Read-only features of shape [x_voxels, y_voxels, z_voxels].
+        """
+        if self.file_path is None:
+            log_error("VoxelGrid " + self.name + " does not have a file_path")
+        grid_shape = tuple(self.get_grid_shape()[0])
+        if self.file_path.endswith(".npy"):
+            features = np.load(self.file_path, mmap_mode="r")
+        else:
+            if self.feature_dtype not in [torch.float32, torch.float16]:
+                log_error("Raw voxel files only support float32 and float16 features")
+            np_dtype = np.float32 if self.feature_dtype == torch.float32 else np.float16
+            features = np.memmap(self.file_path, dtype=np_dtype, mode="r")
+        if features.size != grid_shape[0] * grid_shape[1] * grid_shape[2]:
+            log_error(
+                "VoxelGrid file "
+                + self.file_path
+                + " has "
+                + str(features.size)
+                + " voxels, expected "
+                + str(grid_shape)
+            )
+        return features.reshape(grid_shape)
+
+    def load_features(self) -> torch.Tensor:
+        """Get features of all voxels, reading :attr:`file_path` if :attr:`feature_tensor` is None.
+
+        Returns:
+            torch.Tensor: Features of shape [n_voxels].
+        """
+        if self.feature_tensor is not None:
+            return self.feature_tensor
+        features = torch.from_numpy(np.array(self.get_feature_memmap()).reshape(-1))
+        return features.to(device=self.tensor_args.device, dtype=self.feature_dtype)
+
+    def get_region(
+        self,
+        center: List[float],
+        half_extent: float,
+        fill_value: float = -1.0,
+    ) -> VoxelGrid:
+        """Get a cube of voxels around a point, reading only the cube from :attr:`file_path`.
+
+        The cube is aligned with the axes of this grid and its voxels match voxels of this grid.
+        The number of voxels in the cube only depends on ``half_extent``, so regions around
+        different points can be copied into the same collision cache.
+
+        Args:
+            center: Position in world frame to center the region at.
+            half_extent: Minimum distance in meters from center to each face of the region.
+            fill_value: Feature of voxels in the region that are outside this grid.
+
+        Returns:
+            VoxelGrid: Region with the same name and voxel size as this grid.
+        """
+        grid_shape = self.get_grid_shape()[0]
+        k = int(math.ceil(half_extent / self.voxel_size))
+        region_shape = 2 * k + 1
+
+        # index of voxel containing center, following voxel indexing of collision kernels:
+        grid_pose = Pose.from_list(self.pose, tensor_args=self.tensor_args)
+        center_local = grid_pose.inverse().transform_points(
+            self.tensor_args.to_device([center]).view(1, 3)
+        )
+        center_local = center_local.view(3).cpu().tolist()
+        center_idx = [
+            int(math.floor((center_local[i] + 0.5 * self.dims[i]) / self.voxel_size))
+            for i in range(3)
+        ]
+        start = [c - k for c in center_idx]
+
+        features = np.full((region_shape, region_shape, region_shape), fill_value, dtype=np.float32)
+        src = []
+        dst = []
+        for i in range(3):
+            low = max(start[i], 0)
+            high = min(start[i] + region_shape, grid_shape[i])
+            if high <= low:
+                src = None
+                break
+            src.append(slice(low, high))
+            dst.append(slice(low - start[i], high - start[i]))
+        if src is not None:
+            if self.feature_tensor is not None:
+                grid_features = (
+                    self.feature_tensor.view(grid_shape)[tuple(src)].cpu().float().numpy()
+                )
+            else:
+                grid_features = self.get_feature_memmap()[tuple(src)]
+            features[tuple(dst)] = grid_features
+
+        region_dims = [2 * k * self.voxel_size] * 3
+        region_center_local = [
+            center_idx[i] * self.voxel_size - 0.5 * self.dims[i] for i in range(3)
+        ]
+        region_position = grid_pose.transform_points(
+            self.tensor_args.to_device([region_center_local]).view(1, 3)
+        )
+        return VoxelGrid(
+            name=self.name,
+            pose=region_position.view(3).cpu().tolist() + list(self.pose[3:]),
+            dims=region_dims,
+            voxel_size=self.voxel_size,
+            feature_tensor=torch.from_numpy(features.reshape(-1)).to(
+                device=self.tensor_args.device, dtype=self.feature_dtype
+            ),
+            tensor_args=self.tensor_args,
+        )
+
     def get_occupied_voxels(self, feature_threshold: Optional[float] = None) -> torch.Tensor:
         """Get occupied voxels from voxel grid.
 
@@ -805,6 +1013,7 @@ class VoxelGrid(Obstacle):
             xyzr_tensor=self.xyzr_tensor.clone() if self.xyzr_tensor is not None else None,
             feature_dtype=self.feature_dtype,
             voxel_size=self.voxel_size,
+            file_path=self.file_path,
         )
 
 
@@ -833,6 +1042,9 @@ class WorldConfig(Sequence):
     #: List of ESDF voxel grid obstacles.
     voxel: Optional[List[VoxelGrid]] = None
 
+    #: List of PointCloud obstacles.
+    pointcloud: Optional[List[PointCloud]] = None
+
     #: List of all obstacles in world.
     objects: Optional[List[Obstacle]] = None
 
@@ -853,6 +1065,8 @@ class WorldConfig(Sequence):
             self.blox = []
         if self.voxel is None:
             self.voxel = []
+        if self.pointcloud is None:
+            self.pointcloud = []
         if self.objects is None:
             self.objects = (
                 self.sphere
@@ -862,6 +1076,7 @@ class WorldConfig(Sequence):
                 + self.cylinder
                 + self.blox
                 + self.voxel
+                + self.pointcloud
             )
 
     def __len__(self) -> int:
@@ -882,6 +1097,7 @@ class WorldConfig(Sequence):
             cylinder=self.cylinder.copy() if self.cylinder is not None else None,
             blox=self.blox.copy() if self.blox is not None else None,
             voxel=self.voxel.copy() if self.voxel is not None else None,
+            pointcloud=self.pointcloud.copy() if self.pointcloud is not None else None,
         )
 
     @staticmethod
@@ -901,6 +1117,7 @@ class WorldConfig(Sequence):
         blox = None
         cylinder = None
         voxel = None
+        pointcloud = None
         # load yaml:
         if "cuboid" in data_dict.keys():
             cuboid = [Cuboid(name=x, **data_dict["cuboid"][x]) for x in data_dict["cuboid"]]
@@ -916,6 +1133,10 @@ class WorldConfig(Sequence):
             blox = [BloxMap(name=x, **data_dict["blox"][x]) for x in data_dict["blox"]]
         if "voxel" in data_dict.keys():
             voxel = [VoxelGrid(name=x, **data_dict["voxel"][x]) for x in data_dict["voxel"]]
+        if "pointcloud" in data_dict.keys():
+            pointcloud = [
+                PointCloud(name=x, **data_dict["pointcloud"][x]) for x in data_dict["pointcloud"]
+            ]
 
         return WorldConfig(
             cuboid=cuboid,
@@ -925,6 +1146,7 @@ class WorldConfig(Sequence):
             mesh=mesh,
             blox=blox,
             voxel=voxel,
+            pointcloud=pointcloud,
         )
 
     # load world config as obbs: convert all types to obbs
@@ -936,6 +1158,7 @@ class WorldConfig(Sequence):
         cylinder_obb = []
         mesh_obb = []
         blox_obb = []
+        pointcloud_obb = []
         cuboid_obb = current_world.cuboid
 
         if current_world.capsule is not None and len(current_world.capsule) > 0:
@@ -952,20 +1175,35 @@ class WorldConfig(Sequence):
         if current_world.mesh is not None and len(current_world.mesh) > 0:
             mesh_obb = [x.get_cuboid() for x in current_world.mesh]
 
+        if current_world.pointcloud is not None and len(current_world.pointcloud) > 0:
+            pointcloud_obb = [x.get_cuboid() for x in current_world.pointcloud]
+
         if current_world.voxel is not None and len(current_world.voxel) > 0:
             log_error("VoxelGrid cannot be converted to obb world")
 
         return WorldConfig(
-            cuboid=cuboid_obb + sphere_obb + capsule_obb + cylinder_obb + mesh_obb + blox_obb
+            cuboid=cuboid_obb
+            + sphere_obb
+            + capsule_obb
+            + cylinder_obb
+            + mesh_obb
+            + blox_obb
+            + pointcloud_obb
         )
 
     @staticmethod
-    def create_mesh_world(current_world: WorldConfig, process: bool = False) -> WorldConfig:
+    def create_mesh_world(
+        current_world: WorldConfig,
+        process: bool = False,
+        decimation: Optional[MeshDecimationConfig] = None,
+    ) -> WorldConfig:
         """Convert all obstacles to meshes. Does not convert :class:`VoxelGrid`, :class:`BloxMap`.
 
         Args:
             current_world: Current world configuration.
             process: process flag passed to :class:`trimesh.load`.
+            decimation: Simplify mesh obstacles with these parameters, see
+                :meth:`Mesh.get_decimated_mesh`. Meshes are not simplified when None.
 
         Returns:
             WorldConfig: World configuration with all obstacles converted to meshes.
@@ -975,6 +1213,7 @@ class WorldConfig(Sequence):
         cuboid_obb = []
         cylinder_obb = []
         blox_obb = []
+        pointcloud_obb = []
         if current_world.capsule is not None and len(current_world.capsule) > 0:
             capsule_obb = [x.get_mesh(process=process) for x in current_world.capsule]
 
@@ -992,25 +1231,38 @@ class WorldConfig(Sequence):
                     blox_obb.append(current_world.blox[i].get_mesh(process=process))
         if current_world.voxel is not None and len(current_world.voxel) > 0:
             log_error("VoxelGrid cannot be converted to mesh world")
+        if current_world.pointcloud is not None and len(current_world.pointcloud) > 0:
+            pointcloud_obb = [x.get_mesh(process=process) for x in current_world.pointcloud]
 
         return WorldConfig(
-            mesh=current_world.mesh
+            mesh=WorldConfig._get_decimated_meshes(current_world.mesh, decimation)
             + sphere_obb
             + capsule_obb
             + cuboid_obb
             + cylinder_obb
             + blox_obb
+            + pointcloud_obb
         )
 
     @staticmethod
     def create_collision_support_world(
-        current_world: WorldConfig, process: bool = True
+        current_world: WorldConfig,
+        process: bool = True,
+        decimation: Optional[MeshDecimationConfig] = None,
     ) -> WorldConfig:
         """Converts all obstacles to only supported collision types.
 
+        Cuboids, spheres, and capsules are checked natively by
+        :class:`~curobo.geom.sdf.world.WorldPrimitiveCollision` and are kept. Cylinders are
+        converted to meshes. Point clouds are kept for
+        :class:`~curobo.geom.sdf.world_point_cloud.WorldPointCloudCollision`, use
+        :meth:`get_mesh_world` to mesh them for other collision checkers.
+
         Args:
             current_world: Current world configuration.
             process: process flag passed to :class:`trimesh.load`.
+            decimation: Simplify mesh obstacles with these parameters, see
+                :meth:`Mesh.get_decimated_mesh`. Meshes are not simplified when None.
 
         Returns:
             WorldConfig: World configuration with all obstacles converted to supported collision
@@ -1022,10 +1274,10 @@ class WorldConfig(Sequence):
         cylinder_obb = []
         blox_obb = []
         if current_world.capsule is not None and len(current_world.capsule) > 0:
-            capsule_obb = [x.get_mesh(process=process) for x in current_world.capsule]
+            capsule_obb = current_world.capsule
 
         if current_world.sphere is not None and len(current_world.sphere) > 0:
-            sphere_obb = [x.get_mesh(process=process) for x in current_world.sphere]
+            sphere_obb = current_world.sphere
 
         if current_world.cuboid is not None and len(current_world.cuboid) > 0:
             cuboid_obb = current_world.cuboid
@@ -1038,11 +1290,25 @@ class WorldConfig(Sequence):
                     blox_obb.append(current_world.blox[i].get_mesh(process=process))
 
         return WorldConfig(
-            mesh=current_world.mesh + sphere_obb + capsule_obb + cylinder_obb + blox_obb,
+            mesh=WorldConfig._get_decimated_meshes(current_world.mesh, decimation)
+            + cylinder_obb
+            + blox_obb,
             cuboid=cuboid_obb,
+            sphere=sphere_obb,
+            capsule=capsule_obb,
             voxel=current_world.voxel,
+            pointcloud=current_world.pointcloud,
         )
 
+    @staticmethod
+    def _get_decimated_meshes(
+        mesh_list: List[Mesh], decimation: Optional[MeshDecimationConfig]
+    ) -> List[Mesh]:
+        """Simplify meshes, returning meshes unchanged when decimation is None."""
+        if decimation is None:
+            return mesh_list
+        return [m.get_decimated_mesh(decimation)[0] for m in mesh_list]
+
     @staticmethod
     def get_scene_graph(
         current_world: WorldConfig, process_color: bool = True
@@ -1097,16 +1363,31 @@ class WorldConfig(Sequence):
         """Get world with all obstacles as oriented bounding boxes."""
         return WorldConfig.create_obb_world(self)
 
-    def get_mesh_world(self, merge_meshes: bool = False, process: bool = False) -> WorldConfig:
-        """Get world with all obstacles as meshes."""
+    def get_mesh_world(
+        self,
+        merge_meshes: bool = False,
+        process: bool = False,
+        decimation: Optional[MeshDecimationConfig] = None,
+    ) -> WorldConfig:
+        """Get world with all obstacles as meshes.
+
+        Mesh obstacles are simplified when decimation is given and merge_meshes is False.
+        """
         if merge_meshes:
             return WorldConfig.create_merged_mesh_world(self, process=process)
         else:
-            return WorldConfig.create_mesh_world(self, process=process)
+            return WorldConfig.create_mesh_world(self, process=process, decimation=decimation)
+
+    def get_collision_check_world(
+        self, mesh_process: bool = False, decimation: Optional[MeshDecimationConfig] = None
+    ) -> WorldConfig:
+        """Get world with all obstacles converted to supported collision types.
 
-    def get_collision_check_world(self, mesh_process: bool = False) -> WorldConfig:
-        """Get world with all obstacles converted to supported collision types."""
-        return WorldConfig.create_collision_support_world(self, process=mesh_process)
+        Mesh obstacles are simplified when decimation is given.
+        """
+        return WorldConfig.create_collision_support_world(
+            self, process=mesh_process, decimation=decimation
+        )
 
     def save_world_as_mesh(
         self, file_path: str, save_as_scene_graph=False, process_color: bool = True
@@ -1126,7 +1407,12 @@ class WorldConfig(Sequence):
 
     def get_cache_dict(self) -> Dict[str, int]:
         """Computes the number of obstacles in each type."""
-        cache = {"obb": len(self.cuboid), "mesh": len(self.mesh)}
+        cache = {
+            "obb": len(self.cuboid),
+            "mesh": len(self.mesh),
+            "capsule": len(self.sphere) + len(self.capsule),
+            "pointcloud": len(self.pointcloud),
+        }
         return cache
 
     def add_obstacle(self, obstacle: Obstacle):
@@ -1147,6 +1433,8 @@ class WorldConfig(Sequence):
             self.capsule.append(obstacle)
         elif isinstance(obstacle, VoxelGrid):
             self.voxel.append(obstacle)
+        elif isinstance(obstacle, PointCloud):
+            self.pointcloud.append(obstacle)
         else:
             ValueError("Obstacle type not supported")
         self.objects.append(obstacle)
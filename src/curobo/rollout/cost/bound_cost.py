@@ -23,7 +23,12 @@ from curobo.types.robot import JointState
 from curobo.types.tensor import T_DOF
 from curobo.util.logger import log_error, log_warn
 from curobo.util.torch_utils import get_cache_fn_decorator, get_torch_jit_decorator
-from curobo.util.warp import init_warp, is_runtime_warp_kernel_enabled, warp_support_kernel_key
+from curobo.util.warp import (
+    get_warp_stream,
+    init_warp,
+    is_runtime_warp_kernel_enabled,
+    warp_support_kernel_key,
+)
 
 # Local Folder
 from .cost_base import CostBase, CostConfig
@@ -450,7 +455,7 @@ class WarpBoundSmoothFunction(torch.autograd.Function):
                 dof,
             ],
             device=wp_device,
-            stream=wp.stream_from_torch(vel.device),
+            stream=get_warp_stream(vel.device),
         )
         ctx.save_for_backward(out_gp, out_gv, out_ga, out_gj)
         # out_c = out_cost
@@ -577,7 +582,7 @@ class WarpBoundSmoothL2Function(torch.autograd.Function):
                 dof,
             ],
             device=wp_device,
-            stream=wp.stream_from_torch(vel.device),
+            stream=get_warp_stream(vel.device),
         )
         ctx.save_for_backward(out_gp, out_gv, out_ga, out_gj)
 
@@ -688,7 +693,7 @@ class WarpBoundFunction(torch.autograd.Function):
                 dof,
             ],
             device=wp_device,
-            stream=wp.stream_from_torch(vel.device),
+            stream=get_warp_stream(vel.device),
         )
         ctx.save_for_backward(out_gp, out_gv, out_ga, out_gj)
         # out_c = out_cost
@@ -780,7 +785,7 @@ class WarpBoundPosFunction(torch.autograd.Function):
                 dof,
             ],
             device=wp_device,
-            stream=wp.stream_from_torch(pos.device),
+            stream=get_warp_stream(pos.device),
         )
         ctx.return_loss = return_loss
         ctx.save_for_backward(out_gp)
@@ -841,7 +846,7 @@ class WarpBoundPosL2Function(torch.autograd.Function):
                 dof,
             ],
             device=wp_device,
-            stream=wp.stream_from_torch(pos.device),
+            stream=get_warp_stream(pos.device),
         )
         ctx.return_loss = return_loss
         ctx.save_for_backward(out_gp)
@@ -20,7 +20,12 @@ import warp as wp
 # CuRobo
 from curobo.util.logger import log_error, log_warn
 from curobo.util.torch_utils import get_cache_fn_decorator, get_torch_jit_decorator
-from curobo.util.warp import init_warp, is_runtime_warp_kernel_enabled, warp_support_kernel_key
+from curobo.util.warp import (
+    get_warp_stream,
+    init_warp,
+    is_runtime_warp_kernel_enabled,
+    warp_support_kernel_key,
+)
 
 # Local Folder
 from .cost_base import CostBase, CostConfig
@@ -269,7 +274,7 @@ class L2DistFunction(torch.autograd.Function):
                 dof,
             ],
             device=wp_device,
-            stream=wp.stream_from_torch(pos.device),
+            stream=get_warp_stream(pos.device),
         )
 
         cost = torch.sum(out_cost_v, dim=-1)
@@ -322,7 +327,7 @@ class L2DistLoopFunction(torch.autograd.Function):
                 dof,
             ],
             device=wp_device,
-            stream=wp.stream_from_torch(pos.device),
+            stream=get_warp_stream(pos.device),
         )
 
         ctx.save_for_backward(out_gp)
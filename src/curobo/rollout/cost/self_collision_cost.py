@@ -17,7 +17,8 @@ import torch
 
 # CuRobo
 from curobo.cuda_robot_model.types import SelfCollisionKinematicsConfig
-from curobo.curobolib.geom import SelfCollisionDistance
+from curobo.curobolib.geom import SelfCollisionDistance, get_self_collision_link_pairs
+from curobo.util.logger import log_error
 
 # Local Folder
 from .cost_base import CostBase, CostConfig
@@ -27,6 +28,15 @@ from .cost_base import CostBase, CostConfig
 class SelfCollisionCostConfig(CostConfig):
     self_collision_kin_config: Optional[SelfCollisionKinematicsConfig] = None
 
+    #: Check bounding spheres of link pairs before checking their sphere pairs. Sphere pairs are
+    #: only checked for links whose bounding spheres are within broad_phase_distance. This gives
+    #: the same result and is faster for robots with many links that are far apart (e.g., two
+    #: arms), but uses dynamic shapes which are not supported with CUDA graphs.
+    broad_phase: bool = False
+
+    #: Distance added to link bounding spheres in broad phase.
+    broad_phase_distance: float = 0.0
+
     def __post_init__(self):
         return super().__post_init__()
 
@@ -36,6 +46,23 @@ class SelfCollisionCost(CostBase, SelfCollisionCostConfig):
         SelfCollisionCostConfig.__init__(self, **vars(config))
         CostBase.__init__(self)
         self._batch_size = None
+        self._broad_phase_data = None
+        if self.broad_phase:
+            self._init_broad_phase()
+
+    def _init_broad_phase(self):
+        kin_config = self.self_collision_kin_config
+        if kin_config.sphere_link_idx is None:
+            log_error("broad phase requires sphere_link_idx in self collision kinematics config")
+        link_pairs, pair_link_pair_idx = get_self_collision_link_pairs(
+            kin_config.thread_location, kin_config.thread_max, kin_config.sphere_link_idx
+        )
+        self._broad_phase_data = (
+            kin_config.sphere_link_idx,
+            link_pairs,
+            pair_link_pair_idx,
+            self.broad_phase_distance,
+        )
 
     def update_batch_size(self, robot_spheres):
         # Assuming n stays constant
@@ -70,6 +97,7 @@ class SelfCollisionCost(CostBase, SelfCollisionCostConfig):
             self.self_collision_kin_config.checks_per_thread,
             self.self_collision_kin_config.experimental_kernel,
             self.return_loss,
+            self._broad_phase_data,
         )
 
         if self.classify:
@@ -0,0 +1,113 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+"""
+Pool of output buffers bucketed by batch size.
+
+Kinematics and collision checkers keep output tensors sized to the current batch and previously
+reallocated them whenever the batch size changed. Services that alternate between batch sizes
+(e.g., 1, 4, and 32 goals) hence allocated on every request. :class:`BufferPool` allocates storage
+for the next power of two batch size and hands out views of the leading rows for smaller batches,
+so switching between batch sizes within a bucket does not allocate.
+
+Views of the leading rows of a contiguous tensor are contiguous, so they can be passed to CUDA
+kernels directly. Storage is only grown, never shrunk, until :meth:`BufferPool.clear` is called.
+Views of the same buffer share memory, so a pool should be owned by a single consumer.
+"""
+
+from __future__ import annotations
+
+# Standard Library
+from typing import Dict, Tuple
+
+# Third Party
+import torch
+
+# CuRobo
+from curobo.util.logger import log_error
+
+
+def get_batch_bucket(batch_size: int) -> int:
+    """Get bucket of a batch size, which is the next power of two.
+
+    Args:
+        batch_size: Number of rows requested.
+
+    Returns:
+        int: Number of rows to allocate.
+    """
+    if batch_size <= 0:
+        log_error("batch size should be positive, got " + str(batch_size))
+    return 1 << (batch_size - 1).bit_length()
+
+
+class BufferPool:
+    """Buffers bucketed by batch size, returning views for smaller batches."""
+
+    def __init__(self):
+        """Initialize an empty pool."""
+        self._buffers: Dict[Tuple, torch.Tensor] = {}
+        #: Number of buffers requested from the pool.
+        self.requests = 0
+        #: Number of tensors allocated by the pool.
+        self.allocations = 0
+
+    @property
+    def saved_allocations(self) -> int:
+        """Number of requests served from existing storage without allocating."""
+        return self.requests - self.allocations
+
+    @property
+    def allocated_bytes(self) -> int:
+        """Total memory held by the pool in bytes."""
+        return sum(b.numel() * b.element_size() for b in self._buffers.values())
+
+    def get(
+        self,
+        name: str,
+        batch_size: int,
+        shape: Tuple[int, ...],
+        dtype: torch.dtype,
+        device: torch.device,
+    ) -> torch.Tensor:
+        """Get a buffer of shape [batch_size, \\*shape].
+
+        The returned view is not cleared. Storage is allocated with zeros, rows then hold values
+        written by previous users of the buffer.
+
+        Args:
+            name: Name of buffer, unique within the consumer owning this pool.
+            batch_size: Number of rows.
+            shape: Shape of each row.
+            dtype: Data type of buffer.
+            device: Device of buffer.
+
+        Returns:
+            torch.Tensor: Contiguous view of pooled storage.
+        """
+        self.requests += 1
+        key = (name, tuple(shape), dtype, str(device))
+        buffer = self._buffers.get(key)
+        if buffer is None or buffer.shape[0] < batch_size:
+            buffer = torch.zeros(
+                (get_batch_bucket(batch_size),) + tuple(shape), dtype=dtype, device=device
+            )
+            self._buffers[key] = buffer
+            self.allocations += 1
+        return buffer[:batch_size]
+
+    def clear(self):
+        """Release all pooled storage. Counters are not reset."""
+        self._buffers.clear()
+
+    def reset_counters(self):
+        """Reset request and allocation counters."""
+        self.requests = 0
+        self.allocations = 0
@@ -1101,7 +1101,7 @@ class UsdHelper:
             kin_model = CudaRobotModel(robot_cfg)
 
         if robot_asset_prim_path is None:
-            robot_asset_prim_path = kin_model.kinematics_parser.robot_prim_root
+            robot_asset_prim_path = kin_model.get_kinematics_parser().robot_prim_root
 
         robot_base_frame = join_path(base_frame, robot_base_frame)
 
@@ -11,8 +11,10 @@
 
 # Standard Library
 import os
+from typing import Optional
 
 # Third Party
+import torch
 import warp as wp
 from packaging import version
 
@@ -87,3 +89,18 @@ def is_runtime_warp_kernel_enabled() -> bool:
     if env_variable is None:
         return True
     return bool(int(env_variable))
+
+
+def get_warp_stream(device: torch.device) -> Optional[wp.Stream]:
+    """Get warp stream of the current torch stream on a device.
+
+    Args:
+        device: Torch device of tensors passed to a warp kernel.
+
+    Returns:
+        Optional[wp.Stream]: Warp stream for CUDA devices. None for CPU devices, as warp kernels
+        on CPU do not use streams.
+    """
+    if device.type != "cuda":
+        return None
+    return wp.stream_from_torch(device)
@@ -20,7 +20,12 @@ import torch
 # CuRobo
 from curobo.cuda_robot_model.cuda_robot_model import CudaRobotModel, CudaRobotModelState
 from curobo.geom.sdf.utils import create_collision_checker
-from curobo.geom.sdf.world import CollisionCheckerType, WorldCollision, WorldCollisionConfig
+from curobo.geom.sdf.world import (
+    CollisionCheckerType,
+    WorldCollision,
+    WorldCollisionConfig,
+    WorldUpdateResult,
+)
 from curobo.geom.types import WorldConfig
 from curobo.rollout.cost.bound_cost import BoundCost, BoundCostConfig, BoundCostType
 from curobo.rollout.cost.pose_cost import PoseCost, PoseCostConfig, PoseErrorType
@@ -177,6 +182,32 @@ class RobotWorldConfig:
         )
 
 
+@dataclass
+class SelfCollisionIgnoreResult:
+    """Link pairs to ignore for self collision, found by sampling joint configurations."""
+
+    #: Link pairs to ignore for self collision, in the format of ``self_collision_ignore`` of
+    #: :class:`~curobo.cuda_robot_model.cuda_robot_generator.CudaRobotGeneratorConfig`.
+    #: Every link pair is listed once, under the link that appears first in collision link names.
+    self_collision_ignore: Dict[str, List[str]]
+
+    #: Link pairs that are in collision in all sampled configurations (e.g., adjacent links).
+    always_colliding: List[Tuple[str, str]]
+
+    #: Link pairs that are not in collision in any sampled configuration.
+    never_colliding: List[Tuple[str, str]]
+
+    #: Fraction of sampled configurations with each link pair in collision.
+    collision_fraction: Dict[Tuple[str, str], float]
+
+    #: Links without collision spheres of positive radius (e.g., attached_object). These links
+    #: can't be evaluated, so their ignore pairs are copied from the robot configuration.
+    skipped_links: List[str]
+
+    #: Number of sampled joint configurations.
+    n_samples: int
+
+
 class RobotWorld(RobotWorldConfig):
     def __init__(self, config: RobotWorldConfig) -> None:
         RobotWorldConfig.__init__(self, **vars(config))
@@ -189,7 +220,11 @@ class RobotWorld(RobotWorldConfig):
         state = self.kinematics.get_state(q)
         return state
 
-    def update_world(self, world_config: WorldConfig):
+    def update_world(
+        self, world_config: WorldConfig, incremental: bool = False
+    ) -> Optional[WorldUpdateResult]:
+        if incremental:
+            return self.world_model.update_collision_model(world_config)
         self.world_model.load_collision_model(world_config)
 
     def clear_world_cache(self):
@@ -374,6 +409,140 @@ class RobotWorld(RobotWorldConfig):
         pt_distance = point_robot_distance(kin_state.link_spheres_tensor, points)
         return pt_distance
 
+    def get_self_collision_ignore(
+        self,
+        n_samples: int = 10000,
+        batch_size: int = 1000,
+        never_collision_distance: float = 0.0,
+    ) -> SelfCollisionIgnoreResult:
+        """Find link pairs to ignore for self collision by sampling joint configurations.
+
+        Joint configurations are sampled within joint limits with :meth:`sample` and distance
+        between all sphere pairs of different links is evaluated in batches, including link pairs
+        that are currently ignored. Link pairs that are in collision in all samples (e.g.,
+        adjacent links) or in no sample are returned as pairs to ignore. Sampling can miss rare
+        collisions, so use a large number of samples and check the result before using it.
+
+        Args:
+            n_samples: Number of joint configurations to sample.
+            batch_size: Number of joint configurations to evaluate at once.
+            never_collision_distance: Link pairs closer than this distance in any sample are
+                not marked as never colliding.
+
+        Returns:
+            SelfCollisionIgnoreResult: Link pairs to ignore and collision statistics.
+        """
+        kin_config = self.kinematics.kinematics_config
+        sphere_offset = self.self_collision_cost.self_collision_kin_config.offset
+        idx_to_link_name = {v: k for k, v in kin_config.link_name_to_idx_map.items()}
+        sphere_link_idx = kin_config.link_sphere_idx_map.to(dtype=torch.long)
+        collision_links = []
+        for l_idx in sphere_link_idx.tolist():
+            if l_idx not in collision_links:
+                collision_links.append(l_idx)
+        link_names = [idx_to_link_name[l_idx] for l_idx in collision_links]
+        n_links = len(collision_links)
+        global_to_local = torch.full(
+            (len(idx_to_link_name),), -1, dtype=torch.long, device=self.tensor_args.device
+        )
+        global_to_local[torch.as_tensor(collision_links, device=self.tensor_args.device)] = (
+            torch.arange(n_links, device=self.tensor_args.device)
+        )
+        sphere_link = global_to_local[sphere_link_idx]
+
+        # sphere pairs between different links, using spheres with positive radius:
+        sphere_radius = kin_config.link_spheres[:, 3] + sphere_offset
+        valid_sphere = sphere_radius > 0.0
+        skipped_links = [
+            link_names[i]
+            for i in range(n_links)
+            if not torch.any(valid_sphere[sphere_link == i]).item()
+        ]
+        n_spheres = sphere_link.shape[0]
+        pairs = torch.triu_indices(n_spheres, n_spheres, offset=1, device=self.tensor_args.device)
+        pairs = pairs[
+            :,
+            (sphere_link[pairs[0]] != sphere_link[pairs[1]])
+            & valid_sphere[pairs[0]]
+            & valid_sphere[pairs[1]],
+        ]
+        link_pair = torch.sort(
+            torch.stack([sphere_link[pairs[0]], sphere_link[pairs[1]]], dim=-1), dim=-1
+        )[0]
+        link_pairs, pair_link_pair_idx = torch.unique(link_pair, dim=0, return_inverse=True)
+
+        collision_count = torch.zeros(
+            (link_pairs.shape[0]), device=self.tensor_args.device, dtype=torch.long
+        )
+        near_count = torch.zeros_like(collision_count)
+        n_evaluated = 0
+        while n_evaluated < n_samples:
+            b = min(batch_size, n_samples - n_evaluated)
+            q = self.sample(b, mask_valid=False)
+            spheres = self.get_kinematics(q).link_spheres_tensor.view(b, -1, 4)
+            radius = spheres[..., 3] + sphere_offset
+            distance = torch.linalg.norm(
+                spheres[:, pairs[0], :3] - spheres[:, pairs[1], :3], dim=-1
+            )
+            penetration = radius[:, pairs[0]] + radius[:, pairs[1]] - distance
+            link_penetration = torch.full(
+                (b, link_pairs.shape[0]),
+                -torch.inf,
+                device=self.tensor_args.device,
+                dtype=self.tensor_args.dtype,
+            ).scatter_reduce_(
+                1, pair_link_pair_idx.view(1, -1).expand(b, -1), penetration, reduce="amax"
+            )
+            collision_count += torch.count_nonzero(link_penetration > 0.0, dim=0)
+            near_count += torch.count_nonzero(link_penetration > -never_collision_distance, dim=0)
+            n_evaluated += b
+
+        always_colliding = []
+        never_colliding = []
+        collision_fraction = {}
+        ignore_pairs = []
+        collision_count = collision_count.tolist()
+        near_count = near_count.tolist()
+        for k, (i, j) in enumerate(link_pairs.tolist()):
+            name_pair = (link_names[i], link_names[j])
+            collision_fraction[name_pair] = float(collision_count[k]) / n_evaluated
+            if collision_count[k] == n_evaluated:
+                always_colliding.append(name_pair)
+                ignore_pairs.append((i, j))
+            elif near_count[k] == 0:
+                never_colliding.append(name_pair)
+                ignore_pairs.append((i, j))
+
+        # keep ignore pairs of links that can't be evaluated from the robot configuration:
+        generator_config = self.kinematics.generator_config
+        if (
+            len(skipped_links) > 0
+            and generator_config is not None
+            and generator_config.self_collision_ignore is not None
+        ):
+            for k, v in generator_config.self_collision_ignore.items():
+                for l_name in v:
+                    if k in link_names and l_name in link_names:
+                        if k in skipped_links or l_name in skipped_links:
+                            i, j = sorted([link_names.index(k), link_names.index(l_name)])
+                            if (i, j) not in ignore_pairs:
+                                ignore_pairs.append((i, j))
+
+        self_collision_ignore = {}
+        for i, j in sorted(ignore_pairs):
+            if link_names[i] not in self_collision_ignore:
+                self_collision_ignore[link_names[i]] = []
+            self_collision_ignore[link_names[i]].append(link_names[j])
+
+        return SelfCollisionIgnoreResult(
+            self_collision_ignore=self_collision_ignore,
+            always_colliding=always_colliding,
+            never_colliding=never_colliding,
+            collision_fraction=collision_fraction,
+            skipped_links=skipped_links,
+            n_samples=n_evaluated,
+        )
+
     def get_active_js(self, full_js: JointState):
         active_jnames = self.kinematics.joint_names
         out_js = full_js.get_ordered_joint_state(active_jnames)
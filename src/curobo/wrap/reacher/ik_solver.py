@@ -36,7 +36,12 @@ import torch.autograd.profiler as profiler
 # CuRobo
 from curobo.cuda_robot_model.cuda_robot_model import CudaRobotModel, CudaRobotModelState
 from curobo.geom.sdf.utils import create_collision_checker
-from curobo.geom.sdf.world import CollisionCheckerType, WorldCollision, WorldCollisionConfig
+from curobo.geom.sdf.world import (
+    CollisionCheckerType,
+    WorldCollision,
+    WorldCollisionConfig,
+    WorldUpdateResult,
+)
 from curobo.geom.types import WorldConfig
 from curobo.opt.newton.lbfgs import LBFGSOpt, LBFGSOptConfig
 from curobo.opt.newton.newton_base import NewtonOptBase, NewtonOptConfig
@@ -1396,7 +1401,9 @@ class IKSolver(IKSolverConfig):
         coord_position_seed = torch.cat(seed_list, dim=1)
         return coord_position_seed
 
-    def update_world(self, world: WorldConfig) -> None:
+    def update_world(
+        self, world: WorldConfig, incremental: bool = False
+    ) -> Optional[WorldUpdateResult]:
         """Update world in IKSolver.
 
         If the new world configuration has more obstacles than initial cache, the collision cache
@@ -1405,7 +1412,15 @@ class IKSolver(IKSolverConfig):
 
         Args:
             world: World configuration to update in IKSolver.
+            incremental: Only write obstacles that changed since the last update, matched by
+                name. See :meth:`~curobo.geom.sdf.world.WorldCollision.update_collision_model`.
+
+        Returns:
+            Optional[WorldUpdateResult]: Changes written to the collision checker when
+            ``incremental`` is True, None otherwise.
         """
+        if incremental:
+            return self.world_coll_checker.update_collision_model(world)
         self.world_coll_checker.load_collision_model(world)
 
     def reset_seed(self) -> None:
@@ -51,8 +51,14 @@ import warp as wp
 
 # CuRobo
 from curobo.cuda_robot_model.cuda_robot_model import CudaRobotModel
+from curobo.cuda_robot_model.kinematics_variants import KinematicsVariantRegistry
 from curobo.geom.sdf.utils import create_collision_checker
-from curobo.geom.sdf.world import CollisionCheckerType, WorldCollision, WorldCollisionConfig
+from curobo.geom.sdf.world import (
+    CollisionCheckerType,
+    WorldCollision,
+    WorldCollisionConfig,
+    WorldUpdateResult,
+)
 from curobo.geom.sphere_fit import SphereFitType
 from curobo.geom.types import Cuboid, Obstacle, WorldConfig
 from curobo.graph.graph_base import GraphConfig, GraphPlanBase, GraphResult
@@ -1452,6 +1458,8 @@ class MotionGen(MotionGenConfig):
         self._pose_solver_rollout_list = None
         self._pose_rollout_list = None
         self._kin_list = None
+        self._kinematics_variants = KinematicsVariantRegistry()
+        self._kinematics_variants.add_active(self.kinematics)
         self.update_batch_size(seeds=self.trajopt_seeds)
 
     def update_batch_size(self, seeds=10, batch=1):
@@ -1822,7 +1830,9 @@ class MotionGen(MotionGenConfig):
         metrics = self.ik_solver.check_constraints(state)
         return metrics
 
-    def update_world(self, world: WorldConfig):
+    def update_world(
+        self, world: WorldConfig, incremental: bool = False
+    ) -> Optional[WorldUpdateResult]:
         """Update the world representation for collision checking.
 
         This allows for updating the world representation as long as the new world representation
@@ -1833,7 +1843,21 @@ class MotionGen(MotionGenConfig):
 
         Args:
             world: New world configuration for collision checking.
+            incremental: Only write obstacles that changed since the last update, matched by
+                name. Cached roadmaps are kept when no obstacle changed. See
+                :meth:`~curobo.geom.sdf.world.WorldCollision.update_collision_model`.
+
+        Returns:
+            Optional[WorldUpdateResult]: Changes written to the collision checker when
+            ``incremental`` is True, None otherwise.
         """
+        if incremental:
+            result = self.world_coll_checker.update_collision_model(
+                world, fix_cache_reference=self.use_cuda_graph
+            )
+            if result.changed:
+                self.graph_planner.reset_buffer()
+            return result
         self.world_coll_checker.load_collision_model(world, fix_cache_reference=self.use_cuda_graph)
         self.graph_planner.reset_buffer()
 
@@ -2696,7 +2720,9 @@ class MotionGen(MotionGenConfig):
             self.finetune_js_trajopt_solver.interpolation_type = interpolation_type
 
     def update_locked_joints(
-        self, lock_joints: Dict[str, float], robot_config_dict: Union[str, Dict[Any]]
+        self,
+        lock_joints: Dict[str, float],
+        robot_config_dict: Optional[Union[str, Dict[Any]]] = None,
     ):
         """Update locked joints in the robot configuration.
 
@@ -2705,6 +2731,36 @@ class MotionGen(MotionGenConfig):
         this is only supported when the number of locked joints is the same as the original
         robot configuration as the kinematics tensors are pre-allocated.
 
+        Kinematics generated for a set of locked joints are stored in a registry, so switching
+        back to a previously used set (with the same joint values) only copies tensors and does
+        not parse the robot again. The locked joints of the robot configuration used to create
+        this instance are registered at initialization. Use :meth:`register_locked_joints` to
+        generate other variants ahead of planning.
+
+        Args:
+            lock_joints: Dictionary of joint names and values to lock.
+            robot_config_dict: Robot configuration dictionary or path to robot configuration file.
+                Only required when kinematics for these locked joint values are not registered.
+        """
+        if self._kinematics_variants.get(lock_joints) is None:
+            if robot_config_dict is None:
+                log_error(
+                    "robot_config_dict is required as lock joints "
+                    + str(lock_joints)
+                    + " are not registered"
+                )
+            self.register_locked_joints(lock_joints, robot_config_dict)
+        self._kinematics_variants.activate(lock_joints, self.kinematics)
+
+    def register_locked_joints(
+        self, lock_joints: Dict[str, float], robot_config_dict: Union[str, Dict[Any]]
+    ):
+        """Generate and store kinematics for a set of locked joints without activating them.
+
+        Registered sets can be activated with :meth:`update_locked_joints` without parsing the
+        robot again. All sets should lock the same number of joints as the current robot
+        configuration.
+
         Args:
             lock_joints: Dictionary of joint names and values to lock.
             robot_config_dict: Robot configuration dictionary or path to robot configuration file.
@@ -2717,7 +2773,12 @@ class MotionGen(MotionGenConfig):
             robot_config_dict = robot_config_dict["robot_cfg"]
         robot_config_dict["kinematics"]["lock_joints"] = lock_joints
         robot_cfg = RobotConfig.from_dict(robot_config_dict, self.tensor_args)
-        self.kinematics.update_kinematics_config(robot_cfg.kinematics.kinematics_config)
+        self._kinematics_variants.add(lock_joints, robot_cfg.kinematics.kinematics_config)
+
+    @property
+    def kinematics_variants(self) -> KinematicsVariantRegistry:
+        """Registry of kinematics generated for different sets of locked joints."""
+        return self._kinematics_variants
 
     def check_start_state(
         self, start_state: JointState
@@ -45,7 +45,12 @@ import torch
 # CuRobo
 from curobo.cuda_robot_model.cuda_robot_model import CudaRobotModel
 from curobo.geom.sdf.utils import create_collision_checker
-from curobo.geom.sdf.world import CollisionCheckerType, WorldCollision, WorldCollisionConfig
+from curobo.geom.sdf.world import (
+    CollisionCheckerType,
+    WorldCollision,
+    WorldCollisionConfig,
+    WorldUpdateResult,
+)
 from curobo.geom.types import WorldConfig
 from curobo.opt.newton.lbfgs import LBFGSOpt, LBFGSOptConfig
 from curobo.opt.particle.parallel_es import ParallelES, ParallelESConfig
@@ -599,7 +604,9 @@ class MpcSolver(MpcSolverConfig):
         opt_js = in_js.get_ordered_joint_state(opt_jnames)
         return opt_js
 
-    def update_world(self, world: WorldConfig):
+    def update_world(
+        self, world: WorldConfig, incremental: bool = False
+    ) -> Optional[WorldUpdateResult]:
         """Update the collision world for the solver.
 
         This allows for updating the world representation as long as the new world representation
@@ -608,7 +615,15 @@ class MpcSolver(MpcSolverConfig):
 
         Args:
             world: New collision world configuration. See :ref:`world_collision` for more details.
+            incremental: Only write obstacles that changed since the last update, matched by
+                name. See :meth:`~curobo.geom.sdf.world.WorldCollision.update_collision_model`.
+
+        Returns:
+            Optional[WorldUpdateResult]: Changes written to the collision checker when
+            ``incremental`` is True, None otherwise.
         """
+        if incremental:
+            return self.world_coll_checker.update_collision_model(world)
         self.world_coll_checker.load_collision_model(world)
 
     def get_visual_rollouts(self):
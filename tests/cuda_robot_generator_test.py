@@ -9,12 +9,20 @@
 # its affiliates is strictly prohibited.
 #
 
+# Standard Library
+import os
+
+# Third Party
+import torch
+
 # CuRobo
 from curobo.cuda_robot_model.cuda_robot_generator import (
     CudaRobotGenerator,
     CudaRobotGeneratorConfig,
 )
-from curobo.cuda_robot_model.cuda_robot_model import CudaRobotModelConfig
+from curobo.cuda_robot_model.cuda_robot_model import CudaRobotModel, CudaRobotModelConfig
+from curobo.cuda_robot_model.robot_model_cache import get_robot_model_cache_key
+from curobo.types.base import TensorDeviceType
 from curobo.util_file import get_robot_configs_path, join_path, load_yaml
 
 
@@ -53,3 +61,55 @@ def test_cuda_robot_generator_config_cspace():
     robot_generator = CudaRobotGenerator(config)
 
     assert len(robot_generator.cspace.max_jerk) == 7
+
+
+def test_cuda_robot_model_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("CUROBO_ROBOT_MODEL_CACHE_DIR", str(tmp_path))
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    robot_data = load_yaml(join_path(get_robot_configs_path(), "franka.yml"))
+    config = CudaRobotModelConfig.from_robot_yaml_file(robot_data, tensor_args=tensor_args)
+    assert config.kinematics_parser is not None
+    assert len(os.listdir(tmp_path)) == 1
+
+    robot_data = load_yaml(join_path(get_robot_configs_path(), "franka.yml"))
+    cached_config = CudaRobotModelConfig.from_robot_yaml_file(robot_data, tensor_args=tensor_args)
+    assert cached_config.kinematics_parser is None
+    assert cached_config.link_names == config.link_names
+    assert cached_config.kinematics_config.n_dof == 7
+    assert torch.equal(
+        cached_config.kinematics_config.fixed_transforms,
+        config.kinematics_config.fixed_transforms,
+    )
+    assert torch.equal(
+        cached_config.self_collision_config.thread_location,
+        config.self_collision_config.thread_location,
+    )
+
+    robot_model = CudaRobotModel(config)
+    cached_robot_model = CudaRobotModel(cached_config)
+    q = robot_model.retract_config.view(1, -1)
+    state = robot_model.get_state(q)
+    cached_state = cached_robot_model.get_state(q)
+    assert torch.equal(state.ee_position, cached_state.ee_position)
+    assert torch.equal(state.link_spheres_tensor, cached_state.link_spheres_tensor)
+    assert cached_robot_model.get_kinematics_parser() is not None
+
+
+def test_cuda_robot_model_cache_key():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    robot_params = load_yaml(join_path(get_robot_configs_path(), "franka.yml"))["robot_cfg"][
+        "kinematics"
+    ]
+    key = get_robot_model_cache_key(
+        CudaRobotGeneratorConfig(**robot_params, tensor_args=tensor_args)
+    )
+    robot_params = load_yaml(join_path(get_robot_configs_path(), "franka.yml"))["robot_cfg"][
+        "kinematics"
+    ]
+    assert key == get_robot_model_cache_key(
+        CudaRobotGeneratorConfig(**robot_params, tensor_args=tensor_args)
+    )
+    robot_params["lock_joints"] = {"panda_finger_joint1": 0.04}
+    assert key != get_robot_model_cache_key(
+        CudaRobotGeneratorConfig(**robot_params, tensor_args=tensor_args)
+    )
@@ -12,16 +12,21 @@
 import torch
 
 # CuRobo
+from curobo.geom.sdf.adaptive_sweep import (
+    AdaptiveSweepConfig,
+    get_sphere_sweep_steps,
+    get_swept_sphere_collision_reference,
+)
 from curobo.geom.sdf.world import (
     CollisionQueryBuffer,
     WorldCollisionConfig,
     WorldPrimitiveCollision,
 )
 from curobo.geom.sdf.world_mesh import WorldMeshCollision
-from curobo.geom.types import Cuboid, WorldConfig
+from curobo.geom.types import Capsule, Cuboid, Mesh, Sphere, WorldConfig
 from curobo.types.base import TensorDeviceType
 from curobo.types.math import Pose
-from curobo.util_file import get_world_configs_path, join_path, load_yaml
+from curobo.util_file import get_assets_path, get_world_configs_path, join_path, load_yaml
 
 
 def test_world_primitive():
@@ -174,6 +179,36 @@ def test_batch_world_primitive_mesh_instance():
     assert abs(d_sph[2].item() - 0.1) < 1e-3
 
 
+def test_batch_world_mesh_shared_file():
+    """Meshes loaded from the same file across environments share one warp mesh."""
+    tensor_args = TensorDeviceType()
+    mesh_file = join_path(get_assets_path(), "robot/franka_description/meshes/collision/link0.obj")
+    world_list = [
+        WorldConfig(
+            mesh=[Mesh(name="base_" + str(i), file_path=mesh_file, pose=[0, 0, 0, 1, 0, 0, 0])]
+        )
+        for i in range(4)
+    ]
+    coll_cfg = WorldCollisionConfig(world_model=world_list, tensor_args=tensor_args)
+    coll_check = WorldMeshCollision(coll_cfg)
+    mesh_ids = coll_check._mesh_tensor_list[0][:, 0]
+    assert torch.all(mesh_ids == mesh_ids[0])
+    assert coll_check._env_mesh_names[2][0] == "base_2"
+
+    x_sph = tensor_args.to_device([0.0, 0.0, 0.05, 0.1]).view(1, 1, 1, 4).repeat(4, 1, 1, 1)
+    env_query_idx = torch.arange(4, device=tensor_args.device, dtype=torch.int32)
+    query_buffer = CollisionQueryBuffer.initialize_from_shape(
+        x_sph.shape, tensor_args, coll_check.collision_types
+    )
+    weight = tensor_args.to_device([1])
+    act_distance = tensor_args.to_device([0.0])
+    d_sph = coll_check.get_sphere_distance(
+        x_sph, query_buffer, weight, act_distance, env_query_idx
+    ).view(-1)
+    assert d_sph[0] > 0.0
+    assert torch.allclose(d_sph, d_sph[0])
+
+
 def test_swept_world_primitive_mesh_instance():
     """This tests collision checking across different environments"""
     tensor_args = TensorDeviceType()
@@ -215,3 +250,624 @@ def test_swept_world_primitive_mesh_instance():
     assert abs(d_sph_swept[0].item() - 0.1) < 1e-3
     assert abs(d_sph_swept[1].item() - 0.0) < 1e-9
     assert abs(d_sph_swept[2].item() - 0.1) < 1e-3
+
+
+def test_collision_buffer_pool():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    query_buffer = CollisionQueryBuffer.initialize_from_shape(
+        torch.Size([4, 1, 10, 4]), tensor_args, {"primitive": True}
+    )
+    buffer = query_buffer.primitive_collision_buffer
+    data_ptr = buffer.distance_buffer.data_ptr()
+    for batch in [1, 3, 4, 2]:
+        query_buffer.update_buffer_shape(
+            torch.Size([batch, 1, 10, 4]), tensor_args, {"primitive": True}
+        )
+        assert buffer.distance_buffer.shape == (batch, 1, 10)
+        assert buffer.grad_distance_buffer.shape == (batch, 1, 10, 4)
+        assert buffer.distance_buffer.is_contiguous()
+        assert buffer.distance_buffer.data_ptr() == data_ptr
+    assert buffer.buffer_pool.allocations == 3
+    assert buffer.buffer_pool.saved_allocations == 12
+
+    query_buffer.update_buffer_shape(torch.Size([5, 1, 10, 4]), tensor_args, {"primitive": True})
+    assert buffer.buffer_pool.allocations == 6
+    assert buffer.distance_buffer.shape == (5, 1, 10)
+
+
+def test_world_primitive_torch_backend():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    world_file = "collision_test.yml"
+    data_dict = load_yaml(join_path(get_world_configs_path(), world_file))
+    world_cfg = WorldConfig.from_dict(data_dict)
+    coll_cfg = WorldCollisionConfig(
+        world_model=world_cfg, tensor_args=tensor_args, use_torch_backend=True
+    )
+    coll_check = WorldPrimitiveCollision(coll_cfg)
+    x_sph = torch.as_tensor(
+        [[0.0, 0.0, 0.0, 0.1], [10.0, 0.0, 0.0, 0.0], [0.01, 0.01, 0.0, 0.1]],
+        **(tensor_args.as_torch_dict())
+    ).view(1, 1, -1, 4)
+    x_sph.requires_grad = True
+    query_buffer = CollisionQueryBuffer.initialize_from_shape(
+        x_sph.shape, tensor_args, coll_check.collision_types
+    )
+    weight = tensor_args.to_device([1])
+    act_distance = tensor_args.to_device([0.0])
+
+    d_sph = coll_check.get_sphere_distance(x_sph, query_buffer, weight, act_distance)
+    d_sph.sum().backward()
+    d_sph = d_sph.view(-1)
+    assert abs(d_sph[0].item() - 0.1) < 1e-3
+    assert abs(d_sph[1].item() - 0.0) < 1e-9
+    assert abs(d_sph[2].item() - 0.1) < 1e-3
+
+    # increasing penetration into the table increases the cost:
+    grad = x_sph.grad.view(-1, 4)
+    assert torch.allclose(grad[0, :3], tensor_args.to_device([0.0, 0.0, -1.0]))
+    assert torch.count_nonzero(grad[1]) == 0
+
+    # moving spheres out of collision clears the buffers:
+    x_free = x_sph.detach().clone()
+    x_free[..., 2] += 1.0
+    d_free = coll_check.get_sphere_distance(x_free, query_buffer, weight, act_distance)
+    assert torch.count_nonzero(d_free) == 0
+    assert torch.count_nonzero(query_buffer.primitive_collision_buffer.sparsity_index_buffer) == 0
+
+    # esdf is the signed distance of sphere centers, positive inside obstacles:
+    x_esdf = tensor_args.to_device([[0.0, 0.0, -0.05, 0.1], [0.0, 0.0, 0.05, 0.1]]).view(
+        1, 1, -1, 4
+    )
+    esdf_buffer = CollisionQueryBuffer.initialize_from_shape(
+        x_esdf.shape, tensor_args, coll_check.collision_types
+    )
+    d_esdf = coll_check.get_sphere_distance(
+        x_esdf, esdf_buffer, weight, act_distance, compute_esdf=True
+    ).view(-1)
+    assert abs(d_esdf[0].item() - 0.05) < 1e-5
+    assert abs(d_esdf[1].item() + 0.05) < 1e-5
+
+
+def test_swept_world_primitive_torch_backend():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    world_cfg = WorldConfig(
+        cuboid=[Cuboid("wall", [0.5, 0.0, 0.0, 1, 0, 0, 0], dims=[0.02, 1.0, 1.0])]
+    )
+    coll_cfg = WorldCollisionConfig(
+        world_model=world_cfg, tensor_args=tensor_args, use_torch_backend=True
+    )
+    coll_check = WorldPrimitiveCollision(coll_cfg)
+
+    # sphere jumps across the wall between timesteps:
+    x_sph = tensor_args.to_device([[0.0, 0.0, 0.0, 0.05], [1.0, 0.0, 0.0, 0.05]]).view(1, 2, 1, 4)
+    query_buffer = CollisionQueryBuffer.initialize_from_shape(
+        x_sph.shape, tensor_args, coll_check.collision_types
+    )
+    weight = tensor_args.to_device([1])
+    act_distance = tensor_args.to_device([0.0])
+    dt = tensor_args.to_device([0.1])
+
+    d_sph = coll_check.get_sphere_distance(x_sph, query_buffer.clone(), weight, act_distance)
+    d_sph = d_sph.view(-1)
+    assert torch.count_nonzero(d_sph) == 0
+
+    d_swept = coll_check.get_swept_sphere_distance(
+        x_sph, query_buffer, weight, act_distance, dt, 4
+    ).view(-1)
+    assert torch.all(d_swept > 0.0)
+    d_collision = coll_check.get_swept_sphere_collision(
+        x_sph, query_buffer, weight, act_distance, dt, 4
+    ).view(-1)
+    assert torch.all(d_collision > 0.0)
+
+    # no sweep when the sphere does not move across the wall:
+    x_sph[:, 1, :, 0] = 0.1
+    d_swept = coll_check.get_swept_sphere_distance(
+        x_sph, query_buffer, weight, act_distance, dt, 4
+    ).view(-1)
+    assert torch.count_nonzero(d_swept) == 0
+
+
+def test_world_primitive_sphere_capsule():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    world_cfg = WorldConfig(
+        sphere=[Sphere("ball", pose=[0.0, 0.0, 0.5, 1, 0, 0, 0], radius=0.1)],
+        capsule=[
+            Capsule(
+                "pole",
+                pose=[1.0, 0.0, 0.0, 1, 0, 0, 0],
+                radius=0.05,
+                base=[0.0, 0.0, 0.0],
+                tip=[0.0, 0.0, 1.0],
+            )
+        ],
+    )
+    coll_check = WorldPrimitiveCollision(
+        WorldCollisionConfig(world_model=world_cfg, tensor_args=tensor_args)
+    )
+    assert coll_check.get_obstacle_names()[:2] == ["ball", "pole"]
+    x_sph = tensor_args.to_device(
+        [[0.0, 0.0, 0.45, 0.1], [1.1, 0.0, 0.5, 0.1], [5.0, 5.0, 5.0, 0.1]]
+    ).view(1, 1, -1, 4)
+    x_sph.requires_grad = True
+    query_buffer = CollisionQueryBuffer.initialize_from_shape(
+        x_sph.shape, tensor_args, coll_check.collision_types
+    )
+    weight = tensor_args.to_device([1])
+    act_distance = tensor_args.to_device([0.0])
+
+    d_sph = coll_check.get_sphere_distance(x_sph, query_buffer, weight, act_distance)
+    d_sph.sum().backward()
+    assert torch.allclose(d_sph.view(-1), tensor_args.to_device([0.15, 0.05, 0.0]))
+    grad = x_sph.grad.view(-1, 4)
+    assert torch.allclose(grad[0, :3], tensor_args.to_device([0.0, 0.0, 1.0]))
+    assert torch.allclose(grad[1, :3], tensor_args.to_device([-1.0, 0.0, 0.0]))
+    d_esdf = coll_check.get_sphere_distance(
+        x_sph.detach(), query_buffer, weight, act_distance, compute_esdf=True
+    ).view(-1)
+    assert abs(d_esdf[0].item() - 0.05) < 1e-5
+    assert abs(d_esdf[1].item() + 0.05) < 1e-5
+
+    # enable and pose updates:
+    coll_check.enable_obstacle("ball", False)
+    coll_check.update_obstacle_pose(
+        "pole", Pose.from_list([2.0, 0.0, 0.0, 1, 0, 0, 0], tensor_args)
+    )
+    d_sph = coll_check.get_sphere_collision(x_sph.detach(), query_buffer, weight, act_distance)
+    assert torch.count_nonzero(d_sph) == 0
+    coll_check.enable_obstacle("ball", True)
+    d_sph = coll_check.get_sphere_collision(x_sph.detach(), query_buffer, weight, act_distance)
+    assert d_sph.view(-1).tolist() == [1.0, 0.0, 0.0]
+
+    # sphere jumps across the pole between timesteps, and capsules add to cuboid costs:
+    world_cfg.capsule[0].pose = [1.0, 0.0, 0.0, 1, 0, 0, 0]
+    world_cfg.cuboid = [Cuboid("table", [0.0, 0.0, -0.5, 1, 0, 0, 0], dims=[1.0, 1.0, 1.0])]
+    result = coll_check.update_collision_model(world_cfg)
+    assert result.full_reload
+    x_swept = tensor_args.to_device([[0.8, 0.0, 0.5, 0.02], [1.2, 0.0, 0.5, 0.02]]).view(1, 2, 1, 4)
+    swept_buffer = CollisionQueryBuffer.initialize_from_shape(
+        x_swept.shape, tensor_args, coll_check.collision_types
+    )
+    dt = tensor_args.to_device([0.1])
+    d_sph = coll_check.get_sphere_distance(x_swept, swept_buffer, weight, act_distance)
+    assert torch.count_nonzero(d_sph) == 0
+    d_swept = coll_check.get_swept_sphere_distance(
+        x_swept, swept_buffer, weight, act_distance, dt, 4
+    ).view(-1)
+    assert torch.all(d_swept > 0.0)
+    d_collision = coll_check.get_swept_sphere_collision(
+        x_swept, swept_buffer, weight, act_distance, dt, 4
+    ).view(-1)
+    assert torch.all(d_collision > 0.0)
+    d_sph = coll_check.get_sphere_distance(
+        tensor_args.to_device([0.0, 0.0, 0.05, 0.1]).view(1, 1, 1, 4),
+        CollisionQueryBuffer.initialize_from_shape(
+            torch.Size([1, 1, 1, 4]), tensor_args, coll_check.collision_types
+        ),
+        weight,
+        act_distance,
+    )
+    assert abs(d_sph.item() - 0.05) < 1e-5
+
+    # incremental updates only write changed spheres and capsules:
+    world_cfg.sphere[0].pose = [0.0, 0.0, 0.6, 1, 0, 0, 0]
+    result = coll_check.update_collision_model(world_cfg)
+    assert not result.full_reload
+    assert result.pose_updated == ["ball"]
+
+
+def test_swept_world_primitive_adaptive_sweep():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    world_file = "collision_thin_walls.yml"
+    world_cfg = WorldConfig.from_dict(load_yaml(join_path(get_world_configs_path(), world_file)))
+    coll_check = WorldPrimitiveCollision(
+        WorldCollisionConfig(
+            world_model=world_cfg,
+            tensor_args=tensor_args,
+            use_torch_backend=True,
+            adaptive_sweep={"max_steps": 8},
+        )
+    )
+    fixed_check = WorldPrimitiveCollision(
+        WorldCollisionConfig(world_model=world_cfg, tensor_args=tensor_args, use_torch_backend=True)
+    )
+
+    # small sphere crosses a 1cm thick wall at y=0.4 between the first two timesteps:
+    x_sph = tensor_args.to_device(
+        [[0.0, 0.2, 0.5, 0.02], [0.0, 0.6, 0.5, 0.02], [0.0, 0.61, 0.5, 0.02]]
+    ).view(1, 3, 1, 4)
+    query_buffer = CollisionQueryBuffer.initialize_from_shape(
+        x_sph.shape, tensor_args, coll_check.collision_types
+    )
+    weight = tensor_args.to_device([1])
+    act_distance = tensor_args.to_device([0.0])
+    dt = tensor_args.to_device([0.1])
+
+    steps = get_sphere_sweep_steps(x_sph, AdaptiveSweepConfig(max_steps=8)).view(-1)
+    assert steps.tolist() == [8, 8, 0]
+
+    d_fixed = fixed_check.get_swept_sphere_collision(
+        x_sph, query_buffer, weight, act_distance, dt, 1
+    ).view(-1)
+    assert torch.count_nonzero(d_fixed) == 0
+    d_adaptive = coll_check.get_swept_sphere_collision(
+        x_sph, query_buffer, weight, act_distance, dt, 1
+    ).view(-1)
+    assert torch.all(d_adaptive[:2] > 0.0)
+    assert d_adaptive[2] == 0.0
+    d_swept = coll_check.get_swept_sphere_distance(
+        x_sph, query_buffer, weight, act_distance, dt, 1
+    ).view(-1)
+    assert torch.all(d_swept[:2] > 0.0)
+
+    # reference with steps of each sphere agrees with the query:
+    reference = get_swept_sphere_collision_reference(
+        fixed_check, x_sph, steps.view(1, 3, 1), act_distance
+    ).view(-1)
+    assert reference.tolist() == (d_adaptive > 0.0).tolist()
+
+    # spheres that do not move use the minimum number of steps:
+    x_static = x_sph.clone()
+    x_static[..., :3] = x_static[:, :1, :, :3]
+    assert coll_check._get_sweep_steps(x_static, 4) == 0
+
+
+def test_world_primitive_obb_index():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    generator = torch.Generator().manual_seed(0)
+    position = (torch.rand((200, 3), generator=generator) - 0.5) * 4.0
+    quat = torch.nn.functional.normalize(torch.randn((200, 4), generator=generator), dim=-1)
+    dims = torch.rand((200, 3), generator=generator) * 0.3 + 0.05
+    world_cfg = WorldConfig(
+        cuboid=[
+            Cuboid("cube_" + str(i), position[i].tolist() + quat[i].tolist(), dims[i].tolist())
+            for i in range(200)
+        ]
+    )
+    checkers = [
+        WorldPrimitiveCollision(
+            WorldCollisionConfig(world_model=world_cfg, tensor_args=tensor_args, obb_index=index)
+        )
+        for index in [None, {"cell_size": 0.2}]
+    ]
+    x_sph = torch.rand((4, 5, 20, 4), generator=generator)
+    x_sph[..., :3] = (x_sph[..., :3] - 0.5) * 4.0
+    x_sph[..., 3] *= 0.1
+    weight = tensor_args.to_device([1])
+    act_distance = tensor_args.to_device([0.05])
+    dt = tensor_args.to_device([0.02])
+
+    def query(checker):
+        query_buffer = CollisionQueryBuffer.initialize_from_shape(
+            x_sph.shape, tensor_args, checker.collision_types
+        )
+        d_sph = checker.get_sphere_distance(x_sph, query_buffer, weight, act_distance)
+        d_swept = checker.get_swept_sphere_distance(
+            x_sph, query_buffer.clone(), weight, act_distance, dt, 4
+        )
+        return d_sph, d_swept
+
+    d_sph, d_swept = query(checkers[0])
+    d_sph_index, d_swept_index = query(checkers[1])
+    assert torch.count_nonzero(d_sph) > 0
+    assert torch.allclose(d_sph, d_sph_index)
+    assert torch.allclose(d_swept, d_swept_index)
+
+    # updates only recompute bounds of modified cuboids:
+    grid_index = checkers[1]._obb_grid_index
+    full_updates = grid_index.full_updates
+    for checker in checkers:
+        checker.update_obb_pose(Pose.from_list([0, 0, 0, 1, 0, 0, 0], tensor_args), name="cube_3")
+        checker.enable_obb(False, name="cube_7")
+    d_sph, _ = query(checkers[0])
+    d_sph_index, _ = query(checkers[1])
+    assert grid_index.full_updates == full_updates
+    assert torch.allclose(d_sph, d_sph_index)
+
+
+def test_world_primitive_incremental_update():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    world_cfg = WorldConfig(
+        cuboid=[
+            Cuboid("table", [0.5, 0.0, -0.1, 1, 0, 0, 0], [1.0, 1.0, 0.2]),
+            Cuboid("box", [0.3, 0.2, 0.1, 1, 0, 0, 0], [0.1, 0.1, 0.1]),
+            Cuboid("shelf", [0.0, 0.5, 0.5, 1, 0, 0, 0], [0.5, 0.1, 1.0]),
+        ]
+    )
+    cache = {"obb": 4}
+    coll_check = WorldPrimitiveCollision(
+        WorldCollisionConfig(world_model=world_cfg, tensor_args=tensor_args, cache=cache)
+    )
+    x_sph = torch.rand((2, 3, 20, 4), generator=torch.Generator().manual_seed(0))
+    x_sph[..., :3] = (x_sph[..., :3] - 0.5) * 1.5
+    x_sph[..., 3] *= 0.1
+    weight = tensor_args.to_device([1])
+    act_distance = tensor_args.to_device([0.05])
+
+    def query(checker):
+        query_buffer = CollisionQueryBuffer.initialize_from_shape(
+            x_sph.shape, tensor_args, checker.collision_types
+        )
+        return checker.get_sphere_distance(x_sph, query_buffer, weight, act_distance)
+
+    result = coll_check.update_collision_model(world_cfg)
+    assert not result.changed
+
+    # move box, remove shelf, and add two new cuboids:
+    new_world_cfg = WorldConfig(
+        cuboid=[
+            Cuboid("table", [0.5, 0.0, -0.1, 1, 0, 0, 0], [1.0, 1.0, 0.2]),
+            Cuboid("box", [0.0, 0.0, 0.2, 1, 0, 0, 0], [0.1, 0.1, 0.1]),
+            Cuboid("cup", [0.1, -0.3, 0.1, 1, 0, 0, 0], [0.05, 0.05, 0.1]),
+            Cuboid("wall", [-0.5, 0.0, 0.5, 1, 0, 0, 0], [0.1, 2.0, 1.0]),
+        ]
+    )
+    result = coll_check.update_collision_model(new_world_cfg)
+    assert not result.full_reload
+    assert result.pose_updated == ["box"]
+    assert result.removed == ["shelf"]
+    assert sorted(result.added) == ["cup", "wall"]
+
+    reference = WorldPrimitiveCollision(
+        WorldCollisionConfig(world_model=new_world_cfg, tensor_args=tensor_args, cache=cache)
+    )
+    assert torch.count_nonzero(query(reference)) > 0
+    assert torch.allclose(query(coll_check), query(reference))
+    assert not coll_check.update_collision_model(new_world_cfg).changed
+
+    # cache cannot fit obstacles, collision model is reloaded:
+    new_world_cfg.add_obstacle(Cuboid("stool", [0.2, 0.2, 0.0, 1, 0, 0, 0], [0.2, 0.2, 0.2]))
+    assert coll_check.update_collision_model(new_world_cfg).full_reload
+
+
+def test_world_incremental_update_after_setters():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    world_cfg = WorldConfig(
+        cuboid=[
+            Cuboid("a", [0.0, 0.0, 0.0, 1, 0, 0, 0], [0.2, 0.2, 0.2]),
+            Cuboid("b", [0.3, 0.0, 0.0, 1, 0, 0, 0], [0.1, 0.1, 0.1]),
+        ],
+        sphere=[Sphere("s", [0.0, 0.3, 0.0, 1, 0, 0, 0], radius=0.1)],
+    )
+    coll_check = WorldPrimitiveCollision(
+        WorldCollisionConfig(world_model=world_cfg, tensor_args=tensor_args)
+    )
+    reference = WorldPrimitiveCollision(
+        WorldCollisionConfig(world_model=world_cfg, tensor_args=tensor_args)
+    )
+    x_sph = torch.rand((2, 3, 20, 4), generator=torch.Generator().manual_seed(0))
+    x_sph[..., :3] = (x_sph[..., :3] - 0.5) * 0.8
+    x_sph[..., 3] *= 0.1
+    weight = tensor_args.to_device([1])
+    act_distance = tensor_args.to_device([0.05])
+
+    def query(checker):
+        query_buffer = CollisionQueryBuffer.initialize_from_shape(
+            x_sph.shape, tensor_args, checker.collision_types
+        )
+        return checker.get_sphere_distance(x_sph, query_buffer, weight, act_distance)
+
+    assert torch.count_nonzero(query(reference)) > 0
+
+    # obstacles changed with setters are restored by updating to the loaded world:
+    moved_pose = Pose.from_list([1.0, 0.0, 0.0, 1, 0, 0, 0], tensor_args)
+    coll_check.update_obstacle_pose("a", moved_pose)
+    coll_check.update_capsule_pose(moved_pose, name="s")
+    coll_check.update_obb_dims(tensor_args.to_device([0.5, 0.5, 0.5]), name="b")
+    result = coll_check.update_collision_model(world_cfg)
+    assert not result.full_reload
+    assert sorted(result.pose_updated) == ["a", "s"]
+    assert result.dims_updated == ["b"]
+    assert torch.allclose(query(coll_check), query(reference))
+
+    coll_check.enable_obstacle("b", False)
+    result = coll_check.update_collision_model(world_cfg)
+    assert result.added == ["b"]
+    assert torch.allclose(query(coll_check), query(reference))
+
+    # obstacles written by cache index are rewritten:
+    obb_mask = torch.zeros_like(coll_check._cube_tensor_list[2], dtype=torch.bool)
+    obb_mask[0, 0] = True
+    capsule_mask = torch.zeros_like(coll_check._capsule_tensor_list[2], dtype=torch.bool)
+    capsule_mask[0, 0] = True
+    coll_check.enable_obb(False, env_obj_idx=obb_mask)
+    coll_check.update_obb_pose(moved_pose, env_obj_idx=obb_mask)
+    coll_check.enable_capsule(False, env_obj_idx=capsule_mask)
+    assert not torch.allclose(query(coll_check), query(reference))
+    result = coll_check.update_collision_model(world_cfg)
+    assert not result.full_reload
+    assert torch.allclose(query(coll_check), query(reference))
+    assert not coll_check.update_collision_model(world_cfg).changed
+
+
+def test_world_mesh_incremental_update_after_setters():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    x_sph = torch.rand((2, 3, 20, 4), generator=torch.Generator().manual_seed(0))
+    x_sph[..., :3] = (x_sph[..., :3] - 0.5) * 0.8
+    x_sph[..., 3] *= 0.1
+    weight = tensor_args.to_device([1])
+    act_distance = tensor_args.to_device([0.05])
+
+    def query(checker):
+        query_buffer = CollisionQueryBuffer.initialize_from_shape(
+            x_sph.shape, tensor_args, checker.collision_types
+        )
+        return checker.get_sphere_distance(x_sph, query_buffer, weight, act_distance)
+
+    def get_mesh(size):
+        return Cuboid("m", [0.0, 0.0, 0.0, 1, 0, 0, 0], [size, size, size]).get_mesh()
+
+    world_list = [WorldConfig(mesh=[get_mesh(0.2)]), WorldConfig(mesh=[get_mesh(0.2)])]
+    mesh_check = WorldMeshCollision(
+        WorldCollisionConfig(world_model=world_list, tensor_args=tensor_args)
+    )
+    mesh_reference = WorldMeshCollision(
+        WorldCollisionConfig(world_model=world_list[0], tensor_args=tensor_args)
+    )
+    assert torch.count_nonzero(query(mesh_reference)) > 0
+
+    # meshes changed with setters are restored by updating to the loaded world:
+    mesh_check.update_obstacle_pose("m", Pose.from_list([1.0, 0, 0, 1, 0, 0, 0], tensor_args))
+    mesh_check.enable_mesh(False, name="m", env_idx=0)
+    result = mesh_check.update_collision_model(world_list[0])
+    assert result.added == ["m"]
+    assert torch.allclose(query(mesh_check), query(mesh_reference))
+
+    # replaced warp meshes are released once no environment references them:
+    for i in range(4):
+        mesh_check.update_collision_model(WorldConfig(mesh=[get_mesh(0.1 + 0.05 * i)]), i % 2)
+        assert len(mesh_check._wp_mesh_replaced) <= 1
+
+
+def test_batch_world_primitive_ragged():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    generator = torch.Generator().manual_seed(0)
+
+    def get_world(n_cuboids, prefix="cube_"):
+        position = (torch.rand((n_cuboids, 3), generator=generator) - 0.5) * 1.5
+        dims = torch.rand((n_cuboids, 3), generator=generator) * 0.3 + 0.05
+        return WorldConfig(
+            cuboid=[
+                Cuboid(prefix + str(i), position[i].tolist() + [1, 0, 0, 0], dims[i].tolist())
+                for i in range(n_cuboids)
+            ]
+        )
+
+    world_list = [get_world(n) for n in [12, 1, 0, 3]]
+    checkers = [
+        WorldPrimitiveCollision(
+            WorldCollisionConfig(
+                world_model=world_list, tensor_args=tensor_args, ragged_obstacles=ragged
+            )
+        )
+        for ragged in [False, True]
+    ]
+    # every environment has at least one slot:
+    assert checkers[0]._cube_tensor_list[0].shape[:2] == (4, 12)
+    assert checkers[1]._cube_tensor_list[0].shape[:2] == (17, 1)
+    assert checkers[1].get_obstacle_names(3) == checkers[0].get_obstacle_names(3)[:3]
+
+    x_sph = torch.rand((8, 3, 10, 4), generator=generator)
+    x_sph[..., :3] = (x_sph[..., :3] - 0.5) * 1.5
+    x_sph[..., 3] *= 0.1
+    env_query_idx = torch.randint(0, 4, (8,), generator=generator, dtype=torch.int32)
+    weight = tensor_args.to_device([1])
+    act_distance = tensor_args.to_device([0.05])
+    dt = tensor_args.to_device([0.02])
+
+    def query(checker, env_idx=env_query_idx):
+        query_buffer = CollisionQueryBuffer.initialize_from_shape(
+            x_sph.shape, tensor_args, checker.collision_types
+        )
+        return [
+            checker.get_sphere_distance(x_sph, query_buffer.clone(), weight, act_distance, env_idx),
+            checker.get_sphere_collision(
+                x_sph, query_buffer.clone(), weight, act_distance, env_idx
+            ),
+            checker.get_swept_sphere_distance(
+                x_sph, query_buffer.clone(), weight, act_distance, dt, 4, True, env_idx
+            ),
+            checker.get_sphere_distance(
+                x_sph, query_buffer.clone(), weight, act_distance, env_idx, compute_esdf=True
+            ),
+        ]
+
+    def assert_close(checker, reference, env_idx=env_query_idx):
+        for d_ragged, d_padded in zip(query(checker, env_idx), query(reference, env_idx)):
+            assert torch.allclose(d_ragged, d_padded, atol=1e-6)
+
+    assert torch.count_nonzero(query(checkers[0])[0]) > 0
+    assert_close(checkers[1], checkers[0])
+    assert_close(checkers[1], checkers[0], None)
+
+    # updates of existing cuboids write to slots of their environment:
+    for checker in checkers:
+        checker.update_obb_pose(
+            Pose.from_list([0, 0, 0, 1, 0, 0, 0], tensor_args), name="cube_2", env_idx=3
+        )
+        checker.enable_obb(False, name="cube_0", env_idx=1)
+        checker.update_obb_dims(tensor_args.to_device([0.5, 0.5, 0.5]), name="cube_5", env_idx=0)
+    assert_close(checkers[1], checkers[0])
+
+    # environments grow without reloading other environments:
+    ragged_check = checkers[1]
+    new_world = get_world(5, "new_")
+    ragged_check.load_collision_model(new_world, env_idx=2)
+    ragged_check.add_obb(Cuboid("extra", [0.0, 0.0, 0.0, 1, 0, 0, 0], [0.3, 0.3, 0.3]), env_idx=1)
+    assert ragged_check._cube_tensor_list[0].shape[:2] == (22, 1)
+    assert ragged_check.get_obstacle_names(2) == [c.name for c in new_world.cuboid]
+    world_list[2] = new_world
+    world_list[1].add_obstacle(Cuboid("extra", [0.0, 0.0, 0.0, 1, 0, 0, 0], [0.3, 0.3, 0.3]))
+    reference = WorldPrimitiveCollision(
+        WorldCollisionConfig(world_model=world_list, tensor_args=tensor_args)
+    )
+    reference.update_obb_pose(
+        Pose.from_list([0, 0, 0, 1, 0, 0, 0], tensor_args), name="cube_2", env_idx=3
+    )
+    reference.enable_obb(False, name="cube_0", env_idx=1)
+    reference.update_obb_dims(tensor_args.to_device([0.5, 0.5, 0.5]), name="cube_5", env_idx=0)
+    assert_close(ragged_check, reference)
+
+
+def test_batch_world_mesh_ragged():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+
+    def get_mesh(name, position, size):
+        return Cuboid(name, position + [1, 0, 0, 0], [size, size, size]).get_mesh()
+
+    world_list = [
+        WorldConfig(mesh=[get_mesh("a", [0.0, 0.0, 0.0], 0.2), get_mesh("b", [0.3, 0, 0], 0.1)]),
+        WorldConfig(mesh=[]),
+        WorldConfig(mesh=[get_mesh("c", [0.0, 0.2, 0.0], 0.3)]),
+    ]
+    checkers = [
+        WorldMeshCollision(
+            WorldCollisionConfig(
+                world_model=world_list, tensor_args=tensor_args, ragged_obstacles=ragged
+            )
+        )
+        for ragged in [False, True]
+    ]
+    assert checkers[0]._mesh_tensor_list[0].shape == (3, 2)
+    assert checkers[1]._mesh_tensor_list[0].shape == (4, 1)
+
+    x_sph = torch.rand((6, 2, 10, 4), generator=torch.Generator().manual_seed(0))
+    x_sph[..., :3] = (x_sph[..., :3] - 0.5) * 0.8
+    x_sph[..., 3] *= 0.1
+    env_query_idx = torch.as_tensor([0, 1, 2, 2, 1, 0], dtype=torch.int32)
+    weight = tensor_args.to_device([1])
+    act_distance = tensor_args.to_device([0.05])
+    dt = tensor_args.to_device([0.02])
+
+    def query(checker):
+        query_buffer = CollisionQueryBuffer.initialize_from_shape(
+            x_sph.shape, tensor_args, checker.collision_types
+        )
+        d_sph = checker.get_sphere_distance(
+            x_sph, query_buffer.clone(), weight, act_distance, env_query_idx
+        )
+        d_swept = checker.get_swept_sphere_distance(
+            x_sph, query_buffer.clone(), weight, act_distance, dt, 4, True, env_query_idx
+        )
+        return d_sph, d_swept
+
+    for checker in checkers:
+        checker.update_mesh_pose(
+            Pose.from_list([0, 0, 0.1, 1, 0, 0, 0], tensor_args), name="c", env_idx=2
+        )
+    d_sph, d_swept = query(checkers[0])
+    d_sph_ragged, d_swept_ragged = query(checkers[1])
+    empty_env = env_query_idx == 1
+    assert torch.count_nonzero(d_sph.view(6, -1)[empty_env]) == 0
+    assert torch.count_nonzero(d_sph) > 0
+    assert torch.allclose(d_sph, d_sph_ragged)
+    assert torch.allclose(d_swept, d_swept_ragged)
+
+    # meshes are added to empty environments without reloading other environments:
+    checkers[1].add_mesh(get_mesh("d", [0.0, 0.0, 0.0], 0.4), env_idx=1)
+    checkers[1].add_mesh(get_mesh("e", [0.2, 0.2, 0.0], 0.1), env_idx=1)
+    assert checkers[1]._mesh_tensor_list[0].shape == (5, 1)
+    assert checkers[1].get_obstacle_names(1) == ["d", "e"]
+    d_sph_ragged, _ = query(checkers[1])
+    assert torch.count_nonzero(d_sph_ragged.view(6, -1)[empty_env]) > 0
+    assert torch.allclose(d_sph_ragged.view(6, -1)[~empty_env], d_sph.view(6, -1)[~empty_env])
@@ -16,7 +16,10 @@ import torch
 # CuRobo
 from curobo.cuda_robot_model.cuda_robot_generator import CudaRobotGeneratorConfig
 from curobo.cuda_robot_model.cuda_robot_model import CudaRobotModel, CudaRobotModelConfig
+from curobo.cuda_robot_model.kinematics_memo import KinematicsMemoConfig
+from curobo.cuda_robot_model.kinematics_variants import KinematicsVariantRegistry
 from curobo.cuda_robot_model.types import CSpaceConfig
+from curobo.curobolib.kinematics import torch_forward_cumul_transforms
 from curobo.geom.transform import matrix_to_quaternion, quaternion_to_matrix
 from curobo.geom.types import Cuboid
 from curobo.types.base import TensorDeviceType
@@ -251,3 +254,280 @@ def test_franka_toggle_link_collision(cfg):
     radius = link_radius - state.link_spheres_tensor[:, sph_idx, 3]
 
     assert torch.count_nonzero(radius == 0.0)
+
+
+def test_franka_kinematics_torch_backend():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    robot_data = load_yaml(join_path(get_robot_configs_path(), "franka.yml"))
+    cfg = CudaRobotModelConfig.from_robot_yaml_file(robot_data, "panda_hand", tensor_args)
+    robot_model = CudaRobotModel(cfg)
+    q_test = torch.as_tensor(
+        [0.0, -1.2, 0.0, -2.0, 0.0, 1.0, 0.0], **(tensor_args.as_torch_dict())
+    ).view(1, -1)
+    ee_position = torch.as_tensor(
+        [6.0860e-02, -4.7547e-12, 7.6373e-01], **(tensor_args.as_torch_dict())
+    ).view(1, -1)
+    ee_quat = torch.as_tensor(
+        [0.0382, 0.9193, 0.3808, 0.0922], **(tensor_args.as_torch_dict())
+    ).view(1, -1)
+    state = robot_model.get_state(q_test.repeat(100, 1).clone())
+    assert torch.max(torch.linalg.norm(state.ee_position - ee_position, dim=-1)) < 1e-3
+    assert torch.max(torch.linalg.norm(state.ee_quaternion - ee_quat, dim=-1)) < 1e-3
+
+
+def test_franka_kinematics_torch_backend_gradient():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    robot_data = load_yaml(join_path(get_robot_configs_path(), "franka.yml"))
+    cfg = CudaRobotModelConfig.from_robot_yaml_file(robot_data, "panda_hand", tensor_args)
+    robot_model = CudaRobotModel(cfg)
+    kin_config = robot_model.kinematics_config
+    q = robot_model.retract_config.view(1, -1).repeat(10, 1)
+    q = q + 0.1 * torch.randn_like(q)
+    q.requires_grad_(True)
+    state = robot_model.get_state(q)
+    grad_pos = torch.randn_like(state.links_position)
+    grad_spheres = torch.randn_like(state.link_spheres_tensor)
+    grad_spheres[..., 3] = 0.0
+    cost = torch.sum(grad_pos * state.links_position) + torch.sum(
+        grad_spheres * state.link_spheres_tensor
+    )
+    q_grad = torch.autograd.grad(cost, q)[0]
+
+    # autograd through the differentiable pytorch transforms:
+    q_ref = q.detach().clone().requires_grad_(True)
+    cumul_mat = torch_forward_cumul_transforms(
+        q_ref,
+        kin_config.fixed_transforms,
+        kin_config.link_map,
+        kin_config.joint_map,
+        kin_config.joint_map_type,
+        kin_config.joint_offset_map,
+    )
+    link_pos = cumul_mat[:, kin_config.store_link_map.long(), :3, 3]
+    sphere_mat = cumul_mat[:, kin_config.link_sphere_idx_map.long()]
+    sphere_pos = (sphere_mat[..., :3, :3] @ kin_config.link_spheres[:, :3].unsqueeze(-1)).squeeze(
+        -1
+    ) + sphere_mat[..., :3, 3]
+    cost_ref = torch.sum(grad_pos * link_pos) + torch.sum(grad_spheres[..., :3] * sphere_pos)
+    q_grad_ref = torch.autograd.grad(cost_ref, q_ref)[0]
+    assert torch.max(torch.abs(q_grad - q_grad_ref)) < 1e-4
+
+
+@pytest.mark.parametrize("robot_file", ["franka.yml", "ur5e_robotiq_2f_140.yml"])
+def test_link_jacobians_finite_difference(robot_file):
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    robot_data = load_yaml(join_path(get_robot_configs_path(), robot_file))
+    cfg = CudaRobotModelConfig.from_robot_yaml_file(robot_data, tensor_args=tensor_args)
+    robot_model = CudaRobotModel(cfg)
+    link_names = list(robot_model.kinematics_config.link_name_to_idx_map.keys())
+    q = robot_model.retract_config.view(1, -1).repeat(4, 1)
+    q = q + 0.2 * torch.randn_like(q)
+    jacobian = robot_model.get_link_jacobians(q, link_names)
+
+    eps = 1e-3
+    idx = [
+        robot_model.kinematics_config.link_name_to_idx_map[link_name] for link_name in link_names
+    ]
+    for j in range(robot_model.get_dof()):
+        dq = torch.zeros_like(q)
+        dq[:, j] = eps
+        robot_model.get_link_jacobians(q + dq, link_names)
+        cumul_plus = robot_model._global_cumul_mat.clone()
+        robot_model.get_link_jacobians(q - dq, link_names)
+        cumul_minus = robot_model._global_cumul_mat.clone()
+        robot_model.get_link_jacobians(q, link_names)
+        cumul = robot_model._global_cumul_mat.clone()
+        lin_vel = (cumul_plus[..., :3, 3] - cumul_minus[..., :3, 3]) / (2 * eps)
+        rot_vel = ((cumul_plus[..., :3, :3] - cumul_minus[..., :3, :3]) / (2 * eps)) @ cumul[
+            ..., :3, :3
+        ].transpose(-1, -2)
+        ang_vel = torch.stack([rot_vel[..., 2, 1], rot_vel[..., 0, 2], rot_vel[..., 1, 0]], dim=-1)
+        assert torch.max(torch.abs(jacobian[:, :, :3, j] - lin_vel[:, idx])) < 1e-2
+        assert torch.max(torch.abs(jacobian[:, :, 3:, j] - ang_vel[:, idx])) < 1e-2
+
+    state = robot_model.get_state(q, calculate_jacobian=True)
+    ee_idx = link_names.index(robot_model.ee_link)
+    assert torch.max(torch.abs(state.lin_jacobian - jacobian[:, ee_idx, :3])) < 1e-5
+    assert torch.max(torch.abs(state.ang_jacobian - jacobian[:, ee_idx, 3:])) < 1e-5
+
+
+def test_compute_jacobian_config():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    robot_data = load_yaml(join_path(get_robot_configs_path(), "franka.yml"))
+    cfg = CudaRobotModelConfig.from_robot_yaml_file(robot_data, tensor_args=tensor_args)
+    cfg.compute_jacobian = True
+    robot_model = CudaRobotModel(cfg)
+    q = robot_model.retract_config.view(1, -1).repeat(4, 1)
+    jacobian = robot_model.get_link_jacobians(q, [robot_model.ee_link])
+
+    state = robot_model.get_state(q)
+    assert torch.max(torch.abs(state.lin_jacobian - jacobian[:, 0, :3])) < 1e-5
+    assert torch.max(torch.abs(state.ang_jacobian - jacobian[:, 0, 3:])) < 1e-5
+
+
+@pytest.mark.parametrize("robot_file", ["franka.yml", "ur5e_robotiq_2f_140.yml"])
+def test_forward_subtree(robot_file):
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    robot_data = load_yaml(join_path(get_robot_configs_path(), robot_file))
+    cfg = CudaRobotModelConfig.from_robot_yaml_file(robot_data, tensor_args=tensor_args)
+    robot_model = CudaRobotModel(cfg)
+    link_names = [robot_model.link_names[0], robot_model.ee_link]
+    link_index = [robot_model.link_names.index(link_name) for link_name in link_names]
+    q = robot_model.retract_config.view(1, -1).repeat(10, 1)
+    q = q + 0.1 * torch.randn_like(q)
+    q.requires_grad_(True)
+    state = robot_model.get_state(q)
+    subtree_config = robot_model.get_subtree_config(link_names, include_spheres=True)
+    assert subtree_config.link_idx.shape[0] <= robot_model.kinematics_config.link_map.shape[0]
+
+    q_sub = q.detach().clone().requires_grad_(True)
+    link_pos, link_quat, spheres = robot_model.forward_subtree(
+        q_sub, link_names, include_spheres=True
+    )
+    assert torch.max(torch.abs(link_pos - state.links_position[:, link_index])) < 1e-5
+    assert torch.max(torch.abs(link_quat - state.links_quaternion[:, link_index])) < 1e-5
+    ref_spheres = state.link_spheres_tensor[:, subtree_config.sphere_idx.long()]
+    assert torch.max(torch.abs(spheres - ref_spheres)) < 1e-5
+
+    grad_pos = torch.randn_like(link_pos)
+    grad_spheres = torch.randn_like(spheres)
+    grad_spheres[..., 3] = 0.0
+    cost = torch.sum(grad_pos * state.links_position[:, link_index]) + torch.sum(
+        grad_spheres * ref_spheres
+    )
+    q_grad = torch.autograd.grad(cost, q)[0]
+    cost_sub = torch.sum(grad_pos * link_pos) + torch.sum(grad_spheres * spheres)
+    q_grad_sub = torch.autograd.grad(cost_sub, q_sub)[0]
+    assert torch.max(torch.abs(q_grad - q_grad_sub)) < 1e-4
+
+    pose = robot_model.get_link_poses(q.detach(), link_names)
+    assert torch.max(torch.abs(pose.position - link_pos.detach())) < 1e-5
+
+
+def test_kinematics_variant_registry():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+
+    def load_kinematics(lock_joints):
+        robot_data = load_yaml(join_path(get_robot_configs_path(), "franka.yml"))
+        robot_data["robot_cfg"]["kinematics"]["lock_joints"] = lock_joints
+        return CudaRobotModelConfig.from_robot_yaml_file(robot_data, tensor_args=tensor_args)
+
+    fingers_locked = {"panda_finger_joint1": 0.04, "panda_finger_joint2": 0.04}
+    wrist_locked = {"panda_joint7": 0.5, "panda_finger_joint1": 0.04}
+    robot_model = CudaRobotModel(load_kinematics(fingers_locked))
+    fingers_model = CudaRobotModel(load_kinematics(fingers_locked))
+    wrist_model = CudaRobotModel(load_kinematics(wrist_locked))
+    data_ptr = robot_model.kinematics_config.fixed_transforms.data_ptr()
+
+    registry = KinematicsVariantRegistry()
+    registry.add(fingers_locked, fingers_model.kinematics_config)
+    registry.add(wrist_locked, wrist_model.kinematics_config)
+    assert wrist_locked in registry
+    assert registry.get({"panda_joint7": 0.0, "panda_finger_joint1": 0.04}) is None
+
+    q = robot_model.retract_config.view(1, -1) + 0.1
+    for lock_joints, reference_model in [
+        (wrist_locked, wrist_model),
+        (fingers_locked, fingers_model),
+        (wrist_locked, wrist_model),
+    ]:
+        registry.activate(lock_joints, robot_model)
+        assert robot_model.joint_names == reference_model.joint_names
+        state = robot_model.get_state(q)
+        reference_state = reference_model.get_state(q)
+        assert torch.max(torch.abs(state.ee_position - reference_state.ee_position)) < 1e-5
+        assert (
+            torch.max(torch.abs(state.link_spheres_tensor - reference_state.link_spheres_tensor))
+            < 1e-5
+        )
+        pose = robot_model.get_link_poses(q, [robot_model.ee_link])
+        assert torch.max(torch.abs(pose.position[:, 0] - reference_state.ee_position)) < 1e-5
+    assert registry.active_key == KinematicsVariantRegistry.get_key(wrist_locked)
+    assert robot_model.kinematics_config.fixed_transforms.data_ptr() == data_ptr
+
+
+def test_kinematics_variant_registry_add_active():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+
+    def load_kinematics(lock_joints):
+        robot_data = load_yaml(join_path(get_robot_configs_path(), "franka.yml"))
+        robot_data["robot_cfg"]["kinematics"]["lock_joints"] = lock_joints
+        return CudaRobotModelConfig.from_robot_yaml_file(robot_data, tensor_args=tensor_args)
+
+    fingers_locked = {"panda_finger_joint1": 0.04, "panda_finger_joint2": 0.04}
+    wrist_locked = {"panda_joint7": 0.5, "panda_finger_joint1": 0.04}
+    robot_model = CudaRobotModel(load_kinematics(fingers_locked))
+    fingers_model = CudaRobotModel(load_kinematics(fingers_locked))
+    wrist_model = CudaRobotModel(load_kinematics(wrist_locked))
+
+    registry = KinematicsVariantRegistry()
+    registry.add_active(robot_model)
+    assert registry.get(fingers_locked) is not None
+    assert registry.active_key == KinematicsVariantRegistry.get_key(fingers_locked)
+    registry.add(wrist_locked, wrist_model.kinematics_config)
+
+    # activating another variant should not modify the registered copy:
+    q = robot_model.retract_config.view(1, -1) + 0.1
+    registry.activate(wrist_locked, robot_model)
+    registry.activate(fingers_locked, robot_model)
+    assert robot_model.joint_names == fingers_model.joint_names
+    state = robot_model.get_state(q)
+    reference_state = fingers_model.get_state(q)
+    assert torch.max(torch.abs(state.ee_position - reference_state.ee_position)) < 1e-5
+
+
+def test_kinematics_memo():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    robot_data = load_yaml(join_path(get_robot_configs_path(), "franka.yml"))
+    robot_data["robot_cfg"]["kinematics"]["extra_collision_spheres"] = {"attached_object": 4}
+    cfg = CudaRobotModelConfig.from_robot_yaml_file(robot_data, tensor_args=tensor_args)
+    robot_model = CudaRobotModel(cfg)
+    q = robot_model.retract_config.view(1, -1).repeat(6, 1)
+    q = q + 0.1 * torch.randn_like(q)
+    reference = robot_model.get_state(q)
+    reference_pos = reference.links_position.clone()
+    reference_spheres = reference.link_spheres_tensor.clone()
+
+    memo = robot_model.enable_kinematics_memo(KinematicsMemoConfig(resolution=1e-6, max_entries=8))
+    state = robot_model.get_state(q[:4])
+    assert memo.hits == 0 and memo.misses == 4
+
+    # only some rows hit:
+    state = robot_model.get_state(q[2:])
+    assert memo.hits == 2 and memo.misses == 6
+    assert torch.max(torch.abs(state.links_position - reference_pos[2:])) < 1e-5
+    assert torch.max(torch.abs(state.link_spheres_tensor - reference_spheres[2:])) < 1e-5
+    assert torch.max(torch.abs(state.ee_position - reference.ee_position[2:])) < 1e-5
+
+    # evict least recently used entries:
+    robot_model.get_state(q + 1.0)
+    assert len(memo) == 8
+    robot_model.get_state(q[2:])
+    assert memo.hits == 4 and memo.misses == 14
+
+    # modifying spheres in place invalidates the memo:
+    sphere = tensor_args.to_device([[0.0, 0.0, 0.1, 0.05]]).repeat(4, 1)
+    robot_model.kinematics_config.attach_object(sphere_tensor=sphere, link_name="attached_object")
+    state = robot_model.get_state(q[2:])
+    assert memo.hits == 4 and memo.misses == 18
+    assert torch.max(torch.abs(state.link_spheres_tensor - reference_spheres[2:])) > 1e-3
+
+    # gradients bypass the memo:
+    robot_model.get_state(q.clone().requires_grad_(True))
+    assert memo.hits + memo.misses == 22
+
+
+def test_kinematics_buffer_pool():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    robot_data = load_yaml(join_path(get_robot_configs_path(), "franka.yml"))
+    cfg = CudaRobotModelConfig.from_robot_yaml_file(robot_data, tensor_args=tensor_args)
+    robot_model = CudaRobotModel(cfg)
+    q = robot_model.retract_config.view(1, -1).repeat(32, 1)
+    q = q + 0.1 * torch.randn_like(q)
+    reference = robot_model.get_state(q).links_position.clone()
+    allocations = robot_model.buffer_pool.allocations
+    for batch in [1, 4, 32, 4, 1, 32]:
+        state = robot_model.get_state(q[:batch])
+        assert torch.max(torch.abs(state.links_position - reference[:batch])) < 1e-6
+    assert robot_model.buffer_pool.allocations == allocations
+    assert robot_model.buffer_pool.saved_allocations > 0
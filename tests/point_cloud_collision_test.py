@@ -0,0 +1,141 @@
+#
+# Copyright (c) 2023 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+#
+# NVIDIA CORPORATION, its affiliates and licensors retain all intellectual
+# property and proprietary rights in and to this material, related
+# documentation and any modifications thereto. Any use, reproduction,
+# disclosure or distribution of this material and related documentation
+# without an express license agreement from NVIDIA CORPORATION or
+# its affiliates is strictly prohibited.
+#
+
+# Third Party
+import torch
+
+# CuRobo
+from curobo.geom.sdf.utils import create_collision_checker
+from curobo.geom.sdf.world import CollisionCheckerType, CollisionQueryBuffer, WorldCollisionConfig
+from curobo.geom.types import Cuboid, PointCloud, WorldConfig
+from curobo.types.base import TensorDeviceType
+from curobo.types.math import Pose
+
+
+def get_point_cloud_checker(world_model: WorldConfig, tensor_args: TensorDeviceType):
+    return create_collision_checker(
+        WorldCollisionConfig(
+            tensor_args=tensor_args,
+            world_model=world_model,
+            checker_type=CollisionCheckerType.POINT_CLOUD,
+            point_cloud={"cell_size": 0.05, "far_distance": 0.15},
+        )
+    )
+
+
+def test_point_cloud_sphere_distance():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    generator = torch.Generator().manual_seed(0)
+    points = torch.rand((500, 3), generator=generator) * 0.6 - 0.3
+    checker = get_point_cloud_checker(
+        WorldConfig(pointcloud=[PointCloud("scan", pose=[0.1, 0, 0, 1, 0, 0, 0], points=points)]),
+        tensor_args,
+    )
+    assert checker.n_points == 500
+
+    x_sph = torch.rand((4, 5, 10, 4), generator=generator)
+    x_sph[..., :3] = (x_sph[..., :3] - 0.5) * 0.8
+    x_sph[..., 3] = 0.05
+    x_sph.requires_grad = True
+    query_buffer = CollisionQueryBuffer.initialize_from_shape(
+        x_sph.shape, tensor_args, checker.collision_types
+    )
+    weight = tensor_args.to_device([1.0])
+    act_distance = tensor_args.to_device([0.0])
+    d_sph = checker.get_sphere_distance(x_sph, query_buffer, weight, act_distance)
+    d_sph.sum().backward()
+
+    # compare against brute force nearest points:
+    world_points = points + torch.as_tensor([0.1, 0.0, 0.0])
+    distance = torch.cdist(x_sph.detach()[..., :3].view(-1, 3), world_points)
+    nearest, nearest_idx = torch.min(distance, dim=-1)
+    expected = torch.clamp(0.05 - nearest, min=0.0)
+    assert torch.count_nonzero(expected) > 10
+    assert torch.allclose(d_sph.detach().view(-1), expected, atol=1e-5)
+    direction = world_points[nearest_idx] - x_sph.detach()[..., :3].view(-1, 3)
+    direction = direction / nearest.unsqueeze(-1)
+    grad = x_sph.grad.view(-1, 4)[..., :3]
+    assert torch.allclose(grad[expected > 0], direction[expected > 0], atol=1e-4)
+    assert torch.all(grad[expected == 0] == 0.0)
+
+    query_buffer = CollisionQueryBuffer.initialize_from_shape(
+        x_sph.shape, tensor_args, checker.collision_types
+    )
+    esdf = checker.get_sphere_distance(
+        x_sph, query_buffer, weight, act_distance, compute_esdf=True
+    ).view(-1)
+    assert torch.allclose(esdf, -torch.clamp(nearest, max=0.15), atol=1e-5)
+
+
+def test_point_cloud_insert_remove():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    g = torch.linspace(-0.5, 0.5, 51)
+    grid_x, grid_y = torch.meshgrid(g, g, indexing="ij")
+    floor = torch.stack([grid_x.ravel(), grid_y.ravel(), torch.zeros(51 * 51)], dim=-1)
+    world_model = WorldConfig(
+        pointcloud=[PointCloud("floor", pose=[0, 0, 0.2, 1, 0, 0, 0], points=floor)],
+        cuboid=[Cuboid("box", pose=[2, 0, 0, 1, 0, 0, 0], dims=[0.2, 0.2, 0.2])],
+    )
+    checker = get_point_cloud_checker(world_model, tensor_args)
+    assert checker.get_obstacle_names() == ["floor", "box"]
+
+    x_sph = tensor_args.to_device(
+        [[0.0, 0.0, 0.25, 0.1], [0.0, 0.0, 0.5, 0.1], [0.6, 0.0, 0.2, 0.05]]
+    ).view(1, 1, -1, 4)
+    query_buffer = CollisionQueryBuffer.initialize_from_shape(
+        x_sph.shape, tensor_args, checker.collision_types
+    )
+    weight = tensor_args.to_device([1.0])
+    act_distance = tensor_args.to_device([0.0])
+
+    def get_distance():
+        return checker.get_sphere_distance(x_sph, query_buffer, weight, act_distance).view(-1)
+
+    assert torch.allclose(get_distance(), tensor_args.to_device([0.05, 0.0, 0.0]))
+
+    checker.enable_obstacle("floor", False)
+    assert torch.all(get_distance() == 0.0)
+    checker.enable_obstacle("floor", True)
+
+    checker.update_obstacle_pose("floor", Pose.from_list([0, 0, 0.5, 1, 0, 0, 0], tensor_args))
+    assert torch.allclose(get_distance(), tensor_args.to_device([0.0, 0.1, 0.0]))
+
+    # points are added and removed without reloading other point clouds:
+    n_points = checker.n_points
+    n_inserted = checker.insert_point_cloud(
+        PointCloud("scan", points=[[0.6, 0.0, 0.2], [float("nan"), 0.0, 0.0]])
+    )
+    assert n_inserted == 1
+    assert checker.get_obstacle_names() == ["floor", "scan", "box"]
+    assert torch.allclose(get_distance(), tensor_args.to_device([0.0, 0.1, 0.05]))
+    checker.insert_point_cloud(PointCloud("scan", points=[[0.0, 0.0, 0.3]]))
+    assert torch.allclose(get_distance(), tensor_args.to_device([0.05, 0.1, 0.05]))
+    checker.remove_point_cloud("scan")
+    assert checker.n_points == n_points
+    assert torch.allclose(get_distance(), tensor_args.to_device([0.0, 0.1, 0.0]))
+
+    # swept spheres collide with points between timesteps:
+    x_swept = tensor_args.to_device([[0, 0, 0.8, 0.05], [0, 0, 0.2, 0.05]]).view(1, 2, 1, 4)
+    swept_buffer = CollisionQueryBuffer.initialize_from_shape(
+        x_swept.shape, tensor_args, checker.collision_types
+    )
+    assert torch.all(
+        checker.get_sphere_collision(x_swept, swept_buffer, weight, act_distance) == 0.0
+    )
+    d_swept = checker.get_swept_sphere_collision(
+        x_swept, swept_buffer, weight, act_distance, tensor_args.to_device([0.1]), 4
+    )
+    assert torch.all(d_swept == 1.0)
+
+    result = checker.update_collision_model(WorldConfig(cuboid=world_model.cuboid))
+    assert result.full_reload
+    assert checker.n_points == 0
+    assert checker.get_obstacle_names() == ["box"]
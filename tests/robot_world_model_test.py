@@ -149,3 +149,31 @@ def test_robot_batch_world_collision():
     )
     assert d_world.shape[0] == b
     assert torch.sum(d_world) == 0.0
+
+
+def test_robot_world_self_collision_ignore():
+    # test finding self collision ignore pairs by sampling joint configurations
+    model = load_robot_world()
+    result = model.get_self_collision_ignore(n_samples=2000, batch_size=500)
+    assert result.n_samples == 2000
+    assert "attached_object" in result.skipped_links
+
+    ignore_pairs = []
+    for k, v in result.self_collision_ignore.items():
+        for l_name in v:
+            pair = (k, l_name)
+            assert pair not in ignore_pairs and (l_name, k) not in ignore_pairs
+            ignore_pairs.append(pair)
+    for pair in result.always_colliding:
+        assert result.collision_fraction[pair] == 1.0
+        assert pair in ignore_pairs
+    for pair in result.never_colliding:
+        assert result.collision_fraction[pair] == 0.0
+        assert pair in ignore_pairs
+    for pair, fraction in result.collision_fraction.items():
+        if 0.0 < fraction < 1.0:
+            assert pair not in ignore_pairs
+    # adjacent links are always in collision:
+    assert ("panda_link0", "panda_link1") in result.always_colliding
+    # ignore pairs with attached object are kept from robot configuration:
+    assert "attached_object" in result.self_collision_ignore["panda_hand"]
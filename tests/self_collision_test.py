@@ -181,3 +181,130 @@ def test_self_collision_10k_spheres_franka():
     out_10k = cost_fn.forward(in_spheres)
     assert out_10k.sum().item() > 0.0
     assert torch.linalg.norm(out - out_10k) < 1e-3
+
+
+@pytest.mark.parametrize("n_times", [1, 5])
+def test_self_collision_pair_table(n_times):
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+
+    robot_cfg = load_yaml(join_path(get_robot_configs_path(), "franka.yml"))["robot_cfg"]
+    robot_cfg["kinematics"]["debug"] = {"self_collision_experimental": False}
+    sphere_cfg = load_yaml(
+        join_path(get_robot_configs_path(), robot_cfg["kinematics"]["collision_spheres"])
+    )["collision_spheres"]
+    for k in sphere_cfg.keys():
+        sphere_cfg[k] = [copy.deepcopy(x) for x in sphere_cfg[k] for _ in range(n_times)]
+    robot_cfg["kinematics"]["collision_spheres"] = sphere_cfg
+    robot_cfg = RobotConfig.from_dict(robot_cfg, tensor_args)
+    self_collision_data = robot_cfg.kinematics.self_collision_config
+
+    # pairs in thread table should match upper triangle of collision matrix:
+    coll_matrix = self_collision_data.collision_matrix.bool()
+    assert torch.equal(coll_matrix, coll_matrix.t())
+    expected_pairs = torch.nonzero(torch.triu(coll_matrix, diagonal=1))
+    n_pairs = self_collision_data.thread_max // 2
+    pairs = self_collision_data.thread_location[: 2 * n_pairs].view(-1, 2).long()
+    assert torch.equal(pairs, expected_pairs)
+
+    # tiles of all launched threads are padded:
+    n_spheres = coll_matrix.shape[0]
+    checks_per_thread = self_collision_data.checks_per_thread
+    n_threads = max(32, n_spheres, (n_pairs + checks_per_thread - 1) // checks_per_thread)
+    assert n_threads <= 1024
+    assert self_collision_data.thread_location.shape[0] >= 2 * n_threads * checks_per_thread
+    assert torch.all(self_collision_data.thread_location[2 * n_pairs :] == -1)
+
+    report = self_collision_data.get_pair_report()
+    assert report["n_pairs"] == expected_pairs.shape[0]
+    assert report["n_spheres"] == n_spheres
+    assert report["n_all_pairs"] == n_spheres * (n_spheres - 1) // 2
+    assert 0.0 < report["sparsity"] < 1.0
+    if n_times > 1:
+        assert n_pairs > 32 * 512
+
+
+def test_self_collision_broad_phase():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+
+    robot_cfg = load_yaml(join_path(get_robot_configs_path(), "franka.yml"))["robot_cfg"]
+    robot_cfg["kinematics"]["debug"] = {"self_collision_experimental": False}
+    robot_cfg = RobotConfig.from_dict(robot_cfg, tensor_args)
+    kinematics = CudaRobotModel(robot_cfg.kinematics)
+    self_collision_data = kinematics.get_self_collision_config()
+
+    b = 200
+    q_limits = kinematics.get_joint_limits().position
+    q = q_limits[0] + (q_limits[1] - q_limits[0]) * torch.rand(
+        (b, kinematics.get_dof()), device=tensor_args.device, dtype=tensor_args.dtype
+    )
+    in_spheres = kinematics.get_state(q).link_spheres_tensor.view(b, 1, -1, 4).contiguous()
+
+    # reference: maximum penetration over all sphere pairs in the collision matrix.
+    spheres = in_spheres.view(b, -1, 4)
+    radius = spheres[..., 3] + self_collision_data.offset
+    distance = torch.linalg.norm(spheres[:, :, None, :3] - spheres[:, None, :, :3], dim=-1)
+    penetration = radius[:, :, None] + radius[:, None, :] - distance
+    penetration[:, ~self_collision_data.collision_matrix.bool()] = -torch.inf
+    reference = torch.clamp(torch.max(penetration.view(b, -1), dim=-1)[0], min=0.0)
+    assert torch.count_nonzero(reference) > 0
+
+    outputs = []
+    for broad_phase in [False, True]:
+        self_collision_config = SelfCollisionCostConfig(
+            **{"weight": 1.0, "classify": False, "self_collision_kin_config": self_collision_data},
+            tensor_args=tensor_args,
+            broad_phase=broad_phase
+        )
+        cost_fn = SelfCollisionCost(self_collision_config)
+        x = in_spheres.clone().requires_grad_(True)
+        out = cost_fn.forward(x)
+        grad = torch.autograd.grad(torch.sum(out), x)[0]
+        outputs.append((out.detach().clone(), grad))
+        assert torch.max(torch.abs(out.view(-1) - reference)) < 1e-5
+
+    assert torch.equal(outputs[0][0], outputs[1][0])
+    assert torch.equal(outputs[0][1], outputs[1][1])
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="self collision kernel requires CUDA")
+def test_self_collision_experimental_65k_pairs():
+    tensor_args = TensorDeviceType()
+
+    # franka with every sphere repeated 10 times has more than 65536 sphere pairs:
+    robot_cfg = load_yaml(join_path(get_robot_configs_path(), "franka.yml"))["robot_cfg"]
+    robot_cfg["kinematics"]["debug"] = {"self_collision_experimental": False}
+    sphere_cfg = load_yaml(
+        join_path(get_robot_configs_path(), robot_cfg["kinematics"]["collision_spheres"])
+    )["collision_spheres"]
+    for k in sphere_cfg.keys():
+        sphere_cfg[k] = [copy.deepcopy(x) for x in sphere_cfg[k] for _ in range(10)]
+    robot_cfg["kinematics"]["collision_spheres"] = sphere_cfg
+    robot_cfg = RobotConfig.from_dict(robot_cfg, tensor_args)
+    kinematics = CudaRobotModel(robot_cfg.kinematics)
+    self_collision_data = kinematics.get_self_collision_config()
+    assert self_collision_data.thread_max // 2 > 65536
+    assert self_collision_data.checks_per_thread >= 128
+
+    b = 20
+    q_limits = kinematics.get_joint_limits().position
+    q = q_limits[0] + (q_limits[1] - q_limits[0]) * torch.rand(
+        (b, kinematics.get_dof()), device=tensor_args.device, dtype=tensor_args.dtype
+    )
+    in_spheres = kinematics.get_state(q).link_spheres_tensor.view(b, 1, -1, 4).contiguous()
+
+    # reference: maximum penetration over all sphere pairs in the collision matrix.
+    spheres = in_spheres.view(b, -1, 4)
+    radius = spheres[..., 3] + self_collision_data.offset
+    distance = torch.linalg.norm(spheres[:, :, None, :3] - spheres[:, None, :, :3], dim=-1)
+    penetration = radius[:, :, None] + radius[:, None, :] - distance
+    penetration[:, ~self_collision_data.collision_matrix.bool()] = -torch.inf
+    reference = torch.clamp(torch.max(penetration.view(b, -1), dim=-1)[0], min=0.0)
+
+    self_collision_config = SelfCollisionCostConfig(
+        **{"weight": 1.0, "classify": False, "self_collision_kin_config": self_collision_data},
+        tensor_args=tensor_args
+    )
+    cost_fn = SelfCollisionCost(self_collision_config)
+    cost_fn.self_collision_kin_config.experimental_kernel = True
+    out = cost_fn.forward(in_spheres)
+    assert torch.max(torch.abs(out.view(-1) - reference)) < 1e-4
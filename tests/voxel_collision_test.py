@@ -10,10 +10,19 @@
 #
 
 # Third Party
+import numpy as np
 import pytest
 import torch
 
 # CuRobo
+from curobo.curobolib.geom import VOXEL_UNOBSERVED_DISTANCE, voxel_esdf_torch
+from curobo.geom.sdf import esdf_cache
+from curobo.geom.sdf.esdf_cache import EsdfBakeConfig, bake_world_esdf
+from curobo.geom.sdf.esdf_update import (
+    compute_esdf_from_occupancy,
+    compute_esdf_from_occupancy_reference,
+)
+from curobo.geom.sdf.voxel_pyramid import VoxelPyramid, VoxelPyramidConfig
 from curobo.geom.sdf.world import (
     CollisionCheckerType,
     CollisionQueryBuffer,
@@ -21,9 +30,11 @@ from curobo.geom.sdf.world import (
     WorldPrimitiveCollision,
 )
 from curobo.geom.sdf.world_mesh import WorldMeshCollision
+from curobo.geom.sdf.world_sparse_voxel import WorldSparseVoxelCollision
 from curobo.geom.sdf.world_voxel import WorldVoxelCollision
 from curobo.geom.types import Cuboid, VoxelGrid, WorldConfig
 from curobo.types.base import TensorDeviceType
+from curobo.types.math import Pose
 
 
 def get_world_model(single_object: bool = False):
@@ -251,3 +262,437 @@ def test_primitive_voxel_sphere_gradient(world_collision):
     error = torch.linalg.norm(cuboid_gradient - voxel_gradient, dim=-1)
 
     assert torch.max(error) - voxel_grid.voxel_size < 1e-3
+
+
+def test_bake_world_esdf_cache(tmp_path, monkeypatch):
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    world_model = get_world_model()
+    bake_config = EsdfBakeConfig(
+        voxel_size=0.05, max_distance=0.5, checker_type=CollisionCheckerType.PRIMITIVE
+    )
+    esdf = bake_world_esdf(world_model, bake_config, tensor_args, cache_dir=str(tmp_path))
+    assert len(list(tmp_path.glob("esdf_*.pt"))) == 1
+    assert torch.max(esdf.feature_tensor) > 0.0
+
+    world_collision = WorldPrimitiveCollision(
+        WorldCollisionConfig(tensor_args=tensor_args, world_model=world_model, max_distance=0.5)
+    )
+    esdf_direct = world_collision.get_esdf_in_bounding_box(
+        Cuboid(name="base", pose=esdf.pose, dims=esdf.dims), voxel_size=esdf.voxel_size
+    )
+    assert torch.allclose(esdf.feature_tensor, esdf_direct.feature_tensor)
+
+    # renamed obstacles load from cache without computing signed distance:
+    def fail_create_collision_checker(config):
+        raise AssertionError("signed distance was recomputed")
+
+    monkeypatch.setattr(esdf_cache, "create_collision_checker", fail_create_collision_checker)
+    block2, block3 = world_model.cuboid
+    renamed_world = WorldConfig(
+        cuboid=[block3, Cuboid(name="renamed", pose=block2.pose, dims=block2.dims)]
+    )
+    esdf_cached = bake_world_esdf(renamed_world, bake_config, tensor_args, cache_dir=str(tmp_path))
+    assert torch.equal(esdf.feature_tensor, esdf_cached.feature_tensor)
+    assert esdf_cached.dims == esdf.dims
+
+    # moved obstacles are baked again:
+    moved_world = WorldConfig(
+        cuboid=[block3, Cuboid(name="block2", pose=[-0.25, 0, 0.1, 1, 0, 0, 0], dims=block2.dims)]
+    )
+    with pytest.raises(AssertionError):
+        bake_world_esdf(moved_world, bake_config, tensor_args, cache_dir=str(tmp_path))
+
+
+def test_baked_esdf_voxel_distance(tmp_path):
+    tensor_args = TensorDeviceType()
+    world_model = get_world_model()
+    voxel_size = 0.02
+    esdf = bake_world_esdf(
+        world_model,
+        EsdfBakeConfig(voxel_size=voxel_size, max_distance=1.0),
+        tensor_args,
+        cache_dir=str(tmp_path),
+    )
+    world_voxel_collision = WorldVoxelCollision(
+        WorldCollisionConfig(
+            tensor_args=tensor_args,
+            world_model=WorldConfig(voxel=[esdf]),
+            max_distance=1.0,
+            checker_type=CollisionCheckerType.VOXEL,
+        )
+    )
+    world_collision = WorldPrimitiveCollision(
+        WorldCollisionConfig(tensor_args=tensor_args, world_model=world_model, max_distance=1.0)
+    )
+
+    bounds = Cuboid(name="base", pose=[0, 0, 0, 1, 0, 0, 0], dims=[0.5, 0.5, 0.5])
+    esdf_data = world_collision.get_esdf_in_bounding_box(bounds, voxel_size=0.01).feature_tensor
+    esdf_voxel_data = world_voxel_collision.get_esdf_in_bounding_box(
+        bounds, voxel_size=0.01
+    ).feature_tensor
+    error = torch.abs(esdf_data - esdf_voxel_data)
+    assert torch.max(error) < 2 * voxel_size
+
+
+def test_voxel_esdf_trilinear_interpolation():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    grid = VoxelGrid(name="grid", pose=[0, 0, 0, 1, 0, 0, 0], dims=[1.0, 0.8, 0.6], voxel_size=0.05)
+    xyz = grid.create_xyzr_tensor(tensor_args=tensor_args)[:, :3]
+    slope = torch.as_tensor([0.3, -0.5, 0.8])
+    # trilinear interpolation is exact for signed distance that is linear in position:
+    grid.feature_tensor = (xyz @ slope + 0.1).unsqueeze(-1)
+    world_collision = WorldVoxelCollision(
+        WorldCollisionConfig(
+            tensor_args=tensor_args,
+            world_model=WorldConfig(voxel=[grid]),
+            checker_type=CollisionCheckerType.VOXEL,
+            max_distance=1.0,
+            interpolate_voxel_esdf=True,
+        )
+    )
+    points = (torch.rand((2, 50, 3), generator=torch.Generator().manual_seed(0)) - 0.5) * 0.5
+    esdf, grad = voxel_esdf_torch(
+        points,
+        world_collision._voxel_tensor_list[3],
+        world_collision._voxel_tensor_list[0],
+        world_collision._voxel_tensor_list[1],
+        world_collision._voxel_tensor_list[2],
+        torch.zeros(2, dtype=torch.int32),
+    )
+    assert torch.allclose(esdf[..., 0], points @ slope + 0.1, atol=1e-5)
+    assert torch.allclose(grad[..., 0, :], slope.expand(2, 50, 3), atol=1e-4)
+
+    outside = torch.as_tensor([[[2.0, 0.0, 0.0]]])
+    esdf, grad = voxel_esdf_torch(
+        outside,
+        world_collision._voxel_tensor_list[3],
+        world_collision._voxel_tensor_list[0],
+        world_collision._voxel_tensor_list[1],
+        world_collision._voxel_tensor_list[2],
+        torch.zeros(1, dtype=torch.int32),
+    )
+    assert esdf.item() == VOXEL_UNOBSERVED_DISTANCE
+    assert torch.count_nonzero(grad) == 0
+
+
+def test_baked_esdf_interpolated_sphere_distance(tmp_path):
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    world_model = get_world_model(single_object=True)
+    voxel_size = 0.05
+    esdf = bake_world_esdf(
+        world_model,
+        EsdfBakeConfig(
+            voxel_size=voxel_size, max_distance=0.5, checker_type=CollisionCheckerType.PRIMITIVE
+        ),
+        tensor_args,
+        cache_dir=str(tmp_path),
+    )
+    world_collision = WorldPrimitiveCollision(
+        WorldCollisionConfig(tensor_args=tensor_args, world_model=world_model, max_distance=0.5)
+    )
+    voxel_collision = WorldVoxelCollision(
+        WorldCollisionConfig(
+            tensor_args=tensor_args,
+            world_model=WorldConfig(voxel=[esdf]),
+            checker_type=CollisionCheckerType.VOXEL,
+            max_distance=0.5,
+            interpolate_voxel_esdf=True,
+        )
+    )
+
+    x_sph = torch.rand((4, 5, 20, 4), generator=torch.Generator().manual_seed(0))
+    # spheres in the baked region:
+    x_sph[..., :3] = (x_sph[..., :3] - 0.5) * torch.as_tensor(esdf.dims) + torch.as_tensor(
+        esdf.pose[:3]
+    )
+    x_sph[..., 3] = 0.02
+    x_sph.requires_grad = True
+    weight = tensor_args.to_device([1.0])
+    act_distance = tensor_args.to_device([0.05])
+    speed_dt = tensor_args.to_device([0.02])
+    distances = []
+    for checker in [world_collision, voxel_collision]:
+        query_buffer = CollisionQueryBuffer.initialize_from_shape(
+            x_sph.shape, tensor_args, checker.collision_types
+        )
+        d_sph = checker.get_sphere_distance(
+            x_sph, query_buffer, weight, act_distance, compute_esdf=True
+        )
+        distances.append(d_sph.view(-1))
+    # interpolated distance is exact up to curvature of signed distance at obstacle edges:
+    error = torch.abs(distances[0] - distances[1])
+    assert torch.mean(error) < 0.1 * voxel_size
+    assert torch.max(error) < 0.6 * voxel_size
+
+    query_buffer = CollisionQueryBuffer.initialize_from_shape(
+        x_sph.shape, tensor_args, voxel_collision.collision_types
+    )
+    d_swept = voxel_collision.get_swept_sphere_distance(
+        x_sph, query_buffer, weight, act_distance, speed_dt, 4
+    )
+    assert torch.count_nonzero(d_swept) > 0
+    d_swept.sum().backward()
+    assert torch.count_nonzero(x_sph.grad) > 0
+
+
+def test_voxel_grid_region_from_file(tmp_path):
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    grid = VoxelGrid(
+        name="map",
+        pose=[1.0, 0.0, 0.0, 0.7071068, 0.0, 0.0, 0.7071068],
+        dims=[2.0, 1.6, 1.0],
+        voxel_size=0.1,
+        tensor_args=tensor_args,
+    )
+    grid_shape = grid.get_grid_shape()[0]
+    features = torch.rand(grid_shape, generator=torch.Generator().manual_seed(0))
+    np.save(str(tmp_path / "map.npy"), features.numpy())
+    features.numpy().tofile(str(tmp_path / "map.raw"))
+
+    for file_name in ["map.npy", "map.raw"]:
+        grid.file_path = str(tmp_path / file_name)
+        assert torch.equal(grid.load_features(), features.view(-1))
+
+    region = grid.get_region([1.2, 0.3, 0.1], half_extent=0.7, fill_value=-5.0)
+    assert region.get_grid_shape()[0] == [15, 15, 15]
+
+    # region voxels have the features of the grid voxels they overlap:
+    xyz = region.create_xyzr_tensor(transform_to_origin=True, tensor_args=tensor_args)[:, :3]
+    xyz_grid = Pose.from_list(grid.pose, tensor_args).inverse().transform_points(xyz)
+    grid_idx = torch.floor(
+        (xyz_grid + 0.5 * tensor_args.to_device(grid.dims)) / grid.voxel_size
+    ).long()
+    inside = torch.all((grid_idx >= 0) & (grid_idx < torch.as_tensor(grid_shape)), dim=-1)
+    assert torch.any(inside) and not torch.all(inside)
+    expected = torch.full_like(region.feature_tensor, -5.0)
+    expected[inside] = features[grid_idx[inside].unbind(-1)]
+    assert torch.equal(region.feature_tensor, expected)
+
+
+def test_voxel_stream_region_paging(tmp_path):
+    tensor_args = TensorDeviceType()
+    grid = VoxelGrid(name="map", pose=[0, 0, 0, 1, 0, 0, 0], dims=[4.0, 4.0, 2.0], voxel_size=0.05)
+    features = torch.full(grid.get_grid_shape()[0], -1.0)
+    np.save(str(tmp_path / "map.npy"), features.numpy())
+    grid.file_path = str(tmp_path / "map.npy")
+
+    world_voxel_collision = WorldVoxelCollision(
+        WorldCollisionConfig(
+            tensor_args=tensor_args,
+            world_model=WorldConfig(voxel=[grid]),
+            checker_type=CollisionCheckerType.VOXEL,
+            voxel_stream={"reach_radius": 0.5, "page_margin": 0.2},
+        )
+    )
+    assert world_voxel_collision.voxel_region_loads == 1
+    assert world_voxel_collision.update_voxel_region([0.1, 0.1, 0.0]) == []
+    assert world_voxel_collision.update_voxel_region([0.5, 0.0, 0.0]) == ["map"]
+    assert world_voxel_collision.voxel_region_loads == 2
+
+
+def test_sparse_voxel_sphere_distance():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    world_model = get_world_model(single_object=True)
+    world_collision = WorldPrimitiveCollision(
+        WorldCollisionConfig(tensor_args=tensor_args, world_model=world_model, max_distance=0.5)
+    )
+    esdf = world_collision.get_esdf_in_bounding_box(
+        Cuboid(name="base", pose=[0, 0, 0, 1, 0, 0, 0], dims=[2.0, 2.0, 2.0]), voxel_size=0.02
+    )
+    sparse_collision = WorldSparseVoxelCollision(
+        WorldCollisionConfig(
+            tensor_args=tensor_args,
+            world_model=WorldConfig(voxel=[esdf]),
+            checker_type=CollisionCheckerType.SPARSE_VOXEL,
+            sparse_voxel={"block_size": 8, "far_distance": 0.2},
+        )
+    )
+    dense_bytes = esdf.feature_tensor.numel() * esdf.feature_tensor.element_size()
+    assert sparse_collision.voxel_memory_bytes < 0.1 * dense_bytes
+
+    x_sph = torch.rand((8, 4, 20, 4), generator=torch.Generator().manual_seed(0))
+    x_sph[..., :3] = (x_sph[..., :3] - 0.5) * 0.8 + torch.as_tensor([0.25, 0.1, 0.0])
+    x_sph[..., 3] = 0.02
+    weight = tensor_args.to_device([1.0])
+    act_distance = tensor_args.to_device([0.05])
+    distances = []
+    for checker in [world_collision, sparse_collision]:
+        query_buffer = CollisionQueryBuffer.initialize_from_shape(
+            x_sph.shape, tensor_args, checker.collision_types
+        )
+        distances.append(
+            checker.get_sphere_distance(x_sph, query_buffer, weight, act_distance).view(-1)
+        )
+    assert torch.count_nonzero(distances[0]) > 10
+    assert torch.max(torch.abs(distances[0] - distances[1])) < esdf.voxel_size
+
+    # spheres far from obstacles read from unallocated blocks:
+    x_sph[..., :3] += 5.0
+    query_buffer = CollisionQueryBuffer.initialize_from_shape(
+        x_sph.shape, tensor_args, sparse_collision.collision_types
+    )
+    d_far = sparse_collision.get_sphere_distance(
+        x_sph, query_buffer, weight, act_distance, compute_esdf=True
+    )
+    assert torch.allclose(d_far, torch.full_like(d_far, -0.2))
+
+
+def test_voxel_pyramid_culls_far_spheres():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    # signed distance is not truncated within the grid:
+    world_collision = WorldPrimitiveCollision(
+        WorldCollisionConfig(
+            tensor_args=tensor_args, world_model=get_world_model(True), max_distance=4.0
+        )
+    )
+    grid = world_collision.get_esdf_in_bounding_box(
+        Cuboid(name="base", pose=[0, 0, 0, 1, 0, 0, 0], dims=[2.0, 2.0, 2.0]), voxel_size=0.02
+    )
+    grid_shape = grid.get_grid_shape()[0]
+    voxel_features = grid.feature_tensor.view(1, 1, -1, 1).clone()
+    voxel_params = tensor_args.to_device([[grid.dims + [grid.voxel_size]]])
+    voxel_pose = torch.zeros((1, 1, 8))
+    voxel_pose[0, 0, :7] = Pose.from_list(grid.pose, tensor_args).inverse().get_pose_vector()
+    pyramid = VoxelPyramid(VoxelPyramidConfig(levels=2, factor=4))
+    pyramid.set_voxel_tensors(
+        voxel_params, voxel_pose, torch.ones((1, 1), dtype=torch.uint8), voxel_features, grid_shape
+    )
+
+    x_sph = torch.rand((8, 10, 30, 4), generator=torch.Generator().manual_seed(0))
+    x_sph[..., :3] = (x_sph[..., :3] - 0.5) * 1.8
+    x_sph[..., 3] = 0.02
+    act_distance = tensor_args.to_device([0.05])
+
+    def get_voxel_esdf(position):
+        voxel_idx = torch.floor((position + 1.0) / grid.voxel_size).long()
+        return grid.feature_tensor.view(grid_shape)[voxel_idx.unbind(-1)]
+
+    far = pyramid.get_far_spheres(x_sph, act_distance)
+    colliding = get_voxel_esdf(x_sph[..., :3]) + x_sph[..., 3] + act_distance > 0.0
+    assert torch.count_nonzero(colliding) > 0
+    assert not torch.any(far & colliding)
+    assert torch.count_nonzero(far) > 0.5 * far.numel()
+
+    # swept spheres are not culled when their segments reach obstacles:
+    far = pyramid.get_far_spheres(x_sph, act_distance, sweep=True)
+    for x_other in [
+        torch.cat([x_sph[:, :1], x_sph[:, :-1]], dim=1),
+        torch.cat([x_sph[:, 1:], x_sph[:, -1:]], dim=1),
+    ]:
+        for k0 in torch.linspace(0.5, 1.0, 6):
+            position = k0 * x_sph[..., :3] + (1 - k0) * x_other[..., :3]
+            colliding = get_voxel_esdf(position) + x_sph[..., 3] + act_distance > 0.0
+            assert not torch.any(far & colliding)
+
+    # levels are rebuilt after features are modified in place:
+    voxel_features[:] = 1.0
+    assert not torch.any(pyramid.get_far_spheres(x_sph, act_distance))
+    assert pyramid.full_updates == 2
+
+
+def test_voxel_pyramid_sphere_distance():
+    tensor_args = TensorDeviceType()
+    world_model = get_world_model()
+    esdf = WorldPrimitiveCollision(
+        WorldCollisionConfig(tensor_args=tensor_args, world_model=world_model, max_distance=0.5)
+    ).get_esdf_in_bounding_box(
+        Cuboid(name="base", pose=[0, 0, 0, 1, 0, 0, 0], dims=[1.0, 1.0, 1.0]), voxel_size=0.02
+    )
+    checkers = [
+        WorldVoxelCollision(
+            WorldCollisionConfig(
+                tensor_args=tensor_args,
+                world_model=WorldConfig(voxel=[esdf]),
+                checker_type=CollisionCheckerType.VOXEL,
+                voxel_pyramid=voxel_pyramid,
+            )
+        )
+        for voxel_pyramid in [None, {"levels": 2, "factor": 4}]
+    ]
+    x_sph = torch.rand((8, 10, 30, 4), **(tensor_args.as_torch_dict()))
+    x_sph[..., :3] = (x_sph[..., :3] - 0.5) * 0.8
+    x_sph[..., 3] = 0.02
+    weight = tensor_args.to_device([1.0])
+    act_distance = tensor_args.to_device([0.05])
+    speed_dt = tensor_args.to_device([0.02])
+    results = []
+    for checker in checkers:
+        query_buffer = CollisionQueryBuffer.initialize_from_shape(
+            x_sph.shape, tensor_args, checker.collision_types
+        )
+        d_sph = checker.get_sphere_distance(x_sph, query_buffer, weight, act_distance)
+        d_swept = checker.get_swept_sphere_distance(
+            x_sph, query_buffer, weight, act_distance, speed_dt, 4
+        )
+        results.append(torch.cat([d_sph.view(-1), d_swept.view(-1)]))
+    assert torch.allclose(results[0], results[1])
+    assert checkers[1]._voxel_pyramid.culled_spheres > 0
+
+
+def test_esdf_from_occupancy():
+    occupancy = np.random.default_rng(0).random((30, 25, 20)) < 0.001
+    esdf = compute_esdf_from_occupancy(torch.from_numpy(occupancy), 0.02, 0.2)
+    esdf_reference = compute_esdf_from_occupancy_reference(occupancy, 0.02, 0.2)
+    assert np.any(esdf_reference > 0.0) and np.any(np.isclose(esdf_reference, -0.2))
+    assert np.allclose(esdf.numpy(), esdf_reference, atol=1e-6)
+
+
+def test_voxel_subgrid_update():
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    voxel_size = 0.05
+    grid = VoxelGrid(
+        name="map",
+        pose=[0.5, 0.0, 0.0, 0.7071068, 0.0, 0.0, 0.7071068],
+        dims=[3.0, 2.0, 1.0],
+        voxel_size=voxel_size,
+        tensor_args=tensor_args,
+    )
+    grid_shape = grid.get_grid_shape()[0]
+    occupancy = np.zeros(grid_shape, dtype=bool)
+    occupancy[10:20, 10:20, 5:10] = True
+    occupancy[45:55, 25:35, 10:15] = True
+    grid.feature_tensor = torch.from_numpy(
+        compute_esdf_from_occupancy_reference(occupancy, voxel_size, 0.3)
+    ).view(-1)
+    world_voxel_collision = WorldVoxelCollision(
+        WorldCollisionConfig(
+            tensor_args=tensor_args,
+            world_model=WorldConfig(voxel=[grid]),
+            checker_type=CollisionCheckerType.VOXEL,
+            esdf_update={"max_distance": 0.3},
+        )
+    )
+
+    # region aligned with voxels of the grid, replacing the first obstacle with a smaller one:
+    center = [0.8, -0.75, 0.0]
+    region = grid.get_region(center, half_extent=0.4)
+    center_local = (
+        Pose.from_list(grid.pose, tensor_args)
+        .inverse()
+        .transform_points(tensor_args.to_device([center]))
+    )
+    start = torch.floor((center_local.view(3) + 0.5 * torch.as_tensor(grid.dims)) / voxel_size)
+    start = (start.long() - 8).tolist()
+    region_occupancy = np.zeros((17, 17, 17), dtype=bool)
+    region_occupancy[12:15, 2:5, 5:8] = True
+    region.feature_tensor = torch.from_numpy(np.where(region_occupancy, 1.0, -1.0)).view(-1)
+    occupancy[start[0] : start[0] + 17, start[1] : start[1] + 17, start[2] : start[2] + 17] = (
+        region_occupancy
+    )
+    assert np.count_nonzero(occupancy[10:20, 10:20, 5:10]) < 100
+
+    box_start, box_shape = world_voxel_collision.update_voxel_subgrid(region)
+    assert np.prod(box_shape) < 0.5 * np.prod(grid_shape)
+    features = world_voxel_collision.get_voxel_grid("map").feature_tensor.view(grid_shape)
+    esdf_reference = compute_esdf_from_occupancy_reference(occupancy, voxel_size, 0.3)
+    assert torch.allclose(features, torch.from_numpy(esdf_reference), atol=1e-5)
+
+    # exact distance of a region is written without recomputing its surroundings:
+    region.feature_tensor = torch.full((17**3,), -0.1)
+    box_start, box_shape = world_voxel_collision.update_voxel_subgrid(
+        region, recompute_distance=False
+    )
+    assert box_start == start and box_shape == [17, 17, 17]
+    expected = torch.from_numpy(esdf_reference)
+    expected[start[0] : start[0] + 17, start[1] : start[1] + 17, start[2] : start[2] + 17] = -0.1
+    assert torch.allclose(features, expected, atol=1e-5)
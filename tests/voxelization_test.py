@@ -11,6 +11,7 @@
 
 # Third Party
 import pytest
+import torch
 
 # CuRobo
 from curobo.geom.sdf.world import (
@@ -19,7 +20,7 @@ from curobo.geom.sdf.world import (
     WorldPrimitiveCollision,
 )
 from curobo.geom.sdf.world_mesh import WorldMeshCollision
-from curobo.geom.types import Mesh, WorldConfig
+from curobo.geom.types import Cuboid, Mesh, VoxelGrid, WorldConfig
 from curobo.types.base import TensorDeviceType
 
 
@@ -178,3 +179,49 @@ def test_marching_cubes_from_world(world_collision):
 
     mesh.save_as_mesh("test_" + str(len(voxels)) + ".stl")
     assert len(mesh.vertices) > 100  # exact value is 240
+
+
+def test_esdf_in_chunks(tmp_path):
+    tensor_args = TensorDeviceType(device=torch.device("cpu"))
+    world_collision_config = WorldCollisionConfig.load_from_dict(
+        {"checker_type": CollisionCheckerType.PRIMITIVE, "max_distance": 5.0, "n_envs": 1},
+        get_world_model(),
+        tensor_args,
+    )
+    bounds = Cuboid("bounds", pose=[0.02, 0.01, -0.03, 0.96, 0, 0.28, 0], dims=[0.8, 0.5, 0.6])
+    voxel_size = 0.03
+    esdf = WorldPrimitiveCollision(world_collision_config).get_esdf_in_bounding_box(
+        bounds, voxel_size
+    )
+    occupancy = WorldPrimitiveCollision(world_collision_config).get_occupancy_in_bounding_box(
+        bounds, voxel_size
+    )
+    assert torch.count_nonzero(occupancy.feature_tensor) > 100
+
+    world_collision = WorldPrimitiveCollision(world_collision_config)
+    file_path = str(tmp_path / "esdf.npy")
+    esdf_chunks = world_collision.iter_esdf_in_bounding_box(
+        bounds, voxel_size, chunk_voxels=8, file_path=file_path
+    )
+    occupancy_chunks = world_collision.iter_occupancy_in_bounding_box(
+        bounds, voxel_size, chunk_voxels=8
+    )
+    for grid, chunks in [(esdf, esdf_chunks), (occupancy, occupancy_chunks)]:
+        features = torch.zeros(grid.get_grid_shape()[0])
+        for start, tile in chunks:
+            shape = tile.get_grid_shape()[0]
+            assert all(x <= 8 for x in shape)
+            features[tuple(slice(start[i], start[i] + shape[i]) for i in range(3))] = (
+                tile.feature_tensor.view(shape)
+            )
+        assert torch.allclose(features.view(-1), grid.feature_tensor, atol=1e-5)
+
+    esdf_file = VoxelGrid(
+        name="bounds",
+        pose=bounds.pose,
+        dims=bounds.dims,
+        voxel_size=voxel_size,
+        file_path=file_path,
+        tensor_args=tensor_args,
+    )
+    assert torch.allclose(esdf_file.load_features(), esdf.feature_tensor, atol=1e-5)
@@ -10,9 +10,12 @@
 #
 
 # Third Party
+import numpy as np
 import torch
+import trimesh
 
 # CuRobo
+from curobo.geom.mesh_decimation import MeshDecimationConfig
 from curobo.geom.sdf.world import (
     CollisionQueryBuffer,
     WorldCollisionConfig,
@@ -234,3 +237,101 @@ def test_world_modify_cpu():
     )
 
     assert world_ccheck.world_model.get_obstacle("cylinder_1").pose[2] == 1
+
+
+def test_mesh_decimation_encloses_mesh(tmp_path):
+    sphere = trimesh.creation.icosphere(subdivisions=5, radius=0.3)
+    mesh = Mesh("sphere", pose=[0, 0, 0, 1, 0, 0, 0], vertices=sphere.vertices, faces=sphere.faces)
+    config = MeshDecimationConfig(tolerance=0.05, min_faces=100)
+    world = WorldConfig(mesh=[mesh]).get_collision_check_world(decimation=config)
+    simple_mesh = world.mesh[0]
+    assert simple_mesh.name == "sphere"
+    assert len(simple_mesh.faces) < len(sphere.faces) / 2
+
+    # simplified mesh is inflated to enclose the original mesh:
+    assert simple_mesh.get_trimesh_mesh().contains(sphere.vertices * 0.999).all()
+
+    # face budget is met at the cost of a larger error:
+    _, stats = mesh.get_decimated_mesh(
+        MeshDecimationConfig(max_faces=500, max_error=0.3, min_faces=100)
+    )
+    assert stats.output_faces <= 500
+    assert 0.0 < stats.max_error <= 0.3
+
+    # small meshes are not simplified:
+    box = Cuboid("box", pose=[0, 0, 0, 1, 0, 0, 0], dims=[0.1, 0.1, 0.1]).get_mesh()
+    _, stats = box.get_decimated_mesh(config)
+    assert stats.output_faces == stats.input_faces
+
+    # simplified mesh files are cached:
+    mesh_file = join_path(get_assets_path(), "robot/franka_description/meshes/collision/link0.obj")
+    file_mesh = Mesh("link0", pose=[0, 0, 0, 1, 0, 0, 0], file_path=mesh_file)
+    file_config = MeshDecimationConfig(tolerance=0.02, min_faces=10)
+    simple_file_mesh, stats = file_mesh.get_decimated_mesh(file_config, cache_dir=str(tmp_path))
+    assert not stats.cached
+    cached_mesh, cached_stats = file_mesh.get_decimated_mesh(file_config, cache_dir=str(tmp_path))
+    assert cached_stats.cached
+    assert cached_stats.output_faces == stats.output_faces
+    assert len(cached_mesh.faces) == len(simple_file_mesh.faces)
+
+
+def test_mesh_decimation_encloses_sharp_meshes():
+    n_simplified = 0
+    for link_name in ["link0", "link1", "link3", "hand"]:
+        mesh_file = join_path(
+            get_assets_path(), "robot/franka_description/meshes/collision/" + link_name + ".obj"
+        )
+        mesh = Mesh(link_name, pose=[0, 0, 0, 1, 0, 0, 0], file_path=mesh_file)
+        original = mesh.get_trimesh_mesh()
+        for tolerance in [0.01, 0.02, 0.05]:
+            simple_mesh, stats = mesh.get_decimated_mesh(
+                MeshDecimationConfig(tolerance=tolerance, min_faces=10)
+            )
+            if stats.output_faces < stats.input_faces:
+                n_simplified += 1
+
+            # vertices of the original mesh are inside or on the simplified mesh:
+            simple = simple_mesh.get_trimesh_mesh()
+            outside = original.vertices[~simple.contains(original.vertices)]
+            if len(outside) > 0:
+                _, distance, _ = trimesh.proximity.closest_point(simple, outside)
+                assert distance.max() < 1e-5
+    assert n_simplified > 0
+
+
+def test_mesh_decimation_encloses_open_mesh():
+    # open heightfield, faces point upwards:
+    x, y = np.meshgrid(np.linspace(0, 2, 150), np.linspace(0, 2, 150))
+    vertices = np.stack([x, y, 0.1 * np.sin(3 * x) * np.cos(2 * y)], axis=-1).reshape(-1, 3)
+    idx = np.arange(150 * 150).reshape(150, 150)
+    a, b, c, d = idx[:-1, :-1], idx[:-1, 1:], idx[1:, :-1], idx[1:, 1:]
+    faces = np.concatenate(
+        [np.stack([a, b, d], axis=-1).reshape(-1, 3), np.stack([a, d, c], axis=-1).reshape(-1, 3)]
+    )
+    mesh = Mesh("terrain", pose=[0, 0, 0, 1, 0, 0, 0], vertices=vertices, faces=faces)
+    assert not mesh.get_trimesh_mesh().is_watertight
+
+    simple_mesh, stats = mesh.get_decimated_mesh(MeshDecimationConfig(tolerance=0.05))
+    assert stats.output_faces < stats.input_faces / 2
+
+    # vertices of the original mesh are below the simplified surface:
+    simple = simple_mesh.get_trimesh_mesh()
+    closest, _, face_idx = trimesh.proximity.closest_point(simple, vertices)
+    outside = np.sum((vertices - closest) * simple.face_normals[face_idx], axis=-1)
+    assert outside.max() < 1e-5
+
+
+def test_mesh_decimation_max_error():
+    box = trimesh.creation.box([1.0, 1.0, 1.0]).subdivide_to_size(0.02)
+    mesh = Mesh("box", pose=[0, 0, 0, 1, 0, 0, 0], vertices=box.vertices, faces=box.faces)
+
+    # face budget requires an error larger than max_error, original mesh is used:
+    config = MeshDecimationConfig(tolerance=0.005, max_faces=1000, min_faces=10)
+    _, stats = mesh.get_decimated_mesh(config)
+    assert stats.output_faces == stats.input_faces
+    assert stats.max_error == 0.0
+
+    config = MeshDecimationConfig(tolerance=0.005, max_faces=1000, max_error=0.5, min_faces=10)
+    _, stats = mesh.get_decimated_mesh(config)
+    assert stats.output_faces <= 1000
+    assert 0.0 < stats.max_error <= 0.5